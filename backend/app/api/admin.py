@@ -0,0 +1,113 @@
+"""
+API Routes for Administration
+"""
+
+import asyncio
+import secrets
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel, Field
+
+from app.api.routes import MODEL_LOADING_DETAIL, ErrorResponse
+from app.core.config import settings
+from app.core.profiling import ProfilerBusy, inference_profiler
+from app.utils.logger import get_logger
+
+logger = get_logger("admin")
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Let through only callers sending the configured admin token."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if x_admin_token is None or not secrets.compare_digest(
+        x_admin_token, settings.ADMIN_TOKEN
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+    responses={403: {"model": ErrorResponse}},
+)
+
+
+class ProfileRequest(BaseModel):
+    """Request model for a profiling capture."""
+
+    calls: Optional[int] = Field(
+        10,
+        ge=1,
+        le=1000,
+        description="Number of model calls to profile (null: until `seconds`)",
+    )
+    seconds: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Longest duration of the capture "
+        "(default and cap set by the server)",
+    )
+
+
+class ProfileResponse(BaseModel):
+    """Response model for a profiling capture."""
+
+    id: str = Field(..., description="Capture id")
+    calls: int = Field(..., description="Number of model calls profiled")
+    seconds: float = Field(..., description="Duration of the capture")
+    trace_dir: str = Field(..., description="Directory holding the traces")
+    traces: List[str] = Field(
+        ..., description="Chrome trace of each call (also read by TensorBoard)"
+    )
+    self_cpu_ms: float = Field(..., description="CPU time of every profiled op")
+    top_ops: List[Dict[str, Any]] = Field(
+        ..., description="Ops taking the most self CPU time"
+    )
+    top_shapes: List[Dict[str, Any]] = Field(
+        ..., description="Ops and input shapes taking the most self CPU time"
+    )
+
+
+@router.post(
+    "/profile",
+    response_model=ProfileResponse,
+    responses={409: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
+)
+async def profile(request: ProfileRequest):
+    """
+    Profile the next model calls of live traffic with torch.profiler.
+
+    Waits until `calls` model calls (one per text, or per batch when
+    requests are batched) have been profiled or `seconds` have passed, then
+    returns where the traces were written and the ops taking the most CPU
+    time. Profiled calls run one at a time, so serving slows down during a
+    capture. Returns 409 while another capture is running.
+    """
+    from app.core.model import model_manager
+
+    if not model_manager.is_loaded:
+        raise HTTPException(status_code=503, detail=MODEL_LOADING_DETAIL)
+    if settings.INFERENCE_BACKEND != "pytorch":
+        raise HTTPException(
+            status_code=409, detail="Profiling needs the pytorch backend"
+        )
+
+    seconds = min(
+        request.seconds or settings.PROFILE_MAX_SECONDS, settings.PROFILE_MAX_SECONDS
+    )
+    try:
+        future = inference_profiler.start(settings.LOGS_DIR, request.calls, seconds)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+
+    try:
+        await asyncio.wait({asyncio.wrap_future(future)}, timeout=seconds)
+    finally:
+        if not future.done():
+            # Out of time with no model call to end the capture, or the
+            # client went away.
+            await asyncio.to_thread(inference_profiler.stop)
+    return ProfileResponse(**future.result())
@@ -0,0 +1,148 @@
+"""
+API Routes for Translation Jobs
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field, HttpUrl
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.routes import MODEL_LOADING_DETAIL, ErrorResponse
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.job import Job
+from app.services.jobs import (
+    JobService,
+    check_callback_url,
+    job_params,
+    job_runner,
+)
+from app.services.translation import TranslationService
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+class JobRequest(BaseModel):
+    """Request model for a translation job."""
+
+    text: str = Field(
+        ...,
+        min_length=1,
+        max_length=settings.JOB_MAX_CHARS,
+        description="Document to translate",
+    )
+    num_beams: Optional[int] = Field(
+        None, ge=1, description="Beam width (default and cap set by the server)"
+    )
+    max_new_tokens: Optional[int] = Field(
+        None, ge=1, description="Maximum number of generated tokens per sentence"
+    )
+    callback_url: Optional[HttpUrl] = Field(
+        None, description="URL that receives the job as JSON once it ends"
+    )
+
+
+class JobResponse(BaseModel):
+    """Response model for a translation job."""
+
+    id: str = Field(..., description="Job id")
+    status: str = Field(..., description="queued, running, completed or failed")
+    segments_total: int = Field(..., description="Number of sentences in the document")
+    segments_done: int = Field(..., description="Number of sentences translated")
+    progress: float = Field(..., description="Fraction of sentences translated")
+    translation: str = Field(
+        ...,
+        description="Full translation once completed, else the translated "
+        "leading sentences",
+    )
+    error: Optional[str] = Field(None, description="Why the job failed")
+    strategy: str = Field(..., description="Decoding strategy: greedy or beam")
+    num_beams: int = Field(..., description="Beam width used")
+    callback_status: Optional[str] = Field(
+        None, description="Callback outcome: delivered or failed"
+    )
+    created_at: datetime = Field(..., description="When the job was submitted")
+    completed_at: Optional[datetime] = Field(None, description="When the job ended")
+
+
+async def _job_response(db: AsyncSession, job: Job) -> JobResponse:
+    """Describe a job and its translation so far."""
+    params = job_params(job)
+    return JobResponse(
+        id=job.id,
+        status=job.status,
+        segments_total=job.segments_total,
+        segments_done=job.segments_done,
+        progress=round(job.segments_done / job.segments_total, 4),
+        translation=await JobService.partial_translation(db, job),
+        error=job.error,
+        strategy=params.strategy,
+        num_beams=params.num_beams,
+        callback_status=job.callback_status,
+        created_at=job.created_at,
+        completed_at=job.completed_at,
+    )
+
+
+@router.post(
+    "",
+    response_model=JobResponse,
+    status_code=202,
+    responses={400: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
+)
+async def create_job(
+    request: JobRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Submit a document (e.g. a chapter or a book) for translation.
+
+    Returns at once with the job id. Poll `GET /jobs/{id}` for progress and
+    the translation so far, or pass `callback_url` to receive the finished
+    job as a JSON POST. Callback URLs must be http(s) and reach a public host
+    (or one in JOB_CALLBACK_ALLOWED_HOSTS); others are refused with a 400.
+    """
+    from app.core.model import model_manager
+
+    if not settings.JOBS_ENABLED:
+        raise HTTPException(status_code=503, detail="Translation jobs are disabled")
+    if not model_manager.is_loaded:
+        # Segmenting the document needs the tokenizer.
+        raise HTTPException(status_code=503, detail=MODEL_LOADING_DETAIL)
+
+    text = request.text.strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="Empty input")
+
+    params = TranslationService.plan(
+        "", num_beams=request.num_beams, max_new_tokens=request.max_new_tokens
+    )
+    callback_url = str(request.callback_url) if request.callback_url else None
+    if callback_url is not None:
+        try:
+            await check_callback_url(callback_url)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+    job = await JobService.create(db, text, params, callback_url)
+    job_runner.notify()
+    return await _job_response(db, job)
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobResponse,
+    responses={404: {"model": ErrorResponse}},
+)
+async def get_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the status, progress and translation so far of a job.
+    """
+    job = await JobService.get(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return await _job_response(db, job)
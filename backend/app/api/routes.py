@@ -2,14 +2,46 @@
 API Routes for Translation Service
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, Field
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+from pydantic import BaseModel, Field, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
 
+from app.core.admission import (
+    DeadlineExceeded,
+    Overloaded,
+    Ticket,
+    admission_controller,
+)
+from app.core.batching import batch_scheduler
+from app.core.bucketing import padding_stats
+from app.core.compilation import compile_stats
+from app.core.config import settings
 from app.core.database import get_db
-from app.models.translation import Translation
-from app.services.translation import TranslationService
+from app.core.generation import GenerationParams, cascade_stats, latency_model
+from app.core.metrics import (
+    ERRORS,
+    REQUEST_SECONDS,
+    phase_timer,
+    record_cache_lookup,
+    render_metrics,
+)
+from app.core.tokenization import phase_stats
+from app.services.cache import translation_cache
+from app.services.memory import TranslationMemory, sentence_memory_stats
+from app.services.singleflight import translation_flights
+from app.services.translation import TranslationService, stream_stats
 from app.utils.logger import get_logger
+from app.utils.memory import get_memory_usage
 
 router = APIRouter()
 logger = get_logger("routes")
@@ -22,12 +54,54 @@ class TranslationRequest(BaseModel):
     text: str = Field(
         ..., min_length=1, max_length=5000, description="Text to translate"
     )
+    num_beams: Optional[int] = Field(
+        None, ge=1, description="Beam width (default and cap set by the server)"
+    )
+    max_new_tokens: Optional[int] = Field(
+        None, ge=1, description="Maximum number of generated tokens"
+    )
+    latency_budget_ms: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Latency budget; fewer beams are used if needed to meet it",
+    )
+
+
+class BatchTranslationRequest(BaseModel):
+    """Request model for batch translation."""
+
+    texts: List[Annotated[str, Field(max_length=5000)]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.MAX_BATCH_TEXTS,
+        description="Texts to translate",
+    )
+    num_beams: Optional[int] = Field(
+        None, ge=1, description="Beam width (default and cap set by the server)"
+    )
+    max_new_tokens: Optional[int] = Field(
+        None, ge=1, description="Maximum number of generated tokens per text"
+    )
 
 
 class TranslationResponse(BaseModel):
     """Response model for translation."""
 
     translation: str = Field(..., description="Translated text")
+    from_memory: bool = Field(
+        False, description="Whether the translation came from translation memory"
+    )
+    segments: Optional[int] = Field(
+        None, description="Number of sentences the input was split into"
+    )
+    segments_from_memory: Optional[int] = Field(
+        None, description="Number of sentences served from translation memory"
+    )
+    memory_fraction: float = Field(
+        0.0, description="Fraction of the input served from translation memory"
+    )
+    strategy: str = Field(..., description="Decoding strategy: greedy or beam")
+    num_beams: int = Field(..., description="Beam width used")
 
 
 class ErrorResponse(BaseModel):
@@ -43,13 +117,167 @@ class HealthResponse(BaseModel):
     model_loaded: bool = Field(..., description="Whether the model is loaded")
 
 
+class StatsResponse(BaseModel):
+    """Inference statistics response model."""
+
+    model: Dict[str, Any] = Field(..., description="Served model details")
+    batching: Dict[str, Any] = Field(..., description="Micro-batching statistics")
+    admission: Dict[str, Any] = Field(
+        ..., description="Inference queue depth, waits and rejected requests"
+    )
+    padding: Dict[str, Any] = Field(
+        ..., description="Ratio of real to padded tokens per batch"
+    )
+    tokenization: Dict[str, Any] = Field(
+        ..., description="Tokenize, generate and decode times and token-id cache"
+    )
+    compile: Dict[str, Any] = Field(
+        ..., description="Compile time, bucket hit rates and per-bucket latency"
+    )
+    cache: Dict[str, Any] = Field(..., description="Translation cache counters")
+    dedup: Dict[str, Any] = Field(
+        ..., description="Identical concurrent translations sharing one generation"
+    )
+    memory: Dict[str, Any] = Field(..., description="Sentence memory counters")
+    generation: Dict[str, Any] = Field(
+        ..., description="Latency estimates and decoding strategies chosen"
+    )
+    cascade: Dict[str, Any] = Field(
+        ..., description="Greedy-first escalation rate and latency saved"
+    )
+    streaming: Dict[str, Any] = Field(
+        ..., description="Time to first token and outcome of streamed translations"
+    )
+    process: Dict[str, Any] = Field(..., description="Worker process memory usage")
+
+
 # Index route removed as frontend is served separately
 
+MODEL_LOADING_DETAIL = "Model is loading (takes 30-60s). Please refresh."
+OVERLOADED_DETAIL = "Server is busy. Please retry later."
+EXPIRED_DETAIL = "Request expired while waiting for the model. Please retry."
+
+
+def _admit() -> Ticket:
+    """Admit a request into the inference queue, or reject it with a 429."""
+    try:
+        return admission_controller.acquire()
+    except Overloaded as e:
+        logger.warning(f"{e}, rejecting request")
+        raise HTTPException(
+            status_code=429,
+            detail=OVERLOADED_DETAIL,
+            headers={"Retry-After": str(e.retry_after)},
+        ) from e
+
+
+def _expired(error: DeadlineExceeded) -> HTTPException:
+    """Describe a request dropped before it reached the model."""
+    logger.warning(f"{error}, request dropped")
+    return HTTPException(
+        status_code=503,
+        detail=EXPIRED_DETAIL,
+        headers={"Retry-After": str(admission_controller.retry_after())},
+    )
+
+
+def _count_error(endpoint: str, reason: str) -> None:
+    """
+    Count a failed or rejected request.
+
+    Args:
+        endpoint: Endpoint name
+        reason: invalid, unavailable, overloaded, expired or failed
+    """
+    ERRORS.labels(endpoint, reason).inc()
+
+
+def _error_reason(error: HTTPException) -> str:
+    """Name the reason of an HTTP error for the error counter."""
+    if error.status_code == 429:
+        return "overloaded"
+    if error.status_code == 503:
+        return "expired" if error.detail == EXPIRED_DETAIL else "unavailable"
+    if error.status_code < 500:
+        return "invalid"
+    return "failed"
+
+
+def _observe_request(endpoint: str, started: float) -> None:
+    """Record the total time spent serving a request."""
+    REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - started)
+
+
+def _plan(request: TranslationRequest, text: str) -> GenerationParams:
+    """Choose the decoding settings for a request."""
+    return TranslationService.plan(
+        text,
+        num_beams=request.num_beams,
+        max_new_tokens=request.max_new_tokens,
+        latency_budget_ms=request.latency_budget_ms,
+    )
+
+
+def _decoding(text: str, params: GenerationParams) -> Dict[str, Any]:
+    """Report the decoding a request's translation was actually produced with."""
+    used = TranslationService.decoding_used(text, params)
+    return {"strategy": used.strategy, "num_beams": used.num_beams}
+
+
+async def _lookup_memory(
+    db: AsyncSession, text: str, params: GenerationParams, use_memory: bool = True
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Look a text up in the translation memory.
+
+    Returns:
+        Tuple of (content hash, model version, remembered translation); all
+        None when the translation memory is disabled or bypassed
+    """
+    from app.core.model import model_manager
+
+    if not (settings.TRANSLATION_MEMORY_ENABLED and use_memory):
+        return None, None, None
+
+    content_hash = TranslationService.content_hash(text, params)
+    model_version = model_manager.model_version
+    try:
+        remembered = await TranslationMemory.lookup(db, content_hash, model_version)
+    except Exception as e:
+        logger.error(f"Translation memory lookup failed: {e}")
+        remembered = None
+    record_cache_lookup("memory", remembered is not None)
+    return content_hash, model_version, remembered
+
+
+async def _save_history(
+    db: AsyncSession,
+    text: str,
+    translation: str,
+    content_hash: Optional[str],
+    model_version: Optional[str],
+) -> None:
+    """Save a translation to the database without failing the request."""
+    try:
+        with phase_timer("db_persist"):
+            db_translation = await TranslationMemory.store(
+                db, text, translation, content_hash, model_version
+            )
+        logger.info(f"Saved to DB: {db_translation.id}")
+    except Exception as e:
+        logger.error(f"Failed to save translation to DB: {e}")
+        # We don't fail the request if saving to DB fails, just log it
+
 
 @router.post(
     "/translate",
     response_model=TranslationResponse,
-    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    responses={
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    },
 )
 async def translate(
     request: TranslationRequest,
@@ -59,50 +287,482 @@ async def translate(
     Translate English text to Spanish.
 
     - **text**: English text to translate (1-5000 characters)
+    - **num_beams**: Beam width (optional, capped by the server)
+    - **max_new_tokens**: Maximum number of generated tokens (optional)
+    - **latency_budget_ms**: Latency budget (optional); under a tight budget
+      fewer beams, down to greedy decoding, are used
+
+    Returns the Spanish translation and the decoding strategy used (greedy
+    when cascaded decoding kept the greedy output of a beam search request).
+    When the inference queue is full, returns 429 with a `Retry-After` header.
+    """
+    started = time.perf_counter()
+    try:
+        return await _translate(request, db)
+    except HTTPException as e:
+        _count_error("translate", _error_reason(e))
+        raise
+    finally:
+        _observe_request("translate", started)
+
 
-    Returns the Spanish translation.
+async def _run_translation(
+    text: str, params: GenerationParams, db: AsyncSession, use_memory: bool
+) -> Tuple[str, Dict[str, Any]]:
     """
+    Translate a text that is not in the translation memory.
+
+    Returns:
+        The translation, and the sentence memory report of the response
+    """
+    ticket = _admit()
+    # Inference runs on the executor, so the event loop stays responsive.
+    try:
+        with admission_controller.bind(ticket):
+            if (
+                settings.TRANSLATION_MEMORY_ENABLED
+                and settings.SENTENCE_MEMORY_ENABLED
+                and use_memory
+            ):
+                result = await TranslationService.translate_with_memory(
+                    text, db, params
+                )
+                return result.translation, {
+                    "segments": result.segments,
+                    "segments_from_memory": result.segments_from_memory,
+                    "memory_fraction": round(result.memory_fraction, 4),
+                }
+            translation = await TranslationService.translate_async(
+                text, params, use_cache=use_memory
+            )
+            return translation, {}
+    finally:
+        admission_controller.release(ticket)
+
+
+async def _translate(request: TranslationRequest, db: AsyncSession):
+    """Serve a ``/translate`` request."""
     from app.core.model import model_manager
 
     if not model_manager.is_loaded:
-        raise HTTPException(
-            status_code=503,
-            detail="Model is loading (takes 30-60s). Please refresh.",
-        )
+        raise HTTPException(status_code=503, detail=MODEL_LOADING_DETAIL)
 
     try:
         text = request.text.strip()
         if not text:
             raise HTTPException(status_code=400, detail="Empty input")
 
+        params = _plan(request, text)
+        use_memory = not settings.LOADTEST_BYPASS_MEMORY
+
+        content_hash, model_version, remembered = await _lookup_memory(
+            db, text, params, use_memory
+        )
+        if remembered is not None:
+            logger.info("Translation served from translation memory")
+            await _save_history(db, text, remembered, content_hash, model_version)
+            return TranslationResponse(
+                translation=remembered,
+                from_memory=True,
+                memory_fraction=1.0,
+                **_decoding(text, params),
+            )
+
         logger.info(f"Translating text of length {len(text)}")
-        translation_text = TranslationService.translate(text)
+        translation_text, report = await _run_translation(text, params, db, use_memory)
         logger.info("Translation completed successfully")
 
-        # Save to database
-        try:
-            db_translation = Translation(
-                source_text=text,
-                translated_text=translation_text,
-            )
-            db.add(db_translation)
-            await db.commit()
-            await db.refresh(db_translation)
-            logger.info(f"Saved to DB: {db_translation.id}")
-        except Exception as e:
-            logger.error(f"Failed to save translation to DB: {e}")
-            # We don't fail the request if saving to DB fails, just log it
-            pass
+        # Save to database (not load test traffic, which replays the history)
+        if use_memory:
+            await _save_history(db, text, translation_text, content_hash, model_version)
 
-        return TranslationResponse(translation=translation_text)
+        return TranslationResponse(
+            translation=translation_text, **report, **_decoding(text, params)
+        )
 
     except HTTPException:
         raise
+    except DeadlineExceeded as e:
+        raise _expired(e) from e
     except Exception as e:
         logger.error(f"Translation error: {e}")
         raise HTTPException(status_code=500, detail="Translation error") from e
 
 
+async def _lookup_memory_many(
+    db: AsyncSession, texts: List[str], hashes: List[str], model_version: str
+) -> Dict[str, str]:
+    """
+    Look the non-empty texts of a batch up in the translation memory.
+
+    Returns:
+        Remembered translations by content hash (empty when the translation
+        memory is disabled)
+    """
+    if not settings.TRANSLATION_MEMORY_ENABLED:
+        return {}
+
+    looked_up = [h for h, text in zip(hashes, texts) if text]
+    remembered: Dict[str, str] = {}
+    try:
+        remembered = await TranslationMemory.lookup_many(db, looked_up, model_version)
+    except Exception as e:
+        logger.error(f"Translation memory lookup failed: {e}")
+    hits = sum(h in remembered for h in looked_up)
+    record_cache_lookup("memory", True, hits)
+    record_cache_lookup("memory", False, len(looked_up) - hits)
+    return remembered
+
+
+async def _save_history_many(
+    db: AsyncSession,
+    history: List[Tuple[str, str, Optional[str]]],
+    model_version: str,
+) -> None:
+    """Save the translations of a batch in one transaction, without failing it."""
+    try:
+        with phase_timer("db_persist"):
+            await TranslationMemory.store_many(
+                db,
+                history,
+                model_version if settings.TRANSLATION_MEMORY_ENABLED else None,
+            )
+        if history:
+            logger.info(f"Saved {len(history)} translations to DB")
+    except Exception as e:
+        logger.error(f"Failed to save batch translations to DB: {e}")
+
+
+async def _batch_results(
+    texts: List[str], params: GenerationParams, db: AsyncSession
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Translate a batch, yielding one result per text as soon as it is ready.
+
+    Texts found in the translation memory come first. Everything else goes
+    through ``TranslationService.translate_many``. Every translated text,
+    remembered or not, is saved to the history in one transaction at the end.
+    """
+    from app.core.model import model_manager
+
+    texts = [text.strip() for text in texts]
+    model_version = model_manager.model_version
+    hashes = [TranslationService.content_hash(text, params) for text in texts]
+    remembered = await _lookup_memory_many(db, texts, hashes, model_version)
+
+    history = []
+    pending = []
+    for i, content_hash in enumerate(hashes):
+        if content_hash in remembered and texts[i]:
+            history.append((texts[i], remembered[content_hash], content_hash))
+            yield {
+                "index": i,
+                "translation": remembered[content_hash],
+                "from_memory": True,
+            }
+        else:
+            pending.append(i)
+    if remembered:
+        logger.info(
+            f"{len(texts) - len(pending)} of {len(texts)} texts served "
+            "from translation memory"
+        )
+
+    async for result in TranslationService.translate_many(
+        [texts[i] for i in pending], params
+    ):
+        i = pending[result.index]
+        if result.error is not None:
+            _count_error("translate_batch", "failed" if texts[i] else "invalid")
+            yield {"index": i, "error": result.error}
+            continue
+        yield {"index": i, "translation": result.translation, "from_memory": False}
+        content_hash = hashes[i] if settings.TRANSLATION_MEMORY_ENABLED else None
+        history.append((texts[i], result.translation, content_hash))
+
+    await _save_history_many(db, history, model_version)
+
+
+@router.post(
+    "/translate/batch",
+    responses={
+        200: {"content": {"application/x-ndjson": {}}},
+        429: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    },
+)
+async def translate_batch(
+    request: BatchTranslationRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Translate many English texts to Spanish in one request.
+
+    Returns newline-delimited JSON, one line per text, in the order the
+    translations finish rather than the input order:
+
+    - `{"index", "translation", "from_memory"}` for a translated text
+    - `{"index", "error"}` for an empty text or a failed translation
+
+    `index` is the position of the text in `texts`. Texts share batched
+    model calls and the results are saved to the history together. The
+    request takes one place in the inference queue (429 when it is full).
+    """
+    from app.core.model import model_manager
+
+    started = time.perf_counter()
+    if not model_manager.is_loaded:
+        _count_error("translate_batch", "unavailable")
+        raise HTTPException(status_code=503, detail=MODEL_LOADING_DETAIL)
+
+    params = TranslationService.plan(
+        "", num_beams=request.num_beams, max_new_tokens=request.max_new_tokens
+    )
+
+    try:
+        ticket = _admit()
+    except HTTPException as e:
+        _count_error("translate_batch", _error_reason(e))
+        raise
+
+    async def lines() -> AsyncIterator[str]:
+        try:
+            with admission_controller.bind(ticket):
+                async for result in _batch_results(request.texts, params, db):
+                    yield json.dumps(result, ensure_ascii=False) + "\n"
+        finally:
+            admission_controller.release(ticket)
+            _observe_request("translate_batch", started)
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={
+            "X-Decoding-Strategy": params.strategy,
+            "X-Num-Beams": str(params.num_beams),
+        },
+        # Also releases the ticket if the client left before the first line.
+        background=BackgroundTask(admission_controller.release, ticket),
+    )
+
+
+async def _stream_events(
+    request: TranslationRequest, db: AsyncSession, cancel: threading.Event
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Translate a request as a sequence of stream events.
+
+    Yields ``chunk`` events with consecutive pieces of the translation, then
+    one ``done`` event with the full translation, or an ``error`` event.
+    """
+    text = request.text.strip()
+    use_memory = not settings.LOADTEST_BYPASS_MEMORY
+    try:
+        params = _plan(request, text)
+        content_hash, model_version, remembered = await _lookup_memory(
+            db, text, params, use_memory
+        )
+        if remembered is not None:
+            logger.info("Streamed translation served from translation memory")
+            await _save_history(db, text, remembered, content_hash, model_version)
+            yield {"type": "chunk", "text": remembered}
+            yield {
+                "type": "done",
+                "translation": remembered,
+                "from_memory": True,
+                **_decoding(text, params),
+            }
+            return
+
+        pieces = []
+        async for chunk in TranslationService.translate_stream(
+            text, params, cancel, use_cache=use_memory
+        ):
+            pieces.append(chunk)
+            yield {"type": "chunk", "text": chunk}
+    except DeadlineExceeded as e:
+        logger.warning(f"{e}, streaming request dropped")
+        yield {"type": "error", "error": EXPIRED_DETAIL}
+        return
+    except Exception as e:
+        logger.error(f"Streaming translation error: {e}")
+        yield {"type": "error", "error": "Translation error"}
+        return
+
+    translation = "".join(pieces)
+    if use_memory:
+        await _save_history(db, text, translation, content_hash, model_version)
+    yield {
+        "type": "done",
+        "translation": translation,
+        "from_memory": False,
+        **_decoding(text, params),
+    }
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    """Format a stream event as a server-sent event."""
+    data = {key: value for key, value in event.items() if key != "type"}
+    return f"event: {event['type']}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post(
+    "/translate/stream",
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    },
+)
+async def translate_stream(
+    request: TranslationRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Translate English text to Spanish, streaming the output as server-sent events.
+
+    Takes the same fields as `/translate`. Greedy decoding (`num_beams=1`)
+    streams word by word; beam search streams sentence by sentence. Events:
+
+    - **chunk**: `{"text": ...}`, the next piece of the translation
+    - **done**: `{"translation", "from_memory", "strategy", "num_beams"}`
+    - **error**: `{"error": ...}`
+
+    Generation stops when the client disconnects.
+    """
+    from app.core.model import model_manager
+
+    started = time.perf_counter()
+    try:
+        if not model_manager.is_loaded:
+            raise HTTPException(status_code=503, detail=MODEL_LOADING_DETAIL)
+        if not request.text.strip():
+            raise HTTPException(status_code=400, detail="Empty input")
+        ticket = _admit()
+    except HTTPException as e:
+        _count_error("translate_stream", _error_reason(e))
+        raise
+    cancel = threading.Event()
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            with admission_controller.bind(ticket):
+                async for event in _stream_events(request, db, cancel):
+                    if event["type"] == "error":
+                        expired = event["error"] == EXPIRED_DETAIL
+                        _count_error(
+                            "translate_stream", "expired" if expired else "failed"
+                        )
+                    yield _sse(event)
+        finally:
+            # Also reached when the client disconnects mid-stream.
+            cancel.set()
+            admission_controller.release(ticket)
+            _observe_request("translate_stream", started)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(admission_controller.release, ticket),
+    )
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    """Return once the client disconnects, ignoring other messages."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+async def _reject_ws(websocket: WebSocket, code: int, error: str, **fields) -> None:
+    """Send an error event, then close the socket with ``code``."""
+    await websocket.send_json({"type": "error", "error": error, **fields})
+    await websocket.close(code=code)
+
+
+async def _receive_ws_request(websocket: WebSocket) -> Optional[TranslationRequest]:
+    """
+    Read the request message of a WebSocket stream.
+
+    Returns:
+        The request, or None if the client left or the request was rejected
+        (invalid input closes with 1007, a loading model with 1013)
+    """
+    from app.core.model import model_manager
+
+    try:
+        request = TranslationRequest(**await websocket.receive_json())
+    except WebSocketDisconnect:
+        return None
+    except (ValidationError, ValueError, TypeError) as e:
+        await _reject_ws(websocket, 1007, str(e))
+        return None
+
+    if not model_manager.is_loaded:
+        await _reject_ws(websocket, 1013, MODEL_LOADING_DETAIL)
+        return None
+    if not request.text.strip():
+        await _reject_ws(websocket, 1007, "Empty input")
+        return None
+    return request
+
+
+async def _admit_ws(websocket: WebSocket) -> Optional[Ticket]:
+    """Admit a WebSocket stream, or reject it with 1013 when overloaded."""
+    try:
+        return admission_controller.acquire()
+    except Overloaded as e:
+        logger.warning(f"{e}, rejecting streaming request")
+        await _reject_ws(websocket, 1013, OVERLOADED_DETAIL, retry_after=e.retry_after)
+        return None
+
+
+@router.websocket("/translate/stream")
+async def translate_stream_ws(
+    websocket: WebSocket,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Translate English text to Spanish, streaming the output over a WebSocket.
+
+    The client sends one JSON message with the `/translate` fields and
+    receives the same events as the server-sent event endpoint, as JSON
+    messages with a `type` key. Closing the socket stops generation.
+    """
+    await websocket.accept()
+    request = await _receive_ws_request(websocket)
+    if request is None:
+        return
+    ticket = await _admit_ws(websocket)
+    if ticket is None:
+        return
+
+    cancel = threading.Event()
+
+    async def send_events() -> None:
+        with admission_controller.bind(ticket):
+            async for event in _stream_events(request, db, cancel):
+                await websocket.send_json(event)
+
+    sender = asyncio.ensure_future(send_events())
+    listener = asyncio.ensure_future(_wait_for_disconnect(websocket))
+    try:
+        await asyncio.wait({sender, listener}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        cancel.set()
+        listener.cancel()
+        sender.cancel()
+        admission_controller.release(ticket)
+
+    if listener.done() and not listener.cancelled():
+        logger.info("Client disconnected, streaming translation cancelled")
+        return
+    await websocket.close()
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """
@@ -116,3 +776,64 @@ async def health_check():
         status="healthy",
         model_loaded=model_manager.is_loaded,
     )
+
+
+@router.get("/metrics", response_class=Response)
+async def metrics():
+    """
+    Prometheus metrics endpoint.
+
+    Returns latency histograms of the whole request and of each phase (queue
+    wait, tokenize, generate, decode, DB persist), token, cache lookup and
+    error counters, queue depth and model load durations, in the Prometheus
+    text format.
+    """
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+@router.get("/stats", response_model=StatsResponse)
+async def stats():
+    """
+    Inference statistics endpoint.
+
+    Returns the served model details, inference queue depth, waits and
+    rejections, per-batch sizes and queue waits (used to tune the batching
+    window against latency), the share of real versus padding tokens in each
+    batch, time spent tokenizing, generating and decoding with the token-id
+    cache counters, compile times and per-length-bucket latency, translation
+    cache, in-flight deduplication and sentence memory counters, latency
+    estimates and decoding strategies chosen for requests, the escalation
+    rate and estimated latency saved by greedy-first decoding, time to first
+    token of streamed translations, and the memory usage of the serving
+    process.
+    """
+    from app.core.model import model_manager
+
+    return StatsResponse(
+        model={
+            "loaded": model_manager.is_loaded,
+            "backend": settings.INFERENCE_BACKEND,
+            "version": model_manager.model_version if model_manager.is_loaded else None,
+            "quantized": model_manager.is_quantized,
+            "compiled": model_manager.is_compiled,
+            "memory_mapped": model_manager.weights_memory_mapped,
+            "load_seconds": model_manager.load_timings,
+            "load_memory_mb": model_manager.load_memory,
+            "quantization_check": model_manager.quantization_report,
+        },
+        admission=admission_controller.snapshot(),
+        batching=batch_scheduler.stats.snapshot(),
+        padding=padding_stats.snapshot(),
+        tokenization={
+            "phases": phase_stats.snapshot(),
+            "token_cache": model_manager.token_cache_stats,
+        },
+        compile=compile_stats.snapshot(),
+        cache=translation_cache.stats(),
+        dedup=translation_flights.snapshot(),
+        memory=sentence_memory_stats.snapshot(),
+        generation=latency_model.snapshot(),
+        cascade=cascade_stats.snapshot(),
+        streaming=stream_stats.snapshot(),
+        process={"pid": os.getpid(), **get_memory_usage()},
+    )
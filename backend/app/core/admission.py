@@ -0,0 +1,243 @@
+"""
+Admission Control for Model Inference
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+
+from app.core.config import settings
+from app.core.metrics import QUEUE_DEPTH, QUEUE_REJECTED, QUEUE_SHED, observe_phase
+from app.utils.logger import get_logger
+
+logger = get_logger("admission")
+
+
+class Overloaded(Exception):
+    """Raised when the inference queue is full."""
+
+    def __init__(self, depth: int, retry_after: int):
+        """
+        Initialize the error.
+
+        Args:
+            depth: Requests waiting for or running on the model
+            retry_after: Seconds until the queue is expected to have drained
+        """
+        super().__init__(f"Inference queue is full ({depth} requests)")
+        self.depth = depth
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request waited past its deadline before reaching the model."""
+
+
+@dataclass
+class Ticket:
+    """An admitted request, from admission until it leaves the queue."""
+
+    admitted_at: float
+    # perf_counter() time after which it is dropped (None: never).
+    deadline: Optional[float] = None
+    started_at: Optional[float] = None
+    released: bool = False
+
+    @property
+    def expired(self) -> bool:
+        """Check if the deadline has passed."""
+        return self.deadline is not None and time.perf_counter() > self.deadline
+
+
+# Ticket of the request being served. Inference calls made on its behalf
+# (through the batch scheduler or the inference executor) read it to drop
+# the work once the deadline has passed.
+_current_ticket: ContextVar[Optional[Ticket]] = ContextVar(
+    "admission_ticket", default=None
+)
+
+
+def current_ticket() -> Optional[Ticket]:
+    """Get the ticket of the request being served, if it was admitted."""
+    return _current_ticket.get()
+
+
+class AdmissionController:
+    """
+    Bounded queue in front of the model.
+
+    Counts the requests waiting for or running on the model. Past
+    ADMISSION_MAX_DEPTH, requests are rejected at once with the time the
+    queue is expected to take to drain: its depth times the service time.
+    The service time is a moving average of the time between two requests
+    leaving the queue while it is busy, so batching and parallel inference
+    threads are accounted for. Admitted requests still waiting for the model
+    ADMISSION_TIMEOUT_MS after admission are dropped before generation.
+    """
+
+    def __init__(self, smoothing: float = 0.2):
+        """
+        Initialize the controller.
+
+        Args:
+            smoothing: Weight of the newest observation in the service time
+        """
+        self._smoothing = smoothing
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all counters (the queue must be empty)."""
+        with self._lock:
+            self.depth = 0
+            QUEUE_DEPTH.set(0)
+            self.peak_depth = 0
+            self.admitted = 0
+            self.rejected = 0
+            self.shed = 0
+            self.started = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self._service_s: Optional[float] = None
+            self._last_departure: Optional[float] = None
+
+    def _service_seconds(self) -> float:
+        """Current service time estimate (lock must be held)."""
+        if self._service_s is None:
+            return settings.ADMISSION_SERVICE_TIME_PRIOR_MS / 1000
+        return self._service_s
+
+    def retry_after(self) -> int:
+        """Seconds for the current queue to drain, at least 1."""
+        with self._lock:
+            return max(1, math.ceil(self.depth * self._service_seconds()))
+
+    def acquire(self) -> Ticket:
+        """
+        Admit a request into the queue.
+
+        Returns:
+            Ticket to hand to ``release`` once the request is done
+
+        Raises:
+            Overloaded: If the queue is full
+        """
+        now = time.perf_counter()
+        with self._lock:
+            max_depth = settings.ADMISSION_MAX_DEPTH
+            if max_depth > 0 and self.depth >= max_depth:
+                self.rejected += 1
+                QUEUE_REJECTED.inc()
+                retry_after = max(1, math.ceil(self.depth * self._service_seconds()))
+                raise Overloaded(self.depth, retry_after)
+
+            if self.depth == 0:
+                # Idle until now: time the first departure from here.
+                self._last_departure = now
+            self.depth += 1
+            self.admitted += 1
+            self.peak_depth = max(self.peak_depth, self.depth)
+            QUEUE_DEPTH.set(self.depth)
+
+        timeout = settings.ADMISSION_TIMEOUT_MS
+        deadline = now + timeout / 1000 if timeout > 0 else None
+        return Ticket(admitted_at=now, deadline=deadline)
+
+    def release(self, ticket: Ticket) -> None:
+        """
+        Remove a request from the queue (once, however often it is called).
+
+        Args:
+            ticket: Ticket returned by ``acquire``
+        """
+        now = time.perf_counter()
+        with self._lock:
+            if ticket.released:
+                return
+            ticket.released = True
+            self.depth = max(0, self.depth - 1)
+            QUEUE_DEPTH.set(self.depth)
+            if self._last_departure is not None:
+                interval = now - self._last_departure
+                if self._service_s is None:
+                    self._service_s = interval
+                else:
+                    self._service_s += self._smoothing * (interval - self._service_s)
+            self._last_departure = now if self.depth else None
+
+    def check(self, ticket: Optional[Ticket]) -> None:
+        """
+        Let a request through to the model, unless its deadline has passed.
+
+        Called right before generation. The first call records how long the
+        request waited since admission; once a request has reached the model,
+        the rest of its work (e.g. later segments) is never dropped.
+
+        Args:
+            ticket: Ticket of the request (None for work that was not admitted)
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed
+        """
+        if ticket is None or ticket.started_at is not None:
+            return
+        if ticket.expired:
+            with self._lock:
+                self.shed += 1
+            QUEUE_SHED.inc()
+            raise DeadlineExceeded("Request expired while waiting for the model")
+
+        ticket.started_at = time.perf_counter()
+        wait = ticket.started_at - ticket.admitted_at
+        observe_phase("queue_wait", wait)
+        wait_ms = wait * 1000
+        with self._lock:
+            self.started += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    @contextmanager
+    def bind(self, ticket: Ticket) -> Iterator[Ticket]:
+        """
+        Make a ticket the current one for the inference calls of a block.
+
+        Args:
+            ticket: Ticket returned by ``acquire``
+        """
+        token = _current_ticket.set(ticket)
+        try:
+            yield ticket
+        finally:
+            try:
+                _current_ticket.reset(token)
+            except ValueError:
+                # A streaming generator finalized from another context; there
+                # is nothing to restore there.
+                pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the statistics as a JSON-serializable dict."""
+        with self._lock:
+            service_s = self._service_seconds()
+            return {
+                "max_depth": settings.ADMISSION_MAX_DEPTH,
+                "depth": self.depth,
+                "peak_depth": self.peak_depth,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "shed": self.shed,
+                "mean_wait_ms": (
+                    round(self.total_wait_ms / self.started, 3) if self.started else 0.0
+                ),
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "service_time_ms": round(service_s * 1000, 3),
+                "retry_after_s": max(1, math.ceil(self.depth * service_s)),
+            }
+
+
+# Global admission controller instance
+admission_controller = AdmissionController()
@@ -0,0 +1,362 @@
+"""
+Micro-batching Scheduler for Translation Requests
+"""
+
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.admission import (
+    DeadlineExceeded,
+    Ticket,
+    admission_controller,
+    current_ticket,
+)
+from app.core.config import settings
+from app.core.executor import InferenceExecutor, inference_executor
+from app.core.generation import GenerationParams
+from app.core.model import ModelManager, model_manager
+from app.utils.logger import get_logger
+
+logger = get_logger("batching")
+
+
+@dataclass
+class PendingRequest:
+    """A translation request waiting to be placed in a batch."""
+
+    text: str
+    # None uses the serving settings.
+    params: Optional[GenerationParams] = None
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    num_tokens: Optional[int] = None
+    # Admission ticket of the request it was submitted for, if any.
+    ticket: Optional[Ticket] = None
+
+
+def _set_result(future: Future, result: Any) -> None:
+    """Resolve a future, unless its caller has already cancelled it."""
+    try:
+        if not future.done():
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+def _set_exception(future: Future, error: BaseException) -> None:
+    """Fail a future, unless its caller has already cancelled it."""
+    try:
+        if not future.done():
+            future.set_exception(error)
+    except InvalidStateError:
+        pass
+
+
+class BatchStats:
+    """Running statistics about the batches dispatched to the model."""
+
+    def __init__(self, history: int = 100):
+        """
+        Initialize the statistics.
+
+        Args:
+            history: Number of recent batch sizes to keep
+        """
+        self._lock = threading.Lock()
+        self._history = history
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded statistics."""
+        with self._lock:
+            self.batches = 0
+            self.requests = 0
+            self.size_histogram: Counter = Counter()
+            self.recent_sizes: Deque[int] = deque(maxlen=self._history)
+            self.total_queue_wait_ms = 0.0
+            self.max_queue_wait_ms = 0.0
+
+    def record(self, batch: List[PendingRequest], dispatched_at: float) -> None:
+        """
+        Record a dispatched batch.
+
+        Args:
+            batch: Requests in the batch
+            dispatched_at: perf_counter() timestamp of the dispatch
+        """
+        waits = [(dispatched_at - request.enqueued_at) * 1000 for request in batch]
+        with self._lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self.size_histogram[len(batch)] += 1
+            self.recent_sizes.append(len(batch))
+            self.total_queue_wait_ms += sum(waits)
+            self.max_queue_wait_ms = max(self.max_queue_wait_ms, max(waits))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the statistics as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "mean_batch_size": (
+                    round(self.requests / self.batches, 3) if self.batches else 0.0
+                ),
+                "batch_size_histogram": {
+                    str(size): count
+                    for size, count in sorted(self.size_histogram.items())
+                },
+                "recent_batch_sizes": list(self.recent_sizes),
+                "mean_queue_wait_ms": (
+                    round(self.total_queue_wait_ms / self.requests, 3)
+                    if self.requests
+                    else 0.0
+                ),
+                "max_queue_wait_ms": round(self.max_queue_wait_ms, 3),
+            }
+
+
+class BatchScheduler:
+    """
+    Coalesces concurrent translation requests into batched generations.
+
+    Requests are queued by the callers and collected by a single worker
+    thread. A batch is dispatched when it reaches MAX_BATCH_SIZE items, when
+    adding another item would exceed MAX_BATCH_TOKENS padded input tokens, or
+    when BATCH_WINDOW_MS has passed since its first request was queued.
+    Only requests with the same decoding settings share a batch; the others
+    are deferred to the next batches, ahead of newer requests.
+
+    Batches run on the inference executor. The worker only starts forming a
+    batch once an inference thread is free, so requests that arrive while the
+    model is busy join the next batch instead of waiting behind small ones.
+    Requests whose admission deadline has passed by then are dropped from
+    their batch.
+    """
+
+    def __init__(self, manager: ModelManager, executor: InferenceExecutor):
+        """
+        Initialize the scheduler.
+
+        Args:
+            manager: Model manager that runs the batched generations
+            executor: Executor the batches are run on
+        """
+        self._manager = manager
+        self._executor = executor
+        self._slots: Optional[threading.Semaphore] = None
+        self._queue: "queue.Queue[Optional[PendingRequest]]" = queue.Queue()
+        # Requests set aside while forming earlier batches, oldest first.
+        self._deferred: Deque[PendingRequest] = deque()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.stats = BatchStats()
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the scheduler worker is running."""
+        return self._running
+
+    def start(self) -> None:
+        """Start the worker thread."""
+        if self._running:
+            return
+
+        self._running = True
+        self._slots = threading.Semaphore(self._executor.max_workers)
+        self._thread = threading.Thread(
+            target=self._run, name="batch-scheduler", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Batch scheduler started (window={settings.BATCH_WINDOW_MS}ms, "
+            f"max_batch_size={settings.MAX_BATCH_SIZE}, "
+            f"max_batch_tokens={settings.MAX_BATCH_TOKENS})"
+        )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the worker thread and fail any request still queued.
+
+        Args:
+            timeout: Seconds to wait for the worker to finish its batch
+        """
+        if not self._running:
+            return
+
+        self._running = False
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+        pending = list(self._deferred)
+        self._deferred.clear()
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                pending.append(request)
+
+        for request in pending:
+            _set_exception(request.future, RuntimeError("Batch scheduler stopped."))
+
+        logger.info("Batch scheduler stopped.")
+
+    def submit(self, text: str, params: Optional[GenerationParams] = None) -> Future:
+        """
+        Queue a text for translation.
+
+        Args:
+            text: English text to translate
+            params: Decoding settings (default: the serving settings)
+
+        Returns:
+            Future resolving to the Spanish translation
+        """
+        if not self._running:
+            raise RuntimeError("Batch scheduler is not running.")
+
+        request = PendingRequest(text=text, params=params, ticket=current_ticket())
+        self._queue.put(request)
+        return request.future
+
+    def translate(self, text: str, params: Optional[GenerationParams] = None) -> str:
+        """
+        Translate a text through the scheduler, blocking until it is done.
+
+        Args:
+            text: English text to translate
+            params: Decoding settings (default: the serving settings)
+
+        Returns:
+            Spanish translation
+        """
+        return self.submit(text, params).result()
+
+    def _num_tokens(self, request: PendingRequest) -> int:
+        """Count (once) the input tokens of a request."""
+        # Tokenizing here keeps every tokenizer call on the worker thread.
+        if request.num_tokens is None:
+            try:
+                request.num_tokens = self._manager.count_tokens(request.text)
+            except Exception as e:
+                # Budget for the worst case; generation will report the error.
+                logger.error(f"Failed to count tokens: {e}")
+                request.num_tokens = settings.MAX_INPUT_LENGTH
+        return request.num_tokens
+
+    @staticmethod
+    def _params(request: PendingRequest) -> GenerationParams:
+        """Get the decoding settings a request will be generated with."""
+        return request.params or GenerationParams.default()
+
+    def _collect(self) -> List[PendingRequest]:
+        """Block until a batch is ready and return it (empty when stopping)."""
+        earlier = list(self._deferred)
+        self._deferred.clear()
+        first = earlier.pop(0) if earlier else self._queue.get()
+        if first is None:
+            return []
+
+        params = self._params(first)
+        batch = [first]
+        skipped: List[PendingRequest] = []
+        longest = self._num_tokens(first)
+        deadline = first.enqueued_at + settings.BATCH_WINDOW_MS / 1000
+
+        while len(batch) < settings.MAX_BATCH_SIZE:
+            if earlier:
+                request = earlier.pop(0)
+            else:
+                remaining = deadline - time.perf_counter()
+                try:
+                    # Past the deadline, still take whatever is already queued.
+                    if remaining > 0:
+                        request = self._queue.get(timeout=remaining)
+                    else:
+                        request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    # Stop requested: finish this batch, then let _run() exit.
+                    self._queue.put(None)
+                    break
+
+            if self._params(request) != params:
+                skipped.append(request)
+                continue
+
+            candidate_longest = max(longest, self._num_tokens(request))
+            if candidate_longest * (len(batch) + 1) > settings.MAX_BATCH_TOKENS:
+                # Start the next batch with it instead.
+                skipped.append(request)
+                break
+
+            batch.append(request)
+            longest = candidate_longest
+
+        self._deferred.extend(skipped + earlier)
+        return batch
+
+    def _dispatch(self, batch: List[PendingRequest]) -> None:
+        """Run one batched generation and resolve the futures of its requests."""
+        live = []
+        for request in batch:
+            # Callers cancel the futures of requests they gave up on (e.g. a
+            # client disconnected); claimed futures can no longer be cancelled.
+            if not request.future.set_running_or_notify_cancel():
+                continue
+            try:
+                admission_controller.check(request.ticket)
+            except DeadlineExceeded as e:
+                _set_exception(request.future, e)
+            else:
+                live.append(request)
+        batch = live
+        if not batch:
+            return
+
+        try:
+            translations = self._manager.translate_batch(
+                [request.text for request in batch], batch[0].params
+            )
+        except Exception as e:
+            logger.error(f"Batch of {len(batch)} failed: {e}")
+            for request in batch:
+                _set_exception(request.future, e)
+            return
+
+        for request, translation in zip(batch, translations):
+            _set_result(request.future, translation)
+
+    def _run(self) -> None:
+        """Worker loop: collect batches and hand them to the executor."""
+        while self._running:
+            # Wait for a free inference thread before forming the next batch.
+            self._slots.acquire()
+            batch = self._collect()
+            if not batch:
+                self._slots.release()
+                continue
+
+            self.stats.record(batch, time.perf_counter())
+            try:
+                future = self._executor.submit(self._dispatch, batch)
+            except Exception as e:
+                self._slots.release()
+                for request in batch:
+                    _set_exception(request.future, e)
+                continue
+            future.add_done_callback(lambda _: self._slots.release())
+
+
+# Global batch scheduler instance
+batch_scheduler = BatchScheduler(model_manager, inference_executor)
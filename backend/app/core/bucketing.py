@@ -0,0 +1,143 @@
+"""
+Length-bucketed Batch Formation and Padding Statistics
+"""
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+import torch
+
+from app.core.metrics import TOKENS
+
+
+def token_budget_buckets(lengths: Sequence[int], max_tokens: int) -> List[List[int]]:
+    """
+    Group items of similar length into batches under a padded-token budget.
+
+    Every item of a batch is padded to its longest one, so a batch costs
+    ``longest x size`` tokens. Items are sorted by length and packed in that
+    order, so each batch holds items of about the same length and as many of
+    them as the budget allows. An item longer than the budget gets a batch
+    of its own.
+
+    Args:
+        lengths: Token length of each item
+        max_tokens: Budget of padded tokens per batch
+
+    Returns:
+        Batches of indices into ``lengths``, shortest items first
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    buckets: List[List[int]] = []
+    current: List[int] = []
+    for i in order:
+        # Sorted ascending, so the new item is the longest of the batch.
+        if current and lengths[i] * (len(current) + 1) > max_tokens:
+            buckets.append(current)
+            current = []
+        current.append(i)
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def _efficiency(real: int, padded: int) -> float:
+    """Share of real tokens in a padded batch."""
+    return round(real / padded, 4) if padded else 1.0
+
+
+class PaddingStats:
+    """Ratio of real to padded tokens of the batches sent to the model."""
+
+    def __init__(self, history: int = 100):
+        """
+        Initialize the statistics.
+
+        Args:
+            history: Number of recent batches to keep
+        """
+        self._lock = threading.Lock()
+        self._history = history
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded statistics."""
+        with self._lock:
+            self.batches = 0
+            self.input_tokens = 0
+            self.padded_input_tokens = 0
+            self.output_tokens = 0
+            self.padded_output_tokens = 0
+            self._efficiency_total = 0.0
+            self.recent: Deque[Dict[str, Any]] = deque(maxlen=self._history)
+
+    def record(
+        self,
+        input_ids: torch.Tensor,
+        attention_mask: Optional[torch.Tensor],
+        generated: torch.Tensor,
+        pad_token_id: int,
+    ) -> None:
+        """
+        Record one batched generation.
+
+        Args:
+            input_ids: Padded encoder input, shape (batch, seq)
+            attention_mask: Mask of the real input tokens (None if unpadded)
+            generated: Generated ids, starting with the decoder start token
+            pad_token_id: Id used for padding
+        """
+        padded_input = input_ids.numel()
+        real_input = (
+            int(attention_mask.sum()) if attention_mask is not None else padded_input
+        )
+        # Rows that finished early are padded to the longest output.
+        outputs = generated[:, 1:]
+        padded_output = outputs.numel()
+        real_output = int((outputs != pad_token_id).sum())
+
+        input_efficiency = _efficiency(real_input, padded_input)
+        TOKENS.labels("input").inc(real_input)
+        TOKENS.labels("output").inc(real_output)
+        with self._lock:
+            self.batches += 1
+            self.input_tokens += real_input
+            self.padded_input_tokens += padded_input
+            self.output_tokens += real_output
+            self.padded_output_tokens += padded_output
+            self._efficiency_total += input_efficiency
+            self.recent.append(
+                {
+                    "size": input_ids.shape[0],
+                    "input_efficiency": input_efficiency,
+                    "output_efficiency": _efficiency(real_output, padded_output),
+                }
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the statistics as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "input_tokens": self.input_tokens,
+                "padded_input_tokens": self.padded_input_tokens,
+                "input_efficiency": _efficiency(
+                    self.input_tokens, self.padded_input_tokens
+                ),
+                "mean_batch_input_efficiency": (
+                    round(self._efficiency_total / self.batches, 4)
+                    if self.batches
+                    else 1.0
+                ),
+                "output_tokens": self.output_tokens,
+                "padded_output_tokens": self.padded_output_tokens,
+                "output_efficiency": _efficiency(
+                    self.output_tokens, self.padded_output_tokens
+                ),
+                "recent_batches": list(self.recent),
+            }
+
+
+# Global padding statistics instance
+padding_stats = PaddingStats()
@@ -0,0 +1,178 @@
+"""
+Compiled Inference with Length Buckets
+"""
+
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import torch
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("compilation")
+
+
+def length_bucket(length: int, buckets: Sequence[int]) -> Optional[int]:
+    """
+    Get the smallest bucket that fits an input length.
+
+    Args:
+        length: Padded input length of a batch
+        buckets: Allowed lengths
+
+    Returns:
+        Bucket length, or None if the input is longer than every bucket
+    """
+    for bucket in sorted(buckets):
+        if length <= bucket:
+            return bucket
+    return None
+
+
+def pad_to_length(
+    input_ids: torch.Tensor,
+    attention_mask: Optional[torch.Tensor],
+    length: int,
+    pad_token_id: int,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Right-pad a tokenized batch to a fixed length.
+
+    Args:
+        input_ids: Token ids, shape (batch, seq)
+        attention_mask: Mask for ``input_ids`` (all ones if None)
+        length: Target sequence length
+        pad_token_id: Id used for padding
+
+    Returns:
+        Padded (input_ids, attention_mask)
+    """
+    if attention_mask is None:
+        attention_mask = torch.ones_like(input_ids)
+
+    extra = length - input_ids.shape[1]
+    if extra <= 0:
+        return input_ids, attention_mask
+
+    input_ids = torch.nn.functional.pad(input_ids, (0, extra), value=pad_token_id)
+    attention_mask = torch.nn.functional.pad(attention_mask, (0, extra), value=0)
+    return input_ids, attention_mask
+
+
+def warmup_beam_widths() -> List[int]:
+    """
+    Get every beam width the server may generate with.
+
+    Requests may ask for any width up to MAX_REQUEST_BEAMS, and greedy
+    decoding (1) also serves latency-budget downgrades and cascade first
+    passes, so each of them is compiled during warm-up.
+
+    Returns:
+        Beam widths from 1 to the widest servable, in increasing order
+    """
+    widest = max(settings.MAX_REQUEST_BEAMS, 1)
+    return list(range(1, widest + 1))
+
+
+def compile_model(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Compile the model's forward pass for generation.
+
+    ``generate()`` stays in Python; every encoder and decoder step it runs
+    goes through the compiled forward. Sequence dimensions are compiled as
+    dynamic so the growing KV cache does not trigger a recompile per step.
+
+    Args:
+        model: Merged model in eval mode
+
+    Returns:
+        The same model with a compiled forward
+    """
+    model.forward = torch.compile(
+        model.forward, mode=settings.COMPILE_MODE, dynamic=True
+    )
+    return model
+
+
+class CompileStats:
+    """Compile times, bucket hit rates and per-bucket generation latency."""
+
+    def __init__(self):
+        """Initialize the statistics."""
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        """Reset every counter (lock must be held, or not yet shared)."""
+        self.compile_seconds: Dict[int, float] = {}
+        self.hits: Dict[int, int] = defaultdict(int)
+        self.misses = 0
+        self._latency_total: Dict[int, float] = defaultdict(float)
+        self._latency_max: Dict[int, float] = defaultdict(float)
+
+    def reset(self) -> None:
+        """Forget everything recorded so far (e.g. on model reload)."""
+        with self._lock:
+            self._clear()
+
+    def record_compile(self, bucket: int, seconds: float) -> None:
+        """
+        Record the warm-up time of a bucket.
+
+        Args:
+            bucket: Bucket length
+            seconds: Time of the first (compiling) generations, at every
+                beam width
+        """
+        with self._lock:
+            self.compile_seconds[bucket] = seconds
+
+    def record(self, bucket: Optional[int], seconds: float) -> None:
+        """
+        Record one generation call.
+
+        Args:
+            bucket: Bucket the batch was padded to (None if it fit none)
+            seconds: Generation time
+        """
+        with self._lock:
+            if bucket is None:
+                self.misses += 1
+                return
+            self.hits[bucket] += 1
+            self._latency_total[bucket] += seconds
+            self._latency_max[bucket] = max(self._latency_max[bucket], seconds)
+
+    def _bucket_snapshot(self, bucket: int, calls: int) -> Dict[str, Any]:
+        """Statistics of one bucket (lock must be held)."""
+        hits = self.hits.get(bucket, 0)
+        mean = self._latency_total.get(bucket, 0.0) / hits if hits else 0.0
+        return {
+            "compile_seconds": round(self.compile_seconds.get(bucket, 0.0), 3),
+            "calls": hits,
+            "hit_rate": round(hits / calls, 4) if calls else 0.0,
+            "mean_latency_ms": round(1000 * mean, 2),
+            "max_latency_ms": round(1000 * self._latency_max.get(bucket, 0.0), 2),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the statistics as a JSON-serializable dict."""
+        with self._lock:
+            hits = sum(self.hits.values())
+            calls = hits + self.misses
+            buckets = sorted(set(self.compile_seconds) | set(self.hits))
+            return {
+                "compile_seconds": round(sum(self.compile_seconds.values()), 3),
+                "bucket_hit_rate": round(hits / calls, 4) if calls else 0.0,
+                "unbucketed_calls": self.misses,
+                "buckets": {
+                    str(bucket): self._bucket_snapshot(bucket, calls)
+                    for bucket in buckets
+                },
+            }
+
+
+# Global compiled inference statistics instance
+compile_stats = CompileStats()
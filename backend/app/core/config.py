@@ -3,7 +3,7 @@ Application Configuration using Pydantic Settings
 """
 
 from pathlib import Path
-from typing import Literal
+from typing import List, Literal, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -40,6 +40,180 @@ class Settings(BaseSettings):
     NUM_BEAMS: int = 8
     DEVICE: Literal["cuda", "cpu", "auto"] = "auto"
 
+    # Per-request generation controls
+    # Requests may ask for a beam width (capped at MAX_REQUEST_BEAMS), fewer
+    # new tokens (capped by MAX_OUTPUT_LENGTH) and a latency budget. Under a
+    # budget the widest beam search estimated to fit is used, else greedy.
+    # Estimates come from recent generations; the priors are used until
+    # then (time per decoder step of one beam, output tokens per input token).
+    MAX_REQUEST_BEAMS: int = 8
+    LATENCY_PRIOR_MS_PER_STEP: float = 5.0
+    LATENCY_PRIOR_OUTPUT_RATIO: float = 1.3
+
+    # Greedy-first cascaded decoding (beam search requests only)
+    # Every input is decoded greedily first; beam search reruns only the rows
+    # whose mean token log-probability is below the threshold (-0.3 is a
+    # geometric mean token probability of about 0.74). The beam width each of
+    # the last CASCADE_LOG_SIZE texts was actually decoded with is kept, so
+    # responses report it (also for cache and memory hits of those texts).
+    CASCADE_ENABLED: bool = False
+    CASCADE_CONFIDENCE_THRESHOLD: float = -0.3
+    CASCADE_LOG_SIZE: int = 4096
+
+    # Tokenization
+    # The task prefix is encoded once and its ids are prepended to the ids of
+    # each text. Ids of texts of up to TOKEN_CACHE_MAX_CHARS characters are
+    # kept in an LRU cache of TOKEN_CACHE_SIZE texts (0 disables it).
+    TOKEN_CACHE_SIZE: int = 4096
+    TOKEN_CACHE_MAX_CHARS: int = 256
+
+    # Long inputs are split into sentences (and over-long sentences into
+    # clauses) under this token budget instead of being truncated.
+    # t5-small was fine-tuned on sequences of at most 128 tokens.
+    SEGMENTATION_ENABLED: bool = True
+    SEGMENT_MAX_TOKENS: int = 128
+
+    # Pre-merged model bundle (python -m app.export_bundle)
+    # When present and matching the adapter, the merged weights, tokenizer
+    # and generation config are memory-mapped from the bundle instead of
+    # loading the base checkpoint and merging the LoRA adapter on every start.
+    # Without a usable bundle, the first start merges as usual and writes one.
+    MODEL_BUNDLE_ENABLED: bool = True
+    MODEL_BUNDLE_PATH: Path = MODEL_DIR / "bundle"
+    MODEL_BUNDLE_BUILD_ON_START: bool = True
+
+    # Low-memory loading (no bundle)
+    # The base model is built on the meta device and filled from the
+    # checkpoint, and the LoRA adapter is merged one layer at a time with
+    # each adapter freed as soon as it is folded in. Slightly slower to load,
+    # but the base model, the PEFT wrapper and the merged model never
+    # coexist, which lowers the load-time peak on small instances.
+    LOW_MEMORY_LOAD: bool = False
+
+    # Inference backend
+    # "onnxruntime" serves the encoder and decoder-with-past graphs exported
+    # by `python -m app.export_onnx` (CPU only). 0 threads keeps ORT's default.
+    INFERENCE_BACKEND: Literal["pytorch", "onnxruntime"] = "pytorch"
+    ONNX_MODEL_PATH: Path = MODEL_DIR / "onnx"
+    ORT_INTRA_OP_THREADS: int = 0
+
+    # Compiled inference (opt-in, pytorch backend)
+    # The model's forward pass goes through torch.compile. Inputs are padded
+    # up to the nearest length bucket so only a few shapes are ever compiled,
+    # and every bucket is compiled during startup, at every beam width up to
+    # MAX_REQUEST_BEAMS, rather than on first use.
+    # Segments never exceed SEGMENT_MAX_TOKENS, so buckets stop there; longer
+    # inputs (segmentation disabled) run unbucketed.
+    COMPILE_ENABLED: bool = False
+    COMPILE_MODE: Literal["default", "reduce-overhead", "max-autotune"] = "default"
+    COMPILE_LENGTH_BUCKETS: List[int] = [16, 32, 64, 128]
+
+    # Dynamic int8 quantization (CPU only)
+    # Linear layers are quantized after the LoRA merge. Before serving it,
+    # the int8 model is scored against the fp32 model on a held-out JSONL
+    # sample ({"en": ..., "es": ...} per line). BLEU is on a 0-1 scale and
+    # chrF on 0-100. On failure, "refuse" keeps serving fp32 and "warn"
+    # serves int8 anyway.
+    QUANTIZE_INT8: bool = False
+    QUANTIZATION_CHECK_ENABLED: bool = True
+    QUANTIZATION_EVAL_PATH: Path = DATA_DIR / "quantization_eval.jsonl"
+    QUANTIZATION_EVAL_SAMPLES: int = 64
+    QUANTIZATION_MAX_BLEU_DROP: float = 0.01
+    QUANTIZATION_MAX_CHRF_DROP: float = 1.0
+    QUANTIZATION_ON_FAIL: Literal["refuse", "warn"] = "refuse"
+
+    # Translation cache settings
+    # Repeated inputs are served from an in-process LRU cache. Entries expire
+    # after the TTL and the cache is cleared whenever the model is reloaded.
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_TTL_SECONDS: float = 3600.0
+
+    # Persistent translation memory: exact repeats are answered from the
+    # translations table before running the model.
+    TRANSLATION_MEMORY_ENABLED: bool = True
+    # Sentence-level memory: each segment is looked up on its own, so
+    # headings, dialogue tags and boilerplate are reused across documents and
+    # only unseen sentences reach the model.
+    SENTENCE_MEMORY_ENABLED: bool = True
+    # Load-test deployments only: /translate and its streams skip the
+    # translation memory, the cache and the history, so every request runs
+    # the model and replayed traffic is not recorded again.
+    LOADTEST_BYPASS_MEMORY: bool = False
+
+    # Inference executor settings
+    # Blocking generation runs on a dedicated thread pool so the event loop
+    # stays responsive. 0 keeps torch's own default thread count.
+    INFERENCE_THREADS: int = 1
+    TORCH_INTRA_OP_THREADS: int = 0
+    TORCH_INTER_OP_THREADS: int = 0
+
+    # Pre-fork serving settings (python -m app.prefork)
+    # The model is loaded once in the master and shared copy-on-write with
+    # the forked workers. With TORCH_INTRA_OP_THREADS=0 each worker gets an
+    # equal share of the CPU cores.
+    WORKERS: int = 1
+    SHARE_MODEL_MEMORY: bool = True
+    RSS_REPORT_INTERVAL: float = 60.0
+
+    # Micro-batching settings
+    # Concurrent requests are coalesced into one batched `generate` call. A
+    # batch is dispatched as soon as it is full or the window has elapsed.
+    BATCHING_ENABLED: bool = True
+    BATCH_WINDOW_MS: float = 10.0
+    MAX_BATCH_SIZE: int = 16
+    # Upper bound on padded input tokens (longest item x batch size).
+    MAX_BATCH_TOKENS: int = 4096
+
+    # Admission control
+    # Requests waiting for or running on the model are capped at
+    # ADMISSION_MAX_DEPTH (0 removes the cap). Beyond it, requests get a 429
+    # whose Retry-After is the queue depth times the measured service time
+    # (ADMISSION_SERVICE_TIME_PRIOR_MS until measured). Requests still
+    # waiting ADMISSION_TIMEOUT_MS after admission are dropped before they
+    # reach the model, since their client has most likely given up (0 keeps
+    # them).
+    ADMISSION_MAX_DEPTH: int = 64
+    ADMISSION_TIMEOUT_MS: float = 30000.0
+    ADMISSION_SERVICE_TIME_PRIOR_MS: float = 500.0
+
+    # Admin endpoints (/admin/...)
+    # Callers send the token in the X-Admin-Token header; without a token
+    # configured the admin endpoints are disabled.
+    ADMIN_TOKEN: Optional[str] = None
+
+    # On-demand profiling (POST /admin/profile)
+    # A capture profiles the next model calls with torch.profiler, for at
+    # most PROFILE_MAX_SECONDS, and writes Chrome traces under LOGS_DIR.
+    PROFILE_MAX_SECONDS: float = 300.0
+    PROFILE_TOP_OPS: int = 20
+
+    # Batch endpoint (POST /translate/batch)
+    # Maximum number of texts per request.
+    MAX_BATCH_TEXTS: int = 1000
+
+    # Translation jobs (POST /jobs)
+    # Documents are split into segments stored in the database. Background
+    # workers claim up to JOB_BATCH_SEGMENTS segments of the oldest job and
+    # hold them for JOB_LEASE_SECONDS, so segments claimed before a crash are
+    # translated again once the lease expires (a clean shutdown releases them
+    # at once). A segment failing JOB_MAX_ATTEMPTS times fails its job.
+    JOBS_ENABLED: bool = True
+    JOB_WORKERS: int = 1
+    JOB_BATCH_SEGMENTS: int = 32
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_LEASE_SECONDS: float = 120.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_MAX_CHARS: int = 1_000_000
+    JOB_CALLBACK_TIMEOUT: float = 10.0
+    JOB_CALLBACK_RETRIES: int = 3
+    # Callback URLs must be http(s). When JOB_CALLBACK_ALLOWED_HOSTS is set,
+    # only those hosts are accepted. Otherwise any host is, as long as all
+    # of its addresses are public: loopback, private, link-local and other
+    # reserved addresses are refused, so the API cannot reach internal services.
+    JOB_CALLBACK_ALLOWED_HOSTS: List[str] = []
+
     model_config = {
         "env_file": ".env",
         "env_file_encoding": "utf-8",
@@ -4,6 +4,7 @@ Database Configuration
 
 from typing import AsyncGenerator
 
+from sqlalchemy import Connection, inspect, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
@@ -44,7 +45,40 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+def _add_missing_columns(conn: Connection) -> None:
+    """
+    Add columns and indexes introduced after a table was first created.
+
+    ``create_all`` only creates missing tables, so databases from earlier
+    versions would otherwise lack newer (nullable) columns. Indexes whose
+    uniqueness changed are recreated.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(
+                text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+            )
+
+        unique = {
+            index["name"]: bool(index["unique"])
+            for index in inspector.get_indexes(table.name)
+        }
+        for index in table.indexes:
+            if index.name in unique and unique[index.name] != bool(index.unique):
+                index.drop(conn)
+            index.create(conn, checkfirst=True)
+
+
 async def init_db() -> None:
     """Initialize database tables."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
@@ -0,0 +1,130 @@
+"""
+Dedicated Executor for Blocking Model Inference
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import torch
+
+from app.core.admission import admission_controller, current_ticket
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("executor")
+
+
+def configure_torch_threads() -> None:
+    """Apply the configured torch intra-op and inter-op thread counts."""
+    if settings.TORCH_INTRA_OP_THREADS > 0:
+        torch.set_num_threads(settings.TORCH_INTRA_OP_THREADS)
+
+    if settings.TORCH_INTER_OP_THREADS > 0:
+        try:
+            torch.set_num_interop_threads(settings.TORCH_INTER_OP_THREADS)
+        except RuntimeError as e:
+            # Can only be set once, before any inter-op parallel work starts.
+            logger.warning(f"Could not set inter-op threads: {e}")
+
+    logger.info(
+        f"Torch threads: intra-op={torch.get_num_threads()}, "
+        f"inter-op={torch.get_num_interop_threads()}"
+    )
+
+
+def _checked(ticket, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run ``fn`` unless the admitted request it serves has expired."""
+    admission_controller.check(ticket)
+    return fn(*args, **kwargs)
+
+
+class InferenceExecutor:
+    """
+    Bounded thread pool that runs blocking inference off the event loop.
+
+    ``model.generate`` releases the GIL inside torch kernels, so running it on
+    these threads keeps the event loop free to serve other requests.
+    """
+
+    def __init__(self):
+        """Initialize the executor (threads are created on first use)."""
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def max_workers(self) -> int:
+        """Number of inference threads."""
+        return max(1, settings.INFERENCE_THREADS)
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the thread pool has been started."""
+        return self._executor is not None
+
+    def start(self) -> None:
+        """Configure torch threading and create the thread pool."""
+        with self._lock:
+            if self._executor is not None:
+                return
+
+            configure_torch_threads()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="inference"
+            )
+            logger.info(f"Inference executor started ({self.max_workers} threads)")
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Schedule a blocking call on an inference thread.
+
+        Args:
+            fn: Callable to run
+            *args: Positional arguments for ``fn``
+            **kwargs: Keyword arguments for ``fn``
+
+        Returns:
+            Future resolving to the result of ``fn``
+        """
+        self.start()
+        return self._executor.submit(fn, *args, **kwargs)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Await a blocking call run on an inference thread.
+
+        When called on behalf of an admitted request, the call is dropped if
+        the request's deadline passes before a thread picks it up.
+
+        Args:
+            fn: Callable to run
+            *args: Positional arguments for ``fn``
+            **kwargs: Keyword arguments for ``fn``
+
+        Returns:
+            Result of ``fn``
+
+        Raises:
+            DeadlineExceeded: If the request expired before ``fn`` started
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(_checked, current_ticket(), fn, *args, **kwargs),
+        )
+
+    def shutdown(self) -> None:
+        """Wait for running inference and release the threads."""
+        with self._lock:
+            if self._executor is None:
+                return
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        logger.info("Inference executor stopped.")
+
+
+# Global inference executor instance
+inference_executor = InferenceExecutor()
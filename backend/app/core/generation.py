@@ -0,0 +1,539 @@
+"""
+Per-request Generation Controls, Latency Budgets, Cascaded Decoding and Streaming
+"""
+
+import math
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import torch
+from transformers import AsyncTextIteratorStreamer, StoppingCriteria
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("generation")
+
+
+@dataclass(frozen=True)
+class GenerationParams:
+    """Decoding settings of one generation call (hashable, so batchable)."""
+
+    num_beams: int
+    # None keeps the server-wide MAX_OUTPUT_LENGTH.
+    max_new_tokens: Optional[int] = None
+
+    @classmethod
+    def default(cls) -> "GenerationParams":
+        """Get the server-wide decoding settings."""
+        return cls(num_beams=settings.NUM_BEAMS)
+
+    @property
+    def strategy(self) -> str:
+        """Name of the decoding strategy: ``greedy`` or ``beam``."""
+        return "greedy" if self.num_beams == 1 else "beam"
+
+    def generate_kwargs(self) -> Dict[str, Any]:
+        """
+        Get the keyword arguments for ``model.generate()``.
+
+        Returns:
+            Beam width, output length limit and (for beam search) early stopping
+        """
+        kwargs: Dict[str, Any] = {"num_beams": self.num_beams}
+        if self.max_new_tokens is None:
+            kwargs["max_length"] = settings.MAX_OUTPUT_LENGTH
+        else:
+            kwargs["max_new_tokens"] = self.max_new_tokens
+        if self.num_beams > 1:
+            kwargs["early_stopping"] = True
+        return kwargs
+
+
+class LatencyModel:
+    """
+    Running estimate of generation latency, used to plan latency budgets.
+
+    Latency is modelled as decoder steps times the time per step of a beam
+    width. Both the time per step and the ratio of output to input tokens
+    are exponential moving averages over recent generations. Widths that
+    have not run yet are scaled linearly from the nearest measured width, or
+    from LATENCY_PRIOR_MS_PER_STEP before anything has run.
+    """
+
+    def __init__(self, smoothing: float = 0.2):
+        """
+        Initialize the model.
+
+        Args:
+            smoothing: Weight of the newest observation in the moving averages
+        """
+        self._smoothing = smoothing
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        """Reset every estimate and counter (lock must be held, or not yet shared)."""
+        self._step_ms: Dict[int, float] = {}
+        self._output_ratio: Optional[float] = None
+        self.strategies: Counter = Counter()
+        self.budgeted = 0
+        self.downgraded = 0
+        self.over_budget = 0
+
+    def reset(self) -> None:
+        """Forget everything recorded so far (e.g. on model reload)."""
+        with self._lock:
+            self._clear()
+
+    def _average(self, previous: Optional[float], value: float) -> float:
+        """Fold one observation into a moving average."""
+        if previous is None:
+            return value
+        return previous + self._smoothing * (value - previous)
+
+    def record(
+        self, num_beams: int, input_tokens: int, output_tokens: int, seconds: float
+    ) -> None:
+        """
+        Record one generation call.
+
+        Args:
+            num_beams: Beam width used
+            input_tokens: Input length of the batch (before any padding)
+            output_tokens: Decoder steps run
+            seconds: Generation time
+        """
+        steps = max(1, output_tokens)
+        with self._lock:
+            self._step_ms[num_beams] = self._average(
+                self._step_ms.get(num_beams), 1000 * seconds / steps
+            )
+            self._output_ratio = self._average(
+                self._output_ratio, steps / max(1, input_tokens)
+            )
+
+    def ms_per_step(self, num_beams: int) -> float:
+        """
+        Estimate the time of one decoder step.
+
+        Args:
+            num_beams: Beam width
+
+        Returns:
+            Milliseconds per decoder step
+        """
+        with self._lock:
+            return self._ms_per_step(num_beams)
+
+    def measured_ms_per_step(self, num_beams: int) -> Optional[float]:
+        """
+        Get the measured time of one decoder step, without extrapolating.
+
+        Args:
+            num_beams: Beam width
+
+        Returns:
+            Milliseconds per decoder step, or None if the width has not run yet
+        """
+        with self._lock:
+            return self._step_ms.get(num_beams)
+
+    def _ms_per_step(self, num_beams: int) -> float:
+        """Estimated time of one decoder step (lock must be held)."""
+        if num_beams in self._step_ms:
+            return self._step_ms[num_beams]
+        if not self._step_ms:
+            return settings.LATENCY_PRIOR_MS_PER_STEP * num_beams
+        nearest = min(self._step_ms, key=lambda width: abs(width - num_beams))
+        return self._step_ms[nearest] * num_beams / nearest
+
+    def estimate_ms(
+        self, num_beams: int, input_tokens: int, max_new_tokens: Optional[int]
+    ) -> float:
+        """
+        Estimate the latency of a generation.
+
+        Args:
+            num_beams: Beam width
+            input_tokens: Input length
+            max_new_tokens: Output length limit (None for MAX_OUTPUT_LENGTH)
+
+        Returns:
+            Estimated generation time in milliseconds
+        """
+        limit = max_new_tokens or settings.MAX_OUTPUT_LENGTH - 1
+        with self._lock:
+            ratio = self._output_ratio or settings.LATENCY_PRIOR_OUTPUT_RATIO
+            steps = min(limit, math.ceil(ratio * input_tokens) + 1)
+            return steps * self._ms_per_step(num_beams)
+
+    def record_plan(
+        self, params: GenerationParams, budgeted: bool, downgraded: bool, fits: bool
+    ) -> None:
+        """
+        Record the strategy chosen for a request.
+
+        Args:
+            params: Chosen decoding settings
+            budgeted: Whether the request had a latency budget
+            downgraded: Whether fewer beams than requested were used
+            fits: Whether the estimate was within the budget
+        """
+        with self._lock:
+            self.strategies[params.strategy] += 1
+            self.budgeted += int(budgeted)
+            self.downgraded += int(downgraded)
+            self.over_budget += int(budgeted and not fits)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the estimates and counters as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                "ms_per_step": {
+                    str(width): round(ms, 3)
+                    for width, ms in sorted(self._step_ms.items())
+                },
+                "output_ratio": (
+                    round(self._output_ratio, 3)
+                    if self._output_ratio is not None
+                    else None
+                ),
+                "strategies": dict(self.strategies),
+                "budgeted_requests": self.budgeted,
+                "downgraded_requests": self.downgraded,
+                "over_budget_requests": self.over_budget,
+            }
+
+
+def _beam_ladder(num_beams: int) -> List[int]:
+    """Beam widths to try, widest first: ``num_beams``, halving down to 1."""
+    widths = [num_beams]
+    while widths[-1] > 1:
+        widths.append(widths[-1] // 2)
+    return widths
+
+
+def plan_generation(
+    input_tokens: int,
+    num_beams: Optional[int] = None,
+    max_new_tokens: Optional[int] = None,
+    latency_budget_ms: Optional[float] = None,
+) -> GenerationParams:
+    """
+    Choose the decoding settings for a request.
+
+    Requested values are clamped to the server caps. With a latency budget,
+    the widest beam search (up to the requested width) whose estimated
+    latency fits is used; if none fits, greedy decoding is used, being the
+    cheapest strategy.
+
+    Args:
+        input_tokens: Input length the generation will see
+        num_beams: Requested beam width (default: NUM_BEAMS)
+        max_new_tokens: Requested output length limit
+        latency_budget_ms: Latency budget of the request
+
+    Returns:
+        Decoding settings to generate with
+    """
+    width = min(num_beams or settings.NUM_BEAMS, settings.MAX_REQUEST_BEAMS)
+    if max_new_tokens is not None:
+        max_new_tokens = min(max_new_tokens, settings.MAX_OUTPUT_LENGTH - 1)
+
+    if latency_budget_ms is None:
+        params = GenerationParams(num_beams=width, max_new_tokens=max_new_tokens)
+        latency_model.record_plan(params, budgeted=False, downgraded=False, fits=True)
+        return params
+
+    for candidate in _beam_ladder(width):
+        estimate = latency_model.estimate_ms(candidate, input_tokens, max_new_tokens)
+        fits = estimate <= latency_budget_ms
+        if fits or candidate == 1:
+            break
+
+    params = GenerationParams(num_beams=candidate, max_new_tokens=max_new_tokens)
+    latency_model.record_plan(
+        params, budgeted=True, downgraded=candidate < width, fits=fits
+    )
+    if candidate < width:
+        logger.info(
+            f"Latency budget {latency_budget_ms:.0f}ms: {candidate} beams instead "
+            f"of {width} (estimated {estimate:.0f}ms)"
+        )
+    return params
+
+
+def sequence_confidence(model, output, pad_token_id: int) -> torch.Tensor:
+    """
+    Score generated sequences by their mean token log-probability.
+
+    Args:
+        model: Model that generated ``output``
+        output: ``generate()`` output with ``sequences`` and ``scores``
+        pad_token_id: Id filling the rows that finished early
+
+    Returns:
+        Mean log-probability of the generated tokens of each row, shape (batch,)
+    """
+    log_probs = model.compute_transition_scores(
+        output.sequences, output.scores, normalize_logits=True
+    )
+    # The first position is the decoder start token, which has no score.
+    generated = output.sequences[:, 1:]
+    tokens = generated != pad_token_id
+    total = torch.where(tokens, log_probs, torch.zeros_like(log_probs)).sum(dim=1)
+    return total / tokens.sum(dim=1).clamp(min=1)
+
+
+def replace_rows(
+    sequences: torch.Tensor,
+    replacements: torch.Tensor,
+    rows: torch.Tensor,
+    pad_token_id: int,
+) -> torch.Tensor:
+    """
+    Replace some rows of generated sequences, padding both to a common width.
+
+    Args:
+        sequences: Generated token ids, shape (batch, length)
+        replacements: New token ids for ``rows``, shape (len(rows), length')
+        rows: Indices of the rows to replace
+        pad_token_id: Id used for padding
+
+    Returns:
+        Token ids, shape (batch, max(length, length'))
+    """
+    width = max(sequences.shape[1], replacements.shape[1])
+    merged = torch.nn.functional.pad(
+        sequences, (0, width - sequences.shape[1]), value=pad_token_id
+    )
+    merged[rows] = torch.nn.functional.pad(
+        replacements, (0, width - replacements.shape[1]), value=pad_token_id
+    )
+    return merged
+
+
+class CascadeStats:
+    """
+    Escalation rate and estimated latency saved by greedy-first decoding.
+
+    The saving compares each cascaded call with beam search on all its rows.
+    When every row escalated, that beam search really ran and its measured
+    time is the baseline. Otherwise the baseline is an estimate: the greedy
+    step count times the measured time per step of the beam width. Calls
+    made before that width has ever run have no baseline and are left out
+    of the comparison instead of being compared with an extrapolation.
+    """
+
+    def __init__(self):
+        """Initialize the statistics."""
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        """Reset every counter (lock must be held, or not yet shared)."""
+        self.rows = 0
+        self.escalated = 0
+        self.confidence_total = 0.0
+        self.actual_seconds = 0.0
+        self.compared_rows = 0
+        self.compared_seconds = 0.0
+        self.baseline_seconds = 0.0
+
+    def reset(self) -> None:
+        """Forget everything recorded so far (e.g. on model reload)."""
+        with self._lock:
+            self._clear()
+
+    def record(
+        self,
+        confidence: torch.Tensor,
+        escalated: int,
+        seconds: float,
+        baseline_seconds: Optional[float],
+    ) -> None:
+        """
+        Record one cascaded generation.
+
+        Args:
+            confidence: Mean token log-probability of each greedy output
+            escalated: Number of rows rerun with beam search
+            seconds: Time of the greedy pass plus the beam search rerun
+            baseline_seconds: Time of beam search on every row, measured or
+                estimated from measured beam runs (None when unknown)
+        """
+        with self._lock:
+            self.rows += len(confidence)
+            self.escalated += escalated
+            self.confidence_total += float(confidence.sum())
+            self.actual_seconds += seconds
+            if baseline_seconds is not None:
+                self.compared_rows += len(confidence)
+                self.compared_seconds += seconds
+                self.baseline_seconds += baseline_seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the statistics as a JSON-serializable dict."""
+        with self._lock:
+            saved = self.baseline_seconds - self.compared_seconds
+            return {
+                "enabled": settings.CASCADE_ENABLED,
+                "threshold": settings.CASCADE_CONFIDENCE_THRESHOLD,
+                "rows": self.rows,
+                "escalated_rows": self.escalated,
+                "escalation_rate": (
+                    round(self.escalated / self.rows, 4) if self.rows else 0.0
+                ),
+                "mean_confidence": (
+                    round(self.confidence_total / self.rows, 4) if self.rows else None
+                ),
+                "latency_ms": round(1000 * self.actual_seconds, 1),
+                "compared_rows": self.compared_rows,
+                "compared_latency_ms": round(1000 * self.compared_seconds, 1),
+                "estimated_beam_latency_ms": round(1000 * self.baseline_seconds, 1),
+                "estimated_latency_saved_ms": round(1000 * saved, 1),
+                "estimated_latency_saved_fraction": (
+                    round(saved / self.baseline_seconds, 4)
+                    if self.baseline_seconds
+                    else 0.0
+                ),
+            }
+
+
+class DecodingLog:
+    """
+    Beam width each recent text was actually decoded with.
+
+    Under cascaded decoding a beam search request keeps the greedy output of
+    confident rows, so the planned decoding settings overstate what ran.
+    Whether a row escalates depends only on its text, the settings and the
+    model, so an entry also holds for later cache and memory hits of the
+    same translation. Oldest entries are dropped beyond the capacity.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        """
+        Initialize the log.
+
+        Args:
+            capacity: Number of entries kept (default: CASCADE_LOG_SIZE)
+        """
+        self.capacity = settings.CASCADE_LOG_SIZE if capacity is None else capacity
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, GenerationParams], int]" = OrderedDict()
+
+    def reset(self) -> None:
+        """Forget everything recorded so far (e.g. on model reload)."""
+        with self._lock:
+            self._entries.clear()
+
+    def record(
+        self, texts: Sequence[str], params: GenerationParams, beams: Sequence[int]
+    ) -> None:
+        """
+        Record the beam width each text of a generation call was decoded with.
+
+        Args:
+            texts: Input texts, one per row
+            params: Decoding settings the call was planned with
+            beams: Beam width actually used for each row
+        """
+        with self._lock:
+            for text, width in zip(texts, beams):
+                key = (text, params)
+                self._entries[key] = width
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def lookup(
+        self, texts: Sequence[str], params: GenerationParams
+    ) -> GenerationParams:
+        """
+        Get the decoding settings actually used for a request's texts.
+
+        Args:
+            texts: Texts the request was decoded as (its segments)
+            params: Decoding settings the request was planned with
+
+        Returns:
+            Greedy settings if every recorded text kept its greedy output,
+            else ``params`` (also when none of the texts is recorded)
+        """
+        with self._lock:
+            widths = [
+                self._entries[(text, params)]
+                for text in texts
+                if (text, params) in self._entries
+            ]
+        if not widths or max(widths) == params.num_beams:
+            return params
+        return GenerationParams(
+            num_beams=max(widths), max_new_tokens=params.max_new_tokens
+        )
+
+
+class CancelCriteria(StoppingCriteria):
+    """Stops generation at the next decoder step once an event is set."""
+
+    def __init__(self, cancel: threading.Event):
+        """
+        Initialize the criteria.
+
+        Args:
+            cancel: Set to stop generating (e.g. when the client disconnects)
+        """
+        self._cancel = cancel
+
+    def __call__(
+        self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs
+    ) -> torch.BoolTensor:
+        """Mark every row as done once cancelled."""
+        return torch.full(
+            (input_ids.shape[0],), self._cancel.is_set(), dtype=torch.bool
+        )
+
+
+class TranslationStreamer(AsyncTextIteratorStreamer):
+    """
+    Streams generated text to an async consumer, word by word.
+
+    Tokens are decoded on the generating thread, so decoding takes the model
+    manager's tokenizer lock like every other tokenizer call. Must be created
+    on the event loop that consumes it.
+    """
+
+    def __init__(self, tokenizer, tokenizer_lock: threading.Lock):
+        """
+        Initialize the streamer.
+
+        Args:
+            tokenizer: Tokenizer of the generating model
+            tokenizer_lock: Lock guarding the tokenizer
+        """
+        # The prompt is the decoder start token of an encoder-decoder model.
+        super().__init__(tokenizer, skip_prompt=True, skip_special_tokens=True)
+        self._tokenizer_lock = tokenizer_lock
+
+    def put(self, value: torch.Tensor) -> None:
+        """Decode newly generated tokens."""
+        with self._tokenizer_lock:
+            super().put(value)
+
+    def end(self) -> None:
+        """Flush the remaining text and close the stream."""
+        with self._tokenizer_lock:
+            super().end()
+
+
+# Global latency model instance
+latency_model = LatencyModel()
+
+# Global cascaded decoding statistics instance
+cascade_stats = CascadeStats()
+
+# Global decoding log instance
+decoding_log = DecodingLog()
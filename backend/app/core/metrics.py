@@ -0,0 +1,168 @@
+"""
+Prometheus Metrics
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Seconds, from a cache hit to a long beam search.
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+PHASE_SECONDS = Histogram(
+    "translatica_phase_seconds",
+    "Time spent in one phase of serving a translation",
+    ["phase"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "translatica_request_seconds",
+    "Total time to serve a request",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+ERRORS = Counter(
+    "translatica_errors_total",
+    "Requests that failed or were turned away",
+    ["endpoint", "reason"],
+)
+TOKENS = Counter(
+    "translatica_tokens_total",
+    "Real (non-padding) tokens through the model",
+    ["direction"],
+)
+CACHE_LOOKUPS = Counter(
+    "translatica_cache_lookups_total",
+    "Translation lookups by layer and result",
+    ["layer", "result"],
+)
+QUEUE_DEPTH = Gauge(
+    "translatica_queue_depth",
+    "Requests waiting for or running on the model",
+    multiprocess_mode="livesum",
+)
+QUEUE_REJECTED = Counter(
+    "translatica_queue_rejected_total", "Requests rejected with a 429"
+)
+QUEUE_SHED = Counter(
+    "translatica_queue_shed_total",
+    "Requests dropped after waiting past their deadline",
+)
+MODEL_LOAD_SECONDS = Gauge(
+    "translatica_model_load_seconds",
+    "Duration of each phase of the last model load",
+    ["phase"],
+    multiprocess_mode="max",
+)
+
+# Bound once: looking a label up on every observation costs more than the
+# observation itself.
+_phases: Dict[str, Histogram] = {}
+
+
+def observe_phase(phase: str, seconds: float) -> None:
+    """
+    Record the duration of one phase.
+
+    Args:
+        phase: queue_wait, tokenize, generate, decode or db_persist
+        seconds: Duration
+    """
+    child = _phases.get(phase)
+    if child is None:
+        child = _phases[phase] = PHASE_SECONDS.labels(phase)
+    child.observe(seconds)
+
+
+@contextmanager
+def phase_timer(phase: str) -> Iterator[None]:
+    """
+    Time a block as one phase.
+
+    Args:
+        phase: Phase name (see ``observe_phase``)
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_phase(phase, time.perf_counter() - started)
+
+
+def record_cache_lookup(layer: str, hit: bool, count: int = 1) -> None:
+    """
+    Count lookups in one cache layer.
+
+    Args:
+        layer: cache, memory (whole texts) or sentence_memory
+        hit: Whether the lookups found a translation
+        count: Number of lookups
+    """
+    if count:
+        CACHE_LOOKUPS.labels(layer, "hit" if hit else "miss").inc(count)
+
+
+def record_model_load(timings: Dict[str, float]) -> None:
+    """
+    Export the phase durations of a model load.
+
+    Args:
+        timings: Seconds per load phase, including the total
+    """
+    for phase, seconds in timings.items():
+        MODEL_LOAD_SECONDS.labels(phase).set(seconds)
+
+
+def mark_worker_dead(pid: int) -> None:
+    """
+    Drop the live gauges of an exited worker process (multiprocess mode).
+
+    Args:
+        pid: Process id of the worker
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+
+def render_metrics() -> bytes:
+    """
+    Render every metric in the Prometheus text format.
+
+    With PROMETHEUS_MULTIPROC_DIR set (e.g. under ``app.prefork``), the
+    samples of every worker process are aggregated.
+
+    Returns:
+        Exposition text
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
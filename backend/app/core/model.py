@@ -2,17 +2,360 @@
 ML Model Manager for Translation
 """
 
-from typing import Optional
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from itertools import chain
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import torch
 from peft import PeftModel
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+from peft.tuners.lora import LoraLayer
+from safetensors.torch import load_file
+from transformers import (
+    AutoConfig,
+    AutoModelForSeq2SeqLM,
+    AutoTokenizer,
+    GenerationConfig,
+    StoppingCriteriaList,
+)
 
+from app.core.bucketing import padding_stats, token_budget_buckets
+from app.core.compilation import (
+    compile_model,
+    compile_stats,
+    length_bucket,
+    pad_to_length,
+    warmup_beam_widths,
+)
 from app.core.config import settings
+from app.core.executor import inference_executor
+from app.core.generation import (
+    CancelCriteria,
+    GenerationParams,
+    TranslationStreamer,
+    cascade_stats,
+    decoding_log,
+    latency_model,
+    replace_rows,
+    sequence_confidence,
+)
+from app.core.metrics import record_model_load
+from app.core.profiling import inference_profiler
+from app.core.quantization import check_quantization, quantize_dynamic_int8
+from app.core.tokenization import InputEncoder, pad_batch, phase_stats
 from app.utils.logger import get_logger
+from app.utils.memory import (
+    get_memory_usage,
+    get_peak_rss_mb,
+    release_freed_memory,
+    reset_peak_rss,
+)
 
 logger = get_logger("model")
 
+# Written next to exported ONNX graphs and model bundles, records which
+# model they came from.
+EXPORT_INFO_FILE = "export_info.json"
+# Layout version of bundles written by `python -m app.export_bundle`.
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_WEIGHTS_FILE = "model.safetensors"
+
+
+@contextmanager
+def timed_phase(timings: Optional[Dict[str, float]], phase: str) -> Iterator[None]:
+    """
+    Time one phase of model loading and log its duration.
+
+    Args:
+        timings: Dict receiving the duration in seconds (None to only log)
+        phase: Phase name
+    """
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    if timings is not None:
+        timings[phase] = round(elapsed, 3)
+    logger.info(f"Load phase '{phase}' took {elapsed:.2f}s")
+
+
+def compute_model_version(base_checkpoint: str, adapter_path: Path) -> str:
+    """
+    Fingerprint the base checkpoint name and the adapter weights.
+
+    Args:
+        base_checkpoint: Base model checkpoint name
+        adapter_path: Directory holding the LoRA adapter
+
+    Returns:
+        Short hex digest that changes whenever the adapter is retrained
+    """
+    digest = hashlib.sha256(base_checkpoint.encode())
+    adapter_path = Path(adapter_path)
+    if adapter_path.is_dir():
+        for path in sorted(adapter_path.iterdir()):
+            if path.suffix in {".json", ".safetensors", ".bin"}:
+                digest.update(path.name.encode())
+                digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def merge_lora_in_place(peft_model: PeftModel) -> AutoModelForSeq2SeqLM:
+    """
+    Fold each LoRA layer into its base layer and free it straight away.
+
+    ``merge_and_unload()`` keeps every adapter alive until the whole model is
+    merged. Here each layer's delta is added to the base weight in place, the
+    layer is swapped for its base layer and its adapter tensors are dropped
+    before moving on to the next one.
+
+    Args:
+        peft_model: Base model with the LoRA adapter attached
+
+    Returns:
+        The base model, now holding the merged weights
+    """
+    model = peft_model.get_base_model()
+    # Names only: holding the layers themselves would keep every adapter alive.
+    names = [
+        name for name, module in model.named_modules() if isinstance(module, LoraLayer)
+    ]
+    for name in names:
+        layer = model.get_submodule(name)
+        layer.merge()
+        parent_name, _, child_name = name.rpartition(".")
+        parent = model.get_submodule(parent_name) if parent_name else model
+        setattr(parent, child_name, layer.get_base_layer())
+        for adapters in (
+            layer.lora_A,
+            layer.lora_B,
+            layer.lora_embedding_A,
+            layer.lora_embedding_B,
+        ):
+            adapters.clear()
+        del layer
+
+    logger.info(f"Merged {len(names)} LoRA layers in place")
+    return model
+
+
+def load_merged_model(
+    base_checkpoint: str,
+    adapter_path: Path,
+    timings: Optional[Dict[str, float]] = None,
+    low_memory: Optional[bool] = None,
+) -> AutoModelForSeq2SeqLM:
+    """
+    Load the base checkpoint and merge the LoRA adapter into it.
+
+    Args:
+        base_checkpoint: Base model checkpoint name
+        adapter_path: Directory holding the LoRA adapter
+        timings: Dict receiving the duration of each phase
+        low_memory: Keep peak memory low while loading (default:
+            LOW_MEMORY_LOAD)
+
+    Returns:
+        Merged PyTorch model
+    """
+    if low_memory is None:
+        low_memory = settings.LOW_MEMORY_LOAD
+
+    # The fine-tuned model is a LoRA adapter, not a full model. Load the
+    # base checkpoint (t5-small) first, then attach the adapter on top.
+    logger.info(f"Loading base model: {base_checkpoint}")
+    with timed_phase(timings, "base_model"):
+        # low_cpu_mem_usage builds the model on the meta device and fills it
+        # from the checkpoint, instead of initializing random weights first.
+        base_model = AutoModelForSeq2SeqLM.from_pretrained(
+            base_checkpoint, low_cpu_mem_usage=low_memory
+        )
+
+    logger.info(f"Loading LoRA adapter from {adapter_path}")
+    with timed_phase(timings, "adapter"):
+        # Only peft >= 0.13 accepts low_cpu_mem_usage; older releases, which
+        # requirements allow, still load in the default mode.
+        adapter_kwargs = {"low_cpu_mem_usage": True} if low_memory else {}
+        peft_model = PeftModel.from_pretrained(
+            base_model, str(adapter_path), **adapter_kwargs
+        )
+
+    # Merge the LoRA weights into the base model for faster inference.
+    logger.info("Merging LoRA adapter into base model")
+    with timed_phase(timings, "merge"):
+        if not low_memory:
+            return peft_model.merge_and_unload()
+
+        merged = merge_lora_in_place(peft_model)
+        # Drop the PEFT wrapper and everything only it referenced, and hand
+        # the freed pages back to the OS.
+        del peft_model, base_model
+        release_freed_memory()
+        return merged
+
+
+def load_bundle_model(bundle_dir: Path) -> AutoModelForSeq2SeqLM:
+    """
+    Memory-map a pre-merged model bundle.
+
+    The model is built on the meta device and its parameters are assigned
+    the tensors of the memory-mapped safetensors file, so nothing is copied:
+    pages are read on first use and shared between processes through the
+    page cache.
+
+    Args:
+        bundle_dir: Output directory of ``python -m app.export_bundle``
+
+    Returns:
+        Merged PyTorch model in eval mode
+
+    Raises:
+        RuntimeError: If the bundle does not hold every weight of the model
+    """
+    bundle_dir = Path(bundle_dir)
+    config = AutoConfig.from_pretrained(bundle_dir)
+    with torch.device("meta"):
+        model = AutoModelForSeq2SeqLM.from_config(config)
+
+    state_dict = load_file(bundle_dir / BUNDLE_WEIGHTS_FILE)
+    # Tied weights (shared embeddings, lm_head) are stored once.
+    model.load_state_dict(state_dict, strict=False, assign=True)
+    model.tie_weights()
+
+    missing = [
+        name
+        for name, tensor in chain(model.named_parameters(), model.named_buffers())
+        if tensor.is_meta
+    ]
+    if missing:
+        raise RuntimeError(f"Model bundle {bundle_dir} is missing weights: {missing}")
+
+    if (bundle_dir / "generation_config.json").is_file():
+        model.generation_config = GenerationConfig.from_pretrained(bundle_dir)
+    return model.eval()
+
+
+def save_bundle(
+    model: AutoModelForSeq2SeqLM, tokenizer, output_dir: Path, model_version: str
+) -> Path:
+    """
+    Write a merged model, its tokenizer and generation config as one bundle.
+
+    The bundle is written next to ``output_dir`` and moved into place once
+    complete, so a server never sees a half-written bundle.
+
+    Args:
+        model: Merged PyTorch model
+        tokenizer: Tokenizer of the model
+        output_dir: Bundle directory (replaced if it exists)
+        model_version: Version of the model the weights came from
+
+    Returns:
+        The bundle directory
+    """
+    output_dir = Path(output_dir)
+    # Per process, so concurrent first starts do not write into each other.
+    staging_dir = output_dir.with_name(f"{output_dir.name}.{os.getpid()}.tmp")
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+
+    logger.info(f"Writing merged model bundle to {output_dir}")
+    model.save_pretrained(staging_dir, safe_serialization=True)
+    tokenizer.save_pretrained(staging_dir)
+
+    weights = staging_dir / BUNDLE_WEIGHTS_FILE
+    if not weights.is_file():
+        shutil.rmtree(staging_dir)
+        raise RuntimeError(f"Expected a single weights file {weights}")
+
+    info = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "base_checkpoint": settings.BASE_MODEL_CHECKPOINT,
+        "model_version": model_version,
+    }
+    (staging_dir / EXPORT_INFO_FILE).write_text(
+        json.dumps(info, indent=2), encoding="utf-8"
+    )
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    staging_dir.rename(output_dir)
+    logger.info(f"Bundle for model version {model_version} is ready")
+    return output_dir
+
+
+def load_onnx_model(model_dir: Path):
+    """
+    Load an exported encoder/decoder-with-past model on ONNX Runtime (CPU).
+
+    Args:
+        model_dir: Output directory of ``python -m app.export_onnx``
+
+    Returns:
+        Model exposing the same ``generate()`` API as the PyTorch model
+
+    Raises:
+        RuntimeError: If optimum[onnxruntime] is not installed
+    """
+    try:
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise RuntimeError(
+            "The onnxruntime backend requires optimum[onnxruntime]: "
+            "pip install 'optimum[onnxruntime]'"
+        ) from e
+
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if settings.ORT_INTRA_OP_THREADS > 0:
+        options.intra_op_num_threads = settings.ORT_INTRA_OP_THREADS
+
+    # Separate decoder graphs: the first step runs without a KV cache, every
+    # later step reuses it through the decoder-with-past graph.
+    return ORTModelForSeq2SeqLM.from_pretrained(
+        model_dir,
+        use_merged=False,
+        use_cache=True,
+        provider="CPUExecutionProvider",
+        session_options=options,
+    )
+
+
+def read_export_info(model_dir: Path) -> Optional[Dict[str, Any]]:
+    """
+    Read the details recorded when a model was exported.
+
+    Args:
+        model_dir: Output directory of an export command
+
+    Returns:
+        Export details, or None if the directory holds no export
+    """
+    info_path = Path(model_dir) / EXPORT_INFO_FILE
+    if not info_path.is_file():
+        return None
+    return json.loads(info_path.read_text(encoding="utf-8"))
+
+
+def read_export_version(model_dir: Path) -> Optional[str]:
+    """
+    Read the model version recorded when a model was exported.
+
+    Args:
+        model_dir: Output directory of an export command
+
+    Returns:
+        Version of the merged model the export came from, or None if unknown
+    """
+    info = read_export_info(model_dir)
+    return info.get("model_version") if info else None
+
 
 class ModelManager:
     """Manages the translation model and tokenizer."""
@@ -20,15 +363,72 @@ class ModelManager:
     def __init__(self):
         """Initialize the model manager."""
         self._tokenizer: Optional[AutoTokenizer] = None
+        self._encoder: Optional[InputEncoder] = None
         self._model: Optional[AutoModelForSeq2SeqLM] = None
         self._device: Optional[torch.device] = None
         self._is_loaded: bool = False
+        self._model_version: Optional[str] = None
+        self._is_quantized: bool = False
+        self._is_compiled: bool = False
+        self._memory_mapped: bool = False
+        self._load_timings: Dict[str, float] = {}
+        self._load_memory: Dict[str, float] = {}
+        self._quantization_report: Optional[Dict[str, Any]] = None
+        self._load_listeners: List[Callable[[], None]] = []
+        # Fast tokenizers are not safe to call from several threads at once.
+        self._tokenizer_lock = threading.Lock()
 
     @property
     def is_loaded(self) -> bool:
         """Check if the model is loaded."""
         return self._is_loaded
 
+    @property
+    def model_version(self) -> str:
+        """Get the fingerprint of the loaded base model and adapter."""
+        if self._model_version is None:
+            raise RuntimeError("Model not loaded. Call load() first.")
+        return self._model_version
+
+    @property
+    def is_quantized(self) -> bool:
+        """Check if the served model has int8 Linear layers."""
+        return self._is_quantized
+
+    @property
+    def is_compiled(self) -> bool:
+        """Check if generation runs through the compiled forward pass."""
+        return self._is_compiled
+
+    @property
+    def weights_memory_mapped(self) -> bool:
+        """Check if the weights are memory-mapped from a model bundle."""
+        return self._memory_mapped
+
+    @property
+    def load_timings(self) -> Dict[str, float]:
+        """Get the duration in seconds of each phase of the last load."""
+        return dict(self._load_timings)
+
+    @property
+    def load_memory(self) -> Dict[str, float]:
+        """Get the peak RSS during the last load and the RSS after it, in MB."""
+        return dict(self._load_memory)
+
+    @property
+    def quantization_report(self) -> Optional[Dict[str, Any]]:
+        """Get the result of the int8 accuracy check, if it ran."""
+        return self._quantization_report
+
+    def add_load_listener(self, callback: Callable[[], None]) -> None:
+        """
+        Register a callback to run every time a model is loaded.
+
+        Args:
+            callback: Called with no arguments after each successful load
+        """
+        self._load_listeners.append(callback)
+
     @property
     def device(self) -> torch.device:
         """Get the device for inference."""
@@ -48,6 +448,21 @@ class ModelManager:
             raise RuntimeError("Model not loaded. Call load() first.")
         return self._tokenizer
 
+    @property
+    def encoder(self) -> InputEncoder:
+        """Get the input encoder (task prefix and token-id cache)."""
+        if self._encoder is None:
+            raise RuntimeError("Model not loaded. Call load() first.")
+        return self._encoder
+
+    @property
+    def token_cache_stats(self) -> Dict[str, Any]:
+        """Get the prefix length and token-id cache counters."""
+        if self._encoder is None:
+            return {}
+        with self._tokenizer_lock:
+            return self._encoder.snapshot()
+
     @property
     def model(self) -> AutoModelForSeq2SeqLM:
         """Get the model."""
@@ -61,36 +476,424 @@ class ModelManager:
             logger.info("Model already loaded.")
             return
 
-        logger.info(f"Loading tokenizer from {settings.TOKENIZER_PATH}")
-        self._tokenizer = AutoTokenizer.from_pretrained(settings.TOKENIZER_PATH)
+        self._load_timings = {}
+        latency_model.reset()
+        padding_stats.reset()
+        phase_stats.reset()
+        cascade_stats.reset()
+        decoding_log.reset()
+        peak_is_reset = reset_peak_rss()
+        started = time.perf_counter()
+        bundle = self._find_bundle()
+        tokenizer_path = bundle or settings.TOKENIZER_PATH
 
-        # The fine-tuned model is a LoRA adapter, not a full model. Load the
-        # base checkpoint (t5-small) first, then attach the adapter on top.
-        logger.info(f"Loading base model: {settings.BASE_MODEL_CHECKPOINT}")
-        base_model = AutoModelForSeq2SeqLM.from_pretrained(
-            settings.BASE_MODEL_CHECKPOINT
+        logger.info(f"Loading tokenizer from {tokenizer_path}")
+        with timed_phase(self._load_timings, "tokenizer"):
+            self._tokenizer = AutoTokenizer.from_pretrained(tokenizer_path)
+            self._encoder = InputEncoder(
+                self._tokenizer,
+                settings.TRANSLATION_PREFIX,
+                settings.MAX_INPUT_LENGTH,
+                cache_size=settings.TOKEN_CACHE_SIZE,
+                cache_max_chars=settings.TOKEN_CACHE_MAX_CHARS,
+            )
+
+        if settings.INFERENCE_BACKEND == "onnxruntime":
+            self._load_onnx()
+        else:
+            self._load_pytorch(bundle)
+
+        self._load_timings["total"] = round(time.perf_counter() - started, 3)
+        record_model_load(self._load_timings)
+        self._load_memory = {
+            "peak_rss_mb": get_peak_rss_mb(),
+            "rss_mb": get_memory_usage()["rss_mb"],
+        }
+        self._is_loaded = True
+        logger.info(
+            f"Model loaded successfully! (version {self._model_version}) "
+            f"in {self._load_timings['total']:.2f}s"
+        )
+        # Without a resettable counter the peak covers the whole process.
+        peak_scope = "during load" if peak_is_reset else "since process start"
+        logger.info(
+            f"Peak RSS {peak_scope}: {self._load_memory['peak_rss_mb']:.1f} MB "
+            f"(RSS after load: {self._load_memory['rss_mb']:.1f} MB)"
         )
 
-        logger.info(f"Loading LoRA adapter from {settings.MODEL_PATH}")
-        peft_model = PeftModel.from_pretrained(base_model, str(settings.MODEL_PATH))
+        for callback in self._load_listeners:
+            callback()
+
+    def _find_bundle(self) -> Optional[Path]:
+        """
+        Find a pre-merged model bundle that matches the current adapter.
+
+        Returns:
+            Bundle directory, or None to load and merge the adapter instead
+        """
+        if not settings.MODEL_BUNDLE_ENABLED or settings.INFERENCE_BACKEND != "pytorch":
+            return None
+
+        bundle = Path(settings.MODEL_BUNDLE_PATH)
+        info = read_export_info(bundle)
+        if info is None:
+            return None
+
+        if info.get("format_version") != BUNDLE_FORMAT_VERSION:
+            logger.warning(
+                f"Ignoring model bundle {bundle}: format "
+                f"{info.get('format_version')}, expected {BUNDLE_FORMAT_VERSION}"
+            )
+            return None
+
+        # Deployments may ship the bundle alone; when the adapter is there
+        # too, a retrained adapter must win over a stale bundle.
+        if Path(settings.MODEL_PATH).is_dir():
+            current = compute_model_version(
+                settings.BASE_MODEL_CHECKPOINT, settings.MODEL_PATH
+            )
+            if info.get("model_version") != current:
+                logger.warning(
+                    f"Ignoring stale model bundle {bundle} (version "
+                    f"{info.get('model_version')}, adapter is {current}); "
+                    f"re-run python -m app.export_bundle"
+                )
+                return None
+
+        return bundle
+
+    def _load_pytorch(self, bundle: Optional[Path] = None) -> None:
+        """
+        Load the PyTorch model (the default backend).
 
-        # Merge the LoRA weights into the base model for faster inference.
-        logger.info("Merging LoRA adapter into base model")
-        self._model = peft_model.merge_and_unload()
+        Args:
+            bundle: Pre-merged bundle to memory-map, or None to merge the
+                adapter into the base checkpoint
+        """
+        if bundle is not None:
+            logger.info(f"Memory-mapping merged model bundle from {bundle}")
+            with timed_phase(self._load_timings, "bundle"):
+                self._model = load_bundle_model(bundle)
+            self._memory_mapped = True
+            self._model_version = read_export_version(bundle)
+        else:
+            self._model = load_merged_model(
+                settings.BASE_MODEL_CHECKPOINT,
+                settings.MODEL_PATH,
+                timings=self._load_timings,
+            )
+            self._model_version = compute_model_version(
+                settings.BASE_MODEL_CHECKPOINT, settings.MODEL_PATH
+            )
+            if settings.MODEL_BUNDLE_ENABLED and settings.MODEL_BUNDLE_BUILD_ON_START:
+                self._write_bundle()
 
         logger.info(f"Moving model to device: {self.device}")
-        self._model.to(self.device)
-        self._model.eval()
+        with timed_phase(self._load_timings, "to_device"):
+            self._model.to(self.device)
+            self._model.eval()
 
-        self._is_loaded = True
-        logger.info("Model loaded successfully!")
+        if settings.QUANTIZE_INT8:
+            with timed_phase(self._load_timings, "quantize"):
+                self._model = self._quantize(self._model)
+
+        if settings.COMPILE_ENABLED:
+            with timed_phase(self._load_timings, "compile"):
+                self._compile()
+
+        # Moving to a GPU or quantizing copies the weights out of the bundle.
+        if self._is_quantized or self.device.type != "cpu":
+            self._memory_mapped = False
 
-    def translate(self, text: str) -> str:
+        # int8 output differs from fp32, so it must not share cached entries.
+        if self._is_quantized:
+            self._model_version += "-int8"
+
+    def _write_bundle(self) -> None:
+        """
+        Save the freshly merged model as a bundle for the next start.
+
+        Failing to write it (e.g. on a read-only filesystem) only costs the
+        next start a merge, so errors are logged rather than raised.
+        """
+        try:
+            with timed_phase(self._load_timings, "bundle_write"):
+                save_bundle(
+                    self._model,
+                    self._tokenizer,
+                    settings.MODEL_BUNDLE_PATH,
+                    self._model_version,
+                )
+        except Exception as e:
+            logger.warning(f"Could not write model bundle: {e}")
+
+    def _load_onnx(self) -> None:
+        """Load the exported ONNX graphs on ONNX Runtime."""
+        # The graphs run on ORT's CPU execution provider.
+        self._device = torch.device("cpu")
+        if settings.QUANTIZE_INT8:
+            logger.warning("QUANTIZE_INT8 only applies to the pytorch backend")
+        if settings.COMPILE_ENABLED:
+            logger.warning("COMPILE_ENABLED only applies to the pytorch backend")
+
+        logger.info(f"Loading ONNX Runtime model from {settings.ONNX_MODEL_PATH}")
+        with timed_phase(self._load_timings, "onnx"):
+            self._model = load_onnx_model(settings.ONNX_MODEL_PATH)
+
+        current = compute_model_version(
+            settings.BASE_MODEL_CHECKPOINT, settings.MODEL_PATH
+        )
+        exported = read_export_version(settings.ONNX_MODEL_PATH)
+        if exported != current:
+            logger.warning(
+                f"ONNX model was exported from version {exported}, adapter is "
+                f"{current}; re-run python -m app.export_onnx"
+            )
+        # Kept apart from PyTorch entries: ORT kernels may round differently.
+        self._model_version = f"{exported or current}-onnx"
+
+    def _compile(self) -> None:
+        """Compile the model and warm up every length bucket and beam width."""
+        logger.info(f"Compiling model (mode={settings.COMPILE_MODE})")
+        compile_stats.reset()
+        self._model = compile_model(self._model)
+        self._is_compiled = True
+
+        pad_token_id = self.tokenizer.pad_token_id
+        buckets = [
+            bucket
+            for bucket in sorted(settings.COMPILE_LENGTH_BUCKETS)
+            if bucket <= settings.MAX_INPUT_LENGTH
+        ]
+        widths = warmup_beam_widths()
+        for bucket in buckets:
+            # Two rows, so the batch dimension is compiled as dynamic too.
+            dummy = torch.full((2, bucket), pad_token_id, dtype=torch.long)
+            started = time.perf_counter()
+            # Greedy and beam search take different paths through generate(),
+            # so every width a request may get is compiled now, not on first use.
+            for num_beams in widths:
+                with torch.no_grad():
+                    self.model.generate(
+                        dummy.to(self.device),
+                        attention_mask=torch.ones_like(dummy).to(self.device),
+                        max_new_tokens=4,
+                        num_beams=num_beams,
+                    )
+            elapsed = time.perf_counter() - started
+            compile_stats.record_compile(bucket, elapsed)
+            logger.info(
+                f"Compiled length bucket {bucket} for beam widths 1-{widths[-1]} "
+                f"in {elapsed:.1f}s"
+            )
+
+    def _generate(
+        self,
+        inputs,
+        params: Optional[GenerationParams] = None,
+        texts: Optional[List[str]] = None,
+        **generate_kwargs,
+    ) -> torch.Tensor:
+        """
+        Run generation on tokenized inputs.
+
+        When the model is compiled, inputs are padded to their length bucket
+        so they reuse an already compiled shape. With CASCADE_ENABLED, beam
+        search requests are decoded greedily first (see ``_generate_cascade``)
+        and the beam width each of ``texts`` ended up with is recorded in the
+        decoding log.
+
+        Args:
+            inputs: Tokenizer output on the model device
+            params: Decoding settings (default: the serving settings)
+            texts: Input texts, one per row of ``inputs``
+            **generate_kwargs: Extra ``generate()`` arguments for greedy or
+                uncascaded generation (streamer, stopping criteria)
+
+        Returns:
+            Generated token ids
+        """
+        params = params or GenerationParams.default()
+        input_ids = inputs["input_ids"]
+        attention_mask = inputs.get("attention_mask")
+        input_tokens = input_ids.shape[1]
+
+        bucket = None
+        if self._is_compiled:
+            bucket = length_bucket(input_ids.shape[1], settings.COMPILE_LENGTH_BUCKETS)
+            if bucket is not None:
+                input_ids, attention_mask = pad_to_length(
+                    input_ids, attention_mask, bucket, self.tokenizer.pad_token_id
+                )
+
+        started = time.perf_counter()
+        with inference_profiler.profiled(), torch.no_grad():
+            if settings.CASCADE_ENABLED and params.num_beams > 1:
+                generated, beams = self._generate_cascade(
+                    input_ids, attention_mask, input_tokens, params
+                )
+                if texts is not None:
+                    decoding_log.record(texts, params, beams)
+            else:
+                generated = self.model.generate(
+                    input_ids,
+                    attention_mask=attention_mask,
+                    **params.generate_kwargs(),
+                    **generate_kwargs,
+                )
+                # Every output row starts with the decoder start token.
+                latency_model.record(
+                    params.num_beams,
+                    input_tokens,
+                    generated.shape[1] - 1,
+                    time.perf_counter() - started,
+                )
+        elapsed = time.perf_counter() - started
+        phase_stats.record("generate", elapsed)
+
+        padding_stats.record(
+            input_ids, attention_mask, generated, self.tokenizer.pad_token_id
+        )
+        if self._is_compiled:
+            compile_stats.record(bucket, elapsed)
+        return generated
+
+    def _generate_cascade(
+        self,
+        input_ids: torch.Tensor,
+        attention_mask: Optional[torch.Tensor],
+        input_tokens: int,
+        params: GenerationParams,
+    ) -> Tuple[torch.Tensor, List[int]]:
+        """
+        Decode greedily, then rerun beam search on the low-confidence rows.
+
+        A greedy output is kept when its mean token log-probability is at
+        least CASCADE_CONFIDENCE_THRESHOLD.
+
+        Args:
+            input_ids: Token ids, shape (batch, seq)
+            attention_mask: Mask for ``input_ids``
+            input_tokens: Input length before any bucket padding
+            params: Beam search settings of the request
+
+        Returns:
+            Generated token ids, and the beam width used for each row
+        """
+        pad_token_id = self.tokenizer.pad_token_id
+        greedy = GenerationParams(num_beams=1, max_new_tokens=params.max_new_tokens)
+
+        started = time.perf_counter()
+        output = self.model.generate(
+            input_ids,
+            attention_mask=attention_mask,
+            output_scores=True,
+            return_dict_in_generate=True,
+            **greedy.generate_kwargs(),
+        )
+        greedy_seconds = time.perf_counter() - started
+        steps = output.sequences.shape[1] - 1
+        latency_model.record(1, input_tokens, steps, greedy_seconds)
+
+        confidence = sequence_confidence(self.model, output, pad_token_id)
+        rows = torch.nonzero(
+            confidence < settings.CASCADE_CONFIDENCE_THRESHOLD
+        ).flatten()
+        generated = output.sequences
+
+        if len(rows):
+            rerun_started = time.perf_counter()
+            beams = self.model.generate(
+                input_ids[rows],
+                attention_mask=(
+                    attention_mask[rows] if attention_mask is not None else None
+                ),
+                **params.generate_kwargs(),
+            )
+            rerun_seconds = time.perf_counter() - rerun_started
+            latency_model.record(
+                params.num_beams, input_tokens, beams.shape[1] - 1, rerun_seconds
+            )
+            generated = replace_rows(generated, beams, rows, pad_token_id)
+
+        # Baseline: beam search on every row. It really ran when every row
+        # escalated; otherwise estimate it for as many steps as greedy ran,
+        # from measured beam runs only.
+        if len(rows) and len(rows) == len(confidence):
+            baseline_seconds = rerun_seconds
+        else:
+            step_ms = latency_model.measured_ms_per_step(params.num_beams)
+            baseline_seconds = steps * step_ms / 1000 if step_ms else None
+        cascade_stats.record(
+            confidence, len(rows), time.perf_counter() - started, baseline_seconds
+        )
+
+        widths = [1] * len(confidence)
+        for row in rows.tolist():
+            widths[row] = params.num_beams
+        return generated, widths
+
+    def _quantize(self, model: AutoModelForSeq2SeqLM) -> AutoModelForSeq2SeqLM:
+        """
+        Quantize the merged model to int8, subject to the accuracy check.
+
+        Args:
+            model: Merged fp32 model
+
+        Returns:
+            The model to serve: the int8 copy, or ``model`` if it was refused
+
+        Raises:
+            FileNotFoundError: If the accuracy check is on and its sample is
+                missing, so a misconfiguration fails the load instead of
+                silently serving fp32
+        """
+        if self.device.type != "cpu":
+            logger.warning("int8 dynamic quantization is CPU-only, serving fp32")
+            return model
+
+        eval_path = Path(settings.QUANTIZATION_EVAL_PATH)
+        if settings.QUANTIZATION_CHECK_ENABLED and not eval_path.exists():
+            raise FileNotFoundError(
+                f"QUANTIZE_INT8 needs the evaluation sample at {eval_path}; "
+                "provide it or set QUANTIZATION_CHECK_ENABLED=false"
+            )
+
+        logger.info("Applying dynamic int8 quantization to Linear layers")
+        quantized = quantize_dynamic_int8(model)
+
+        if settings.QUANTIZATION_CHECK_ENABLED:
+            try:
+                report = check_quantization(
+                    model, quantized, self._tokenizer, self.device
+                )
+                self._quantization_report = report.to_dict()
+                passed = report.passed
+                logger.info(
+                    f"int8 check on {report.samples} pairs: "
+                    f"BLEU {report.fp32['bleu']} -> {report.int8['bleu']}, "
+                    f"chrF {report.fp32['chrf']} -> {report.int8['chrf']}"
+                )
+            except Exception as e:
+                logger.error(f"int8 accuracy check could not run: {e}")
+                passed = False
+
+            if not passed:
+                if settings.QUANTIZATION_ON_FAIL == "refuse":
+                    logger.error("int8 model refused, serving fp32")
+                    return model
+                logger.warning("int8 model failed the accuracy check, serving anyway")
+
+        self._is_quantized = True
+        return quantized
+
+    def translate(self, text: str, params: Optional[GenerationParams] = None) -> str:
         """
         Translate text from English to Spanish.
 
         Args:
             text: English text to translate
+            params: Decoding settings (default: the serving settings)
 
         Returns:
             Spanish translation
@@ -98,33 +901,198 @@ class ModelManager:
         if not self._is_loaded:
             raise RuntimeError("Model not loaded. Call load() first.")
 
-        # T5 needs the same task prefix that was used during fine-tuning.
-        prefixed_text = settings.TRANSLATION_PREFIX + text
-
-        # Tokenize input
-        inputs = self.tokenizer(
-            prefixed_text,
-            return_tensors="pt",
-            padding=True,
-            truncation=True,
-            max_length=settings.MAX_INPUT_LENGTH,
-        ).to(self.device)
+        inputs = self._encode([text])
 
         # Generate translation
-        with torch.no_grad():
-            translated_tokens = self.model.generate(
-                inputs["input_ids"],
-                max_length=settings.MAX_OUTPUT_LENGTH,
-                num_beams=settings.NUM_BEAMS,
-                early_stopping=True,
-            )
+        translated_tokens = self._generate(inputs, params, texts=[text])
 
         # Decode and return
-        translated_text = self.tokenizer.decode(
-            translated_tokens[0], skip_special_tokens=True
-        )
+        with phase_stats.timed("decode"), self._tokenizer_lock:
+            translated_text = self.tokenizer.decode(
+                translated_tokens[0], skip_special_tokens=True
+            )
         return translated_text
 
+    def translate_batch(
+        self, texts: List[str], params: Optional[GenerationParams] = None
+    ) -> List[str]:
+        """
+        Translate several texts with batched generations.
+
+        Texts are sorted by token length and split into batches of similar
+        length under MAX_BATCH_TOKENS padded tokens (see
+        ``token_budget_buckets``), so short texts are not padded to the
+        longest one.
+
+        Args:
+            texts: English texts to translate
+            params: Decoding settings (default: the serving settings)
+
+        Returns:
+            Spanish translations, in the same order as ``texts``
+        """
+        if not self._is_loaded:
+            raise RuntimeError("Model not loaded. Call load() first.")
+
+        if not texts:
+            return []
+
+        with phase_stats.timed("tokenize"), self._tokenizer_lock:
+            encoded = self.encoder.encode(texts)
+
+        translations = [""] * len(texts)
+        buckets = token_budget_buckets(
+            [len(ids) for ids in encoded], settings.MAX_BATCH_TOKENS
+        )
+        for bucket in buckets:
+            # Padding is real here, so the attention mask must go to generate().
+            inputs = pad_batch(
+                [encoded[i] for i in bucket], self.tokenizer.pad_token_id, self.device
+            )
+
+            translated_tokens = self._generate(
+                inputs, params, texts=[texts[i] for i in bucket]
+            )
+
+            with phase_stats.timed("decode"), self._tokenizer_lock:
+                decoded = self.tokenizer.batch_decode(
+                    translated_tokens, skip_special_tokens=True
+                )
+            for i, translation in zip(bucket, decoded):
+                translations[i] = translation
+        return translations
+
+    def _encode(self, texts: List[str]) -> Dict[str, torch.Tensor]:
+        """
+        Tokenize texts into padded model inputs on the model device.
+
+        Args:
+            texts: English texts, without the task prefix
+
+        Returns:
+            ``input_ids`` and ``attention_mask`` tensors
+        """
+        # T5 needs the same task prefix that was used during fine-tuning; the
+        # encoder prepends its cached ids.
+        with phase_stats.timed("tokenize"), self._tokenizer_lock:
+            encoded = self.encoder.encode(texts)
+        return pad_batch(encoded, self.tokenizer.pad_token_id, self.device)
+
+    def create_streamer(self) -> TranslationStreamer:
+        """
+        Create a streamer for ``translate_streaming`` (on the event loop).
+
+        Returns:
+            Async iterator over the generated text
+        """
+        return TranslationStreamer(self.tokenizer, self._tokenizer_lock)
+
+    def translate_streaming(
+        self,
+        text: str,
+        streamer: TranslationStreamer,
+        params: Optional[GenerationParams] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> None:
+        """
+        Translate text greedily, pushing the output to a streamer as it grows.
+
+        Args:
+            text: English text to translate
+            streamer: Streamer from ``create_streamer``
+            params: Greedy decoding settings (default: greedy with the
+                serving output length)
+            cancel: Event that stops generation when set
+
+        Raises:
+            ValueError: If ``params`` is not greedy decoding
+        """
+        params = params or GenerationParams(num_beams=1)
+        try:
+            if not self._is_loaded:
+                raise RuntimeError("Model not loaded. Call load() first.")
+            if params.num_beams != 1:
+                raise ValueError("Token streaming requires greedy decoding.")
+
+            inputs = self._encode([text])
+
+            stopping_criteria = None
+            if cancel is not None:
+                stopping_criteria = StoppingCriteriaList([CancelCriteria(cancel)])
+            self._generate(
+                inputs,
+                params,
+                streamer=streamer,
+                stopping_criteria=stopping_criteria,
+            )
+        except Exception:
+            # Release the consumer, which would otherwise wait forever.
+            streamer.end()
+            raise
+
+    async def translate_streaming_async(
+        self,
+        text: str,
+        streamer: TranslationStreamer,
+        params: Optional[GenerationParams] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> None:
+        """
+        Run ``translate_streaming`` on the inference executor.
+
+        Args:
+            text: English text to translate
+            streamer: Streamer from ``create_streamer``
+            params: Greedy decoding settings
+            cancel: Event that stops generation when set
+        """
+        await inference_executor.run(
+            self.translate_streaming, text, streamer, params, cancel
+        )
+
+    async def translate_async(
+        self, text: str, params: Optional[GenerationParams] = None
+    ) -> str:
+        """
+        Translate text on the inference executor without blocking the loop.
+
+        Args:
+            text: English text to translate
+            params: Decoding settings (default: the serving settings)
+
+        Returns:
+            Spanish translation
+        """
+        return await inference_executor.run(self.translate, text, params)
+
+    async def translate_batch_async(
+        self, texts: List[str], params: Optional[GenerationParams] = None
+    ) -> List[str]:
+        """
+        Translate several texts on the inference executor.
+
+        Args:
+            texts: English texts to translate
+            params: Decoding settings (default: the serving settings)
+
+        Returns:
+            Spanish translations, in the same order as ``texts``
+        """
+        return await inference_executor.run(self.translate_batch, texts, params)
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Count the input tokens a text will occupy, including the task prefix.
+
+        Args:
+            text: English text
+
+        Returns:
+            Number of tokens after truncation to MAX_INPUT_LENGTH
+        """
+        with self._tokenizer_lock:
+            return self.encoder.count(text)
+
     def cleanup(self) -> None:
         """Cleanup model resources."""
         if self._model is not None:
@@ -134,8 +1102,14 @@ class ModelManager:
         if self._tokenizer is not None:
             del self._tokenizer
             self._tokenizer = None
+        self._encoder = None
 
         self._is_loaded = False
+        self._model_version = None
+        self._is_quantized = False
+        self._is_compiled = False
+        self._memory_mapped = False
+        self._quantization_report = None
 
         # Clear CUDA cache if available
         if torch.cuda.is_available():
@@ -0,0 +1,244 @@
+"""
+On-demand Profiling of Live Inference
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from torch.profiler import ProfilerActivity, profile
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("profiling")
+
+
+class ProfilerBusy(Exception):
+    """Raised when a capture is requested while another one is running."""
+
+
+class _Capture:
+    """Profiles of the model calls of one capture, merged as they arrive."""
+
+    def __init__(
+        self, capture_id: str, directory: Path, calls: Optional[int], seconds: float
+    ):
+        """
+        Initialize the capture.
+
+        Args:
+            capture_id: Capture id, also the name of its directory
+            directory: Directory the traces are written to
+            calls: Number of model calls to profile (None: no limit)
+            seconds: Duration after which the capture ends
+        """
+        self.id = capture_id
+        self.directory = directory
+        self.max_calls = calls
+        self.started = time.perf_counter()
+        self.deadline = self.started + seconds
+        self.calls = 0
+        self.traces: List[str] = []
+        # (op, input shapes) -> [count, self CPU us, total CPU us, self CPU bytes]
+        self.ops: Dict[Tuple[str, str], List[float]] = {}
+        self.future: "Future[Dict[str, Any]]" = Future()
+
+    @property
+    def done(self) -> bool:
+        """Check if the capture has reached its call count or duration."""
+        if self.max_calls is not None and self.calls >= self.max_calls:
+            return True
+        return time.perf_counter() >= self.deadline
+
+    def add(self, prof: profile) -> None:
+        """Write the trace of one model call and merge its op statistics."""
+        self.calls += 1
+        path = self.directory / (
+            f"{socket.gethostname()}_{os.getpid()}.{self.calls:04d}.pt.trace.json"
+        )
+        prof.export_chrome_trace(str(path))
+        self.traces.append(path.name)
+        for event in prof.key_averages(group_by_input_shape=True):
+            totals = self.ops.setdefault((event.key, str(event.input_shapes)), [0] * 4)
+            totals[0] += event.count
+            totals[1] += event.self_cpu_time_total
+            totals[2] += event.cpu_time_total
+            totals[3] += event.self_cpu_memory_usage
+
+    def summary(self, top: int) -> Dict[str, Any]:
+        """
+        Summarize the capture.
+
+        Args:
+            top: Number of ops (and op/shape pairs) to list
+
+        Returns:
+            Capture details with the ops taking the most self CPU time
+        """
+        by_op: Dict[str, List[float]] = {}
+        for (name, _), totals in self.ops.items():
+            merged = by_op.setdefault(name, [0] * 4)
+            for i, value in enumerate(totals):
+                merged[i] += value
+        self_total = sum(totals[1] for totals in by_op.values())
+
+        def row(totals: List[float]) -> Dict[str, Any]:
+            return {
+                "calls": int(totals[0]),
+                "self_cpu_ms": round(totals[1] / 1000, 3),
+                "cpu_total_ms": round(totals[2] / 1000, 3),
+                "self_cpu_share": (
+                    round(totals[1] / self_total, 4) if self_total else 0.0
+                ),
+                "self_cpu_memory_mb": round(totals[3] / 1024**2, 3),
+            }
+
+        ops = sorted(by_op.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        shapes = sorted(self.ops.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "id": self.id,
+            "calls": self.calls,
+            "seconds": round(time.perf_counter() - self.started, 3),
+            "trace_dir": str(self.directory),
+            "traces": list(self.traces),
+            "self_cpu_ms": round(self_total / 1000, 3),
+            "top_ops": [{"name": name, **row(totals)} for name, totals in ops],
+            "top_shapes": [
+                {"name": name, "input_shapes": shape, **row(totals)}
+                for (name, shape), totals in shapes[:top]
+            ],
+        }
+
+
+class InferenceProfiler:
+    """
+    Runs torch.profiler over the next model calls, while serving.
+
+    A capture covers the next ``calls`` model calls (one ``generate`` per
+    text, or per batch when requests are batched) or ``seconds``, whichever
+    ends first. Each call is profiled on its own (CPU activities, input
+    shapes and memory), and its Chrome trace is written to the capture
+    directory under a name TensorBoard's profiler plugin also reads. Op
+    statistics are merged across the calls.
+
+    Profiled calls run one at a time, so a capture slows serving down;
+    outside a capture the cost is one attribute check per call.
+    """
+
+    def __init__(self):
+        """Initialize the profiler."""
+        self._lock = threading.Lock()
+        # Held for a whole profiled call: torch runs one profiler at a time.
+        self._run_lock = threading.Lock()
+        self._capture: Optional[_Capture] = None
+
+    @property
+    def is_active(self) -> bool:
+        """Check if a capture is running."""
+        return self._capture is not None
+
+    def start(
+        self, directory: Path, calls: Optional[int], seconds: float
+    ) -> "Future[Dict[str, Any]]":
+        """
+        Start a capture.
+
+        Args:
+            directory: Directory under which the capture directory is created
+            calls: Number of model calls to profile (None: until ``seconds``)
+            seconds: Longest duration of the capture
+
+        Returns:
+            Future resolving to the summary once the capture ends
+
+        Raises:
+            ProfilerBusy: If a capture is already running
+        """
+        with self._lock:
+            if self._capture is not None:
+                raise ProfilerBusy(f"Capture {self._capture.id} is still running")
+            capture_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+            path = directory / "profiles" / capture_id
+            path.mkdir(parents=True, exist_ok=True)
+            self._capture = _Capture(capture_id, path, calls, seconds)
+        logger.info(
+            f"Profiling capture {capture_id} started "
+            f"({calls or 'all'} calls, at most {seconds:g}s) into {path}"
+        )
+        return self._capture.future
+
+    @contextmanager
+    def profiled(self) -> Iterator[None]:
+        """Profile the model call run in the block, if a capture is running."""
+        if self._capture is None:
+            yield
+            return
+
+        self._run_lock.acquire()
+        capture = self._capture
+        if capture is None or capture.done:
+            try:
+                if capture is not None:
+                    self._finish(capture)
+            finally:
+                self._run_lock.release()
+            yield
+            return
+
+        try:
+            with profile(
+                activities=[ProfilerActivity.CPU],
+                record_shapes=True,
+                profile_memory=True,
+            ) as prof:
+                yield
+            try:
+                capture.add(prof)
+            except Exception as e:
+                logger.error(f"Failed to record a profiled call: {e}")
+            if capture.done:
+                self._finish(capture)
+        finally:
+            self._run_lock.release()
+
+    def stop(self) -> Optional[Dict[str, Any]]:
+        """
+        End the running capture early (waits for a profiled call to finish).
+
+        Returns:
+            Summary of the capture, or None if none was running
+        """
+        with self._run_lock:
+            capture = self._capture
+            if capture is None:
+                return None
+            return self._finish(capture)
+
+    def _finish(self, capture: _Capture) -> Dict[str, Any]:
+        """End a capture and hand its summary to the waiting caller."""
+        summary = capture.summary(settings.PROFILE_TOP_OPS)
+        with self._lock:
+            if self._capture is capture:
+                self._capture = None
+        try:
+            with open(capture.directory / "summary.json", "w") as f:
+                json.dump(summary, f, indent=2)
+        except OSError as e:
+            logger.error(f"Failed to write the profiling summary: {e}")
+        logger.info(
+            f"Profiling capture {capture.id} ended after {summary['calls']} calls"
+        )
+        if not capture.future.done():
+            capture.future.set_result(summary)
+        return summary
+
+
+# Global inference profiler instance
+inference_profiler = InferenceProfiler()
@@ -0,0 +1,203 @@
+"""
+Dynamic int8 Quantization with an Accuracy Gate
+"""
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import torch
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger("quantization")
+
+# Sentences translated per generate() call while scoring a model.
+_EVAL_BATCH_SIZE = 16
+
+
+@dataclass
+class QuantizationReport:
+    """Quality of the int8 model compared with the fp32 model."""
+
+    samples: int
+    fp32: Dict[str, float]
+    int8: Dict[str, float]
+    bleu_drop: float
+    chrf_drop: float
+    passed: bool
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the report as a JSON-serializable dict."""
+        return asdict(self)
+
+
+def quantize_dynamic_int8(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Quantize the Linear layers of a CPU model to int8 weights.
+
+    Activations are quantized on the fly, so no calibration data is needed.
+
+    Args:
+        model: Merged fp32 model (left untouched)
+
+    Returns:
+        Quantized copy of the model
+    """
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def load_eval_sample(path: Path, limit: int) -> Tuple[List[str], List[str]]:
+    """
+    Read held-out sentence pairs for the accuracy check.
+
+    Args:
+        path: JSONL file with one ``{"en": ..., "es": ...}`` object per line
+        limit: Maximum number of pairs to read
+
+    Returns:
+        Tuple of (English sources, Spanish references)
+
+    Raises:
+        FileNotFoundError: If the sample file does not exist
+        ValueError: If the file holds no usable pairs
+    """
+    sources: List[str] = []
+    references: List[str] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if len(sources) >= limit:
+                break
+            if not line.strip():
+                continue
+            pair = json.loads(line)
+            sources.append(pair["en"])
+            references.append(pair["es"])
+
+    if not sources:
+        raise ValueError(f"No sentence pairs in {path}")
+    return sources, references
+
+
+def _pad(sequences: List[List[int]], pad_token_id: int) -> np.ndarray:
+    """Right-pad token id sequences into a 2-D array."""
+    width = max(len(sequence) for sequence in sequences)
+    padded = np.full((len(sequences), width), pad_token_id, dtype=np.int64)
+    for row, sequence in enumerate(sequences):
+        length = len(sequence)
+        padded[row, :length] = sequence
+    return padded
+
+
+def evaluate_model(
+    model: torch.nn.Module,
+    tokenizer,
+    sources: List[str],
+    references: List[str],
+    compute_metrics: Callable,
+    device: torch.device,
+) -> Dict[str, float]:
+    """
+    Translate a sample with the serving settings and score it.
+
+    Args:
+        model: Model to evaluate
+        tokenizer: Tokenizer matching the model
+        sources: English sentences
+        references: Spanish reference translations
+        compute_metrics: Metric function from ``training.trainer``
+        device: Device holding the model
+
+    Returns:
+        Metrics returned by ``compute_metrics`` (bleu, chrf, ...)
+    """
+    predictions: List[List[int]] = []
+    for start in range(0, len(sources), _EVAL_BATCH_SIZE):
+        stop = start + _EVAL_BATCH_SIZE
+        batch = [settings.TRANSLATION_PREFIX + text for text in sources[start:stop]]
+        inputs = tokenizer(
+            batch,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=settings.MAX_INPUT_LENGTH,
+        )
+        with torch.no_grad():
+            generated = model.generate(
+                inputs["input_ids"].to(device),
+                attention_mask=inputs["attention_mask"].to(device),
+                max_length=settings.MAX_OUTPUT_LENGTH,
+                num_beams=settings.NUM_BEAMS,
+                early_stopping=True,
+            )
+        predictions.extend(generated.tolist())
+
+    labels = tokenizer(
+        text_target=references,
+        truncation=True,
+        max_length=settings.MAX_OUTPUT_LENGTH,
+    )["input_ids"]
+
+    return compute_metrics(
+        (
+            _pad(predictions, tokenizer.pad_token_id),
+            _pad(labels, tokenizer.pad_token_id),
+        )
+    )
+
+
+def check_quantization(
+    fp32_model: torch.nn.Module,
+    int8_model: torch.nn.Module,
+    tokenizer,
+    device: torch.device,
+) -> QuantizationReport:
+    """
+    Compare BLEU and chrF of the int8 model against the fp32 model.
+
+    Uses the held-out sample at QUANTIZATION_EVAL_PATH and the same metrics
+    as training evaluation.
+
+    Args:
+        fp32_model: Merged fp32 model
+        int8_model: Its quantized copy
+        tokenizer: Tokenizer matching both models
+        device: Device holding the models
+
+    Returns:
+        Report with both scores and whether the drop is within the limits
+    """
+    # Training dependencies are only needed when the check runs.
+    from training.trainer import get_compute_metrics
+
+    sources, references = load_eval_sample(
+        settings.QUANTIZATION_EVAL_PATH, settings.QUANTIZATION_EVAL_SAMPLES
+    )
+    compute_metrics = get_compute_metrics(tokenizer)
+
+    logger.info(f"Scoring fp32 and int8 models on {len(sources)} held-out pairs")
+    fp32 = evaluate_model(
+        fp32_model, tokenizer, sources, references, compute_metrics, device
+    )
+    int8 = evaluate_model(
+        int8_model, tokenizer, sources, references, compute_metrics, device
+    )
+
+    bleu_drop = round(fp32["bleu"] - int8["bleu"], 4)
+    chrf_drop = round(fp32["chrf"] - int8["chrf"], 4)
+    return QuantizationReport(
+        samples=len(sources),
+        fp32=fp32,
+        int8=int8,
+        bleu_drop=bleu_drop,
+        chrf_drop=chrf_drop,
+        passed=(
+            bleu_drop <= settings.QUANTIZATION_MAX_BLEU_DROP
+            and chrf_drop <= settings.QUANTIZATION_MAX_CHRF_DROP
+        ),
+    )
@@ -0,0 +1,249 @@
+"""
+Input Tokenization with a Cached Task Prefix
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import torch
+
+from app.core.metrics import observe_phase
+from app.utils.logger import get_logger
+
+logger = get_logger("tokenization")
+
+# Texts checked at load time: joining the ids must match tokenizing the
+# prefixed string, or the prefix is re-tokenized with every text instead.
+PROBE_TEXTS = ("Hello world.", " Leading space", "don't stop", "", "3.5 km")
+
+PHASES = ("tokenize", "generate", "decode")
+
+
+class InputEncoder:
+    """
+    Turns texts into model input ids with the task prefix prepended.
+
+    The prefix is encoded once. Texts are tokenized without special tokens in
+    one call to the (fast) tokenizer's batch API, and their ids are joined to
+    the prefix ids and the end-of-sequence token, truncated like the
+    tokenizer would truncate the prefixed string. Ids of short texts are kept
+    in an LRU cache, since short inputs repeat often.
+
+    Not thread-safe: callers hold the tokenizer lock.
+    """
+
+    def __init__(
+        self,
+        tokenizer,
+        prefix: str,
+        max_length: int,
+        cache_size: int = 0,
+        cache_max_chars: int = 0,
+    ):
+        """
+        Initialize the encoder.
+
+        Args:
+            tokenizer: Hugging Face tokenizer
+            prefix: Task prefix prepended to every text
+            max_length: Maximum number of input ids, special tokens included
+            cache_size: Number of texts whose ids are cached (0 disables it)
+            cache_max_chars: Longest text (in characters) that is cached
+        """
+        self.tokenizer = tokenizer
+        self.prefix = prefix
+        self.max_length = max_length
+        self.cache_size = cache_size
+        self.cache_max_chars = cache_max_chars
+        self._cache: "OrderedDict[str, Tuple[int, ...]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self.prefix_ids: List[int] = tokenizer(prefix, add_special_tokens=False)[
+            "input_ids"
+        ]
+        eos = tokenizer.eos_token_id
+        self.suffix_ids: List[int] = [eos] if eos is not None else []
+        self.joins_prefix = self._check_join()
+        if not self.joins_prefix:
+            logger.warning(
+                "Tokenizer does not split the task prefix from the text; "
+                "tokenizing prefixed strings instead"
+            )
+
+    def _check_join(self) -> bool:
+        """Check that joined ids match tokenizing the prefixed strings."""
+        expected = self._tokenize_prefixed(list(PROBE_TEXTS))
+        return self._tokenize_joined(list(PROBE_TEXTS)) == expected
+
+    def _tokenize_prefixed(self, texts: List[str]) -> List[List[int]]:
+        """Tokenize the prefixed strings (the slow path)."""
+        return self.tokenizer(
+            [self.prefix + text for text in texts],
+            truncation=True,
+            max_length=self.max_length,
+        )["input_ids"]
+
+    def _tokenize_joined(self, texts: List[str]) -> List[List[int]]:
+        """Tokenize the texts alone and join their ids to the prefix ids."""
+        text_ids = self.tokenizer(texts, add_special_tokens=False)["input_ids"]
+        room = self.max_length - len(self.prefix_ids) - len(self.suffix_ids)
+        return [self.prefix_ids + ids[:room] + self.suffix_ids for ids in text_ids]
+
+    def encode(self, texts: Sequence[str]) -> List[List[int]]:
+        """
+        Get the input ids of several texts.
+
+        Args:
+            texts: Texts without the task prefix
+
+        Returns:
+            Input ids of each text, prefix and end-of-sequence token included
+        """
+        encoded: List[Optional[List[int]]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            cached = self._cache.get(text) if self.cache_size else None
+            if cached is not None:
+                self._cache.move_to_end(text)
+                self.hits += 1
+                encoded[i] = list(cached)
+            else:
+                missing.setdefault(text, []).append(i)
+
+        if missing:
+            self.misses += len(missing)
+            unique = list(missing)
+            tokenize = (
+                self._tokenize_joined if self.joins_prefix else self._tokenize_prefixed
+            )
+            for text, ids in zip(unique, tokenize(unique)):
+                for i in missing[text]:
+                    encoded[i] = ids
+                if self.cache_size and len(text) <= self.cache_max_chars:
+                    self._cache[text] = tuple(ids)
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        return encoded
+
+    def count(self, text: str) -> int:
+        """
+        Count the input ids of a text.
+
+        Args:
+            text: Text without the task prefix
+
+        Returns:
+            Number of input ids, prefix and end-of-sequence token included
+        """
+        return len(self.encode([text])[0])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the cache statistics as a JSON-serializable dict."""
+        lookups = self.hits + self.misses
+        return {
+            "prefix_tokens": len(self.prefix_ids),
+            "joins_prefix": self.joins_prefix,
+            "cache_entries": len(self._cache),
+            "cache_size": self.cache_size,
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def pad_batch(
+    encoded: Sequence[Sequence[int]], pad_token_id: int, device: torch.device
+) -> Dict[str, torch.Tensor]:
+    """
+    Right-pad input ids into model inputs on a device.
+
+    Args:
+        encoded: Input ids of each row
+        pad_token_id: Id used for padding
+        device: Device of the model
+
+    Returns:
+        ``input_ids`` and ``attention_mask`` tensors, shape (rows, longest)
+    """
+    width = max(len(ids) for ids in encoded)
+    input_ids = torch.full((len(encoded), width), pad_token_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(encoded), width), dtype=torch.long)
+    for row, ids in enumerate(encoded):
+        length = len(ids)
+        input_ids[row, :length] = torch.tensor(ids, dtype=torch.long)
+        attention_mask[row, :length] = 1
+    return {
+        "input_ids": input_ids.to(device),
+        "attention_mask": attention_mask.to(device),
+    }
+
+
+class PhaseStats:
+    """
+    Time spent tokenizing, generating and decoding, kept apart.
+
+    Durations are also observed in the ``translatica_phase_seconds``
+    histogram.
+    """
+
+    def __init__(self):
+        """Initialize the statistics."""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded statistics."""
+        with self._lock:
+            self._calls = {phase: 0 for phase in PHASES}
+            self._seconds = {phase: 0.0 for phase in PHASES}
+
+    def record(self, phase: str, seconds: float) -> None:
+        """
+        Record the duration of one phase of a model call.
+
+        Args:
+            phase: One of PHASES
+            seconds: Duration
+        """
+        observe_phase(phase, seconds)
+        with self._lock:
+            self._calls[phase] += 1
+            self._seconds[phase] += seconds
+
+    @contextmanager
+    def timed(self, phase: str) -> Iterator[None]:
+        """
+        Time a block as one phase.
+
+        Args:
+            phase: One of PHASES
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the statistics as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                phase: {
+                    "calls": self._calls[phase],
+                    "total_ms": round(self._seconds[phase] * 1000, 2),
+                    "mean_ms": (
+                        round(self._seconds[phase] * 1000 / self._calls[phase], 3)
+                        if self._calls[phase]
+                        else 0.0
+                    ),
+                }
+                for phase in PHASES
+            }
+
+
+# Global phase timing instance
+phase_stats = PhaseStats()
@@ -0,0 +1,73 @@
+"""
+Pre-merged Model Bundle Export
+
+Usage:
+    python -m app.export_bundle --output fine-tuned-model/bundle
+
+Loads the base checkpoint, merges the LoRA adapter into it and writes the
+merged weights (one safetensors file), config, generation config and
+tokenizer to a single directory, together with the version of the model
+they came from. At startup ModelManager memory-maps the bundle instead of
+downloading the base checkpoint and merging the adapter. The server also
+writes the bundle itself on the first start without one
+(MODEL_BUNDLE_BUILD_ON_START); this command builds it ahead of time.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Optional, Sequence
+
+from transformers import AutoTokenizer
+
+from app.core.config import settings
+from app.core.model import compute_model_version, load_merged_model, save_bundle
+
+
+def export_bundle(output_dir: Path) -> Path:
+    """
+    Merge the adapter and write the merged model as a bundle.
+
+    Args:
+        output_dir: Bundle directory (replaced if it exists)
+
+    Returns:
+        The bundle directory
+    """
+    model = load_merged_model(settings.BASE_MODEL_CHECKPOINT, settings.MODEL_PATH)
+    return save_bundle(
+        model,
+        AutoTokenizer.from_pretrained(settings.TOKENIZER_PATH),
+        output_dir,
+        compute_model_version(settings.BASE_MODEL_CHECKPOINT, settings.MODEL_PATH),
+    )
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Export the merged translation model as a safetensors bundle"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=settings.MODEL_BUNDLE_PATH,
+        help="Directory for the bundle",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Export the bundle.
+
+    Returns:
+        Exit code
+    """
+    args = parse_args(argv)
+    export_bundle(args.output)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+ONNX Export of the Merged Translation Model
+
+Usage:
+    python -m app.export_onnx --output fine-tuned-model/onnx
+
+Merges the LoRA adapter into the base checkpoint, exports an encoder graph,
+a first-step decoder graph and a decoder-with-past graph (which reuses the
+KV cache on every later step), then checks that ONNX Runtime produces the
+same translations as PyTorch on a parity set. Serve the result with
+INFERENCE_BACKEND=onnxruntime.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import torch
+from transformers import AutoTokenizer
+
+from app.core.config import settings
+from app.core.model import (
+    EXPORT_INFO_FILE,
+    compute_model_version,
+    load_merged_model,
+    load_onnx_model,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger("export_onnx")
+
+# Used when no parity file is given: headings, dialogue and long sentences.
+PARITY_SENTENCES = [
+    "Chapter One",
+    "Hello, how are you?",
+    '"I will be back before dark," she said.',
+    "The house stood at the end of the road, surrounded by old trees.",
+    "He had never seen the sea, and the thought of it frightened him.",
+    "All rights reserved.",
+    "Where is the nearest train station?",
+    "It was the best of times, it was the worst of times.",
+]
+
+# Sentences translated per generate() call during the parity check.
+_PARITY_BATCH_SIZE = 8
+
+
+def load_parity_sentences(path: Path, limit: int) -> List[str]:
+    """
+    Read English sentences for the parity check.
+
+    Parity compares the two backends with each other, so only the ``en`` key
+    is read; reference translations, if present, are ignored.
+
+    Args:
+        path: JSONL file with one ``{"en": ...}`` object per line
+        limit: Maximum number of sentences to read
+
+    Returns:
+        English sentences
+
+    Raises:
+        ValueError: If a line has no ``en`` text, or the file holds none
+    """
+    sentences: List[str] = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if len(sentences) >= limit:
+                break
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict) or not isinstance(record.get("en"), str):
+                raise ValueError(
+                    f'{path}:{number}: expected an object with an "en" key'
+                )
+            sentences.append(record["en"])
+
+    if not sentences:
+        raise ValueError(f"No parity sentences in {path}")
+    return sentences
+
+
+@dataclass
+class ParityReport:
+    """Outputs of both backends on the parity set."""
+
+    sentences: int
+    # (source, pytorch output, onnxruntime output) for every difference.
+    mismatches: List[Tuple[str, str, str]] = field(default_factory=list)
+    pytorch_ms_per_token: float = 0.0
+    onnx_ms_per_token: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        """Whether both backends produced identical translations."""
+        return not self.mismatches
+
+
+def export_onnx(output_dir: Path) -> None:
+    """
+    Export the merged model to ONNX.
+
+    Args:
+        output_dir: Directory for the ONNX graphs and config
+    """
+    # Optional dependency: only needed to export.
+    from optimum.exporters.onnx import main_export
+
+    model = load_merged_model(settings.BASE_MODEL_CHECKPOINT, settings.MODEL_PATH)
+    with tempfile.TemporaryDirectory() as merged_dir:
+        model.save_pretrained(merged_dir)
+        logger.info(f"Exporting ONNX graphs to {output_dir}")
+        main_export(
+            merged_dir,
+            output_dir,
+            task="text2text-generation-with-past",
+            # Keep decoder and decoder-with-past as separate graphs.
+            no_post_process=True,
+        )
+
+    info = {
+        "base_checkpoint": settings.BASE_MODEL_CHECKPOINT,
+        "model_version": compute_model_version(
+            settings.BASE_MODEL_CHECKPOINT, settings.MODEL_PATH
+        ),
+    }
+    (Path(output_dir) / EXPORT_INFO_FILE).write_text(
+        json.dumps(info, indent=2), encoding="utf-8"
+    )
+
+
+def _translate(model, tokenizer, sentences: Sequence[str]) -> Tuple[List[str], float]:
+    """Translate with the serving settings; returns outputs and ms per token."""
+    outputs: List[str] = []
+    tokens = 0
+    elapsed = 0.0
+    for start in range(0, len(sentences), _PARITY_BATCH_SIZE):
+        stop = start + _PARITY_BATCH_SIZE
+        batch = [settings.TRANSLATION_PREFIX + text for text in sentences[start:stop]]
+        inputs = tokenizer(
+            batch,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=settings.MAX_INPUT_LENGTH,
+        )
+        began = time.perf_counter()
+        with torch.no_grad():
+            generated = model.generate(
+                inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+                max_length=settings.MAX_OUTPUT_LENGTH,
+                num_beams=settings.NUM_BEAMS,
+                early_stopping=True,
+            )
+        elapsed += time.perf_counter() - began
+        tokens += int((generated != tokenizer.pad_token_id).sum())
+        outputs.extend(tokenizer.batch_decode(generated, skip_special_tokens=True))
+
+    return outputs, 1000 * elapsed / max(1, tokens)
+
+
+def check_parity(
+    pytorch_model, onnx_model, tokenizer, sentences: Sequence[str]
+) -> ParityReport:
+    """
+    Translate the parity set with both backends and compare the outputs.
+
+    Args:
+        pytorch_model: Merged PyTorch model
+        onnx_model: Exported model loaded on ONNX Runtime
+        tokenizer: Tokenizer matching both models
+        sentences: English sentences
+
+    Returns:
+        Differences and per-token latency of each backend
+    """
+    pytorch_out, pytorch_ms = _translate(pytorch_model, tokenizer, sentences)
+    onnx_out, onnx_ms = _translate(onnx_model, tokenizer, sentences)
+
+    return ParityReport(
+        sentences=len(sentences),
+        mismatches=[
+            (source, expected, actual)
+            for source, expected, actual in zip(sentences, pytorch_out, onnx_out)
+            if expected != actual
+        ],
+        pytorch_ms_per_token=round(pytorch_ms, 3),
+        onnx_ms_per_token=round(onnx_ms, 3),
+    )
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Export the merged translation model to ONNX"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=settings.ONNX_MODEL_PATH,
+        help="Directory for the exported model",
+    )
+    parser.add_argument(
+        "--parity-file",
+        type=Path,
+        default=None,
+        help='JSONL parity set ({"en": ...} per line); built-in sentences if omitted',
+    )
+    parser.add_argument(
+        "--parity-samples",
+        type=int,
+        default=64,
+        help="Maximum number of parity sentences",
+    )
+    parser.add_argument(
+        "--skip-parity",
+        action="store_true",
+        help="Export without comparing the backends",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Export the model and check parity.
+
+    Returns:
+        Exit code: 0 on success, 1 if the parity file is invalid or the
+        backends disagree
+    """
+    args = parse_args(argv)
+    export_onnx(args.output)
+    logger.info(f"ONNX model written to {args.output}")
+
+    if args.skip_parity:
+        return 0
+
+    if args.parity_file is not None:
+        try:
+            sentences = load_parity_sentences(args.parity_file, args.parity_samples)
+        except ValueError as e:
+            logger.error(f"Invalid parity file: {e}")
+            return 1
+    else:
+        sentences = PARITY_SENTENCES
+
+    tokenizer = AutoTokenizer.from_pretrained(settings.TOKENIZER_PATH)
+    pytorch_model = load_merged_model(
+        settings.BASE_MODEL_CHECKPOINT, settings.MODEL_PATH
+    ).eval()
+    report = check_parity(
+        pytorch_model, load_onnx_model(args.output), tokenizer, sentences
+    )
+
+    logger.info(
+        f"Latency per generated token: pytorch {report.pytorch_ms_per_token} ms, "
+        f"onnxruntime {report.onnx_ms_per_token} ms"
+    )
+    for source, expected, actual in report.mismatches:
+        logger.error(f"Parity mismatch for {source!r}: {expected!r} != {actual!r}")
+    if not report.passed:
+        logger.error(
+            f"{len(report.mismatches)} of {report.sentences} parity sentences differ"
+        )
+        return 1
+
+    logger.info(f"Both backends agree on {report.sentences} parity sentences")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
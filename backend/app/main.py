@@ -7,10 +7,15 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.admin import router as admin_router
+from app.api.jobs import router as jobs_router
 from app.api.routes import router
+from app.core.batching import batch_scheduler
 from app.core.config import settings
 from app.core.database import init_db
+from app.core.executor import inference_executor
 from app.core.model import model_manager
+from app.services.jobs import job_runner
 from app.utils.logger import get_logger
 
 logger = get_logger("main")
@@ -35,11 +40,20 @@ async def lifespan(app: FastAPI):
 
     threading.Thread(target=load_task, daemon=True).start()
 
+    inference_executor.start()
+    if settings.BATCHING_ENABLED:
+        batch_scheduler.start()
+
     logger.info("Initializing database...")
     await init_db()
+    if settings.JOBS_ENABLED:
+        job_runner.start()
 
     yield
     logger.info("Shutting down application...")
+    await job_runner.stop()
+    batch_scheduler.stop()
+    inference_executor.shutdown()
     model_manager.cleanup()
     logger.info("Cleanup complete.")
 
@@ -65,6 +79,8 @@ app.add_middleware(
 
 # Include API router
 app.include_router(router)
+app.include_router(jobs_router)
+app.include_router(admin_router)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+"""
+Translation Job Database Models
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class Job(Base):
+    """An asynchronous translation of a long document."""
+
+    __tablename__ = "jobs"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    # queued -> running -> completed | failed
+    status: Mapped[str] = mapped_column(String(16), nullable=False, index=True)
+    num_beams: Mapped[int] = mapped_column(Integer, nullable=False)
+    max_new_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    segments_total: Mapped[int] = mapped_column(Integer, nullable=False)
+    segments_done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    translation: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    callback_url: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # NULL until the callback is attempted: delivered | failed
+    callback_status: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+
+class JobSegment(Base):
+    """One segment of a job's document, translated by the job workers."""
+
+    __tablename__ = "job_segments"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    job_id: Mapped[str] = mapped_column(
+        String(32), ForeignKey("jobs.id", ondelete="CASCADE"), index=True
+    )
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    source_text: Mapped[str] = mapped_column(Text, nullable=False)
+    # Whitespace that followed the segment in the document.
+    trailing: Mapped[str] = mapped_column(Text, default="", nullable=False)
+    translated_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # A worker holds the segment until the lease expires, so segments claimed
+    # by a worker that died (or a server that restarted) are picked up again.
+    claimed_by: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    lease_until: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True, index=True
+    )
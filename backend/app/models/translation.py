@@ -3,8 +3,9 @@ Translation Database Model
 """
 
 from datetime import datetime
+from typing import Optional
 
-from sqlalchemy import DateTime, Integer, Text
+from sqlalchemy import DateTime, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
@@ -21,3 +22,30 @@ class Translation(Base):
     timestamp: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, nullable=False
     )
+    # Translation memory: hash of the normalized source text and generation
+    # settings (see app.services.cache.make_cache_key), and the fingerprint of
+    # the model that produced the translation. Rows saved before these
+    # columns existed have NULLs and are never served from memory. The table
+    # stays an append-only log, so repeated requests share a hash.
+    content_hash: Mapped[Optional[str]] = mapped_column(
+        String(64), index=True, nullable=True
+    )
+    model_version: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+
+
+class SentenceTranslation(Base):
+    """Sentence-level translation memory entry, shared across documents."""
+
+    __tablename__ = "sentence_translations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    # Same key as the in-process cache, computed on the segment text.
+    content_hash: Mapped[str] = mapped_column(
+        String(64), unique=True, index=True, nullable=False
+    )
+    source_text: Mapped[str] = mapped_column(Text, nullable=False)
+    translated_text: Mapped[str] = mapped_column(Text, nullable=False)
+    model_version: Mapped[str] = mapped_column(String(32), nullable=False)
+    timestamp: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
@@ -0,0 +1,304 @@
+"""
+Pre-fork Multi-worker Server
+
+Usage:
+    python -m app.prefork --workers 4
+
+The master process loads the tokenizer, base model and LoRA adapter and
+merges them once, then forks the workers. The merged weights are never
+written after loading, so every worker reads the same physical pages instead
+of holding its own copy. Each worker gets an equal share of the CPU cores for
+torch, and the master periodically logs the RSS/PSS of every worker.
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import signal
+import socket
+import time
+from typing import Any, Dict, Optional
+
+import torch
+import uvicorn
+
+from app.core.config import settings
+from app.core.database import engine, init_db
+from app.core.metrics import mark_worker_dead
+from app.core.model import model_manager
+from app.utils.logger import get_logger
+from app.utils.memory import get_memory_usage
+
+logger = get_logger("prefork")
+
+
+def worker_torch_threads(workers: int, cpu_count: Optional[int] = None) -> int:
+    """
+    Get the torch intra-op thread count for each worker.
+
+    Args:
+        workers: Number of worker processes
+        cpu_count: Available cores (default: os.cpu_count())
+
+    Returns:
+        TORCH_INTRA_OP_THREADS if set, otherwise an equal share of the cores
+    """
+    if settings.TORCH_INTRA_OP_THREADS > 0:
+        return settings.TORCH_INTRA_OP_THREADS
+
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, cpu_count // max(1, workers))
+
+
+async def _prepare_database() -> None:
+    """Create the tables once, then drop connections before forking."""
+    await init_db()
+    await engine.dispose()
+
+
+def prepare_master() -> None:
+    """Load and merge the model in the master, ready to be shared on fork."""
+    if settings.INFERENCE_BACKEND != "pytorch":
+        # ONNX Runtime sessions own thread pools that do not survive fork().
+        raise RuntimeError("Pre-fork serving only supports the pytorch backend.")
+
+    # Keep the master single-threaded: an OpenMP pool started before fork()
+    # cannot be used by the children.
+    torch.set_num_threads(1)
+
+    model_manager.load()
+    if model_manager.device.type != "cpu":
+        raise RuntimeError("Pre-fork serving only supports CPU inference.")
+
+    if model_manager.weights_memory_mapped:
+        # Bundle weights live in the page cache and are already shared.
+        logger.info("Model weights are memory-mapped from the bundle")
+    elif settings.SHARE_MODEL_MEMORY:
+        # Move the weights into shared memory so they stay shared even if a
+        # page is touched after the fork.
+        logger.info("Moving model weights to shared memory")
+        model_manager.model.share_memory()
+
+    asyncio.run(_prepare_database())
+
+    # Objects created so far are never freed; keep the GC from writing to
+    # their pages in the workers (which would un-share them).
+    gc.collect()
+    gc.freeze()
+
+    logger.info(f"Master memory after load: {get_memory_usage()}")
+
+
+def create_socket(host: str, port: int) -> socket.socket:
+    """
+    Bind the listening socket shared by all workers.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind
+
+    Returns:
+        Bound, inheritable socket
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket, threads: int) -> None:  # pragma: no cover
+    """
+    Serve the app on the shared socket (runs in a forked child).
+
+    Args:
+        sock: Listening socket bound by the master
+        threads: Torch intra-op threads for this worker
+    """
+    from app.main import app
+
+    settings.TORCH_INTRA_OP_THREADS = threads
+    config = uvicorn.Config(app, log_level="info")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class PreforkServer:
+    """Forks and supervises the worker processes."""
+
+    def __init__(self, workers: int, host: str, port: int):
+        """
+        Initialize the server.
+
+        Args:
+            workers: Number of worker processes
+            host: Interface to bind
+            port: Port to bind
+        """
+        self.workers = max(1, workers)
+        self.host = host
+        self.port = port
+        self.threads = worker_torch_threads(self.workers)
+        self._pids: Dict[int, int] = {}
+        self._socket: Optional[socket.socket] = None
+        self._stopping = False
+
+    def spawn(self, worker_id: int) -> int:
+        """
+        Fork one worker.
+
+        Args:
+            worker_id: Index of the worker
+
+        Returns:
+            Process id of the worker
+        """
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - child process
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                run_worker(self._socket, self.threads)
+            finally:
+                os._exit(0)
+
+        self._pids[pid] = worker_id
+        logger.info(
+            f"Started worker {worker_id} (pid {pid}, {self.threads} torch threads)"
+        )
+        return pid
+
+    def report_memory(self) -> Dict[str, Any]:
+        """
+        Log and return the memory usage of the master and every worker.
+
+        Returns:
+            Dict with per-process usage and the total PSS in MB
+        """
+        report: Dict[str, Any] = {"master": get_memory_usage()}
+        for pid, worker_id in sorted(self._pids.items(), key=lambda item: item[1]):
+            report[f"worker-{worker_id}"] = {"pid": pid, **get_memory_usage(pid)}
+
+        total_pss = sum(
+            usage["pss_mb"] for usage in report.values() if isinstance(usage, dict)
+        )
+        report["total_pss_mb"] = round(total_pss, 1)
+
+        for name, usage in report.items():
+            if isinstance(usage, dict):
+                logger.info(
+                    f"{name}: rss={usage['rss_mb']}MB pss={usage['pss_mb']}MB "
+                    f"shared={usage['shared_mb']}MB private={usage['private_mb']}MB"
+                )
+        logger.info(f"Total PSS: {report['total_pss_mb']}MB")
+        return report
+
+    def _handle_signal(self, signum, frame) -> None:
+        """Stop supervising and shut the workers down."""
+        self._stopping = True
+
+    def reap(self) -> None:
+        """Collect exited workers and replace them unless stopping."""
+        while self._pids:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            worker_id = self._pids.pop(pid, None)
+            if worker_id is None:
+                continue
+            mark_worker_dead(pid)
+            logger.warning(
+                f"Worker {worker_id} (pid {pid}) exited with status {status}"
+            )
+            if not self._stopping:
+                self.spawn(worker_id)
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """
+        Terminate the workers, killing any that outlive the timeout.
+
+        Args:
+            timeout: Seconds to wait for a graceful exit
+        """
+        self._stopping = True
+        for pid in list(self._pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self._pids.pop(pid, None)
+
+        deadline = time.monotonic() + timeout
+        while self._pids and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+
+        for pid in list(self._pids):
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self._pids.pop(pid, None)
+
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        logger.info("All workers stopped.")
+
+    def serve(self) -> None:  # pragma: no cover - forks real processes
+        """Load the model, fork the workers and supervise them until stopped."""
+        prepare_master()
+
+        # Import the app before forking so workers inherit the loaded modules.
+        import app.main  # noqa: F401
+
+        self._socket = create_socket(self.host, self.port)
+        logger.info(f"Listening on {self.host}:{self.port} with {self.workers} workers")
+
+        signal.signal(signal.SIGINT, self._handle_signal)
+        signal.signal(signal.SIGTERM, self._handle_signal)
+
+        for worker_id in range(self.workers):
+            self.spawn(worker_id)
+
+        next_report = time.monotonic() + settings.RSS_REPORT_INTERVAL
+        try:
+            while not self._stopping:
+                self.reap()
+                if time.monotonic() >= next_report:
+                    self.report_memory()
+                    next_report += settings.RSS_REPORT_INTERVAL
+                time.sleep(0.5)
+        finally:
+            self.shutdown()
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Serve Translatica with pre-forked workers sharing one model"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.WORKERS,
+        help="Number of worker processes",
+    )
+    parser.add_argument("--host", type=str, default=settings.HOST, help="Bind host")
+    parser.add_argument("--port", type=int, default=settings.PORT, help="Bind port")
+    return parser.parse_args()
+
+
+def main():  # pragma: no cover - CLI entry point
+    """Run the pre-fork server."""
+    args = parse_args()
+    PreforkServer(args.workers, args.host, args.port).serve()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
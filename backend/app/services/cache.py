@@ -0,0 +1,215 @@
+"""
+In-process LRU Translation Cache
+"""
+
+import hashlib
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.generation import GenerationParams
+from app.core.metrics import record_cache_lookup
+from app.core.model import model_manager
+from app.utils.logger import get_logger
+
+logger = get_logger("cache")
+
+# Runs of spaces/tabs (not line breaks, which carry paragraph structure).
+_HORIZONTAL_WHITESPACE_RE = re.compile(r"[^\S\n]+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize source text so trivially different inputs share a cache entry.
+
+    Args:
+        text: Source text
+
+    Returns:
+        NFC-normalized text with outer whitespace stripped and runs of spaces
+        collapsed (line breaks are kept)
+    """
+    text = unicodedata.normalize("NFC", text)
+    text = _HORIZONTAL_WHITESPACE_RE.sub(" ", text)
+    return "\n".join(line.strip() for line in text.strip().split("\n"))
+
+
+def make_cache_key(
+    text: str, model_version: str, params: Optional[GenerationParams] = None
+) -> str:
+    """
+    Build the cache key for a source text and the generation settings.
+
+    Args:
+        text: Source text
+        model_version: Fingerprint of the loaded model and adapter
+        params: Decoding settings (default: the serving settings)
+
+    Returns:
+        Hex digest identifying the translation
+    """
+    params = params or GenerationParams.default()
+    parts = [
+        normalize_text(text),
+        settings.TRANSLATION_PREFIX,
+        model_version,
+        str(params.num_beams),
+        str(settings.MAX_OUTPUT_LENGTH),
+        str(settings.SEGMENTATION_ENABLED),
+        str(settings.SEGMENT_MAX_TOKENS),
+    ]
+    # Appended only when set, so keys of the serving settings stay unchanged.
+    if params.max_new_tokens is not None:
+        parts.append(f"max_new_tokens={params.max_new_tokens}")
+    if settings.CASCADE_ENABLED:
+        parts.append(f"cascade={settings.CASCADE_CONFIDENCE_THRESHOLD}")
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _CacheEntry:
+    """A cached translation."""
+
+    value: str
+    expires_at: float
+    size: int
+
+
+class TranslationCache:
+    """Thread-safe LRU cache with TTL and entry-count and memory bounds."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached translations
+            max_bytes: Approximate maximum memory held by cached entries
+            ttl_seconds: Lifetime of an entry
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        """Number of cached translations."""
+        return len(self._entries)
+
+    @staticmethod
+    def _entry_size(key: str, value: str) -> int:
+        """Approximate memory held by one entry."""
+        return sys.getsizeof(key) + sys.getsizeof(value) + 64
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry (lock must be held)."""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a translation, refreshing its LRU position.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+
+        Returns:
+            Cached translation, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                record_cache_lookup("cache", False)
+                return None
+
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                record_cache_lookup("cache", False)
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            record_cache_lookup("cache", True)
+            return entry.value
+
+    def put(self, key: str, value: str) -> None:
+        """
+        Store a translation, evicting least recently used entries as needed.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+            value: Translation
+        """
+        size = self._entry_size(key, value)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = _CacheEntry(
+                value=value,
+                expires_at=time.monotonic() + self.ttl_seconds,
+                size=size,
+            )
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry (e.g. after the model is reloaded)."""
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+        logger.info("Translation cache cleared.")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the cache counters as a JSON-serializable dict."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# Global translation cache instance, cleared whenever the model is (re)loaded
+translation_cache = TranslationCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    max_bytes=settings.CACHE_MAX_BYTES,
+    ttl_seconds=settings.CACHE_TTL_SECONDS,
+)
+model_manager.add_load_listener(translation_cache.clear)
@@ -0,0 +1,564 @@
+"""
+Asynchronous Translation Jobs
+"""
+
+import asyncio
+import ipaddress
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.generation import GenerationParams
+from app.core.model import model_manager
+from app.models.job import Job, JobSegment
+from app.services.segmentation import Segment, join_segments
+from app.services.translation import TranslationService
+from app.utils.logger import get_logger
+
+logger = get_logger("jobs")
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+ACTIVE_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+CALLBACK_DELIVERED = "delivered"
+CALLBACK_FAILED = "failed"
+
+
+async def _resolve(host: str, port: int) -> List[str]:
+    """Get the IP addresses a host name resolves to."""
+    infos = await asyncio.get_running_loop().getaddrinfo(
+        host, port, type=socket.SOCK_STREAM
+    )
+    return [info[4][0] for info in infos]
+
+
+def _is_public(address: str) -> bool:
+    """Check that an IP address is publicly routable."""
+    ip = ipaddress.ip_address(address)
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+async def check_callback_url(url: str) -> None:
+    """
+    Check that a callback URL may be called by the server.
+
+    Only http(s) URLs are accepted. Their host must be in
+    JOB_CALLBACK_ALLOWED_HOSTS when that is set, and otherwise must only
+    resolve to public addresses, so job callbacks cannot reach loopback,
+    private or link-local services.
+
+    Args:
+        url: Callback URL
+
+    Raises:
+        ValueError: If the URL is refused
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("Callback URL must be an http or https URL")
+
+    host = parts.hostname.lower()
+    allowed = [name.lower() for name in settings.JOB_CALLBACK_ALLOWED_HOSTS]
+    if allowed:
+        if host not in allowed:
+            raise ValueError(f"Callback host {host} is not allowed")
+        return
+
+    try:
+        addresses = [str(ipaddress.ip_address(host))]
+    except ValueError:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        try:
+            addresses = await _resolve(host, port)
+        except OSError as e:
+            raise ValueError(f"Callback host {host} cannot be resolved") from e
+    if not addresses or not all(_is_public(address) for address in addresses):
+        raise ValueError(f"Callback host {host} is not a public address")
+
+
+def job_params(job: Job) -> GenerationParams:
+    """Get the decoding settings a job was submitted with."""
+    return GenerationParams(num_beams=job.num_beams, max_new_tokens=job.max_new_tokens)
+
+
+class JobService:
+    """Database operations on translation jobs."""
+
+    @staticmethod
+    async def create(
+        db: AsyncSession,
+        text: str,
+        params: GenerationParams,
+        callback_url: Optional[str] = None,
+    ) -> Job:
+        """
+        Split a document into segments and queue it for translation.
+
+        Args:
+            db: Database session
+            text: English document
+            params: Decoding settings for every segment
+            callback_url: URL notified with the result once the job ends
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If the text is empty
+        """
+        cleaned = TranslationService.validate_input(text)
+        # Tokenizing a whole book would stall the event loop.
+        segments = await asyncio.to_thread(TranslationService.segment, cleaned)
+
+        job = Job(
+            id=uuid.uuid4().hex,
+            status=JOB_QUEUED,
+            num_beams=params.num_beams,
+            max_new_tokens=params.max_new_tokens,
+            segments_total=len(segments),
+            segments_done=0,
+            callback_url=callback_url,
+        )
+        db.add(job)
+        db.add_all(
+            JobSegment(
+                job_id=job.id,
+                position=position,
+                source_text=segment.text,
+                trailing=segment.trailing,
+            )
+            for position, segment in enumerate(segments)
+        )
+        await db.commit()
+        logger.info(f"Queued job {job.id} with {len(segments)} segments")
+        return job
+
+    @staticmethod
+    async def get(db: AsyncSession, job_id: str) -> Optional[Job]:
+        """
+        Find a job by id.
+
+        Args:
+            db: Database session
+            job_id: Job id
+
+        Returns:
+            The job, or None if it does not exist
+        """
+        return await db.get(Job, job_id)
+
+    @staticmethod
+    async def partial_translation(db: AsyncSession, job: Job) -> str:
+        """
+        Get the translation of a job so far.
+
+        Args:
+            db: Database session
+            job: Job to report on
+
+        Returns:
+            The full translation of a completed job, else the translation of
+            the leading segments that are already done
+        """
+        if job.translation is not None:
+            return job.translation
+
+        result = await db.execute(
+            select(JobSegment.trailing, JobSegment.translated_text)
+            .where(JobSegment.job_id == job.id)
+            .order_by(JobSegment.position)
+        )
+        segments: List[Segment] = []
+        translations: List[str] = []
+        for trailing, translated_text in result.all():
+            if translated_text is None:
+                break
+            segments.append(Segment(text="", trailing=trailing))
+            translations.append(translated_text)
+        return join_segments(segments, translations)
+
+    @staticmethod
+    async def claim(db: AsyncSession, limit: int) -> List[JobSegment]:
+        """
+        Claim the next untranslated segments of the oldest active job.
+
+        Claimed segments are leased for ``JOB_LEASE_SECONDS``; segments whose
+        lease expired (e.g. claimed before a restart) can be claimed again.
+
+        Args:
+            db: Database session
+            limit: Maximum number of segments to claim
+
+        Returns:
+            Claimed segments in document order (all from the same job)
+        """
+        now = datetime.utcnow()
+        available = (
+            JobSegment.translated_text.is_(None),
+            or_(JobSegment.lease_until.is_(None), JobSegment.lease_until < now),
+        )
+        job_id = await db.scalar(
+            select(JobSegment.job_id)
+            .join(Job, Job.id == JobSegment.job_id)
+            .where(Job.status.in_(ACTIVE_STATUSES), *available)
+            .order_by(Job.created_at, JobSegment.id)
+            .limit(1)
+        )
+        if job_id is None:
+            return []
+
+        token = uuid.uuid4().hex
+        candidates = (
+            select(JobSegment.id)
+            .where(JobSegment.job_id == job_id, *available)
+            .order_by(JobSegment.position)
+            .limit(limit)
+        )
+        # One UPDATE, so concurrent workers never claim the same segment.
+        await db.execute(
+            update(JobSegment)
+            .where(JobSegment.id.in_(candidates), *available)
+            .values(
+                claimed_by=token,
+                lease_until=now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                attempts=JobSegment.attempts + 1,
+            )
+        )
+        await db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JOB_QUEUED)
+            .values(status=JOB_RUNNING)
+        )
+        await db.commit()
+
+        result = await db.execute(
+            select(JobSegment)
+            .where(JobSegment.claimed_by == token)
+            .order_by(JobSegment.position)
+        )
+        return list(result.scalars())
+
+    @staticmethod
+    async def release(db: AsyncSession, segment_ids: List[int]) -> None:
+        """
+        Give claimed segments back untranslated, e.g. on shutdown.
+
+        Args:
+            db: Database session
+            segment_ids: Segments to release
+        """
+        await db.execute(
+            update(JobSegment)
+            .where(JobSegment.id.in_(segment_ids))
+            .values(claimed_by=None, lease_until=None, attempts=JobSegment.attempts - 1)
+        )
+        await db.commit()
+
+    @staticmethod
+    async def record_results(
+        db: AsyncSession,
+        job_id: str,
+        translations: Dict[int, str],
+        failures: Dict[int, int],
+        error: Optional[str] = None,
+    ) -> Job:
+        """
+        Save translated segments and update the job's progress.
+
+        Args:
+            db: Database session
+            job_id: Job the segments belong to
+            translations: Translation per segment id
+            failures: Attempts so far per failed segment id
+            error: Error of the failed segments
+
+        Returns:
+            The updated job
+        """
+        if translations:
+            # Bulk UPDATE by primary key, one statement for the batch.
+            await db.execute(
+                update(JobSegment),
+                [
+                    {
+                        "id": segment_id,
+                        "translated_text": translated_text,
+                        "claimed_by": None,
+                        "lease_until": None,
+                    }
+                    for segment_id, translated_text in translations.items()
+                ],
+            )
+        if failures:
+            await db.execute(
+                update(JobSegment)
+                .where(JobSegment.id.in_(list(failures)))
+                .values(claimed_by=None, lease_until=None)
+            )
+
+        job = await db.get(Job, job_id, populate_existing=True)
+        job.segments_done = await db.scalar(
+            select(func.count())
+            .select_from(JobSegment)
+            .where(JobSegment.job_id == job_id, JobSegment.translated_text.isnot(None))
+        )
+
+        if failures and max(failures.values()) >= settings.JOB_MAX_ATTEMPTS:
+            job.status = JOB_FAILED
+            job.error = error or "Translation error"
+            job.completed_at = datetime.utcnow()
+            logger.error(f"Job {job_id} failed: {job.error}")
+        elif job.segments_done == job.segments_total:
+            result = await db.execute(
+                select(JobSegment.trailing, JobSegment.translated_text)
+                .where(JobSegment.job_id == job_id)
+                .order_by(JobSegment.position)
+            )
+            rows = result.all()
+            job.translation = join_segments(
+                [Segment(text="", trailing=trailing) for trailing, _ in rows],
+                [translated_text for _, translated_text in rows],
+            )
+            job.status = JOB_COMPLETED
+            job.completed_at = datetime.utcnow()
+            logger.info(f"Job {job_id} completed ({job.segments_total} segments)")
+
+        await db.commit()
+        return job
+
+    @staticmethod
+    async def pending_callbacks(db: AsyncSession) -> List[Job]:
+        """
+        Find finished jobs whose callback was never attempted.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Jobs still owing a callback
+        """
+        result = await db.execute(
+            select(Job).where(
+                Job.status.in_((JOB_COMPLETED, JOB_FAILED)),
+                Job.callback_url.isnot(None),
+                Job.callback_status.is_(None),
+            )
+        )
+        return list(result.scalars())
+
+
+def callback_payload(job: Job) -> Dict[str, Any]:
+    """Body POSTed to a job's callback URL."""
+    return {
+        "id": job.id,
+        "status": job.status,
+        "segments_total": job.segments_total,
+        "segments_done": job.segments_done,
+        "translation": job.translation,
+        "error": job.error,
+    }
+
+
+class JobRunner:
+    """
+    Background workers that translate queued jobs.
+
+    Each worker claims a batch of segments from the oldest active job,
+    translates them with ``TranslationService.translate_many`` (so they share
+    batched model calls) and saves the results. Progress lives in the
+    database, so jobs resume after a restart.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = async_session_factory,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            session_factory: Creates database sessions for the workers
+        """
+        self._session_factory = session_factory
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the workers are running."""
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Start the workers on the running event loop."""
+        if self._tasks:
+            return
+
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.ensure_future(self._work(worker))
+            for worker in range(max(1, settings.JOB_WORKERS))
+        ]
+        self._tasks.append(asyncio.ensure_future(self._resume_callbacks()))
+        logger.info(
+            f"Job runner started (workers={settings.JOB_WORKERS}, "
+            f"batch_segments={settings.JOB_BATCH_SEGMENTS})"
+        )
+
+    async def stop(self) -> None:
+        """Stop the workers, releasing the segments they hold."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def notify(self) -> None:
+        """Wake idle workers (a job was queued)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _work(self, worker: int) -> None:
+        """Process batches until stopped, sleeping while there is no work."""
+        while True:
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {worker} error: {e}")
+                processed = 0
+
+            if processed:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self) -> int:
+        """
+        Claim and translate one batch of segments.
+
+        Returns:
+            Number of segments processed (0 if there was nothing to do or
+            the model is not loaded yet)
+        """
+        if not model_manager.is_loaded:
+            return 0
+
+        async with self._session_factory() as db:
+            segments = await JobService.claim(db, settings.JOB_BATCH_SEGMENTS)
+            if not segments:
+                return 0
+
+            job_id = segments[0].job_id
+            job = await JobService.get(db, job_id)
+            try:
+                translations, failures, error = await self._translate(job, segments)
+            except asyncio.CancelledError:
+                # Shutting down: hand the batch back for the next start.
+                await asyncio.shield(
+                    JobService.release(db, [segment.id for segment in segments])
+                )
+                raise
+
+            job = await JobService.record_results(
+                db, job_id, translations, failures, error
+            )
+            if job.status in (JOB_COMPLETED, JOB_FAILED) and job.callback_url:
+                await self._deliver_callback(db, job)
+            return len(segments)
+
+    @staticmethod
+    async def _translate(
+        job: Job, segments: List[JobSegment]
+    ) -> Tuple[Dict[int, str], Dict[int, int], Optional[str]]:
+        """
+        Translate claimed segments of a job.
+
+        Returns:
+            Translations by segment id, the attempt count of every failed
+            segment by id, and the last error (None if nothing failed)
+        """
+        translations: Dict[int, str] = {}
+        failures: Dict[int, int] = {}
+        error = None
+        try:
+            async for result in TranslationService.translate_many(
+                [segment.source_text for segment in segments], job_params(job)
+            ):
+                segment = segments[result.index]
+                if result.error is None:
+                    translations[segment.id] = result.translation
+                else:
+                    failures[segment.id] = segment.attempts
+                    error = result.error
+        except Exception as e:
+            logger.error(f"Job {job.id} batch failed: {e}")
+            error = "Translation error"
+            for segment in segments:
+                if segment.id not in translations:
+                    failures[segment.id] = segment.attempts
+        return translations, failures, error
+
+    async def _resume_callbacks(self) -> None:
+        """Deliver callbacks of jobs that finished before a restart."""
+        try:
+            async with self._session_factory() as db:
+                for job in await JobService.pending_callbacks(db):
+                    await self._deliver_callback(db, job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to resume job callbacks: {e}")
+
+    async def _deliver_callback(self, db: AsyncSession, job: Job) -> None:
+        """POST the result of a finished job to its callback URL."""
+        payload = callback_payload(job)
+        status = CALLBACK_FAILED
+        try:
+            # Checked again: the host may resolve elsewhere since submission.
+            await check_callback_url(job.callback_url)
+        except ValueError as e:
+            logger.warning(f"Callback for job {job.id} refused: {e}")
+            job.callback_status = status
+            await db.commit()
+            return
+
+        async with httpx.AsyncClient(timeout=settings.JOB_CALLBACK_TIMEOUT) as client:
+            for attempt in range(1, settings.JOB_CALLBACK_RETRIES + 1):
+                try:
+                    response = await client.post(job.callback_url, json=payload)
+                    response.raise_for_status()
+                    status = CALLBACK_DELIVERED
+                    break
+                except httpx.HTTPError as e:
+                    logger.warning(
+                        f"Callback for job {job.id} failed "
+                        f"(attempt {attempt}/{settings.JOB_CALLBACK_RETRIES}): {e}"
+                    )
+                    if attempt < settings.JOB_CALLBACK_RETRIES:
+                        await asyncio.sleep(attempt)
+
+        job.callback_status = status
+        await db.commit()
+        logger.info(f"Callback for job {job.id}: {status}")
+
+
+# Global job runner instance
+job_runner = JobRunner()
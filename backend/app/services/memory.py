@@ -0,0 +1,251 @@
+"""
+Persistent Translation Memory
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import record_cache_lookup
+from app.models.translation import SentenceTranslation, Translation
+from app.utils.logger import get_logger
+
+logger = get_logger("translation_memory")
+
+# Stay well under SQLite's limit on bound parameters per statement.
+_LOOKUP_CHUNK_SIZE = 500
+
+
+class TranslationMemory:
+    """
+    Exact-match translation memory on top of the translations table.
+
+    The table is the request history: every translation served is appended,
+    repeats included, and lookups return the most recent matching row.
+    """
+
+    @staticmethod
+    async def lookup(
+        db: AsyncSession, content_hash: str, model_version: str
+    ) -> Optional[str]:
+        """
+        Find a stored translation of the same input by the same model.
+
+        Args:
+            db: Database session
+            content_hash: Hash of the normalized input and generation settings
+            model_version: Fingerprint of the loaded model
+
+        Returns:
+            Stored translation, or None if there is no usable entry
+        """
+        result = await db.execute(
+            select(Translation.translated_text)
+            .where(
+                Translation.content_hash == content_hash,
+                Translation.model_version == model_version,
+            )
+            .order_by(Translation.id.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def store(
+        db: AsyncSession,
+        source_text: str,
+        translated_text: str,
+        content_hash: Optional[str],
+        model_version: Optional[str],
+    ) -> Translation:
+        """
+        Append a translation to the history, indexed for later lookups.
+
+        Args:
+            db: Database session
+            source_text: English input
+            translated_text: Spanish output
+            content_hash: Hash of the normalized input and generation settings
+            model_version: Fingerprint of the model that translated it
+
+        Returns:
+            The saved row
+        """
+        db_translation = Translation(
+            source_text=source_text,
+            translated_text=translated_text,
+            content_hash=content_hash,
+            model_version=model_version,
+        )
+        db.add(db_translation)
+        await db.commit()
+        await db.refresh(db_translation)
+        return db_translation
+
+    @staticmethod
+    async def lookup_many(
+        db: AsyncSession, content_hashes: Sequence[str], model_version: str
+    ) -> Dict[str, str]:
+        """
+        Find stored translations of many inputs by the same model.
+
+        Args:
+            db: Database session
+            content_hashes: Hashes of the normalized inputs and generation settings
+            model_version: Fingerprint of the loaded model
+
+        Returns:
+            Translations keyed by hash (misses are left out)
+        """
+        unique = list(dict.fromkeys(content_hashes))
+        found: Dict[str, str] = {}
+        for start in range(0, len(unique), _LOOKUP_CHUNK_SIZE):
+            stop = start + _LOOKUP_CHUNK_SIZE
+            chunk = unique[start:stop]
+            result = await db.execute(
+                select(Translation.content_hash, Translation.translated_text).where(
+                    Translation.content_hash.in_(chunk),
+                    Translation.model_version == model_version,
+                )
+                # Newest last, so the most recent translation of a hash wins.
+                .order_by(Translation.id)
+            )
+            found.update(result.all())
+        return found
+
+    @staticmethod
+    async def store_many(
+        db: AsyncSession,
+        entries: Sequence[Tuple[str, str, Optional[str]]],
+        model_version: Optional[str],
+    ) -> None:
+        """
+        Append many translations to the history in one transaction.
+
+        Args:
+            db: Database session
+            entries: (source_text, translated_text, content_hash) per input
+            model_version: Fingerprint of the model that translated them
+        """
+        if not entries:
+            return
+
+        rows: List[Dict[str, Any]] = [
+            {
+                "source_text": source_text,
+                "translated_text": translated_text,
+                "content_hash": content_hash,
+                "model_version": model_version,
+            }
+            for source_text, translated_text, content_hash in entries
+        ]
+        await db.execute(insert(Translation), rows)
+        await db.commit()
+
+
+class SentenceMemory:
+    """Sentence-level translation memory, reused across documents."""
+
+    @staticmethod
+    async def lookup_many(
+        db: AsyncSession, content_hashes: Sequence[str], model_version: str
+    ) -> Dict[str, str]:
+        """
+        Find stored translations of sentences translated by the same model.
+
+        Args:
+            db: Database session
+            content_hashes: Hashes of the segments to look up
+            model_version: Fingerprint of the loaded model
+
+        Returns:
+            Translations keyed by hash (misses are left out)
+        """
+        unique = list(dict.fromkeys(content_hashes))
+        found: Dict[str, str] = {}
+        for start in range(0, len(unique), _LOOKUP_CHUNK_SIZE):
+            stop = start + _LOOKUP_CHUNK_SIZE
+            chunk = unique[start:stop]
+            result = await db.execute(
+                select(
+                    SentenceTranslation.content_hash,
+                    SentenceTranslation.translated_text,
+                ).where(
+                    SentenceTranslation.content_hash.in_(chunk),
+                    SentenceTranslation.model_version == model_version,
+                )
+            )
+            found.update(result.all())
+        return found
+
+    @staticmethod
+    async def store_many(
+        db: AsyncSession,
+        entries: Sequence[Tuple[str, str, str]],
+        model_version: str,
+    ) -> None:
+        """
+        Save newly translated sentences, skipping ones already stored.
+
+        Args:
+            db: Database session
+            entries: (content_hash, source_text, translated_text) per sentence
+            model_version: Fingerprint of the model that translated them
+        """
+        if not entries:
+            return
+
+        rows: List[Dict[str, Any]] = [
+            {
+                "content_hash": content_hash,
+                "source_text": source_text,
+                "translated_text": translated_text,
+                "model_version": model_version,
+            }
+            for content_hash, source_text, translated_text in entries
+        ]
+        # Concurrent requests (or other workers) may store the same sentence.
+        statement = insert(SentenceTranslation).on_conflict_do_nothing(
+            index_elements=["content_hash"]
+        )
+        await db.execute(statement, rows)
+        await db.commit()
+
+
+class SentenceMemoryStats:
+    """Counters of sentences served from memory versus translated."""
+
+    def __init__(self):
+        """Initialize the counters."""
+        self.requests = 0
+        self.segments = 0
+        self.hits = 0
+
+    def record(self, segments: int, hits: int) -> None:
+        """
+        Record the outcome of one request.
+
+        Args:
+            segments: Number of segments in the request
+            hits: Number of them served from memory
+        """
+        self.requests += 1
+        self.segments += segments
+        self.hits += hits
+        record_cache_lookup("sentence_memory", True, hits)
+        record_cache_lookup("sentence_memory", False, segments - hits)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters as a JSON-serializable dict."""
+        return {
+            "requests": self.requests,
+            "segments": self.segments,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.segments, 4) if self.segments else 0.0,
+        }
+
+
+# Global sentence memory statistics instance
+sentence_memory_stats = SentenceMemoryStats()
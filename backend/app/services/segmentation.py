@@ -0,0 +1,169 @@
+"""
+Sentence Segmentation for Long-document Translation
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Sequence
+
+# A sentence ends with terminal punctuation, optionally followed by closing
+# quotes or brackets.
+_SENTENCE_END_RE = re.compile(r"[.!?…]+[\"'”’»)\]]*$")
+# Clause boundaries used to split sentences that are over the token budget.
+_CLAUSE_END_RE = re.compile(r"[,;:—–]+[\"'”’»)\]]*$")
+_WORD_RE = re.compile(r"\S+")
+_WHITESPACE_RE = re.compile(r"\s*")
+
+# Words ending in a period that do not end a sentence.
+_ABBREVIATIONS = {
+    "mr.",
+    "mrs.",
+    "ms.",
+    "dr.",
+    "prof.",
+    "sr.",
+    "jr.",
+    "st.",
+    "vs.",
+    "etc.",
+    "e.g.",
+    "i.e.",
+    "no.",
+    "fig.",
+    "mt.",
+}
+
+
+@dataclass
+class Segment:
+    """A piece of the input translated on its own."""
+
+    text: str
+    # Whitespace that followed the segment in the original text.
+    trailing: str = ""
+
+
+def _is_sentence_end(word: str) -> bool:
+    """Check if a word closes a sentence."""
+    if not _SENTENCE_END_RE.search(word):
+        return False
+    lowered = word.lower()
+    if lowered in _ABBREVIATIONS:
+        return False
+    # Initials such as "J." in "J. R. R. Tolkien".
+    return not re.fullmatch(r"[A-Z]\.", word)
+
+
+def _is_clause_end(word: str) -> bool:
+    """Check if a word closes a clause."""
+    return bool(_CLAUSE_END_RE.search(word))
+
+
+def _split_words(
+    text: str,
+    spans: List[re.Match],
+    is_boundary: Callable[[str], bool],
+) -> List[List[re.Match]]:
+    """Group word matches into runs that end at a boundary word."""
+    groups: List[List[re.Match]] = []
+    current: List[re.Match] = []
+    for i, word in enumerate(spans):
+        current.append(word)
+        end = word.end()
+        next_start = spans[i + 1].start() if i + 1 < len(spans) else len(text)
+        gap = text[end:next_start]
+        if is_boundary(word.group()) or "\n" in gap:
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _to_segment(text: str, words: List[re.Match]) -> Segment:
+    """Build a segment from word matches, keeping the whitespace after it."""
+    start, stop = words[0].start(), words[-1].end()
+    trailing = _WHITESPACE_RE.match(text, stop).group()
+    return Segment(text=text[start:stop], trailing=trailing)
+
+
+def _pack(
+    text: str,
+    groups: List[List[re.Match]],
+    count_tokens: Callable[[str], int],
+    max_tokens: int,
+) -> List[List[re.Match]]:
+    """Greedily merge consecutive groups while they fit in the budget."""
+    packed: List[List[re.Match]] = []
+    for group in groups:
+        if packed:
+            candidate = packed[-1] + group
+            if count_tokens(_to_segment(text, candidate).text) <= max_tokens:
+                packed[-1] = candidate
+                continue
+        packed.append(group)
+    return packed
+
+
+def split_segments(
+    text: str,
+    count_tokens: Callable[[str], int],
+    max_tokens: int,
+) -> List[Segment]:
+    """
+    Split text into sentences, and sentences into chunks under a token budget.
+
+    Sentences end at terminal punctuation followed by whitespace, and at every
+    line break. A sentence over ``max_tokens`` is split at clause punctuation
+    and, failing that, between words. Each segment keeps the whitespace that
+    followed it, so ``join_segments`` can restore the original layout.
+
+    Args:
+        text: Input text
+        count_tokens: Returns the model input length of a piece of text
+        max_tokens: Token budget per segment
+
+    Returns:
+        Segments in their original order
+    """
+    words = list(_WORD_RE.finditer(text))
+    segments: List[Segment] = []
+
+    for sentence in _split_words(text, words, _is_sentence_end):
+        if count_tokens(_to_segment(text, sentence).text) <= max_tokens:
+            segments.append(_to_segment(text, sentence))
+            continue
+
+        # Too long: pack clauses, then words, into chunks under the budget.
+        chunks: List[List[re.Match]] = []
+        clauses = _split_words(text, sentence, _is_clause_end)
+        for clause in _pack(text, clauses, count_tokens, max_tokens):
+            if count_tokens(_to_segment(text, clause).text) <= max_tokens:
+                chunks.append(clause)
+            else:
+                words_only = [[word] for word in clause]
+                chunks.extend(_pack(text, words_only, count_tokens, max_tokens))
+
+        segments.extend(
+            _to_segment(text, chunk)
+            for chunk in _pack(text, chunks, count_tokens, max_tokens)
+        )
+
+    return segments
+
+
+def join_segments(segments: Sequence[Segment], translations: Sequence[str]) -> str:
+    """
+    Reassemble translated segments with the original whitespace.
+
+    Args:
+        segments: Segments returned by ``split_segments``
+        translations: Translation of each segment
+
+    Returns:
+        Translated text
+    """
+    return "".join(
+        translation + segment.trailing
+        for segment, translation in zip(segments, translations)
+    ).strip()
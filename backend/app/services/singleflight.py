@@ -0,0 +1,136 @@
+"""
+Single-flight Deduplication of Concurrent Translations
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+from app.utils.logger import get_logger
+
+logger = get_logger("singleflight")
+
+
+class SingleFlight:
+    """
+    Shares one in-flight computation between concurrent identical requests.
+
+    Work is identified by a key (the content hash of a text and its
+    generation settings). A caller asking for keys already being computed
+    awaits the running computation instead of starting another one, and
+    only the other keys are computed. Results are not kept once the
+    computation ends; that is the cache's job.
+
+    Computations run as their own task, so a caller that goes away (e.g. a
+    client disconnecting) does not cancel the work the others wait for.
+    Must be used from one event loop.
+    """
+
+    def __init__(self):
+        """Initialize the registry of running computations."""
+        self._flights: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear the counters."""
+        with self._lock:
+            self.computed = 0
+            self.coalesced = 0
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get the result for one key, joining a running computation if any.
+
+        Args:
+            key: Identity of the work
+            compute: Coroutine function computing the result
+
+        Returns:
+            Result of ``compute``, from this call or a concurrent one
+        """
+
+        async def compute_one(_: List[int]) -> List[Any]:
+            return [await compute()]
+
+        return (await self.run_many([key], compute_one))[0]
+
+    async def run_many(
+        self,
+        keys: Sequence[str],
+        compute: Callable[[List[int]], Awaitable[List[Any]]],
+    ) -> List[Any]:
+        """
+        Get the results for several keys, computing only those not in flight.
+
+        Args:
+            keys: Identity of each piece of work (repeats are computed once)
+            compute: Coroutine function taking the positions in ``keys`` to
+                compute and returning their results in the same order
+
+        Returns:
+            Result for each key, in the order of ``keys``
+        """
+        loop = asyncio.get_running_loop()
+        futures: Dict[str, asyncio.Future] = {}
+        missing: List[int] = []
+        joined = 0
+        for i, key in enumerate(keys):
+            if key in futures:
+                continue
+            flight = self._flights.get(key)
+            # A flight left behind by a closed event loop can never finish.
+            if flight is not None and flight.get_loop() is loop:
+                futures[key] = flight
+                joined += 1
+            else:
+                futures[key] = self._flights[key] = loop.create_future()
+                missing.append(i)
+
+        with self._lock:
+            self.computed += len(missing)
+            self.coalesced += joined
+        if joined:
+            logger.info(f"Joined {joined} identical translations already in flight")
+
+        if missing:
+            task = asyncio.ensure_future(compute(missing))
+            task.add_done_callback(
+                lambda done: self._settle([keys[i] for i in missing], done)
+            )
+
+        results = await asyncio.gather(
+            *(asyncio.shield(future) for future in futures.values())
+        )
+        by_key = dict(zip(futures, results))
+        return [by_key[key] for key in keys]
+
+    def _settle(self, keys: List[str], task: asyncio.Task) -> None:
+        """Hand the outcome of a computation to everyone waiting on its keys."""
+        for i, key in enumerate(keys):
+            future = self._flights.pop(key)
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+                # Retrieved here in case every waiter has gone away.
+                future.exception()
+            else:
+                future.set_result(task.result()[i])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters as a JSON-serializable dict."""
+        with self._lock:
+            requested = self.computed + self.coalesced
+            return {
+                "in_flight": len(self._flights),
+                "computed": self.computed,
+                "coalesced": self.coalesced,
+                "coalesce_rate": (
+                    round(self.coalesced / requested, 4) if requested else 0.0
+                ),
+            }
+
+
+# Global single-flight instance for translations
+translation_flights = SingleFlight()
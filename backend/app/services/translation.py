@@ -2,12 +2,208 @@
 Translation Service
 """
 
+import asyncio
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.batching import batch_scheduler
+from app.core.bucketing import token_budget_buckets
+from app.core.config import settings
+from app.core.generation import GenerationParams, decoding_log, plan_generation
 from app.core.model import model_manager
+from app.services.cache import make_cache_key, translation_cache
+from app.services.memory import SentenceMemory, sentence_memory_stats
+from app.services.segmentation import Segment, join_segments, split_segments
+from app.services.singleflight import translation_flights
 from app.utils.logger import get_logger
 
 logger = get_logger("translation_service")
 
 
+@dataclass
+class MemoryTranslation:
+    """A translation and how much of it was served from memory."""
+
+    translation: str
+    segments: int
+    segments_from_memory: int
+
+    @property
+    def memory_fraction(self) -> float:
+        """Fraction of segments served from memory."""
+        if not self.segments:
+            return 0.0
+        return self.segments_from_memory / self.segments
+
+
+@dataclass
+class BatchTranslation:
+    """One result of ``translate_many``: a translation or an error."""
+
+    index: int
+    translation: Optional[str] = None
+    error: Optional[str] = None
+
+
+class _SegmentAssembly:
+    """Segments of the texts ``translate_many`` translates, put back together."""
+
+    def __init__(
+        self,
+        pending: List[str],
+        segments: List[List[Segment]],
+        groups: Dict[str, List[int]],
+        keys: Dict[str, Optional[str]],
+    ):
+        """
+        Initialize the assembly.
+
+        Args:
+            pending: Distinct cleaned texts to translate
+            segments: Segments of each pending text
+            groups: Input indices of every cleaned text
+            keys: Cache key of every cleaned text (None when not cached)
+        """
+        self.pending = pending
+        self.segments = segments
+        self.groups = groups
+        self.keys = keys
+        # (text, segment) positions of every segment, shortest first.
+        self.positions = sorted(
+            ((t, s) for t, parts in enumerate(segments) for s in range(len(parts))),
+            key=lambda ts: len(segments[ts[0]][ts[1]].text),
+        )
+        self.texts = [segments[t][s].text for t, s in self.positions]
+        self._outputs = [[""] * len(parts) for parts in segments]
+        self._remaining = [len(parts) for parts in segments]
+        self._failed = [False] * len(pending)
+
+    def _results(self, t: int, **fields: Any) -> List[BatchTranslation]:
+        """Results for every input of pending text ``t``."""
+        return [
+            BatchTranslation(index=index, **fields)
+            for index in self.groups[self.pending[t]]
+        ]
+
+    def complete(self, batch: List[int], results: List[str]) -> List[BatchTranslation]:
+        """
+        Record the translations of a batch of segments (positions in ``texts``).
+
+        Returns:
+            Results of the texts it completed, which are also cached
+        """
+        done = []
+        for i, result in zip(batch, results):
+            t, s = self.positions[i]
+            self._outputs[t][s] = result
+            self._remaining[t] -= 1
+            if self._remaining[t] or self._failed[t]:
+                continue
+            translation = join_segments(self.segments[t], self._outputs[t])
+            key = self.keys[self.pending[t]]
+            if key is not None:
+                translation_cache.put(key, translation)
+            done.extend(self._results(t, translation=translation))
+        return done
+
+    def fail(self, batch: List[int]) -> List[BatchTranslation]:
+        """
+        Fail the texts a failed batch of segments belonged to.
+
+        Returns:
+            Error results of the texts not failed before
+        """
+        done = []
+        for t in dict.fromkeys(self.positions[i][0] for i in batch):
+            if not self._failed[t]:
+                self._failed[t] = True
+                done.extend(self._results(t, error="Translation error"))
+        return done
+
+
+class StreamStats:
+    """Time to first token and outcome of streamed translations."""
+
+    def __init__(self, history: int = 1000):
+        """
+        Initialize the statistics.
+
+        Args:
+            history: Number of recent time-to-first-token samples to keep
+        """
+        self._lock = threading.Lock()
+        self._history = history
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded statistics."""
+        with self._lock:
+            self.streams = 0
+            self.completed = 0
+            self.cancelled = 0
+            self.failed = 0
+            self.ttft_ms: Deque[float] = deque(maxlen=self._history)
+
+    def record_first_token(self, started: float) -> None:
+        """
+        Record the time to the first streamed text.
+
+        Args:
+            started: perf_counter() timestamp of the request
+        """
+        with self._lock:
+            self.ttft_ms.append((time.perf_counter() - started) * 1000)
+
+    def record_end(self, outcome: str) -> None:
+        """
+        Record the end of a stream.
+
+        Args:
+            outcome: ``completed``, ``cancelled`` or ``failed``
+        """
+        with self._lock:
+            self.streams += 1
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the statistics as a JSON-serializable dict."""
+        with self._lock:
+            samples = sorted(self.ttft_ms)
+        ttft: Dict[str, Optional[float]] = {"mean": None, "p50": None, "p95": None}
+        if samples:
+            ttft = {
+                "mean": round(statistics.fmean(samples), 2),
+                "p50": round(samples[len(samples) // 2], 2),
+                "p95": round(
+                    samples[min(len(samples) - 1, len(samples) * 95 // 100)], 2
+                ),
+            }
+        return {
+            "streams": self.streams,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "ttft_ms": ttft,
+        }
+
+
 class TranslationService:
     """Service layer for translation operations."""
 
@@ -35,12 +231,468 @@ class TranslationService:
         return cleaned
 
     @staticmethod
-    def translate(text: str) -> str:
+    def content_hash(text: str, params: Optional[GenerationParams] = None) -> str:
+        """
+        Identify a translation by its input, generation settings and model.
+
+        Args:
+            text: Cleaned English text
+            params: Decoding settings (default: the serving settings)
+
+        Returns:
+            Hash shared by the in-process cache and the translation memory
+        """
+        return make_cache_key(text, model_manager.model_version, params)
+
+    @staticmethod
+    def _cache_key(text: str, params: Optional[GenerationParams]) -> Optional[str]:
+        """Get the cache key for a text, or None when caching is disabled."""
+        if not settings.CACHE_ENABLED:
+            return None
+        return TranslationService.content_hash(text, params)
+
+    @staticmethod
+    def plan(
+        text: str,
+        num_beams: Optional[int] = None,
+        max_new_tokens: Optional[int] = None,
+        latency_budget_ms: Optional[float] = None,
+    ) -> GenerationParams:
+        """
+        Choose the decoding settings for a request.
+
+        Args:
+            text: Cleaned English text
+            num_beams: Requested beam width
+            max_new_tokens: Requested output length limit
+            latency_budget_ms: Latency budget of the request
+
+        Returns:
+            Decoding settings within the server caps and, if possible, the
+            latency budget
+        """
+        input_tokens = 0
+        if latency_budget_ms is not None:
+            input_tokens = model_manager.count_tokens(text)
+            if settings.SEGMENTATION_ENABLED:
+                # Segments are translated together; the longest sets the pace.
+                input_tokens = min(input_tokens, settings.SEGMENT_MAX_TOKENS)
+
+        return plan_generation(
+            input_tokens,
+            num_beams=num_beams,
+            max_new_tokens=max_new_tokens,
+            latency_budget_ms=latency_budget_ms,
+        )
+
+    @staticmethod
+    def decoding_used(text: str, params: GenerationParams) -> GenerationParams:
+        """
+        Get the decoding settings a request was actually translated with.
+
+        Under cascaded decoding, a beam search request whose segments all
+        kept their confident greedy output was decoded greedily.
+
+        Args:
+            text: Cleaned English text
+            params: Decoding settings the request was planned with
+
+        Returns:
+            Decoding settings to report for the request
+        """
+        if not settings.CASCADE_ENABLED or params.num_beams == 1:
+            return params
+        texts = [segment.text for segment in TranslationService.segment(text)]
+        return decoding_log.lookup(texts, params)
+
+    @staticmethod
+    def segment(text: str) -> List[Segment]:
+        """
+        Split text into segments under the model's token budget.
+
+        Args:
+            text: Cleaned English text
+
+        Returns:
+            Segments in their original order (a single one when segmentation
+            is disabled)
+        """
+        if not settings.SEGMENTATION_ENABLED:
+            return [Segment(text=text)]
+
+        return split_segments(
+            text, model_manager.count_tokens, settings.SEGMENT_MAX_TOKENS
+        )
+
+    @staticmethod
+    def _length_order(segments: List[Segment]) -> List[int]:
+        """Get segment indices sorted by length, so batches pad little."""
+        return sorted(range(len(segments)), key=lambda i: len(segments[i].text))
+
+    @staticmethod
+    def _translate_segments(
+        segments: List[Segment], params: Optional[GenerationParams] = None
+    ) -> List[str]:
+        """Translate segments as one length-sorted batch."""
+        order = TranslationService._length_order(segments)
+        translations = [""] * len(segments)
+
+        if batch_scheduler.is_running:
+            futures = {
+                i: batch_scheduler.submit(segments[i].text, params) for i in order
+            }
+            for i, future in futures.items():
+                translations[i] = future.result()
+        else:
+            results = model_manager.translate_batch(
+                [segments[i].text for i in order], params
+            )
+            for i, result in zip(order, results):
+                translations[i] = result
+
+        return translations
+
+    @staticmethod
+    async def _translate_segments_async(
+        segments: List[Segment], params: Optional[GenerationParams] = None
+    ) -> List[str]:
+        """Translate segments as one length-sorted batch without blocking."""
+        order = TranslationService._length_order(segments)
+        translations = [""] * len(segments)
+
+        if batch_scheduler.is_running:
+            results = await asyncio.gather(
+                *(
+                    asyncio.wrap_future(
+                        batch_scheduler.submit(segments[i].text, params)
+                    )
+                    for i in order
+                )
+            )
+        else:
+            results = await model_manager.translate_batch_async(
+                [segments[i].text for i in order], params
+            )
+
+        for i, result in zip(order, results):
+            translations[i] = result
+        return translations
+
+    @staticmethod
+    async def _translate_one_async(text: str, params: GenerationParams) -> str:
+        """Translate one segment, through the scheduler when it is running."""
+        if batch_scheduler.is_running:
+            return await asyncio.wrap_future(batch_scheduler.submit(text, params))
+        return await model_manager.translate_async(text, params)
+
+    @staticmethod
+    async def _stream_tokens(
+        text: str, params: GenerationParams, cancel: threading.Event
+    ) -> AsyncIterator[str]:
+        """Stream the greedy translation of one segment as it is generated."""
+        streamer = model_manager.create_streamer()
+        generation = asyncio.ensure_future(
+            model_manager.translate_streaming_async(text, streamer, params, cancel)
+        )
+        finished = False
+        try:
+            async for chunk in streamer:
+                # The streamer flushes an empty string when it ends.
+                if chunk:
+                    yield chunk
+            finished = True
+        finally:
+            if not finished:
+                # Closed early by the consumer: stop generating.
+                cancel.set()
+        # Surface generation errors once the streamer is closed.
+        await generation
+
+    @staticmethod
+    async def translate_stream(
+        text: str,
+        params: Optional[GenerationParams] = None,
+        cancel: Optional[threading.Event] = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[str]:
+        """
+        Translate English text to Spanish, yielding the output as it is ready.
+
+        Greedy decoding streams every segment word by word. Beam search
+        translates all segments together and streams them sentence by
+        sentence, in order. Segments are cached like ``translate_with_memory``
+        does. Closing the iterator (e.g. on client disconnect) sets ``cancel``,
+        which stops a greedy generation at its next step.
+
+        Args:
+            text: English text to translate
+            params: Decoding settings (default: the serving settings)
+            cancel: Event that stops generation when set
+            use_cache: Whether to read and fill the translation cache
+
+        Yields:
+            Consecutive pieces of the Spanish translation
+
+        Raises:
+            ValueError: If input is invalid
+            RuntimeError: If model is not loaded
+        """
+        cleaned_text = TranslationService.validate_input(text)
+        params = params or GenerationParams.default()
+        cancel = cancel or threading.Event()
+        started = time.perf_counter()
+        streamed_any = False
+        outcome = "cancelled"
+
+        segments = TranslationService.segment(cleaned_text)
+        keys = [
+            TranslationService._cache_key(s.text, params) if use_cache else None
+            for s in segments
+        ]
+        cached = [translation_cache.get(k) if k is not None else None for k in keys]
+        pending = TranslationService._submit_ahead(segments, cached, params)
+
+        chunks = TranslationService._stream_segments(
+            segments, keys, cached, pending, params, cancel
+        )
+        try:
+            # Closing this iterator closes the inner one at once, too.
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    if chunk and not streamed_any:
+                        stream_stats.record_first_token(started)
+                        streamed_any = True
+                    yield chunk
+            # Stopped early when cancelled: the output is incomplete.
+            outcome = "cancelled" if cancel.is_set() else "completed"
+        except Exception:
+            outcome = "failed"
+            raise
+        finally:
+            if outcome != "completed":
+                cancel.set()
+                for future in pending.values():
+                    future.cancel()
+            stream_stats.record_end(outcome)
+
+    @staticmethod
+    def _submit_ahead(
+        segments: List[Segment],
+        cached: List[Optional[str]],
+        params: GenerationParams,
+    ) -> Dict[int, "asyncio.Future[str]"]:
+        """
+        Start translating the uncached segments of a beam search stream.
+
+        Every segment is submitted at once so they share batches. Greedy
+        streams translate each segment when its turn comes instead.
+
+        Returns:
+            Translation futures by segment position
+        """
+        if params.num_beams == 1:
+            return {}
+        return {
+            i: asyncio.ensure_future(
+                TranslationService._translate_one_async(segment.text, params)
+            )
+            for i, segment in enumerate(segments)
+            if cached[i] is None
+        }
+
+    @staticmethod
+    async def _stream_segments(
+        segments: List[Segment],
+        keys: List[Optional[str]],
+        cached: List[Optional[str]],
+        pending: Dict[int, "asyncio.Future[str]"],
+        params: GenerationParams,
+        cancel: threading.Event,
+    ) -> AsyncIterator[str]:
+        """
+        Yield the translation of each segment in order, caching new ones.
+
+        Cached and submitted segments are yielded whole; the others are
+        streamed token by token. Stops early once ``cancel`` is set.
+        """
+        for i, segment in enumerate(segments):
+            # The whitespace join_segments() would put after the segment.
+            trailing = segment.trailing if i < len(segments) - 1 else ""
+
+            if cached[i] is None and i not in pending:
+                chunks = []
+                async for chunk in TranslationService._stream_tokens(
+                    segment.text, params, cancel
+                ):
+                    chunks.append(chunk)
+                    yield chunk
+                if cancel.is_set():
+                    return
+                translation = "".join(chunks)
+                if trailing:
+                    yield trailing
+            else:
+                translation = cached[i]
+                if translation is None:
+                    translation = await pending[i]
+                yield translation + trailing
+
+            if keys[i] is not None and cached[i] is None:
+                translation_cache.put(keys[i], translation)
+
+    @staticmethod
+    def _group_texts(
+        texts: Sequence[str],
+    ) -> Tuple[Dict[str, List[int]], List[BatchTranslation]]:
+        """
+        Group inputs by their cleaned text, so repeats are translated once.
+
+        Returns:
+            Indices of every input with the same cleaned text, and an error
+            result for each invalid input
+        """
+        groups: Dict[str, List[int]] = {}
+        errors = []
+        for i, text in enumerate(texts):
+            try:
+                cleaned = TranslationService.validate_input(text)
+            except ValueError as e:
+                errors.append(BatchTranslation(index=i, error=str(e)))
+                continue
+            groups.setdefault(cleaned, []).append(i)
+        return groups, errors
+
+    @staticmethod
+    def _lookup_cached(
+        groups: Dict[str, List[int]], params: Optional[GenerationParams]
+    ) -> Tuple[List[str], Dict[str, Optional[str]], List[BatchTranslation]]:
+        """
+        Serve grouped texts from the translation cache.
+
+        Returns:
+            Texts still to translate, the cache key of every text (None when
+            caching is disabled), and a result for each input served
+        """
+        pending: List[str] = []
+        keys: Dict[str, Optional[str]] = {}
+        hits = []
+        for cleaned, indices in groups.items():
+            keys[cleaned] = TranslationService._cache_key(cleaned, params)
+            cached = translation_cache.get(keys[cleaned]) if keys[cleaned] else None
+            if cached is None:
+                pending.append(cleaned)
+                continue
+            hits.extend(BatchTranslation(index=i, translation=cached) for i in indices)
+        return pending, keys, hits
+
+    @staticmethod
+    async def _run_batch(batch: List[int], results: Awaitable[List[str]]):
+        """Await a batch, returning its positions with its results or error."""
+        try:
+            return batch, await results, None
+        except Exception as e:
+            return batch, None, e
+
+    @staticmethod
+    async def _submit_one(text: str, params: Optional[GenerationParams]) -> List[str]:
+        """Translate one text through the scheduler, as a batch of one."""
+        return [await asyncio.wrap_future(batch_scheduler.submit(text, params))]
+
+    @staticmethod
+    def _submit_batches(
+        texts: List[str], params: Optional[GenerationParams]
+    ) -> List["asyncio.Future"]:
+        """
+        Start translating texts in batches under MAX_BATCH_TOKENS.
+
+        Returns:
+            One task per batch, resolving to ``(positions, results, error)``
+        """
+        run = TranslationService._run_batch
+        if batch_scheduler.is_running:
+            # The scheduler forms the batches.
+            return [
+                asyncio.ensure_future(
+                    run([i], TranslationService._submit_one(text, params))
+                )
+                for i, text in enumerate(texts)
+            ]
+
+        lengths = [model_manager.count_tokens(text) for text in texts]
+        return [
+            asyncio.ensure_future(
+                run(
+                    batch,
+                    model_manager.translate_batch_async(
+                        [texts[i] for i in batch], params
+                    ),
+                )
+            )
+            for batch in token_budget_buckets(lengths, settings.MAX_BATCH_TOKENS)
+        ]
+
+    @staticmethod
+    async def translate_many(
+        texts: Sequence[str], params: Optional[GenerationParams] = None
+    ) -> AsyncIterator[BatchTranslation]:
+        """
+        Translate many texts together, yielding each one as soon as it is done.
+
+        Repeated texts are translated once and cached texts are yielded first.
+        The segments of all other texts are sorted by token length and
+        translated in shared batches under MAX_BATCH_TOKENS padded tokens, so
+        short texts tend to finish first.
+
+        Args:
+            texts: English texts to translate
+            params: Decoding settings (default: the serving settings)
+
+        Yields:
+            Results in completion order; ``index`` is the position in
+            ``texts``. Invalid texts and failed batches yield an error.
+        """
+        groups, errors = TranslationService._group_texts(texts)
+        pending, keys, hits = TranslationService._lookup_cached(groups, params)
+        for result in errors + hits:
+            yield result
+        if not pending:
+            return
+
+        assembly = _SegmentAssembly(
+            pending,
+            [TranslationService.segment(cleaned) for cleaned in pending],
+            groups,
+            keys,
+        )
+        logger.info(
+            f"Translating {len(pending)} distinct texts "
+            f"({len(assembly.texts)} segments) of {len(texts)}"
+        )
+
+        tasks = TranslationService._submit_batches(assembly.texts, params)
+        try:
+            for task in asyncio.as_completed(tasks):
+                batch, results, error = await task
+                if error is None:
+                    done = assembly.complete(batch, results)
+                else:
+                    logger.error(f"Batch translation failed: {error}")
+                    done = assembly.fail(batch)
+                for result in done:
+                    yield result
+        finally:
+            # Closed early by the consumer: drop the work still queued.
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def translate(text: str, params: Optional[GenerationParams] = None) -> str:
         """
         Translate English text to Spanish.
 
         Args:
             text: English text to translate
+            params: Decoding settings (default: the serving settings)
 
         Returns:
             Spanish translation
@@ -52,11 +704,233 @@ class TranslationService:
         # Validate input
         cleaned_text = TranslationService.validate_input(text)
 
+        cache_key = TranslationService._cache_key(cleaned_text, params)
+        if cache_key is not None:
+            cached = translation_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Translation served from cache")
+                return cached
+
         logger.info(f"Translating text of length {len(cleaned_text)}")
 
-        # Perform translation using model manager
-        translation = model_manager.translate(cleaned_text)
+        segments = TranslationService.segment(cleaned_text)
+        if len(segments) > 1:
+            logger.info(f"Split input into {len(segments)} segments")
+            translation = join_segments(
+                segments, TranslationService._translate_segments(segments, params)
+            )
+        # Coalesce with concurrent requests when the scheduler is running,
+        # otherwise translate directly with the model manager.
+        elif batch_scheduler.is_running:
+            translation = batch_scheduler.translate(cleaned_text, params)
+        else:
+            translation = model_manager.translate(cleaned_text, params)
 
         logger.info(f"Translation completed, output length {len(translation)}")
 
+        if cache_key is not None:
+            translation_cache.put(cache_key, translation)
+
         return translation
+
+    @staticmethod
+    async def translate_async(
+        text: str, params: Optional[GenerationParams] = None, use_cache: bool = True
+    ) -> str:
+        """
+        Translate English text to Spanish without blocking the event loop.
+
+        Args:
+            text: English text to translate
+            params: Decoding settings (default: the serving settings)
+            use_cache: Whether to read and fill the translation cache
+
+        Returns:
+            Spanish translation
+
+        Raises:
+            ValueError: If input is invalid
+            RuntimeError: If model is not loaded
+        """
+        cleaned_text = TranslationService.validate_input(text)
+
+        cache_key = None
+        if use_cache:
+            cache_key = TranslationService._cache_key(cleaned_text, params)
+        if cache_key is not None:
+            cached = translation_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Translation served from cache")
+                return cached
+
+        logger.info(f"Translating text of length {len(cleaned_text)}")
+
+        async def compute() -> str:
+            segments = TranslationService.segment(cleaned_text)
+            if len(segments) > 1:
+                logger.info(f"Split input into {len(segments)} segments")
+                return join_segments(
+                    segments,
+                    await TranslationService._translate_segments_async(
+                        segments, params
+                    ),
+                )
+            return await TranslationService._translate_one_async(cleaned_text, params)
+
+        # Identical requests in flight at the same time share one translation.
+        translation = await translation_flights.run(
+            cache_key or TranslationService.content_hash(cleaned_text, params), compute
+        )
+
+        logger.info(f"Translation completed, output length {len(translation)}")
+
+        if cache_key is not None:
+            translation_cache.put(cache_key, translation)
+
+        return translation
+
+    @staticmethod
+    async def translate_with_memory(
+        text: str, db: AsyncSession, params: Optional[GenerationParams] = None
+    ) -> MemoryTranslation:
+        """
+        Translate text sentence by sentence, reusing remembered sentences.
+
+        Each segment is looked up in the in-process cache, then in the
+        sentence-level translation memory. Only the misses are translated,
+        as one batch, and stored for later requests. Misses that concurrent
+        requests are already translating are awaited instead.
+
+        Args:
+            text: English text to translate
+            db: Database session for the sentence memory
+            params: Decoding settings (default: the serving settings)
+
+        Returns:
+            Spanish translation with the share of segments served from memory
+
+        Raises:
+            ValueError: If input is invalid
+            RuntimeError: If model is not loaded
+        """
+        cleaned_text = TranslationService.validate_input(text)
+        model_version = model_manager.model_version
+
+        segments = TranslationService.segment(cleaned_text)
+        hashes = [TranslationService.content_hash(s.text, params) for s in segments]
+        # First segment for each distinct hash; repeats are translated once.
+        unique: Dict[str, Segment] = {}
+        for content_hash, segment in zip(hashes, segments):
+            unique.setdefault(content_hash, segment)
+
+        translations = await TranslationService._lookup_sentences(
+            db, list(unique), model_version
+        )
+
+        hits = sum(1 for h in hashes if h in translations)
+        misses = [h for h in unique if h not in translations]
+        if misses:
+            logger.info(
+                f"Translating {len(misses)} of {len(segments)} segments "
+                f"({hits} served from memory)"
+            )
+            translated = await TranslationService._translate_sentences(
+                {h: unique[h] for h in misses}, params
+            )
+            translations.update(translated)
+            await TranslationService._store_sentences(
+                db,
+                [(h, unique[h].text, translated[h]) for h in misses],
+                model_version,
+            )
+
+        sentence_memory_stats.record(len(segments), hits)
+        translation = join_segments(segments, [translations[h] for h in hashes])
+        return MemoryTranslation(
+            translation=translation,
+            segments=len(segments),
+            segments_from_memory=hits,
+        )
+
+    @staticmethod
+    def _cache_many(translations: Dict[str, str]) -> None:
+        """Put translations keyed by content hash in the cache, if enabled."""
+        if settings.CACHE_ENABLED:
+            for content_hash, translation in translations.items():
+                translation_cache.put(content_hash, translation)
+
+    @staticmethod
+    async def _lookup_sentences(
+        db: AsyncSession, hashes: List[str], model_version: Optional[str]
+    ) -> Dict[str, str]:
+        """
+        Look sentences up in the cache, then in the sentence memory.
+
+        Args:
+            db: Database session for the sentence memory
+            hashes: Content hashes of the distinct sentences
+            model_version: Version of the serving model
+
+        Returns:
+            Translations found, by content hash
+        """
+        translations: Dict[str, str] = {}
+        if settings.CACHE_ENABLED:
+            for content_hash in hashes:
+                cached = translation_cache.get(content_hash)
+                if cached is not None:
+                    translations[content_hash] = cached
+
+        pending = [h for h in hashes if h not in translations]
+        if not pending:
+            return translations
+        try:
+            found = await SentenceMemory.lookup_many(db, pending, model_version)
+        except Exception as e:
+            logger.error(f"Sentence memory lookup failed: {e}")
+            found = {}
+        TranslationService._cache_many(found)
+        translations.update(found)
+        return translations
+
+    @staticmethod
+    async def _translate_sentences(
+        sentences: Dict[str, Segment], params: Optional[GenerationParams]
+    ) -> Dict[str, str]:
+        """
+        Translate sentences as one batch, sharing those already in flight.
+
+        Args:
+            sentences: Segments to translate, by content hash
+            params: Decoding settings
+
+        Returns:
+            Translations by content hash, also put in the cache
+        """
+        hashes = list(sentences)
+
+        async def compute(positions: List[int]) -> List[str]:
+            return await TranslationService._translate_segments_async(
+                [sentences[hashes[i]] for i in positions], params
+            )
+
+        results = await translation_flights.run_many(hashes, compute)
+        translations = dict(zip(hashes, results))
+        TranslationService._cache_many(translations)
+        return translations
+
+    @staticmethod
+    async def _store_sentences(
+        db: AsyncSession,
+        sentences: List[Tuple[str, str, str]],
+        model_version: Optional[str],
+    ) -> None:
+        """Save translated sentences to the sentence memory without failing."""
+        try:
+            await SentenceMemory.store_many(db, sentences, model_version)
+        except Exception as e:
+            logger.error(f"Failed to save sentences to memory: {e}")
+
+
+# Global streaming statistics instance
+stream_stats = StreamStats()
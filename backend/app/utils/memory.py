@@ -0,0 +1,121 @@
+"""
+Process Memory Utility
+"""
+
+import ctypes
+import ctypes.util
+import gc
+import os
+import resource
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def _read_kb_fields(path: Path) -> Dict[str, int]:
+    """Parse ``Name:  123 kB`` lines from a /proc file into a dict of kB."""
+    fields: Dict[str, int] = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        pass
+    return fields
+
+
+def get_memory_usage(pid: Optional[int] = None) -> Dict[str, float]:
+    """
+    Get the memory usage of a process in MB.
+
+    On Linux this reports RSS, PSS (proportional set size, where pages shared
+    with other processes are divided between them) and the shared/private
+    split. Elsewhere only the peak RSS of the current process is available.
+
+    Args:
+        pid: Process id (default: current process)
+
+    Returns:
+        Dict with ``rss_mb``, ``pss_mb``, ``shared_mb`` and ``private_mb``
+    """
+    pid = os.getpid() if pid is None else pid
+    proc = Path("/proc") / str(pid)
+
+    rollup = _read_kb_fields(proc / "smaps_rollup")
+    if rollup:
+        shared = rollup.get("Shared_Clean", 0) + rollup.get("Shared_Dirty", 0)
+        private = rollup.get("Private_Clean", 0) + rollup.get("Private_Dirty", 0)
+        return {
+            "rss_mb": round(rollup.get("Rss", 0) / 1024, 1),
+            "pss_mb": round(rollup.get("Pss", 0) / 1024, 1),
+            "shared_mb": round(shared / 1024, 1),
+            "private_mb": round(private / 1024, 1),
+        }
+
+    status = _read_kb_fields(proc / "status")
+    if status:
+        rss = status.get("VmRSS", 0) / 1024
+        return {
+            "rss_mb": round(rss, 1),
+            "pss_mb": round(rss, 1),
+            "shared_mb": 0.0,
+            "private_mb": round(rss, 1),
+        }
+
+    peak_mb = _ru_maxrss_mb()
+    return {
+        "rss_mb": round(peak_mb, 1),
+        "pss_mb": round(peak_mb, 1),
+        "shared_mb": 0.0,
+        "private_mb": round(peak_mb, 1),
+    }
+
+
+def _ru_maxrss_mb() -> float:
+    """Peak RSS of the current process over its whole lifetime, in MB."""
+    # ru_maxrss is in kB on Linux but in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the peak RSS counter of the current process (Linux only).
+
+    Returns:
+        True if the counter was reset, so ``get_peak_rss_mb`` measures from now
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def get_peak_rss_mb() -> float:
+    """
+    Get the peak RSS of the current process in MB.
+
+    Returns:
+        Peak since the last ``reset_peak_rss`` (or since the process started)
+    """
+    status = _read_kb_fields(Path("/proc/self/status"))
+    if "VmHWM" in status:
+        return round(status["VmHWM"] / 1024, 1)
+    return round(_ru_maxrss_mb(), 1)
+
+
+def release_freed_memory() -> None:
+    """Collect garbage and return freed heap pages to the OS where possible."""
+    gc.collect()
+    libc_name = ctypes.util.find_library("c")
+    if not libc_name:
+        return
+    try:
+        # glibc keeps freed arenas mapped; malloc_trim gives them back.
+        ctypes.CDLL(libc_name).malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
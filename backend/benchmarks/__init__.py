@@ -0,0 +1,3 @@
+"""
+Inference Benchmarks
+"""
@@ -0,0 +1,204 @@
+"""
+Comparison of Benchmark Results Against a Baseline
+
+Usage:
+    python -m benchmarks.inference --save-baseline benchmarks/baseline.json
+    python -m benchmarks.compare results.json benchmarks/baseline.json
+
+No baseline is committed: timings only compare on the machine that produced
+them, so generate the baseline there (first line) before comparing.
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.utils.logger import get_logger
+
+logger = get_logger("benchmarks")
+
+# Environment fields that make timings incomparable when they differ.
+ENVIRONMENT_KEYS = ("model", "torch", "transformers", "machine", "cpu_count")
+
+
+@dataclass
+class CaseComparison:
+    """Median latency of one case in the results and in the baseline."""
+
+    id: str
+    p50_ms: float
+    baseline_p50_ms: float
+
+    @property
+    def ratio(self) -> float:
+        """Latency relative to the baseline (above 1 is slower)."""
+        if self.baseline_p50_ms <= 0:
+            return 1.0
+        return self.p50_ms / self.baseline_p50_ms
+
+
+@dataclass
+class Comparison:
+    """Outcome of comparing results to a baseline."""
+
+    tolerance: float
+    cases: List[CaseComparison] = field(default_factory=list)
+    # Environment fields that differ: (key, results value, baseline value).
+    mismatches: List[Tuple[str, Any, Any]] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+
+    @property
+    def regressions(self) -> List[CaseComparison]:
+        """Cases slower than the baseline by more than the tolerance."""
+        return [case for case in self.cases if case.ratio > 1 + self.tolerance]
+
+    @property
+    def improvements(self) -> List[CaseComparison]:
+        """Cases faster than the baseline by more than the tolerance."""
+        return [case for case in self.cases if case.ratio < 1 - self.tolerance]
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.15
+) -> Comparison:
+    """
+    Compare the median latency of every case run in both.
+
+    Args:
+        results: Benchmark results (as written by ``benchmarks.inference``)
+        baseline: Stored baseline results
+        tolerance: Allowed relative slowdown (0.15: 15%)
+
+    Returns:
+        Per-case comparison
+    """
+    comparison = Comparison(tolerance=tolerance)
+    env = results.get("environment", {})
+    baseline_env = baseline.get("environment", {})
+    for key in ENVIRONMENT_KEYS:
+        if env.get(key) != baseline_env.get(key):
+            comparison.mismatches.append((key, env.get(key), baseline_env.get(key)))
+
+    baseline_cases = {case["id"]: case for case in baseline.get("cases", [])}
+    for case in results.get("cases", []):
+        reference = baseline_cases.get(case["id"])
+        if reference is None:
+            comparison.missing.append(case["id"])
+            continue
+        comparison.cases.append(
+            CaseComparison(case["id"], case["p50_ms"], reference["p50_ms"])
+        )
+    return comparison
+
+
+def format_comparison(comparison: Comparison) -> str:
+    """
+    Format a comparison as a table.
+
+    Args:
+        comparison: Result of ``compare``
+
+    Returns:
+        One line per case, regressions flagged
+    """
+    lines = []
+    for key, value, reference in comparison.mismatches:
+        lines.append(f"warning: {key} differs ({value} vs baseline {reference})")
+    width = max((len(case.id) for case in comparison.cases), default=4)
+    lines.append(f"{'case':<{width}}  {'p50 ms':>10}  {'baseline':>10}  change")
+    regressions = {case.id for case in comparison.regressions}
+    improvements = {case.id for case in comparison.improvements}
+    for case in comparison.cases:
+        flag = ""
+        if case.id in regressions:
+            flag = "  REGRESSION"
+        elif case.id in improvements:
+            flag = "  faster"
+        lines.append(
+            f"{case.id:<{width}}  {case.p50_ms:>10.2f}  "
+            f"{case.baseline_p50_ms:>10.2f}  {case.ratio - 1:+7.1%}{flag}"
+        )
+    for case_id in comparison.missing:
+        lines.append(f"{case_id:<{width}}  not in baseline")
+    return "\n".join(lines)
+
+
+def report(comparison: Comparison) -> int:
+    """
+    Log a comparison.
+
+    Returns:
+        Exit code: 0, or 1 if any case regressed
+    """
+    logger.info(f"Comparison with the baseline:\n{format_comparison(comparison)}")
+    if comparison.regressions:
+        logger.error(
+            f"{len(comparison.regressions)} of {len(comparison.cases)} cases are "
+            f"more than {comparison.tolerance:.0%} slower than the baseline"
+        )
+        return 1
+    logger.info(
+        f"No regression over {comparison.tolerance:.0%} "
+        f"in {len(comparison.cases)} cases"
+    )
+    return 0
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    """Read a results file."""
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def check_baseline(path: Path) -> bool:
+    """
+    Check that a baseline exists, explaining how to create it if not.
+
+    Returns:
+        Whether the baseline file exists
+    """
+    if Path(path).is_file():
+        return True
+    logger.error(
+        f"No baseline at {path}. Baselines are machine-specific and not "
+        "committed; create one on this machine first with "
+        f"python -m benchmarks.inference --save-baseline {path}"
+    )
+    return False
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Compare benchmark results against a baseline"
+    )
+    parser.add_argument("results", type=Path, help="Results JSON")
+    parser.add_argument("baseline", type=Path, help="Baseline results JSON")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="Allowed relative slowdown of the median latency",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Compare two results files.
+
+    Returns:
+        Exit code: 0, or 1 if any case regressed
+    """
+    args = parse_args(argv)
+    if not check_baseline(args.baseline):
+        return 1
+    return report(
+        compare(load_results(args.results), load_results(args.baseline), args.tolerance)
+    )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,389 @@
+"""
+Inference Latency and Throughput Benchmarks
+
+Usage:
+    python -m benchmarks.inference
+    python -m benchmarks.inference --model fine-tuned --beams 1 4 8
+    python -m benchmarks.inference --save-baseline benchmarks/baseline.json
+    python -m benchmarks.inference --baseline benchmarks/baseline.json
+
+Times ``ModelManager.translate`` (one text) and ``translate_batch`` (several
+texts) for every combination of input length, beam width, batch size, torch
+thread count and inference backend. By default the model is a randomly
+initialized tiny T5 built on the spot, so the suite runs offline in seconds;
+``--model fine-tuned`` benchmarks the model the server is configured with.
+Results are written as JSON and can be compared against a stored baseline
+(exit code 1 on a regression). No baseline is committed, since timings only
+compare on one machine: save one with ``--save-baseline`` first. Settings
+such as COMPILE_ENABLED or QUANTIZE_INT8 are read from the environment as
+usual, so variants are benchmarked by setting them.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import torch
+import transformers
+
+from app.core.bucketing import padding_stats
+from app.core.config import settings
+from app.core.generation import GenerationParams
+from app.core.model import ModelManager
+from app.utils.logger import get_logger
+from benchmarks.compare import check_baseline, compare, load_results, report
+from benchmarks.tiny_model import build_tiny_model
+
+logger = get_logger("benchmarks")
+
+# Source text of the inputs, cut to the requested number of words.
+TEXT = (
+    "The old lighthouse keeper climbed the stairs every evening to light the "
+    "lamp, and from the top he could see the fishing boats returning to the "
+    "harbour before the storm. His daughter wrote letters to him from the "
+    "city, where she worked in a small bookshop near the station, and he read "
+    "each one twice before putting it away in the drawer of his desk."
+).split()
+
+
+def make_text(words: int, row: int = 0) -> str:
+    """
+    Build an English input of a given number of words.
+
+    Args:
+        words: Number of words
+        row: Row of a batch; each row starts at a different word
+
+    Returns:
+        Text of ``words`` words
+    """
+    return " ".join(TEXT[(row * 7 + i) % len(TEXT)] for i in range(words))
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """One combination of the benchmarked dimensions."""
+
+    backend: str
+    threads: int
+    input_words: int
+    num_beams: int
+    batch_size: int
+
+    @property
+    def id(self) -> str:
+        """Stable name of the case, used to match it with the baseline."""
+        return (
+            f"{self.backend}/threads={self.threads}/words={self.input_words}"
+            f"/beams={self.num_beams}/batch={self.batch_size}"
+        )
+
+
+def build_cases(
+    backends: Sequence[str],
+    threads: Sequence[int],
+    lengths: Sequence[int],
+    beams: Sequence[int],
+    batch_sizes: Sequence[int],
+) -> List[BenchmarkCase]:
+    """Every combination of the dimensions, grouped by backend and threads."""
+    return [
+        BenchmarkCase(*values)
+        for values in itertools.product(backends, threads, lengths, beams, batch_sizes)
+    ]
+
+
+@contextmanager
+def configured(**overrides: Any) -> Iterator[None]:
+    """Override settings for the duration of a block."""
+    previous = {name: getattr(settings, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(settings, name, value)
+
+
+def measure(
+    manager: ModelManager,
+    case: BenchmarkCase,
+    max_new_tokens: int,
+    warmup: int,
+    repeats: int,
+) -> Dict[str, Any]:
+    """
+    Time one case.
+
+    Args:
+        manager: Loaded model manager
+        case: Case to run
+        max_new_tokens: Output length limit
+        warmup: Untimed calls before measuring
+        repeats: Timed calls
+
+    Returns:
+        Latency percentiles and throughput of the case
+    """
+    texts = [make_text(case.input_words, row) for row in range(case.batch_size)]
+    params = GenerationParams(num_beams=case.num_beams, max_new_tokens=max_new_tokens)
+
+    def call() -> None:
+        if case.batch_size == 1:
+            manager.translate(texts[0], params)
+        else:
+            manager.translate_batch(texts, params)
+
+    for _ in range(warmup):
+        call()
+    padding_stats.reset()
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+
+    samples = sorted(latency * 1000 for latency in latencies)
+    total = sum(latencies)
+    return {
+        "id": case.id,
+        **asdict(case),
+        "input_tokens": round(
+            statistics.fmean(manager.count_tokens(text) for text in texts), 1
+        ),
+        "repeats": repeats,
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[min(len(samples) - 1, len(samples) * 95 // 100)], 3),
+        "min_ms": round(samples[0], 3),
+        "texts_per_s": round(case.batch_size * repeats / total, 2),
+        "output_tokens_per_s": round(
+            padding_stats.snapshot()["output_tokens"] / total, 1
+        ),
+    }
+
+
+def load_model(backend: str, threads: int) -> ModelManager:
+    """
+    Load a model manager on a backend with a number of CPU threads.
+
+    Args:
+        backend: pytorch or onnxruntime
+        threads: Intra-op threads of torch (and ONNX Runtime)
+
+    Returns:
+        Loaded model manager
+    """
+    torch.set_num_threads(threads)
+    with configured(INFERENCE_BACKEND=backend, ORT_INTRA_OP_THREADS=threads):
+        manager = ModelManager()
+        manager.load()
+    return manager
+
+
+def run_cases(
+    cases: Sequence[BenchmarkCase], max_new_tokens: int, warmup: int, repeats: int
+) -> List[Dict[str, Any]]:
+    """
+    Run cases, loading the model once per backend and thread count.
+
+    Returns:
+        Measurements of every case, in order
+    """
+    results = []
+    for (backend, threads), group in itertools.groupby(
+        cases, key=lambda case: (case.backend, case.threads)
+    ):
+        manager = load_model(backend, threads)
+        try:
+            with configured(INFERENCE_BACKEND=backend):
+                for case in group:
+                    result = measure(manager, case, max_new_tokens, warmup, repeats)
+                    logger.info(
+                        f"{case.id}: p50 {result['p50_ms']:.1f} ms, "
+                        f"{result['texts_per_s']:.1f} texts/s"
+                    )
+                    results.append(result)
+        finally:
+            manager.cleanup()
+    return results
+
+
+def environment(model: str) -> Dict[str, Any]:
+    """Describe what the timings depend on."""
+    return {
+        "model": model,
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "transformers": transformers.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def export_tiny_onnx(directory: Path) -> bool:
+    """
+    Export the configured (tiny) model for the onnxruntime backend.
+
+    Returns:
+        Whether the export succeeded (optimum is an optional dependency)
+    """
+    from app.export_onnx import export_onnx
+
+    if (directory / "encoder_model.onnx").exists():
+        return True
+    try:
+        export_onnx(directory)
+    except ImportError as e:
+        logger.warning(f"Skipping the onnxruntime backend ({e})")
+        return False
+    return True
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark translation latency and throughput"
+    )
+    parser.add_argument(
+        "--model",
+        choices=["tiny", "fine-tuned"],
+        default="tiny",
+        help="Random tiny T5 built offline, or the configured fine-tuned model",
+    )
+    parser.add_argument(
+        "--work-dir",
+        type=Path,
+        default=None,
+        help="Directory for the tiny model and its ONNX export (kept for reuse)",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=["pytorch", "onnxruntime"],
+        default=["pytorch"],
+    )
+    parser.add_argument("--threads", nargs="+", type=int, default=[1])
+    parser.add_argument(
+        "--lengths", nargs="+", type=int, default=[8, 32, 96], help="Input words"
+    )
+    parser.add_argument("--beams", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8])
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("benchmark_results.json"),
+        help="Results JSON",
+    )
+    parser.add_argument(
+        "--baseline", type=Path, default=None, help="Baseline results to compare to"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="Allowed relative slowdown of the median latency",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        type=Path,
+        default=None,
+        help="Also store the results as the baseline at this path",
+    )
+    return parser.parse_args(argv)
+
+
+def run(args: argparse.Namespace, work_dir: Path) -> Dict[str, Any]:
+    """
+    Run the benchmarks described by the command line.
+
+    Args:
+        args: Parsed arguments
+        work_dir: Directory for the tiny model
+
+    Returns:
+        Results, as written to the output file
+    """
+    # Repeated inputs would all hit the token-id cache; time the tokenizer.
+    overrides: Dict[str, Any] = {"TOKEN_CACHE_SIZE": 0}
+    if args.model == "tiny":
+        tiny = build_tiny_model(work_dir)
+        overrides.update(
+            BASE_MODEL_CHECKPOINT=str(tiny.base),
+            MODEL_PATH=tiny.adapter,
+            TOKENIZER_PATH=tiny.tokenizer,
+            MODEL_BUNDLE_ENABLED=False,
+            ONNX_MODEL_PATH=work_dir / "onnx",
+        )
+
+    backends = list(args.backends)
+    with configured(**overrides):
+        if args.model == "tiny" and "onnxruntime" in backends:
+            if not export_tiny_onnx(settings.ONNX_MODEL_PATH):
+                backends.remove("onnxruntime")
+        cases = build_cases(
+            backends, args.threads, args.lengths, args.beams, args.batch_sizes
+        )
+        results = run_cases(cases, args.max_new_tokens, args.warmup, args.repeats)
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(args.model),
+        "max_new_tokens": args.max_new_tokens,
+        "cases": results,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the benchmarks, write the results and compare them to a baseline.
+
+    Returns:
+        Exit code: 0, or 1 if a case regressed against the baseline
+    """
+    args = parse_args(argv)
+    # Fail before running the suite rather than after it.
+    if (
+        args.baseline is not None
+        and args.baseline != args.save_baseline
+        and not check_baseline(args.baseline)
+    ):
+        return 1
+
+    if args.work_dir is not None:
+        args.work_dir.mkdir(parents=True, exist_ok=True)
+        results = run(args, args.work_dir)
+    else:
+        with tempfile.TemporaryDirectory() as work_dir:
+            results = run(args, Path(work_dir))
+
+    text = json.dumps(results, indent=2)
+    args.output.write_text(text, encoding="utf-8")
+    logger.info(f"Results of {len(results['cases'])} cases written to {args.output}")
+    if args.save_baseline is not None:
+        args.save_baseline.write_text(text, encoding="utf-8")
+        logger.info(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline is None:
+        return 0
+    return report(compare(results, load_results(args.baseline), args.tolerance))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,566 @@
+"""
+Production-replay Load Generator
+
+Usage:
+    python -m benchmarks.loadtest --local --qps 20 --duration 60
+    python -m benchmarks.loadtest --url http://localhost:8000 --concurrency 16
+    python -m benchmarks.loadtest --jsonl texts.jsonl --zipf 1.1 --url ... --qps 50
+
+Replays source texts sampled from the ``translations`` history table (or a
+JSONL file) against ``POST /translate``. The history records every request,
+repeats included, so rows drawn from it have the length mix and the repeat
+rate of real traffic; a JSONL file of distinct texts can be given a skewed
+repeat rate with ``--zipf``. Servers deployed for load tests should set
+``LOADTEST_BYPASS_MEMORY`` so that every request reaches the model rather
+than the translation memory or cache, and is not added to the history being
+replayed. Requests are sent at a target rate (open loop, Poisson arrivals)
+or by a fixed number of concurrent clients (closed loop). ``--local`` serves
+a random tiny T5 (see ``benchmarks.tiny_model``) on a free port with an
+empty database, for hermetic runs, with the memory bypassed unless
+``--use-memory`` asks to measure the full serving path. Reports
+throughput, latency percentiles, error and 429 rates, and latency by input
+length.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import httpx
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+from benchmarks.tiny_model import build_tiny_model
+
+logger = get_logger("benchmarks")
+
+# Longest text /translate accepts.
+MAX_TEXT_CHARS = 5000
+
+# Upper edges (in characters) of the input length bins of the report.
+LENGTH_BINS = (32, 64, 128, 256, 512, 1024, 2048, MAX_TEXT_CHARS)
+
+# Keys holding the source text in a JSONL line, in order of preference.
+JSONL_FIELDS = ("source_text", "text", "en")
+
+
+def load_db_texts(path: Path, limit: int) -> List[str]:
+    """
+    Read the most recent source texts of the translations history.
+
+    Args:
+        path: SQLite database file
+        limit: Maximum number of rows
+
+    Returns:
+        Source texts, newest first
+    """
+    with sqlite3.connect(f"file:{path}?mode=ro", uri=True) as connection:
+        rows = connection.execute(
+            "SELECT source_text FROM translations ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+def load_jsonl_texts(path: Path) -> List[str]:
+    """
+    Read source texts from a JSONL file.
+
+    Each line is an object with a ``source_text``, ``text`` or ``en`` key
+    (a translations table export, or an evaluation sample).
+
+    Args:
+        path: JSONL file
+
+    Returns:
+        Source texts, in file order
+    """
+    texts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = next((record[key] for key in JSONL_FIELDS if key in record), None)
+            if text is not None:
+                texts.append(text)
+    return texts
+
+
+def sample_texts(
+    pool: Sequence[str], count: int, seed: int = 0, zipf: Optional[float] = None
+) -> List[str]:
+    """
+    Draw the texts of a run, with replacement.
+
+    Every entry of the pool is equally likely, so texts repeated in the pool
+    (as in the history) are repeated in the run as often. With ``zipf``, the
+    distinct texts are ranked in a random order instead and drawn with
+    probability proportional to ``1 / rank ** zipf``, so a few texts make up
+    most of the load, as in real traffic. Blank texts and texts the endpoint
+    would reject for their length are left out.
+
+    Args:
+        pool: Candidate texts
+        count: Number of requests
+        seed: Seed of the draw
+        zipf: Exponent of the Zipf distribution (None draws uniformly)
+
+    Returns:
+        ``count`` texts
+    """
+    usable = [text for text in pool if text.strip() and len(text) <= MAX_TEXT_CHARS]
+    if len(usable) < len(pool):
+        logger.warning(f"Skipped {len(pool) - len(usable)} blank or over-long texts")
+    if not usable:
+        raise ValueError("No texts to replay")
+
+    rng = random.Random(seed)
+    if zipf is None:
+        return rng.choices(usable, k=count)
+    ranked = list(dict.fromkeys(usable))
+    rng.shuffle(ranked)
+    weights = [1 / rank**zipf for rank in range(1, len(ranked) + 1)]
+    return rng.choices(ranked, weights=weights, k=count)
+
+
+def repeat_rate(texts: Sequence[str]) -> float:
+    """Share of the texts that repeat an earlier one."""
+    return 1 - len(set(texts)) / len(texts) if texts else 0.0
+
+
+@dataclass
+class RequestResult:
+    """Outcome of one replayed request."""
+
+    chars: int
+    latency_s: float
+    # None when no response was received.
+    status: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the translation succeeded."""
+        return self.status is not None and 200 <= self.status < 300
+
+
+async def send(client: httpx.AsyncClient, text: str, scheduled: float) -> RequestResult:
+    """
+    Send one translation request.
+
+    Args:
+        client: Client bound to the server's base URL
+        text: Source text
+        scheduled: perf_counter() time the request was due; latency counts
+            from there, so a late client does not hide server slowness
+
+    Returns:
+        Status and latency of the request
+    """
+    try:
+        response = await client.post("/translate", json={"text": text})
+    except httpx.HTTPError as e:
+        return RequestResult(
+            len(text), time.perf_counter() - scheduled, error=type(e).__name__
+        )
+    return RequestResult(
+        len(text), time.perf_counter() - scheduled, status=response.status_code
+    )
+
+
+async def run_open_loop(
+    client: httpx.AsyncClient,
+    texts: Sequence[str],
+    qps: float,
+    seed: int = 0,
+) -> List[RequestResult]:
+    """
+    Send requests at a target rate, whatever the server's response times.
+
+    Arrivals follow a Poisson process, like independent users.
+
+    Args:
+        client: Client bound to the server's base URL
+        texts: Source text of each request
+        qps: Target requests per second
+        seed: Seed of the arrival times
+
+    Returns:
+        Result of each request, in sending order
+    """
+    rng = random.Random(seed)
+    loop = asyncio.get_running_loop()
+    due = time.perf_counter()
+    tasks = []
+    for text in texts:
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(loop.create_task(send(client, text, due)))
+        due += rng.expovariate(qps)
+    return list(await asyncio.gather(*tasks))
+
+
+async def run_closed_loop(
+    client: httpx.AsyncClient,
+    texts: Sequence[str],
+    concurrency: int,
+) -> List[RequestResult]:
+    """
+    Send requests from a fixed number of clients, each waiting for its reply.
+
+    Args:
+        client: Client bound to the server's base URL
+        texts: Source text of each request
+        concurrency: Number of concurrent clients
+
+    Returns:
+        Result of each request, in the order of ``texts``
+    """
+    results: List[Optional[RequestResult]] = [None] * len(texts)
+    positions = iter(range(len(texts)))
+
+    async def worker() -> None:
+        for i in positions:
+            results[i] = await send(client, texts[i], time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+
+def _percentiles(latencies: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Mean and percentiles, in milliseconds, of latencies in seconds."""
+    samples = sorted(latency * 1000 for latency in latencies)
+    if not samples:
+        return {"mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+
+    def at(fraction: float) -> float:
+        return round(samples[min(len(samples) - 1, int(len(samples) * fraction))], 2)
+
+    return {
+        "mean": round(statistics.fmean(samples), 2),
+        "p50": at(0.5),
+        "p95": at(0.95),
+        "p99": at(0.99),
+        "max": round(samples[-1], 2),
+    }
+
+
+def summarize(
+    results: Sequence[RequestResult],
+    duration: float,
+    bins: Sequence[int] = LENGTH_BINS,
+) -> Dict[str, Any]:
+    """
+    Summarize a run.
+
+    Args:
+        results: Result of every request
+        duration: Wall time of the run in seconds
+        bins: Upper edges of the input length bins, in characters
+
+    Returns:
+        Throughput, latency percentiles of successful requests, error and 429
+        rates, overall and per input length bin
+    """
+
+    def rates(group: Sequence[RequestResult]) -> Dict[str, Any]:
+        total = len(group)
+        rejected = sum(result.status == 429 for result in group)
+        failed = sum(not result.ok for result in group) - rejected
+        return {
+            "requests": total,
+            "succeeded": total - rejected - failed,
+            "error_rate": round(failed / total, 4) if total else 0.0,
+            "rejection_rate": round(rejected / total, 4) if total else 0.0,
+            "latency_ms": _percentiles(
+                [result.latency_s for result in group if result.ok]
+            ),
+        }
+
+    by_length = []
+    lower = 0
+    for upper in bins:
+        group = [result for result in results if lower < result.chars <= upper]
+        if group:
+            by_length.append({"chars": f"{lower + 1}-{upper}", **rates(group)})
+        lower = upper
+
+    statuses: Dict[str, int] = {}
+    for result in results:
+        key = str(result.status) if result.status is not None else result.error
+        statuses[key] = statuses.get(key, 0) + 1
+
+    overall = rates(results)
+    return {
+        "duration_s": round(duration, 3),
+        "offered_rps": round(len(results) / duration, 2) if duration else 0.0,
+        "throughput_rps": (
+            round(overall["succeeded"] / duration, 2) if duration else 0.0
+        ),
+        **overall,
+        "statuses": statuses,
+        "by_input_chars": by_length,
+    }
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Format a run summary as text, with one row per input length bin."""
+    latency = summary["latency_ms"]
+    lines = [
+        f"requests {summary['requests']} in {summary['duration_s']}s: "
+        f"offered {summary['offered_rps']} req/s, "
+        f"throughput {summary['throughput_rps']} req/s",
+        f"errors {summary['error_rate']:.2%}, 429s {summary['rejection_rate']:.2%}, "
+        f"statuses {summary['statuses']}",
+        f"latency ms: p50 {latency['p50']}  p95 {latency['p95']}  "
+        f"p99 {latency['p99']}  max {latency['max']}",
+        "",
+        f"{'chars':>10}  {'requests':>8}  {'p50 ms':>9}  {'p95 ms':>9}  "
+        f"{'p99 ms':>9}  {'errors':>7}  {'429s':>7}",
+    ]
+    for row in summary["by_input_chars"]:
+        latency = row["latency_ms"]
+        lines.append(
+            f"{row['chars']:>10}  {row['requests']:>8}  {str(latency['p50']):>9}  "
+            f"{str(latency['p95']):>9}  {str(latency['p99']):>9}  "
+            f"{row['error_rate']:>7.2%}  {row['rejection_rate']:>7.2%}"
+        )
+    return "\n".join(lines)
+
+
+def _free_port() -> int:
+    """Find a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def local_server(
+    work_dir: Path,
+    max_output_tokens: int,
+    bypass_memory: bool = True,
+    timeout: float = 120.0,
+) -> Iterator[str]:
+    """
+    Serve the app with a random tiny T5 and an empty database.
+
+    Args:
+        work_dir: Directory for the tiny model and the database
+        max_output_tokens: MAX_OUTPUT_LENGTH of the server; the random model
+            nearly always generates that many tokens
+        bypass_memory: Skip the translation memory, cache and history
+            (LOADTEST_BYPASS_MEMORY)
+        timeout: Seconds to wait for the model to load
+
+    Yields:
+        Base URL of the server
+    """
+    tiny = build_tiny_model(work_dir)
+    database = work_dir / "replay.db"
+    database.unlink(missing_ok=True)
+    port = _free_port()
+    env = {
+        **os.environ,
+        "BASE_MODEL_CHECKPOINT": str(tiny.base),
+        "MODEL_PATH": str(tiny.adapter),
+        "TOKENIZER_PATH": str(tiny.tokenizer),
+        "MODEL_BUNDLE_ENABLED": "false",
+        "INFERENCE_BACKEND": "pytorch",
+        "DATABASE_URL": f"sqlite+aiosqlite:///{database}",
+        "JOBS_ENABLED": "false",
+        "MAX_OUTPUT_LENGTH": str(max_output_tokens),
+        "LOADTEST_BYPASS_MEMORY": str(bypass_memory).lower(),
+    }
+    url = f"http://127.0.0.1:{port}"
+    logger.info(f"Starting a stand-in server on {url}")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        cwd=Path(__file__).resolve().parent.parent,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError("Stand-in server exited during startup")
+            try:
+                health = httpx.get(f"{url}/health", timeout=1.0).json()
+                if health.get("model_loaded"):
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("Stand-in server did not load the model in time")
+            time.sleep(0.5)
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def replay(
+    args: argparse.Namespace, url: str, texts: List[str]
+) -> Dict[str, Any]:
+    """
+    Replay texts against a server and summarize the run.
+
+    Args:
+        args: Parsed arguments
+        url: Base URL of the server
+        texts: Source text of each request
+
+    Returns:
+        Run summary
+    """
+    limits = httpx.Limits(max_connections=args.max_connections)
+    async with httpx.AsyncClient(
+        base_url=url, timeout=args.timeout, limits=limits
+    ) as client:
+        started = time.perf_counter()
+        if args.qps is not None:
+            results = await run_open_loop(client, texts, args.qps, args.seed)
+        else:
+            results = await run_closed_loop(client, texts, args.concurrency)
+        duration = time.perf_counter() - started
+    return summarize(results, duration)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Replay recorded translation requests against the API"
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--db",
+        type=Path,
+        default=settings.DATABASE_PATH,
+        help="SQLite database holding the translations history",
+    )
+    source.add_argument(
+        "--jsonl", type=Path, help="JSONL file of source texts instead of the DB"
+    )
+    parser.add_argument(
+        "--pool", type=int, default=10000, help="Most recent DB rows to sample from"
+    )
+    parser.add_argument(
+        "--zipf",
+        type=float,
+        default=None,
+        help="Draw distinct texts with Zipf-distributed frequencies of this "
+        "exponent (e.g. 1.1 for a JSONL file without repeats)",
+    )
+    parser.add_argument(
+        "--use-memory",
+        action="store_true",
+        help="With --local, let the server answer repeats from its translation "
+        "memory and cache, and record the requests in its history",
+    )
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument(
+        "--url", default="http://localhost:8000", help="Base URL of the server"
+    )
+    target.add_argument(
+        "--local",
+        action="store_true",
+        help="Serve a random tiny T5 locally and replay against it",
+    )
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--qps", type=float, help="Target requests per second")
+    load.add_argument(
+        "--concurrency", type=int, default=8, help="Number of concurrent clients"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=None, help="Number of requests to send"
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=60.0,
+        help="With --qps and no --requests, seconds of load to send",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument(
+        "--local-max-output-tokens",
+        type=int,
+        default=64,
+        help="Tokens generated per request by the stand-in model",
+    )
+    parser.add_argument(
+        "--work-dir", type=Path, default=None, help="Directory for --local"
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Summary JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Replay recorded requests and report the results.
+
+    Returns:
+        Exit code: 0, or 1 if there is nothing to replay or no request
+        succeeded
+    """
+    args = parse_args(argv)
+    if args.jsonl is not None:
+        pool = load_jsonl_texts(args.jsonl)
+    else:
+        pool = load_db_texts(args.db, args.pool)
+
+    count = args.requests
+    if count is None:
+        count = round(args.qps * args.duration) if args.qps else 500
+    try:
+        texts = sample_texts(pool, count, args.seed, args.zipf)
+    except ValueError as e:
+        logger.error(f"{e} in {args.jsonl or args.db}")
+        return 1
+    logger.info(
+        f"Replaying {count} requests sampled from {len(pool)} texts "
+        f"({'%g req/s' % args.qps if args.qps else f'{args.concurrency} clients'}), "
+        f"{repeat_rate(texts):.0%} repeats"
+    )
+
+    if args.local:
+        with tempfile.TemporaryDirectory() as tmp:
+            work_dir = args.work_dir or Path(tmp)
+            work_dir.mkdir(parents=True, exist_ok=True)
+            with local_server(
+                work_dir, args.local_max_output_tokens, not args.use_memory
+            ) as url:
+                summary = asyncio.run(replay(args, url, texts))
+    else:
+        summary = asyncio.run(replay(args, args.url, texts))
+
+    logger.info(f"Replay summary:\n{format_summary(summary)}")
+    if args.output is not None:
+        args.output.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        logger.info(f"Summary written to {args.output}")
+    return 0 if summary["succeeded"] else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -5,8 +5,20 @@ Pytest Configuration and Fixtures
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
-from app.core.database import get_db
+from app.core.database import Base, get_db
+from app.core.generation import GenerationParams
+from app.services.cache import translation_cache
+from app.services.translation import MemoryTranslation
+
+
+@pytest.fixture(autouse=True)
+def clear_translation_cache():
+    """Start every test with an empty translation cache."""
+    translation_cache.clear()
+    yield
+    translation_cache.clear()
 
 
 @pytest.fixture
@@ -35,6 +47,11 @@ def mock_model_manager():
     mock = MagicMock()
     mock.is_loaded = True
     mock.translate.return_value = "Hola mundo"
+    mock.translate_batch.side_effect = lambda texts, params=None: [
+        f"es:{t}" for t in texts
+    ]
+    mock.count_tokens.side_effect = lambda text: len(text.split())
+    mock.model_version = "test-version"
     mock.load.return_value = None
     mock.cleanup.return_value = None
     return mock
@@ -47,9 +64,27 @@ async def client():
     mock_manager = MagicMock()
     mock_manager.is_loaded = True
     mock_manager.translate.return_value = "Hola mundo"
+    mock_manager.model_version = "test-version"
+    mock_manager.is_quantized = False
+    mock_manager.is_compiled = False
+    mock_manager.weights_memory_mapped = False
+    mock_manager.load_timings = {"total": 1.0}
+    mock_manager.load_memory = {"peak_rss_mb": 512.0, "rss_mb": 400.0}
+    mock_manager.quantization_report = None
+    mock_manager.token_cache_stats = {}
     mock_manager.load.return_value = None
     mock_manager.cleanup.return_value = None
 
+    # Mock database session; lookups find nothing by default
+    mock_session = MagicMock()
+    mock_session.add = MagicMock()
+    mock_session.commit = AsyncMock()
+    mock_session.refresh = AsyncMock()
+    mock_session.rollback = AsyncMock()
+    lookup_result = MagicMock()
+    lookup_result.scalar_one_or_none.return_value = None
+    mock_session.execute = AsyncMock(return_value=lookup_result)
+
     # Patch the model manager in all modules before importing app
     with (
         patch("app.core.model.model_manager", mock_manager),
@@ -59,6 +94,15 @@ async def client():
 
         # Configure the mock service
         MockService.translate.return_value = "Hola mundo"
+        MockService.translate_async = AsyncMock(return_value="Hola mundo")
+        MockService.content_hash.return_value = "test-hash"
+        MockService.plan.return_value = GenerationParams(num_beams=8)
+        MockService.decoding_used.side_effect = lambda text, params: params
+        MockService.translate_with_memory = AsyncMock(
+            return_value=MemoryTranslation(
+                translation="Hola mundo", segments=2, segments_from_memory=1
+            )
+        )
 
         from httpx import ASGITransport, AsyncClient
 
@@ -68,10 +112,6 @@ async def client():
         with patch.object(app, "_mock_manager", mock_manager, create=True):
             # Override get_db dependency
             async def override_get_db():
-                mock_session = MagicMock()
-                mock_session.add = MagicMock()
-                mock_session.commit = AsyncMock()
-                mock_session.refresh = AsyncMock()
                 yield mock_session
 
             app.dependency_overrides[get_db] = override_get_db
@@ -81,6 +121,7 @@ async def client():
             ) as client:
                 client._mock_manager = mock_manager
                 client._mock_service = MockService
+                client._mock_session = mock_session
                 yield client
 
             # Clean up overrides
@@ -97,3 +138,21 @@ def sample_texts():
         "empty": "",
         "whitespace": "   ",
     }
+
+
+@pytest.fixture
+async def memory_engine():
+    """Create an in-memory SQLite database with the current schema."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db(memory_engine):
+    """Create a session on the in-memory database."""
+    session_factory = async_sessionmaker(memory_engine, expire_on_commit=False)
+    async with session_factory() as session:
+        yield session
@@ -0,0 +1,115 @@
+"""
+Admission Control Tests
+"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.core.admission import (
+    AdmissionController,
+    DeadlineExceeded,
+    Overloaded,
+    current_ticket,
+)
+from app.core.config import settings
+
+
+@pytest.fixture
+def controller():
+    """Admission controller with a queue of two and a 1s service time prior."""
+    with (
+        patch.object(settings, "ADMISSION_MAX_DEPTH", 2),
+        patch.object(settings, "ADMISSION_SERVICE_TIME_PRIOR_MS", 1000.0),
+    ):
+        yield AdmissionController()
+
+
+class TestAdmissionController:
+    """Tests for the bounded inference queue."""
+
+    def test_rejects_past_max_depth(self, controller):
+        """Test a full queue rejects with its drain time."""
+        first = controller.acquire()
+        controller.acquire()
+
+        with pytest.raises(Overloaded) as error:
+            controller.acquire()
+
+        assert error.value.depth == 2
+        # Two requests at the 1s prior.
+        assert error.value.retry_after == 2
+        controller.release(first)
+        controller.acquire()
+        snapshot = controller.snapshot()
+        assert snapshot["admitted"] == 3
+        assert snapshot["rejected"] == 1
+        assert snapshot["peak_depth"] == 2
+
+    def test_no_cap(self, controller):
+        """Test ADMISSION_MAX_DEPTH=0 admits everything."""
+        with patch.object(settings, "ADMISSION_MAX_DEPTH", 0):
+            for _ in range(10):
+                controller.acquire()
+
+        assert controller.snapshot()["depth"] == 10
+
+    def test_release_is_idempotent(self, controller):
+        """Test releasing a ticket twice frees one place."""
+        ticket = controller.acquire()
+        controller.acquire()
+
+        controller.release(ticket)
+        controller.release(ticket)
+
+        assert controller.snapshot()["depth"] == 1
+
+    def test_service_time_is_measured(self, controller):
+        """Test the service time follows departures from a busy queue."""
+        tickets = [controller.acquire(), controller.acquire()]
+        time.sleep(0.02)
+        for ticket in tickets:
+            controller.release(ticket)
+
+        snapshot = controller.snapshot()
+        # Much faster than the 1s prior.
+        assert 0 < snapshot["service_time_ms"] < 1000
+        assert snapshot["retry_after_s"] == 1
+
+    def test_expired_request_is_dropped(self, controller):
+        """Test a request past its deadline never reaches the model."""
+        with patch.object(settings, "ADMISSION_TIMEOUT_MS", 1.0):
+            ticket = controller.acquire()
+        time.sleep(0.01)
+
+        with pytest.raises(DeadlineExceeded):
+            controller.check(ticket)
+        assert controller.snapshot()["shed"] == 1
+
+    def test_started_request_is_not_dropped(self, controller):
+        """Test later work of a request already on the model goes through."""
+        with patch.object(settings, "ADMISSION_TIMEOUT_MS", 1.0):
+            ticket = controller.acquire()
+        controller.check(ticket)
+        time.sleep(0.01)
+
+        controller.check(ticket)
+
+        snapshot = controller.snapshot()
+        assert snapshot["shed"] == 0
+        assert snapshot["mean_wait_ms"] >= 0
+        assert controller.started == 1
+
+    def test_unadmitted_work_is_never_dropped(self, controller):
+        """Test work without a ticket (e.g. jobs) is let through."""
+        controller.check(None)
+        assert controller.snapshot()["shed"] == 0
+
+    def test_bind_sets_current_ticket(self, controller):
+        """Test the bound ticket is visible to inference calls, then cleared."""
+        ticket = controller.acquire()
+
+        with controller.bind(ticket):
+            assert current_ticket() is ticket
+        assert current_ticket() is None
@@ -1,4 +1,12 @@
+import json
+from unittest.mock import patch
+
 import pytest
+from prometheus_client import REGISTRY
+
+from app.core.admission import AdmissionController, DeadlineExceeded
+from app.core.config import settings
+from app.core.generation import GenerationParams
 
 
 class TestTranslateEndpoint:
@@ -13,6 +21,50 @@ class TestTranslateEndpoint:
         assert "translation" in data
         assert data["translation"] == "Hola mundo"
 
+    @pytest.mark.asyncio
+    async def test_translate_generation_controls(self, client):
+        """Test request controls are planned and the strategy is reported."""
+        client._mock_service.plan.return_value = GenerationParams(num_beams=1)
+
+        response = await client.post(
+            "/translate",
+            json={
+                "text": "Hello world",
+                "num_beams": 4,
+                "max_new_tokens": 32,
+                "latency_budget_ms": 50,
+            },
+        )
+
+        data = response.json()
+        assert data["strategy"] == "greedy"
+        assert data["num_beams"] == 1
+        client._mock_service.plan.assert_called_once_with(
+            "Hello world", num_beams=4, max_new_tokens=32, latency_budget_ms=50
+        )
+
+    @pytest.mark.asyncio
+    async def test_translate_reports_decoding_used(self, client):
+        """Test a beam search request that kept greedy outputs reports greedy."""
+        client._mock_service.decoding_used.side_effect = None
+        client._mock_service.decoding_used.return_value = GenerationParams(1)
+
+        response = await client.post("/translate", json={"text": "Hello world"})
+
+        data = response.json()
+        assert (data["strategy"], data["num_beams"]) == ("greedy", 1)
+        client._mock_service.decoding_used.assert_called_once_with(
+            "Hello world", GenerationParams(num_beams=8)
+        )
+
+    @pytest.mark.asyncio
+    async def test_translate_rejects_invalid_controls(self, client):
+        """Test non-positive controls are rejected."""
+        response = await client.post(
+            "/translate", json={"text": "Hello", "num_beams": 0}
+        )
+        assert response.status_code == 422
+
     @pytest.mark.asyncio
     async def test_translate_saves_to_db(self, client):
         """Test that translation is saved to the database."""
@@ -29,6 +81,104 @@ class TestTranslateEndpoint:
         response = await client.post("/translate", json={"text": "Save me"})
         assert response.status_code == 200
 
+    @pytest.mark.asyncio
+    async def test_translate_served_from_memory(self, client):
+        """Test a remembered translation skips the model."""
+        lookup = client._mock_session.execute.return_value
+        lookup.scalar_one_or_none.return_value = "Hola de memoria"
+
+        response = await client.post("/translate", json={"text": "Hello world"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["translation"] == "Hola de memoria"
+        assert data["from_memory"] is True
+        client._mock_service.translate_with_memory.assert_not_called()
+        # The request is still recorded in the history.
+        saved = client._mock_session.add.call_args[0][0]
+        assert (saved.source_text, saved.translated_text) == (
+            "Hello world",
+            "Hola de memoria",
+        )
+
+    @pytest.mark.asyncio
+    async def test_translate_miss_is_stored_with_hash(self, client):
+        """Test a fresh translation is saved with its hash and model version."""
+        response = await client.post("/translate", json={"text": "Hello world"})
+
+        assert response.status_code == 200
+        assert response.json()["from_memory"] is False
+        saved = client._mock_session.add.call_args[0][0]
+        assert saved.content_hash == "test-hash"
+        assert saved.model_version == "test-version"
+
+    @pytest.mark.asyncio
+    async def test_translate_reports_sentence_memory(self, client):
+        """Test the response reports the share of sentences from memory."""
+        response = await client.post("/translate", json={"text": "Hi. Bye."})
+
+        data = response.json()
+        assert data["segments"] == 2
+        assert data["segments_from_memory"] == 1
+        assert data["memory_fraction"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_translate_without_sentence_memory(self, client):
+        """Test the whole text goes to the model when sentence memory is off."""
+        with patch.object(settings, "SENTENCE_MEMORY_ENABLED", False):
+            response = await client.post("/translate", json={"text": "Hi. Bye."})
+
+        data = response.json()
+        assert data["translation"] == "Hola mundo"
+        assert data["segments"] is None
+        client._mock_service.translate_async.assert_awaited_once_with(
+            "Hi. Bye.", client._mock_service.plan.return_value, use_cache=True
+        )
+        client._mock_service.translate_with_memory.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_translate_bypassing_memory(self, client):
+        """Test load-test deployments skip the memory, cache and history."""
+        lookup = client._mock_session.execute.return_value
+        lookup.scalar_one_or_none.return_value = "Hola de memoria"
+
+        with patch.object(settings, "LOADTEST_BYPASS_MEMORY", True):
+            response = await client.post("/translate", json={"text": "Hi. Bye."})
+
+        data = response.json()
+        assert data["translation"] == "Hola mundo"
+        assert data["from_memory"] is False
+        client._mock_service.translate_async.assert_awaited_once_with(
+            "Hi. Bye.", client._mock_service.plan.return_value, use_cache=False
+        )
+        client._mock_service.translate_with_memory.assert_not_called()
+        client._mock_session.execute.assert_not_called()
+        client._mock_session.add.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_clients_cannot_bypass_memory(self, client):
+        """Test a request cannot opt itself out of the memory."""
+        lookup = client._mock_session.execute.return_value
+        lookup.scalar_one_or_none.return_value = "Hola de memoria"
+
+        response = await client.post(
+            "/translate", json={"text": "Hi. Bye.", "use_memory": False}
+        )
+
+        data = response.json()
+        assert data["translation"] == "Hola de memoria"
+        assert data["from_memory"] is True
+
+    @pytest.mark.asyncio
+    async def test_translate_memory_lookup_failure(self, client):
+        """Test a failing lookup falls back to the model."""
+        client._mock_session.execute.side_effect = RuntimeError("db down")
+
+        response = await client.post("/translate", json={"text": "Hello world"})
+
+        assert response.status_code == 200
+        assert response.json()["translation"] == "Hola mundo"
+
     @pytest.mark.asyncio
     async def test_translate_empty_text(self, client):
         """Test translation with empty text."""
@@ -73,6 +223,337 @@ class TestTranslateEndpoint:
         assert "translation" in data
 
 
+def _fake_stream(*chunks):
+    """Build a stand-in for TranslationService.translate_stream."""
+
+    async def translate_stream(text, params=None, cancel=None, use_cache=True):
+        for chunk in chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    return translate_stream
+
+
+def _sse_events(body):
+    """Parse a server-sent event stream into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestAdmission:
+    """Tests for rejecting requests when the inference queue is full."""
+
+    @pytest.fixture
+    def full_queue(self):
+        """Fill a one-place inference queue."""
+        controller = AdmissionController()
+        with (
+            patch("app.api.routes.admission_controller", controller),
+            patch.object(settings, "ADMISSION_MAX_DEPTH", 1),
+            patch.object(settings, "ADMISSION_SERVICE_TIME_PRIOR_MS", 1500.0),
+        ):
+            controller.acquire()
+            yield controller
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "path, body",
+        [
+            ("/translate", {"text": "Hello"}),
+            ("/translate/stream", {"text": "Hello"}),
+            ("/translate/batch", {"texts": ["Hello"]}),
+        ],
+    )
+    async def test_full_queue_returns_429(self, client, full_queue, path, body):
+        """Test every inference endpoint rejects with Retry-After."""
+        response = await client.post(path, json=body)
+
+        assert response.status_code == 429
+        # One request ahead at 1.5s each.
+        assert response.headers["retry-after"] == "2"
+        assert full_queue.snapshot()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_translation_memory_hit_is_not_queued(self, client, full_queue):
+        """Test remembered translations are served even when the queue is full."""
+        client._mock_session.execute.return_value.scalar_one_or_none.return_value = (
+            "Hola"
+        )
+
+        response = await client.post("/translate", json={"text": "Hello"})
+
+        assert response.status_code == 200
+        assert response.json()["from_memory"] is True
+
+    @pytest.mark.asyncio
+    async def test_places_are_released(self, client):
+        """Test every endpoint frees its place once done."""
+        controller = AdmissionController()
+        client._mock_service.translate_stream = _fake_stream("Hola")
+        client._mock_service.translate_many = _fake_translate_many([0])
+        client._mock_service.content_hash.side_effect = lambda text, params=None: text
+        client._mock_session.execute.return_value.all.return_value = []
+
+        with patch("app.api.routes.admission_controller", controller):
+            await client.post("/translate", json={"text": "Hello"})
+            await client.post("/translate/stream", json={"text": "Hello"})
+            await client.post("/translate/batch", json={"texts": ["Hello"]})
+
+        snapshot = controller.snapshot()
+        assert snapshot["admitted"] == 3
+        assert snapshot["depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_expired_request_returns_503(self, client):
+        """Test a request dropped before reaching the model is a 503."""
+        client._mock_service.translate_with_memory.side_effect = DeadlineExceeded()
+
+        response = await client.post("/translate", json={"text": "Hello"})
+
+        assert response.status_code == 503
+        assert "retry-after" in response.headers
+
+
+class TestTranslateStreamEndpoint:
+    """Tests for the streaming translate endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_sse_streams_chunks_then_done(self, client):
+        """Test chunks arrive as events and the result is saved."""
+        client._mock_service.translate_stream = _fake_stream("Hola ", "mundo")
+
+        response = await client.post("/translate/stream", json={"text": "Hello world"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _sse_events(response.text)
+        assert events[:2] == [
+            ("chunk", {"text": "Hola "}),
+            ("chunk", {"text": "mundo"}),
+        ]
+        assert events[2] == (
+            "done",
+            {
+                "translation": "Hola mundo",
+                "from_memory": False,
+                "strategy": "beam",
+                "num_beams": 8,
+            },
+        )
+        client._mock_session.add.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_sse_serves_translation_memory(self, client):
+        """Test a remembered translation is sent as one chunk."""
+        client._mock_session.execute.return_value.scalar_one_or_none.return_value = (
+            "Hola mundo"
+        )
+
+        response = await client.post("/translate/stream", json={"text": "Hello world"})
+
+        events = _sse_events(response.text)
+        assert events[0] == ("chunk", {"text": "Hola mundo"})
+        assert events[1][1]["from_memory"] is True
+
+    @pytest.mark.asyncio
+    async def test_sse_reports_errors_as_events(self, client):
+        """Test a failure mid-stream ends with an error event."""
+        client._mock_service.translate_stream = _fake_stream(
+            "Hola ", RuntimeError("boom")
+        )
+
+        response = await client.post("/translate/stream", json={"text": "Hello world"})
+
+        events = _sse_events(response.text)
+        assert events[-1] == ("error", {"error": "Translation error"})
+        client._mock_session.add.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_sse_validates_before_streaming(self, client):
+        """Test empty input and an unloaded model are plain HTTP errors."""
+        response = await client.post("/translate/stream", json={"text": "   "})
+        assert response.status_code == 400
+
+        client._mock_manager.is_loaded = False
+        response = await client.post("/translate/stream", json={"text": "Hello"})
+        assert response.status_code == 503
+
+    @pytest.mark.asyncio
+    async def test_websocket_streams_events(self, client):
+        """Test the WebSocket endpoint sends the same events as JSON."""
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+
+        client._mock_service.translate_stream = _fake_stream("Hola ", "mundo")
+
+        with TestClient(app).websocket_connect("/translate/stream") as websocket:
+            websocket.send_json({"text": "Hello world", "num_beams": 1})
+            messages = [websocket.receive_json() for _ in range(3)]
+
+        assert messages[0] == {"type": "chunk", "text": "Hola "}
+        assert messages[2]["type"] == "done"
+        assert messages[2]["translation"] == "Hola mundo"
+
+    @pytest.mark.asyncio
+    async def test_websocket_rejects_invalid_request(self, client):
+        """Test an invalid first message gets an error event."""
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+
+        with TestClient(app).websocket_connect("/translate/stream") as websocket:
+            websocket.send_json({"text": "Hello", "num_beams": 0})
+            message = websocket.receive_json()
+
+        assert message["type"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_websocket_rejects_empty_text(self, client):
+        """Test empty input is closed as invalid data, not a server error."""
+        from fastapi.testclient import TestClient
+        from starlette.websockets import WebSocketDisconnect
+
+        from app.main import app
+
+        with TestClient(app).websocket_connect("/translate/stream") as websocket:
+            websocket.send_json({"text": "   "})
+            message = websocket.receive_json()
+            with pytest.raises(WebSocketDisconnect) as closed:
+                websocket.receive_json()
+
+        assert message == {"type": "error", "error": "Empty input"}
+        assert closed.value.code == 1007
+
+
+def _fake_translate_many(order):
+    """Build a stand-in for TranslationService.translate_many."""
+
+    async def translate_many(texts, params=None):
+        from app.services.translation import BatchTranslation
+
+        for i in order:
+            yield BatchTranslation(index=i, translation=f"es:{texts[i]}")
+
+    return translate_many
+
+
+class TestTranslateBatchEndpoint:
+    """Tests for the batch translate endpoint."""
+
+    @pytest.fixture
+    def batch_client(self, client):
+        """Give every text its own hash and an empty translation memory."""
+        client._mock_service.content_hash.side_effect = lambda text, params=None: (
+            f"h:{text}"
+        )
+        client._mock_session.execute.return_value.all.return_value = []
+        return client
+
+    @pytest.mark.asyncio
+    async def test_streams_ndjson_in_completion_order(self, batch_client):
+        """Test one line per text, tagged with its index, as results finish."""
+        batch_client._mock_service.translate_many = _fake_translate_many([1, 0])
+
+        response = await batch_client.post(
+            "/translate/batch", json={"texts": ["Hello", "Bye"], "num_beams": 1}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines == [
+            {"index": 1, "translation": "es:Bye", "from_memory": False},
+            {"index": 0, "translation": "es:Hello", "from_memory": False},
+        ]
+        assert response.headers["x-num-beams"] == "8"
+        batch_client._mock_service.plan.assert_called_once_with(
+            "", num_beams=1, max_new_tokens=None
+        )
+
+    @pytest.mark.asyncio
+    async def test_history_is_saved_in_one_commit(self, batch_client):
+        """Test the whole batch is persisted together."""
+        batch_client._mock_service.translate_many = _fake_translate_many([0, 1])
+
+        await batch_client.post("/translate/batch", json={"texts": ["Hello", "Bye"]})
+
+        session = batch_client._mock_session
+        session.commit.assert_awaited_once()
+        rows = session.execute.await_args_list[-1].args[1]
+        assert [row["content_hash"] for row in rows] == ["h:Hello", "h:Bye"]
+
+    @pytest.mark.asyncio
+    async def test_memory_hits_come_first(self, batch_client):
+        """Test remembered texts are answered before the rest is translated."""
+        batch_client._mock_session.execute.return_value.all.return_value = [
+            ("h:Bye", "Adiós")
+        ]
+        seen = []
+
+        async def translate_many(texts, params=None):
+            from app.services.translation import BatchTranslation
+
+            seen.extend(texts)
+            yield BatchTranslation(index=0, translation="Hola")
+
+        batch_client._mock_service.translate_many = translate_many
+
+        response = await batch_client.post(
+            "/translate/batch", json={"texts": ["Hello", "Bye"]}
+        )
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0] == {"index": 1, "translation": "Adiós", "from_memory": True}
+        assert lines[1]["index"] == 0
+        assert seen == ["Hello"]
+        rows = batch_client._mock_session.execute.await_args_list[-1].args[1]
+        assert [row["source_text"] for row in rows] == ["Bye", "Hello"]
+
+    @pytest.mark.asyncio
+    async def test_item_errors_are_reported_per_line(self, batch_client):
+        """Test a failed text does not fail the batch."""
+
+        async def translate_many(texts, params=None):
+            from app.services.translation import BatchTranslation
+
+            yield BatchTranslation(index=0, error="Text cannot be empty")
+            yield BatchTranslation(index=1, translation="Hola")
+
+        batch_client._mock_service.translate_many = translate_many
+
+        response = await batch_client.post(
+            "/translate/batch", json={"texts": [" ", "Hello"]}
+        )
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0] == {"index": 0, "error": "Text cannot be empty"}
+        assert lines[1]["translation"] == "Hola"
+
+    @pytest.mark.asyncio
+    async def test_batch_size_limits(self, batch_client):
+        """Test empty and oversized batches are rejected."""
+        response = await batch_client.post("/translate/batch", json={"texts": []})
+        assert response.status_code == 422
+
+        texts = ["Hello"] * (settings.MAX_BATCH_TEXTS + 1)
+        response = await batch_client.post("/translate/batch", json={"texts": texts})
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_model_not_loaded(self, batch_client):
+        """Test the endpoint waits for the model like /translate."""
+        batch_client._mock_manager.is_loaded = False
+
+        response = await batch_client.post("/translate/batch", json={"texts": ["Hi"]})
+
+        assert response.status_code == 503
+
+
 class TestHealthEndpoint:
     """Tests for the health check endpoint."""
 
@@ -87,6 +568,68 @@ class TestHealthEndpoint:
         assert "model_loaded" in data
 
 
+class TestStatsEndpoint:
+    """Tests for the inference statistics endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_stats_reports_batching(self, client):
+        """Test stats expose the micro-batching statistics."""
+        response = await client.get("/stats")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "batch_size_histogram" in data["batching"]
+        assert "recent_batch_sizes" in data["batching"]
+        assert "rss_mb" in data["process"]
+        assert "hit_rate" in data["cache"]
+        assert "hit_rate" in data["memory"]
+        assert data["model"]["version"] == "test-version"
+        assert data["model"]["quantized"] is False
+        assert "bucket_hit_rate" in data["compile"]
+        assert "strategies" in data["generation"]
+        assert "escalation_rate" in data["cascade"]
+        assert "ttft_ms" in data["streaming"]
+        assert "input_efficiency" in data["padding"]
+        assert "tokenize" in data["tokenization"]["phases"]
+        assert "retry_after_s" in data["admission"]
+        assert "coalesced" in data["dedup"]
+
+
+class TestMetricsEndpoint:
+    """Tests for the Prometheus metrics endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_metrics_report_requests(self, client):
+        """Test served requests appear in the request histogram."""
+        await client.post("/translate", json={"text": "Hello world"})
+
+        response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'translatica_request_seconds_count{endpoint="translate"}' in (
+            response.text
+        )
+        assert 'translatica_phase_seconds_count{phase="db_persist"}' in response.text
+
+    @pytest.mark.asyncio
+    async def test_rejections_are_counted(self, client):
+        """Test requests rejected with a 429 count as errors."""
+        labels = {"endpoint": "translate", "reason": "overloaded"}
+        before = REGISTRY.get_sample_value("translatica_errors_total", labels) or 0.0
+
+        with patch.object(settings, "ADMISSION_MAX_DEPTH", 1):
+            controller = AdmissionController()
+            controller.acquire()
+            with patch("app.api.routes.admission_controller", controller):
+                response = await client.post("/translate", json={"text": "Hello"})
+
+        assert response.status_code == 429
+        assert REGISTRY.get_sample_value("translatica_errors_total", labels) == (
+            before + 1
+        )
+
+
 class TestAPIDocumentation:
     """Tests for API documentation."""
 
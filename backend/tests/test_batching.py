@@ -0,0 +1,206 @@
+"""
+Micro-batching Scheduler Tests
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.admission import AdmissionController, DeadlineExceeded
+from app.core.batching import BatchScheduler, BatchStats, PendingRequest
+from app.core.executor import InferenceExecutor
+from app.core.generation import GenerationParams
+
+
+@pytest.fixture
+def batch_manager():
+    """Create a mock model manager that records batched calls."""
+    manager = MagicMock()
+    manager.count_tokens.side_effect = lambda text: len(text.split())
+    manager.translate_batch.side_effect = lambda texts, params=None: [
+        t.upper() for t in texts
+    ]
+    return manager
+
+
+@pytest.fixture
+def executor():
+    """Create an inference executor and shut it down afterwards."""
+    executor = InferenceExecutor()
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def scheduler(batch_manager, executor):
+    """Create a running scheduler and stop it afterwards."""
+    scheduler = BatchScheduler(batch_manager, executor)
+    with (
+        patch("app.core.batching.settings.BATCH_WINDOW_MS", 200.0),
+        patch("app.core.batching.settings.MAX_BATCH_SIZE", 4),
+        patch("app.core.batching.settings.MAX_BATCH_TOKENS", 4096),
+    ):
+        scheduler.start()
+        yield scheduler
+        scheduler.stop()
+
+
+class TestBatchScheduler:
+    """Tests for request coalescing."""
+
+    def test_submit_not_running(self, batch_manager, executor):
+        """Test that submitting to a stopped scheduler fails."""
+        scheduler = BatchScheduler(batch_manager, executor)
+        with pytest.raises(RuntimeError, match="not running"):
+            scheduler.submit("hello")
+
+    def test_translate_single(self, scheduler, batch_manager):
+        """Test a lone request is dispatched once the window elapses."""
+        assert scheduler.translate("hello") == "HELLO"
+        batch_manager.translate_batch.assert_called_once_with(["hello"], None)
+
+    def test_concurrent_requests_are_coalesced(self, scheduler, batch_manager):
+        """Test concurrent requests share one batched generation."""
+        texts = ["one", "two", "three", "four"]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(scheduler.translate, texts))
+
+        assert results == ["ONE", "TWO", "THREE", "FOUR"]
+        assert batch_manager.translate_batch.call_count == 1
+        assert scheduler.stats.snapshot()["batch_size_histogram"] == {"4": 1}
+
+    def test_max_batch_size_splits_batches(self, scheduler, batch_manager):
+        """Test batches never exceed MAX_BATCH_SIZE."""
+        futures = [scheduler.submit(f"text {i}") for i in range(6)]
+        results = [future.result(timeout=5) for future in futures]
+
+        assert results == [f"TEXT {i}" for i in range(6)]
+        sizes = [len(c.args[0]) for c in batch_manager.translate_batch.call_args_list]
+        assert max(sizes) <= 4
+        assert sum(sizes) == 6
+
+    def test_token_budget_splits_batches(self, scheduler, batch_manager):
+        """Test the padded token budget starts a new batch."""
+        with patch("app.core.batching.settings.MAX_BATCH_TOKENS", 5):
+            futures = [scheduler.submit("a b c") for _ in range(3)]
+            [future.result(timeout=5) for future in futures]
+
+        # Three tokens each: only one item fits under a budget of five.
+        assert batch_manager.translate_batch.call_count == 3
+
+    def test_decoding_settings_split_batches(self, scheduler, batch_manager):
+        """Test requests only share a batch with the same decoding settings."""
+        greedy = GenerationParams(num_beams=1)
+        futures = [
+            scheduler.submit("one"),
+            scheduler.submit("two", greedy),
+            scheduler.submit("three"),
+        ]
+        results = [future.result(timeout=5) for future in futures]
+
+        assert results == ["ONE", "TWO", "THREE"]
+        calls = [c.args for c in batch_manager.translate_batch.call_args_list]
+        assert calls == [(["one", "three"], None), (["two"], greedy)]
+
+    def test_batch_error_propagates(self, scheduler, batch_manager):
+        """Test a failed generation fails every request in the batch."""
+        batch_manager.translate_batch.side_effect = RuntimeError("boom")
+
+        future = scheduler.submit("hello")
+        with pytest.raises(RuntimeError, match="boom"):
+            future.result(timeout=5)
+
+    def test_cancelled_requests_are_dropped(self, scheduler, batch_manager):
+        """Test a cancelled request neither runs nor stalls its batch."""
+        cancelled = scheduler.submit("a")
+        live = scheduler.submit("b")
+        cancelled.cancel()
+
+        assert live.result(timeout=3) == "B"
+        assert cancelled.cancelled()
+        batch_manager.translate_batch.assert_called_once_with(["b"], None)
+
+    def test_cancelled_during_stop(self, batch_manager, executor):
+        """Test stopping skips requests that were cancelled meanwhile."""
+        scheduler = BatchScheduler(batch_manager, executor)
+        scheduler._running = True
+        cancelled = scheduler.submit("a")
+        pending = scheduler.submit("b")
+        cancelled.cancel()
+
+        scheduler.stop()
+
+        assert cancelled.cancelled()
+        with pytest.raises(RuntimeError, match="stopped"):
+            pending.result(timeout=5)
+
+    def test_stop_fails_pending_requests(self, batch_manager, executor):
+        """Test requests still queued at shutdown are failed."""
+        scheduler = BatchScheduler(batch_manager, executor)
+        # Mark as running without a worker so the request stays queued.
+        scheduler._running = True
+        future = scheduler.submit("hello")
+
+        scheduler.stop()
+
+        assert not scheduler.is_running
+        with pytest.raises(RuntimeError, match="stopped"):
+            future.result(timeout=5)
+        batch_manager.translate_batch.assert_not_called()
+
+    def test_batches_run_on_executor(self, scheduler, batch_manager):
+        """Test generation runs on an inference thread, not the worker."""
+        thread_names = []
+        batch_manager.translate_batch.side_effect = lambda texts, params=None: (
+            thread_names.append(threading.current_thread().name) or texts
+        )
+
+        scheduler.translate("hello")
+
+        assert thread_names[0].startswith("inference")
+
+    def test_expired_requests_are_dropped(self, scheduler, batch_manager):
+        """Test requests past their admission deadline skip generation."""
+        controller = AdmissionController()
+        with (
+            patch("app.core.batching.admission_controller", controller),
+            patch("app.core.admission.settings.ADMISSION_TIMEOUT_MS", 1.0),
+        ):
+            ticket = controller.acquire()
+            with controller.bind(ticket):
+                expired = scheduler.submit("late")
+            live = scheduler.submit("hello")
+
+            with pytest.raises(DeadlineExceeded):
+                expired.result(timeout=5)
+            assert live.result(timeout=5) == "HELLO"
+
+        batch_manager.translate_batch.assert_called_once_with(["hello"], None)
+        assert controller.snapshot()["shed"] == 1
+
+
+class TestBatchStats:
+    """Tests for batch statistics."""
+
+    def test_snapshot_empty(self):
+        """Test an empty snapshot."""
+        snapshot = BatchStats().snapshot()
+        assert snapshot["batches"] == 0
+        assert snapshot["mean_batch_size"] == 0.0
+        assert snapshot["mean_queue_wait_ms"] == 0.0
+
+    def test_record(self):
+        """Test recording batches updates sizes and waits."""
+        stats = BatchStats(history=2)
+        for size in (1, 3, 3):
+            batch = [PendingRequest(text="x", enqueued_at=0.0) for _ in range(size)]
+            stats.record(batch, dispatched_at=0.5)
+
+        snapshot = stats.snapshot()
+        assert snapshot["batches"] == 3
+        assert snapshot["requests"] == 7
+        assert snapshot["batch_size_histogram"] == {"1": 1, "3": 2}
+        assert snapshot["recent_batch_sizes"] == [3, 3]
+        assert snapshot["max_queue_wait_ms"] == 500.0
@@ -0,0 +1,158 @@
+"""
+Inference Benchmark Suite Tests
+"""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+import torch
+from transformers import AutoTokenizer
+
+from app.core.config import settings
+from benchmarks.compare import compare, format_comparison, main, report
+from benchmarks.inference import (
+    BenchmarkCase,
+    build_cases,
+    configured,
+    make_text,
+    measure,
+    parse_args,
+    run,
+)
+
+
+@pytest.fixture
+def shipped_tokenizer():
+    """Skip unless the tokenizer in the repository loads with this transformers."""
+    try:
+        AutoTokenizer.from_pretrained(settings.TOKENIZER_PATH)
+    except Exception as e:
+        pytest.skip(f"Tokenizer at {settings.TOKENIZER_PATH} does not load: {e}")
+
+
+def results(*cases, model="tiny"):
+    """Results holding (id, p50_ms) cases."""
+    return {
+        "environment": {"model": model},
+        "cases": [{"id": case_id, "p50_ms": p50} for case_id, p50 in cases],
+    }
+
+
+class TestCases:
+    """Tests for building and running benchmark cases."""
+
+    def test_make_text(self):
+        """Test inputs have the requested number of words, varying per row."""
+        assert len(make_text(50).split()) == 50
+        assert make_text(8, row=0) != make_text(8, row=1)
+
+    def test_build_cases(self):
+        """Test every combination is run, grouped by backend and threads."""
+        cases = build_cases(["pytorch"], [1, 2], [8, 32], [1, 4], [1])
+
+        assert len(cases) == 8
+        assert [case.threads for case in cases] == [1, 1, 1, 1, 2, 2, 2, 2]
+        assert cases[0].id == "pytorch/threads=1/words=8/beams=1/batch=1"
+
+    def test_configured_restores_settings(self):
+        """Test overridden settings are restored after the block."""
+        before = settings.TOKEN_CACHE_SIZE
+
+        with configured(TOKEN_CACHE_SIZE=0):
+            assert settings.TOKEN_CACHE_SIZE == 0
+
+        assert settings.TOKEN_CACHE_SIZE == before
+
+    def test_measure_single_text_and_batch(self):
+        """Test one text goes through translate and several through translate_batch."""
+        manager = MagicMock()
+        manager.count_tokens.return_value = 12
+
+        single = measure(
+            manager, BenchmarkCase("pytorch", 1, 8, 1, 1), 16, warmup=1, repeats=3
+        )
+        batch = measure(
+            manager, BenchmarkCase("pytorch", 1, 8, 4, 2), 16, warmup=0, repeats=2
+        )
+
+        assert manager.translate.call_count == 4
+        assert manager.translate_batch.call_count == 2
+        texts, params = manager.translate_batch.call_args.args
+        assert len(texts) == 2
+        assert (params.num_beams, params.max_new_tokens) == (4, 16)
+        assert single["repeats"] == 3
+        assert single["input_tokens"] == 12
+        assert single["min_ms"] <= single["p50_ms"] <= single["p95_ms"]
+        assert batch["id"] == "pytorch/threads=1/words=8/beams=4/batch=2"
+
+    def test_run_on_tiny_model(self, tmp_path, shipped_tokenizer):
+        """Test one case runs end to end on the tiny model, offline."""
+        args = parse_args(
+            [
+                "--lengths", "8",
+                "--beams", "1",
+                "--batch-sizes", "1",
+                "--max-new-tokens", "4",
+                "--warmup", "0",
+                "--repeats", "1",
+            ]
+        )  # fmt: skip
+        threads = torch.get_num_threads()
+        try:
+            results = run(args, tmp_path)
+        finally:
+            torch.set_num_threads(threads)
+
+        assert (tmp_path / "adapter" / "adapter_config.json").exists()
+        assert results["environment"]["model"] == "tiny"
+        [case] = results["cases"]
+        assert case["id"] == "pytorch/threads=1/words=8/beams=1/batch=1"
+        assert case["repeats"] == 1
+        assert case["p50_ms"] > 0
+
+
+class TestCompare:
+    """Tests for comparing results against a baseline."""
+
+    def test_flags_regressions_and_improvements(self):
+        """Test cases outside the tolerance are flagged both ways."""
+        comparison = compare(
+            results(("slow", 130.0), ("same", 105.0), ("fast", 50.0), ("new", 1.0)),
+            results(("slow", 100.0), ("same", 100.0), ("fast", 100.0)),
+            tolerance=0.15,
+        )
+
+        assert [case.id for case in comparison.regressions] == ["slow"]
+        assert [case.id for case in comparison.improvements] == ["fast"]
+        assert comparison.missing == ["new"]
+        assert not comparison.mismatches
+        table = format_comparison(comparison)
+        assert "REGRESSION" in table
+        assert "not in baseline" in table
+
+    def test_warns_about_different_environments(self):
+        """Test timings of another model or machine are flagged."""
+        comparison = compare(
+            results(("a", 1.0), model="tiny"),
+            results(("a", 1.0), model="fine-tuned"),
+        )
+
+        assert comparison.mismatches[0] == ("model", "tiny", "fine-tuned")
+        assert "warning: model differs" in format_comparison(comparison)
+
+    def test_report_exit_code(self):
+        """Test a regression fails the run."""
+        baseline = results(("a", 100.0))
+
+        assert report(compare(results(("a", 110.0)), baseline)) == 0
+        assert report(compare(results(("a", 200.0)), baseline)) == 1
+
+    def test_missing_baseline(self, tmp_path):
+        """Test a missing baseline fails instead of comparing nothing."""
+        path = tmp_path / "results.json"
+        path.write_text(json.dumps(results(("a", 100.0))), encoding="utf-8")
+
+        assert main([str(path), str(tmp_path / "baseline.json")]) == 1
+        # The same file as its own baseline compares cleanly.
+        assert main([str(path), str(path)]) == 0
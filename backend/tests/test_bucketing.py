@@ -0,0 +1,81 @@
+"""
+Length-bucketed Batch Formation Tests
+"""
+
+import torch
+
+from app.core.bucketing import PaddingStats, token_budget_buckets
+
+
+class TestTokenBudgetBuckets:
+    """Tests for grouping items under a padded-token budget."""
+
+    def test_sorted_and_packed_under_budget(self):
+        """Test similar lengths share a batch and the budget is respected."""
+        lengths = [10, 2, 9, 3, 2]
+
+        buckets = token_budget_buckets(lengths, max_tokens=20)
+
+        assert buckets == [[1, 4, 3], [2, 0]]
+        for bucket in buckets:
+            assert max(lengths[i] for i in bucket) * len(bucket) <= 20
+
+    def test_covers_every_item_once(self):
+        """Test results can be put back in the original order."""
+        lengths = [7, 1, 5, 3, 8, 2]
+
+        buckets = token_budget_buckets(lengths, max_tokens=8)
+
+        assert sorted(i for bucket in buckets for i in bucket) == list(range(6))
+
+    def test_item_over_budget_runs_alone(self):
+        """Test an item longer than the budget still gets a batch."""
+        assert token_budget_buckets([50, 1], max_tokens=10) == [[1], [0]]
+
+    def test_empty(self):
+        """Test no items give no batches."""
+        assert token_budget_buckets([], max_tokens=10) == []
+
+
+class TestPaddingStats:
+    """Tests for padding efficiency statistics."""
+
+    def test_record(self):
+        """Test real and padded tokens are counted per batch."""
+        stats = PaddingStats()
+        attention_mask = torch.tensor([[1, 1, 1, 1], [1, 0, 0, 0]])
+        generated = torch.tensor([[0, 5, 6, 1], [0, 7, 1, 0]])
+
+        stats.record(torch.zeros(2, 4), attention_mask, generated, pad_token_id=0)
+
+        snapshot = stats.snapshot()
+        assert snapshot["input_tokens"] == 5
+        assert snapshot["padded_input_tokens"] == 8
+        assert snapshot["input_efficiency"] == 0.625
+        assert snapshot["output_efficiency"] == round(5 / 6, 4)
+        assert snapshot["recent_batches"] == [
+            {"size": 2, "input_efficiency": 0.625, "output_efficiency": 0.8333}
+        ]
+
+    def test_unpadded_batch(self):
+        """Test a batch without a mask counts as fully used."""
+        stats = PaddingStats()
+        stats.record(torch.zeros(1, 3), None, torch.tensor([[0, 4, 1]]), 0)
+        stats.record(
+            torch.zeros(2, 2), torch.tensor([[1, 1], [1, 0]]), torch.ones(2, 2), 0
+        )
+
+        snapshot = stats.snapshot()
+        assert snapshot["mean_batch_input_efficiency"] == round((1.0 + 0.75) / 2, 4)
+        assert snapshot["input_efficiency"] == round(6 / 7, 4)
+
+    def test_reset(self):
+        """Test a reset clears everything."""
+        stats = PaddingStats()
+        stats.record(torch.zeros(1, 3), None, torch.tensor([[0, 4, 1]]), 0)
+        stats.reset()
+
+        snapshot = stats.snapshot()
+        assert snapshot["batches"] == 0
+        assert snapshot["input_efficiency"] == 1.0
+        assert snapshot["recent_batches"] == []
@@ -0,0 +1,136 @@
+"""
+Translation Cache Tests
+"""
+
+from unittest.mock import patch
+
+from app.core.generation import GenerationParams
+from app.services.cache import TranslationCache, make_cache_key, normalize_text
+
+
+class TestNormalizeText:
+    """Tests for cache key normalization."""
+
+    def test_collapses_spaces(self):
+        """Test runs of spaces and tabs collapse to one space."""
+        assert normalize_text("  Hello \t  world  ") == "Hello world"
+
+    def test_keeps_line_breaks(self):
+        """Test paragraph structure is kept."""
+        assert normalize_text("One. \n\n  Two.") == "One.\n\nTwo."
+
+    def test_unicode_nfc(self):
+        """Test composed and decomposed accents normalize alike."""
+        assert normalize_text("Cafe\u0301") == normalize_text("Caf\u00e9")
+
+
+class TestMakeCacheKey:
+    """Tests for cache keys."""
+
+    def test_equivalent_inputs_share_key(self):
+        """Test inputs differing only in spacing share a key."""
+        assert make_cache_key("Hello  world", "v1") == make_cache_key(
+            " Hello world", "v1"
+        )
+
+    def test_model_version_changes_key(self):
+        """Test the model fingerprint is part of the key."""
+        assert make_cache_key("Hello", "v1") != make_cache_key("Hello", "v2")
+
+    def test_generation_settings_change_key(self):
+        """Test beam width and output length are part of the key."""
+        key = make_cache_key("Hello", "v1")
+        with patch("app.services.cache.settings.NUM_BEAMS", 1):
+            assert make_cache_key("Hello", "v1") != key
+        with patch("app.services.cache.settings.MAX_OUTPUT_LENGTH", 32):
+            assert make_cache_key("Hello", "v1") != key
+
+    def test_request_params_change_key(self):
+        """Test per-request decoding settings are part of the key."""
+        key = make_cache_key("Hello", "v1")
+        with patch("app.services.cache.settings.NUM_BEAMS", 8):
+            assert make_cache_key("Hello", "v1", GenerationParams(8)) == key
+            assert make_cache_key("Hello", "v1", GenerationParams(1)) != key
+            assert make_cache_key("Hello", "v1", GenerationParams(8, 20)) != key
+        with patch("app.services.cache.settings.CASCADE_ENABLED", True):
+            assert make_cache_key("Hello", "v1") != key
+
+
+class TestTranslationCache:
+    """Tests for LRU, TTL and memory bounds."""
+
+    def test_hit_and_miss(self):
+        """Test counters for hits and misses."""
+        cache = TranslationCache(max_entries=10, max_bytes=10**6, ttl_seconds=60)
+        assert cache.get("a") is None
+        cache.put("a", "uno")
+        assert cache.get("a") == "uno"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction_by_count(self):
+        """Test the least recently used entry is evicted first."""
+        cache = TranslationCache(max_entries=2, max_bytes=10**6, ttl_seconds=60)
+        cache.put("a", "uno")
+        cache.put("b", "dos")
+        cache.get("a")
+        cache.put("c", "tres")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "uno"
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_by_memory(self):
+        """Test the memory bound evicts entries."""
+        size = TranslationCache._entry_size("a", "x" * 100)
+        cache = TranslationCache(max_entries=100, max_bytes=size * 2, ttl_seconds=60)
+        for key in ("a", "b", "c"):
+            cache.put(key, "x" * 100)
+
+        assert len(cache) == 2
+        assert cache.stats()["bytes"] <= size * 2
+
+    def test_oversized_entry_is_not_cached(self):
+        """Test an entry larger than the memory bound is skipped."""
+        cache = TranslationCache(max_entries=10, max_bytes=10, ttl_seconds=60)
+        cache.put("a", "too big to fit")
+        assert len(cache) == 0
+
+    def test_ttl_expiry(self):
+        """Test expired entries miss and are dropped."""
+        cache = TranslationCache(max_entries=10, max_bytes=10**6, ttl_seconds=5)
+        with patch("app.services.cache.time.monotonic", return_value=100.0):
+            cache.put("a", "uno")
+        with patch("app.services.cache.time.monotonic", return_value=106.0):
+            assert cache.get("a") is None
+
+        assert cache.stats()["expirations"] == 1
+        assert len(cache) == 0
+
+    def test_put_replaces_existing(self):
+        """Test re-storing a key replaces its value."""
+        cache = TranslationCache(max_entries=10, max_bytes=10**6, ttl_seconds=60)
+        cache.put("a", "uno")
+        cache.put("a", "one")
+        assert cache.get("a") == "one"
+        assert len(cache) == 1
+
+    def test_clear_counts_invalidation(self):
+        """Test clearing drops entries and counts an invalidation."""
+        cache = TranslationCache(max_entries=10, max_bytes=10**6, ttl_seconds=60)
+        cache.put("a", "uno")
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.stats()["invalidations"] == 1
+        assert cache.stats()["bytes"] == 0
+
+    def test_cleared_on_model_load(self):
+        """Test the global cache is registered as a model load listener."""
+        from app.core.model import model_manager
+        from app.services.cache import translation_cache
+
+        assert translation_cache.clear in model_manager._load_listeners
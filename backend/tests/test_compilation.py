@@ -0,0 +1,120 @@
+"""
+Compiled Inference Tests
+"""
+
+from unittest.mock import MagicMock, patch
+
+import torch
+
+from app.core.compilation import (
+    CompileStats,
+    compile_model,
+    length_bucket,
+    pad_to_length,
+    warmup_beam_widths,
+)
+from app.core.config import settings
+
+
+class TestLengthBucket:
+    """Tests for choosing a length bucket."""
+
+    def test_smallest_fitting_bucket(self):
+        """Test the smallest bucket at least as long as the input is used."""
+        assert length_bucket(5, [64, 16, 32]) == 16
+        assert length_bucket(16, [16, 32]) == 16
+        assert length_bucket(17, [16, 32]) == 32
+
+    def test_longer_than_every_bucket(self):
+        """Test over-long inputs get no bucket."""
+        assert length_bucket(200, [16, 32]) is None
+
+
+class TestPadToLength:
+    """Tests for padding batches to a bucket."""
+
+    def test_pads_ids_and_mask(self):
+        """Test ids are padded with the pad id and masked out."""
+        ids = torch.tensor([[5, 6, 1]])
+        mask = torch.ones_like(ids)
+
+        padded_ids, padded_mask = pad_to_length(ids, mask, 5, pad_token_id=0)
+
+        assert padded_ids.tolist() == [[5, 6, 1, 0, 0]]
+        assert padded_mask.tolist() == [[1, 1, 1, 0, 0]]
+
+    def test_missing_mask_and_exact_length(self):
+        """Test a missing mask becomes all ones and exact fits are untouched."""
+        ids = torch.tensor([[5, 6]])
+
+        padded_ids, padded_mask = pad_to_length(ids, None, 2, pad_token_id=0)
+
+        assert padded_ids is ids
+        assert padded_mask.tolist() == [[1, 1]]
+
+
+class TestCompileModel:
+    """Tests for compiling the forward pass."""
+
+    def test_forward_is_compiled(self):
+        """Test the forward is replaced with a dynamic-shape compiled one."""
+        model = MagicMock()
+        original_forward = model.forward
+
+        with patch("app.core.compilation.torch.compile") as mock_compile:
+            result = compile_model(model)
+
+        assert result is model
+        assert model.forward is mock_compile.return_value
+        assert mock_compile.call_args[0][0] is original_forward
+        assert mock_compile.call_args[1]["dynamic"] is True
+
+    def test_warmup_beam_widths(self):
+        """Test greedy and every width up to MAX_REQUEST_BEAMS are warmed up."""
+        with patch.object(settings, "MAX_REQUEST_BEAMS", 4):
+            assert warmup_beam_widths() == [1, 2, 3, 4]
+        with patch.object(settings, "MAX_REQUEST_BEAMS", 1):
+            assert warmup_beam_widths() == [1]
+
+
+class TestCompileStats:
+    """Tests for compile and bucket statistics."""
+
+    def test_snapshot(self):
+        """Test compile times, hit rates and latencies are reported."""
+        stats = CompileStats()
+        stats.record_compile(16, 2.0)
+        stats.record_compile(32, 3.0)
+        stats.record(16, 0.010)
+        stats.record(16, 0.030)
+        stats.record(32, 0.050)
+        stats.record(None, 0.5)
+
+        snapshot = stats.snapshot()
+
+        assert snapshot["compile_seconds"] == 5.0
+        assert snapshot["bucket_hit_rate"] == 0.75
+        assert snapshot["unbucketed_calls"] == 1
+        assert snapshot["buckets"]["16"] == {
+            "compile_seconds": 2.0,
+            "calls": 2,
+            "hit_rate": 0.5,
+            "mean_latency_ms": 20.0,
+            "max_latency_ms": 30.0,
+        }
+        assert snapshot["buckets"]["32"]["calls"] == 1
+
+    def test_reset(self):
+        """Test reset forgets everything."""
+        stats = CompileStats()
+        stats.record_compile(16, 2.0)
+        stats.record(16, 0.01)
+
+        stats.reset()
+
+        assert stats.snapshot() == {
+            "compile_seconds": 0.0,
+            "bucket_hit_rate": 0.0,
+            "unbucketed_calls": 0,
+            "buckets": {},
+        }
@@ -0,0 +1,109 @@
+"""
+Inference Executor Tests
+"""
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app.core.admission import AdmissionController, DeadlineExceeded
+from app.core.executor import InferenceExecutor, configure_torch_threads
+
+
+@pytest.fixture
+def executor():
+    """Create an inference executor and shut it down afterwards."""
+    executor = InferenceExecutor()
+    yield executor
+    executor.shutdown()
+
+
+class TestInferenceExecutor:
+    """Tests for the inference thread pool."""
+
+    def test_lazy_start(self, executor):
+        """Test threads are only created on first use."""
+        assert not executor.is_running
+        assert executor.submit(lambda: 1).result() == 1
+        assert executor.is_running
+
+    def test_max_workers_from_settings(self, executor):
+        """Test the pool size follows INFERENCE_THREADS (at least one)."""
+        with patch("app.core.executor.settings.INFERENCE_THREADS", 0):
+            assert executor.max_workers == 1
+        with patch("app.core.executor.settings.INFERENCE_THREADS", 3):
+            assert executor.max_workers == 3
+
+    @pytest.mark.asyncio
+    async def test_run_off_event_loop(self, executor):
+        """Test blocking calls run on an inference thread."""
+        name = await executor.run(lambda: threading.current_thread().name)
+        assert name.startswith("inference")
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self, executor):
+        """Test the loop keeps running while inference blocks."""
+        release = threading.Event()
+        task = asyncio.ensure_future(executor.run(release.wait, 5))
+
+        # The loop can still schedule other work while the call blocks.
+        await asyncio.sleep(0.01)
+        assert not task.done()
+        release.set()
+        assert await task is True
+
+    @pytest.mark.asyncio
+    async def test_expired_request_is_not_run(self, executor):
+        """Test calls for a request past its deadline are dropped."""
+        controller = AdmissionController()
+        calls = []
+        with (
+            patch("app.core.executor.admission_controller", controller),
+            patch("app.core.admission.settings.ADMISSION_TIMEOUT_MS", 1.0),
+        ):
+            ticket = controller.acquire()
+            await asyncio.sleep(0.01)
+            with controller.bind(ticket), pytest.raises(DeadlineExceeded):
+                await executor.run(calls.append, 1)
+
+        assert calls == []
+
+    def test_shutdown(self, executor):
+        """Test shutdown releases the pool and can be repeated."""
+        executor.start()
+        executor.shutdown()
+        assert not executor.is_running
+        executor.shutdown()
+
+
+class TestConfigureTorchThreads:
+    """Tests for torch thread configuration."""
+
+    def test_defaults_leave_torch_alone(self):
+        """Test zero thread counts keep torch's defaults."""
+        with patch("app.core.executor.torch") as mock_torch:
+            configure_torch_threads()
+        mock_torch.set_num_threads.assert_not_called()
+        mock_torch.set_num_interop_threads.assert_not_called()
+
+    def test_sets_thread_counts(self):
+        """Test configured thread counts are applied."""
+        with (
+            patch("app.core.executor.settings.TORCH_INTRA_OP_THREADS", 4),
+            patch("app.core.executor.settings.TORCH_INTER_OP_THREADS", 2),
+            patch("app.core.executor.torch") as mock_torch,
+        ):
+            configure_torch_threads()
+        mock_torch.set_num_threads.assert_called_once_with(4)
+        mock_torch.set_num_interop_threads.assert_called_once_with(2)
+
+    def test_interop_already_set(self):
+        """Test a late inter-op setting only warns."""
+        with (
+            patch("app.core.executor.settings.TORCH_INTER_OP_THREADS", 2),
+            patch("app.core.executor.torch") as mock_torch,
+        ):
+            mock_torch.set_num_interop_threads.side_effect = RuntimeError("late")
+            configure_torch_threads()
@@ -0,0 +1,119 @@
+"""
+Model Bundle Export and Loading Tests
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+import torch
+from transformers import T5Config, T5ForConditionalGeneration
+
+from app.core.model import (
+    BUNDLE_FORMAT_VERSION,
+    BUNDLE_WEIGHTS_FILE,
+    load_bundle_model,
+    read_export_info,
+)
+from app.export_bundle import export_bundle, main, parse_args
+
+
+@pytest.fixture
+def tiny_model():
+    """Create a small randomly initialized T5 (no download)."""
+    torch.manual_seed(0)
+    config = T5Config(
+        vocab_size=32,
+        d_model=16,
+        d_kv=4,
+        d_ff=32,
+        num_layers=1,
+        num_heads=2,
+        decoder_start_token_id=0,
+        pad_token_id=0,
+        eos_token_id=1,
+    )
+    return T5ForConditionalGeneration(config).eval()
+
+
+@pytest.fixture
+def bundle(tiny_model, tmp_path):
+    """Export the tiny model as if it were the merged adapter."""
+    with (
+        patch("app.export_bundle.load_merged_model", return_value=tiny_model),
+        patch("app.export_bundle.AutoTokenizer") as mock_tokenizer,
+    ):
+        path = export_bundle(tmp_path / "bundle")
+    mock_tokenizer.from_pretrained.return_value.save_pretrained.assert_called_once()
+    return path
+
+
+class TestExportBundle:
+    """Tests for writing the bundle."""
+
+    def test_writes_weights_config_and_info(self, bundle, tmp_path):
+        """Test the bundle holds one weights file and its export info."""
+        assert (bundle / BUNDLE_WEIGHTS_FILE).is_file()
+        assert (bundle / "config.json").is_file()
+        assert (bundle / "generation_config.json").is_file()
+        info = read_export_info(bundle)
+        assert info["format_version"] == BUNDLE_FORMAT_VERSION
+        assert len(info["model_version"]) == 16
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_replaces_previous_bundle(self, bundle, tiny_model):
+        """Test re-exporting replaces the old bundle."""
+        (bundle / "stale.txt").write_text("old")
+
+        with (
+            patch("app.export_bundle.load_merged_model", return_value=tiny_model),
+            patch("app.export_bundle.AutoTokenizer"),
+        ):
+            export_bundle(bundle)
+
+        assert not (bundle / "stale.txt").exists()
+        assert (bundle / BUNDLE_WEIGHTS_FILE).is_file()
+
+    def test_main(self, tmp_path):
+        """Test the command line exports to --output."""
+        with patch("app.export_bundle.export_bundle") as mock_export:
+            assert main(["--output", str(tmp_path)]) == 0
+        mock_export.assert_called_once_with(tmp_path)
+        assert parse_args([]).output.name == "bundle"
+
+
+class TestLoadBundleModel:
+    """Tests for memory-mapping the bundle."""
+
+    def test_matches_merged_model(self, bundle, tiny_model):
+        """Test the mapped model has the same weights and output."""
+        loaded = load_bundle_model(bundle)
+
+        for name, tensor in tiny_model.state_dict().items():
+            assert torch.equal(loaded.state_dict()[name], tensor), name
+        # Tied weights are restored from the single stored copy.
+        assert loaded.lm_head.weight is loaded.shared.weight
+
+        inputs = torch.tensor([[3, 4, 5, 1]])
+        assert torch.equal(
+            loaded.generate(inputs, max_length=6, num_beams=2),
+            tiny_model.generate(inputs, max_length=6, num_beams=2),
+        )
+
+    def test_missing_weights(self, bundle):
+        """Test an incomplete bundle is rejected."""
+        with patch("app.core.model.load_file", return_value={}):
+            with pytest.raises(RuntimeError, match="missing weights"):
+                load_bundle_model(bundle)
+
+    def test_generation_config_optional(self, bundle):
+        """Test bundles without a generation config still load."""
+        (bundle / "generation_config.json").unlink()
+        assert load_bundle_model(bundle) is not None
+
+
+def test_read_export_info_missing(tmp_path):
+    """Test a directory without export info has none."""
+    assert read_export_info(tmp_path) is None
+    (tmp_path / "export_info.json").write_text(json.dumps({"model_version": "x"}))
+    assert read_export_info(tmp_path) == {"model_version": "x"}
@@ -0,0 +1,180 @@
+"""
+ONNX Export and Backend Parity Tests
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+import torch
+from transformers import T5Config, T5ForConditionalGeneration
+
+from app.core.config import settings
+from app.core.model import read_export_version
+from app.export_onnx import (
+    PARITY_SENTENCES,
+    ParityReport,
+    check_parity,
+    export_onnx,
+    main,
+    parse_args,
+)
+
+
+@pytest.fixture
+def tiny_model():
+    """Create a small randomly initialized T5 (no download)."""
+    torch.manual_seed(0)
+    config = T5Config(
+        vocab_size=32,
+        d_model=16,
+        d_kv=4,
+        d_ff=32,
+        num_layers=1,
+        num_heads=2,
+        decoder_start_token_id=0,
+        pad_token_id=0,
+        eos_token_id=1,
+    )
+    return T5ForConditionalGeneration(config).eval()
+
+
+@pytest.fixture
+def fake_tokenizer():
+    """Tokenizer stand-in mapping each text to ids derived from its length."""
+
+    def tokenize(texts, **kwargs):
+        rows = [[2 + len(text) % 29, 3 + len(text) % 7, 1] for text in texts]
+        ids = torch.tensor(rows)
+        return {"input_ids": ids, "attention_mask": torch.ones_like(ids)}
+
+    tokenizer = MagicMock(side_effect=tokenize)
+    tokenizer.pad_token_id = 0
+    tokenizer.batch_decode.side_effect = lambda ids, **kwargs: [
+        " ".join(str(i) for i in row.tolist() if i > 1) for row in ids
+    ]
+    return tokenizer
+
+
+class TestParityReport:
+    """Tests for the parity report."""
+
+    def test_passed_without_mismatches(self):
+        """Test a report with no differences passes."""
+        assert ParityReport(sentences=3).passed
+        assert not ParityReport(sentences=3, mismatches=[("a", "b", "c")]).passed
+
+
+class TestCheckParity:
+    """Tests for comparing backend outputs."""
+
+    def test_reports_mismatches(self, fake_tokenizer):
+        """Test differing outputs are listed with their source."""
+        same = MagicMock()
+        same.generate.return_value = torch.tensor([[0, 5, 1]])
+        different = MagicMock()
+        different.generate.return_value = torch.tensor([[0, 6, 1]])
+
+        report = check_parity(same, different, fake_tokenizer, ["Hello"])
+
+        assert report.mismatches == [("Hello", "5", "6")]
+        assert report.pytorch_ms_per_token >= 0
+
+
+class TestExportOnnx:
+    """Tests for the export command on a tiny model."""
+
+    @pytest.fixture
+    def exported(self, tiny_model, tmp_path):
+        """Export the tiny model as if it were the merged adapter."""
+        pytest.importorskip("optimum.onnxruntime")
+        with patch("app.export_onnx.load_merged_model", return_value=tiny_model):
+            export_onnx(tmp_path)
+        return tmp_path
+
+    def test_writes_encoder_and_decoder_with_past(self, exported):
+        """Test the three graphs and the export info are written."""
+        for name in (
+            "encoder_model.onnx",
+            "decoder_model.onnx",
+            "decoder_with_past_model.onnx",
+        ):
+            assert (exported / name).is_file()
+        assert read_export_version(exported) is not None
+
+    def test_backends_agree_on_parity_set(self, exported, tiny_model, fake_tokenizer):
+        """Test ONNX Runtime reproduces PyTorch beam search outputs."""
+        from app.core.model import load_onnx_model
+
+        with (
+            patch.object(settings, "MAX_OUTPUT_LENGTH", 8),
+            patch.object(settings, "NUM_BEAMS", 3),
+        ):
+            report = check_parity(
+                tiny_model,
+                load_onnx_model(exported),
+                fake_tokenizer,
+                PARITY_SENTENCES,
+            )
+
+        assert report.sentences == len(PARITY_SENTENCES)
+        assert report.passed, report.mismatches
+
+
+class TestMain:
+    """Tests for the export command line."""
+
+    def test_parse_args_defaults(self):
+        """Test the default output is the configured ONNX path."""
+        args = parse_args([])
+        assert args.output == settings.ONNX_MODEL_PATH
+        assert args.parity_file is None
+
+    @pytest.fixture
+    def mocked(self):
+        """Patch the heavy steps of the command."""
+        with (
+            patch("app.export_onnx.export_onnx") as mock_export,
+            patch("app.export_onnx.AutoTokenizer"),
+            patch("app.export_onnx.load_merged_model"),
+            patch("app.export_onnx.load_onnx_model"),
+            patch("app.export_onnx.check_parity") as mock_parity,
+        ):
+            yield mock_export, mock_parity
+
+    def test_skip_parity(self, mocked, tmp_path):
+        """Test --skip-parity only exports."""
+        mock_export, mock_parity = mocked
+
+        assert main(["--output", str(tmp_path), "--skip-parity"]) == 0
+
+        mock_export.assert_called_once_with(tmp_path)
+        mock_parity.assert_not_called()
+
+    def test_parity_failure_exit_code(self, mocked, tmp_path):
+        """Test a parity mismatch exits with status 1."""
+        _, mock_parity = mocked
+        mock_parity.return_value = ParityReport(
+            sentences=1, mismatches=[("a", "b", "c")]
+        )
+
+        assert main(["--output", str(tmp_path)]) == 1
+
+    def test_parity_file(self, mocked, tmp_path):
+        """Test sentences are read from the parity file."""
+        _, mock_parity = mocked
+        mock_parity.return_value = ParityReport(sentences=1)
+        parity_file = tmp_path / "parity.jsonl"
+        parity_file.write_text(json.dumps({"en": "Hi"}))
+
+        assert main(["--output", str(tmp_path), "--parity-file", str(parity_file)]) == 0
+        assert mock_parity.call_args[0][3] == ["Hi"]
+
+    def test_invalid_parity_file(self, mocked, tmp_path):
+        """Test a line without English text fails with exit status 1."""
+        _, mock_parity = mocked
+        parity_file = tmp_path / "parity.jsonl"
+        parity_file.write_text(json.dumps({"es": "Hola"}))
+
+        assert main(["--output", str(tmp_path), "--parity-file", str(parity_file)]) == 1
+        mock_parity.assert_not_called()
@@ -0,0 +1,228 @@
+"""
+Generation Controls Tests
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+import torch
+
+from app.core.config import settings
+from app.core.generation import (
+    CascadeStats,
+    DecodingLog,
+    GenerationParams,
+    LatencyModel,
+    plan_generation,
+    replace_rows,
+    sequence_confidence,
+)
+
+
+@pytest.fixture
+def latency():
+    """Replace the global latency model with a fresh one."""
+    model = LatencyModel()
+    with (
+        patch("app.core.generation.latency_model", model),
+        patch.object(settings, "NUM_BEAMS", 8),
+        patch.object(settings, "MAX_REQUEST_BEAMS", 8),
+        patch.object(settings, "MAX_OUTPUT_LENGTH", 256),
+        patch.object(settings, "LATENCY_PRIOR_MS_PER_STEP", 5.0),
+        patch.object(settings, "LATENCY_PRIOR_OUTPUT_RATIO", 1.0),
+    ):
+        yield model
+
+
+class TestGenerationParams:
+    """Tests for decoding settings."""
+
+    def test_default_uses_serving_settings(self):
+        """Test the defaults match the server-wide settings."""
+        with patch.object(settings, "NUM_BEAMS", 4):
+            params = GenerationParams.default()
+        assert params == GenerationParams(num_beams=4)
+        assert params.strategy == "beam"
+
+    def test_beam_kwargs(self):
+        """Test beam search keeps the serving length limit and early stopping."""
+        kwargs = GenerationParams(num_beams=4).generate_kwargs()
+        assert kwargs == {
+            "num_beams": 4,
+            "max_length": settings.MAX_OUTPUT_LENGTH,
+            "early_stopping": True,
+        }
+
+    def test_greedy_kwargs(self):
+        """Test greedy decoding with a token limit."""
+        params = GenerationParams(num_beams=1, max_new_tokens=20)
+        assert params.strategy == "greedy"
+        assert params.generate_kwargs() == {"num_beams": 1, "max_new_tokens": 20}
+
+
+class TestLatencyModel:
+    """Tests for latency estimates."""
+
+    def test_prior_before_any_generation(self, latency):
+        """Test the prior scales with beams and expected output length."""
+        # ratio 1.0: 10 input tokens -> 11 steps at 5ms per beam.
+        assert latency.estimate_ms(1, 10, None) == pytest.approx(55.0)
+        assert latency.estimate_ms(4, 10, None) == pytest.approx(220.0)
+
+    def test_output_limit_caps_steps(self, latency):
+        """Test max_new_tokens bounds the expected steps."""
+        assert latency.estimate_ms(1, 100, 4) == pytest.approx(20.0)
+
+    def test_measured_width(self, latency):
+        """Test a measured width replaces the prior."""
+        latency.record(num_beams=4, input_tokens=10, output_tokens=10, seconds=0.1)
+        assert latency.estimate_ms(4, 9, None) == pytest.approx(100.0)
+        # Unmeasured widths are scaled from the nearest measured one.
+        assert latency.estimate_ms(2, 9, None) == pytest.approx(50.0)
+        assert latency.measured_ms_per_step(4) == pytest.approx(10.0)
+        assert latency.measured_ms_per_step(2) is None
+
+    def test_moving_average(self, latency):
+        """Test later observations move the estimate gradually."""
+        latency.record(1, 10, 10, 0.01)
+        latency.record(1, 10, 10, 0.02)
+        assert latency.snapshot()["ms_per_step"] == {"1": 1.2}
+
+    def test_reset(self, latency):
+        """Test a reset forgets measurements and counters."""
+        latency.record(1, 10, 10, 0.01)
+        latency.record_plan(GenerationParams(1), True, True, False)
+        latency.reset()
+        snapshot = latency.snapshot()
+        assert snapshot["ms_per_step"] == {}
+        assert snapshot["output_ratio"] is None
+        assert snapshot["budgeted_requests"] == 0
+
+
+class TestPlanGeneration:
+    """Tests for choosing a strategy per request."""
+
+    def test_defaults(self, latency):
+        """Test a request without controls gets the serving settings."""
+        assert plan_generation(10) == GenerationParams.default()
+
+    def test_caps(self, latency):
+        """Test requested values are clamped to the server caps."""
+        params = plan_generation(10, num_beams=32, max_new_tokens=10_000)
+        assert params == GenerationParams(num_beams=8, max_new_tokens=255)
+
+    def test_generous_budget_keeps_beams(self, latency):
+        """Test a budget that fits the requested width changes nothing."""
+        assert plan_generation(10, latency_budget_ms=10_000).num_beams == 8
+
+    def test_tight_budget_halves_beams(self, latency):
+        """Test the widest width that fits is chosen."""
+        # 11 steps: 8 beams ~440ms, 4 beams ~220ms, 2 beams ~110ms.
+        params = plan_generation(10, latency_budget_ms=150)
+        assert params.num_beams == 2
+        snapshot = latency.snapshot()
+        assert snapshot["downgraded_requests"] == 1
+        assert snapshot["over_budget_requests"] == 0
+
+    def test_impossible_budget_falls_back_to_greedy(self, latency):
+        """Test greedy decoding is used when nothing fits."""
+        params = plan_generation(10, latency_budget_ms=1)
+        assert params == GenerationParams(num_beams=1)
+        snapshot = latency.snapshot()
+        assert snapshot["strategies"] == {"greedy": 1}
+        assert snapshot["over_budget_requests"] == 1
+
+
+class TestCascade:
+    """Tests for greedy-first cascaded decoding helpers."""
+
+    def test_sequence_confidence_ignores_padding(self):
+        """Test padding after the end of a row does not count."""
+        output = SimpleNamespace(
+            sequences=torch.tensor([[0, 5, 6, 1], [0, 7, 1, 0]]),
+            scores=None,
+        )
+        model = MagicMock()
+        model.compute_transition_scores.return_value = torch.tensor(
+            [[-0.1, -0.2, -0.3], [-1.0, -2.0, float("-inf")]]
+        )
+
+        confidence = sequence_confidence(model, output, pad_token_id=0)
+
+        assert confidence.tolist() == pytest.approx([-0.2, -1.5])
+
+    def test_replace_rows_pads_to_common_width(self):
+        """Test replaced rows and kept rows are padded to the same width."""
+        sequences = torch.tensor([[0, 5, 1], [0, 6, 1], [0, 7, 1]])
+        replacements = torch.tensor([[0, 8, 9, 1]])
+
+        merged = replace_rows(sequences, replacements, torch.tensor([1]), 0)
+
+        assert merged.tolist() == [[0, 5, 1, 0], [0, 8, 9, 1], [0, 7, 1, 0]]
+
+    def test_stats_snapshot(self):
+        """Test escalation rate and estimated latency saved."""
+        stats = CascadeStats()
+        stats.record(torch.tensor([-0.1, -0.9]), 1, seconds=0.3, baseline_seconds=0.4)
+        stats.record(torch.tensor([-0.2, -0.2]), 0, seconds=0.1, baseline_seconds=0.4)
+
+        snapshot = stats.snapshot()
+
+        assert snapshot["rows"] == 4
+        assert snapshot["escalation_rate"] == 0.25
+        assert snapshot["mean_confidence"] == pytest.approx(-0.35)
+        assert snapshot["estimated_latency_saved_ms"] == pytest.approx(400.0)
+        assert snapshot["estimated_latency_saved_fraction"] == 0.5
+
+    def test_stats_leave_out_calls_without_baseline(self):
+        """Test calls without a beam search baseline are not compared."""
+        stats = CascadeStats()
+        stats.record(torch.tensor([-0.9]), 1, seconds=0.5, baseline_seconds=0.4)
+        stats.record(torch.tensor([-0.1, -0.2]), 0, seconds=0.1, baseline_seconds=None)
+
+        snapshot = stats.snapshot()
+
+        assert snapshot["rows"] == 3
+        assert snapshot["latency_ms"] == pytest.approx(600.0)
+        assert snapshot["compared_rows"] == 1
+        assert snapshot["compared_latency_ms"] == pytest.approx(500.0)
+        assert snapshot["estimated_latency_saved_ms"] == pytest.approx(-100.0)
+
+    def test_stats_empty(self):
+        """Test an empty snapshot."""
+        stats = CascadeStats()
+        stats.record(torch.tensor([-0.1]), 0, 0.1, 0.2)
+        stats.reset()
+        snapshot = stats.snapshot()
+        assert snapshot["escalation_rate"] == 0.0
+        assert snapshot["mean_confidence"] is None
+        assert snapshot["estimated_latency_saved_fraction"] == 0.0
+
+
+class TestDecodingLog:
+    """Tests for the record of the beam width each text was decoded with."""
+
+    def test_lookup(self):
+        """Test a request is greedy only if all of its texts kept greedy."""
+        log = DecodingLog(capacity=8)
+        beam = GenerationParams(num_beams=4, max_new_tokens=20)
+        log.record(["a", "b", "c"], beam, [1, 4, 1])
+
+        assert log.lookup(["a", "c"], beam) == GenerationParams(1, max_new_tokens=20)
+        assert log.lookup(["a", "b"], beam) == beam
+        # Unknown texts and other settings keep the planned settings.
+        assert log.lookup(["d"], beam) == beam
+        assert log.lookup(["a"], GenerationParams(num_beams=2)).num_beams == 2
+
+    def test_capacity_and_reset(self):
+        """Test the oldest entries are dropped and a reset forgets all."""
+        log = DecodingLog(capacity=2)
+        beam = GenerationParams(num_beams=4)
+        log.record(["a", "b", "c"], beam, [1, 1, 1])
+
+        assert log.lookup(["a"], beam) == beam
+        assert log.lookup(["c"], beam).num_beams == 1
+
+        log.reset()
+        assert log.lookup(["c"], beam) == beam
@@ -0,0 +1,457 @@
+"""
+Translation Job Tests
+"""
+
+import json
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.generation import GenerationParams
+from app.models.job import Job, JobSegment
+from app.services.jobs import (
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JobRunner,
+    JobService,
+    check_callback_url,
+)
+
+DOCUMENT = "First one. Second one.\n\nThird one."
+
+
+@pytest.fixture
+def session_factory(memory_engine):
+    """Create sessions on the in-memory database."""
+    return async_sessionmaker(memory_engine, expire_on_commit=False)
+
+
+@pytest.fixture
+def jobs_model(mock_model_manager):
+    """Patch the model manager used for segmenting and translating jobs."""
+    mock_model_manager.translate_batch_async = AsyncMock(
+        side_effect=lambda texts, params=None: [f"es:{t}" for t in texts]
+    )
+    mock_scheduler = MagicMock()
+    mock_scheduler.is_running = False
+    with (
+        patch("app.services.translation.model_manager", mock_model_manager),
+        patch("app.services.translation.batch_scheduler", mock_scheduler),
+        patch("app.services.jobs.model_manager", mock_model_manager),
+    ):
+        yield mock_model_manager
+
+
+# Host names the callback checks resolve, without touching real DNS.
+HOSTS = {
+    "hook.test": ["93.184.216.34"],
+    "intranet.test": ["10.0.0.7"],
+    "rebind.test": ["93.184.216.34", "127.0.0.1"],
+    "metadata.test": ["169.254.169.254"],
+    "mapped.test": ["::ffff:192.168.1.1"],
+}
+
+
+@pytest.fixture(autouse=True)
+def resolver():
+    """Resolve callback hosts from HOSTS."""
+
+    async def resolve(host, port):
+        if host not in HOSTS:
+            raise OSError(f"unknown host {host}")
+        return HOSTS[host]
+
+    with patch("app.services.jobs._resolve", side_effect=resolve) as mock_resolve:
+        yield mock_resolve
+
+
+@pytest.fixture
+def callbacks():
+    """Record callback POSTs instead of sending them."""
+    received = []
+
+    def handler(request):
+        received.append((str(request.url), json.loads(request.content)))
+        return httpx.Response(200)
+
+    transport = httpx.MockTransport(handler)
+    real_client = httpx.AsyncClient
+
+    def client(**kwargs):
+        return real_client(transport=transport, **kwargs)
+
+    with patch("app.services.jobs.httpx.AsyncClient", side_effect=client):
+        yield received
+
+
+async def _create(session_factory, text=DOCUMENT, callback_url=None):
+    async with session_factory() as db:
+        return await JobService.create(
+            db, text, GenerationParams(num_beams=2), callback_url
+        )
+
+
+async def _load(session_factory, job_id):
+    async with session_factory() as db:
+        job = await JobService.get(db, job_id)
+        return job, await JobService.partial_translation(db, job)
+
+
+class TestJobService:
+    """Tests for job storage and segment claiming."""
+
+    @pytest.mark.asyncio
+    async def test_create_stores_segments(self, session_factory, jobs_model):
+        """Test a document is queued as one row per segment."""
+        job = await _create(session_factory)
+
+        async with session_factory() as db:
+            result = await db.execute(
+                select(JobSegment.source_text, JobSegment.trailing)
+                .where(JobSegment.job_id == job.id)
+                .order_by(JobSegment.position)
+            )
+            segments = result.all()
+
+        assert job.status == JOB_QUEUED
+        assert job.segments_total == 3
+        assert job.num_beams == 2
+        assert segments == [
+            ("First one.", " "),
+            ("Second one.", "\n\n"),
+            ("Third one.", ""),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_create_rejects_empty_text(self, session_factory, jobs_model):
+        """Test an empty document is not queued."""
+        with pytest.raises(ValueError):
+            await _create(session_factory, text="   ")
+
+    @pytest.mark.asyncio
+    async def test_claim_takes_oldest_job_in_order(self, session_factory, jobs_model):
+        """Test segments are claimed in document order, oldest job first."""
+        first = await _create(session_factory)
+        await _create(session_factory, text="Other job.")
+
+        async with session_factory() as db:
+            claimed = await JobService.claim(db, limit=2)
+            again = await JobService.claim(db, limit=5)
+            job = await JobService.get(db, first.id)
+
+        assert [s.source_text for s in claimed] == ["First one.", "Second one."]
+        assert [s.attempts for s in claimed] == [1, 1]
+        # Claimed segments are skipped until their lease expires.
+        assert [s.source_text for s in again] == ["Third one."]
+        assert job.status == JOB_RUNNING
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_claimed_again(self, session_factory, jobs_model):
+        """Test segments held by a crashed worker are picked up again."""
+        await _create(session_factory, text="Only one.")
+
+        async with session_factory() as db:
+            first = await JobService.claim(db, limit=5)
+            await db.execute(
+                update(JobSegment).values(
+                    lease_until=datetime.utcnow() - timedelta(seconds=1)
+                )
+            )
+            await db.commit()
+            second = await JobService.claim(db, limit=5)
+
+        assert [s.id for s in second] == [s.id for s in first]
+        assert second[0].attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_release_returns_segments(self, session_factory, jobs_model):
+        """Test released segments can be claimed at once, attempts unchanged."""
+        await _create(session_factory, text="Only one.")
+
+        async with session_factory() as db:
+            claimed = await JobService.claim(db, limit=5)
+            await JobService.release(db, [s.id for s in claimed])
+            again = await JobService.claim(db, limit=5)
+
+        assert again[0].attempts == 1
+
+
+class TestCallbackUrl:
+    """Tests for callback URL checks."""
+
+    @pytest.mark.asyncio
+    async def test_accepts_public_hosts(self):
+        """Test http(s) URLs of public hosts are accepted."""
+        await check_callback_url("http://hook.test/done")
+        await check_callback_url("https://hook.test:8443/done")
+        await check_callback_url("https://93.184.216.34/done")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "ftp://hook.test/done",
+            "file:///etc/passwd",
+            "http:///done",
+            "http://localhost/done",
+            "http://127.0.0.1:8000/admin",
+            "http://[::1]/done",
+            "http://intranet.test/done",
+            "http://rebind.test/done",
+            "http://metadata.test/latest/meta-data",
+            "http://mapped.test/done",
+            "http://0.0.0.0/done",
+        ],
+    )
+    async def test_rejects_internal_urls(self, url):
+        """Test other schemes and non-public or unknown hosts are refused."""
+        with pytest.raises(ValueError):
+            await check_callback_url(url)
+
+    @pytest.mark.asyncio
+    async def test_allowlist(self, resolver):
+        """Test only allowlisted hosts are accepted when one is configured."""
+        with patch.object(settings, "JOB_CALLBACK_ALLOWED_HOSTS", ["Intranet.test"]):
+            await check_callback_url("http://intranet.test/done")
+            with pytest.raises(ValueError):
+                await check_callback_url("http://hook.test/done")
+        resolver.assert_not_called()
+
+
+class TestJobRunner:
+    """Tests for the background job workers."""
+
+    @pytest.mark.asyncio
+    async def test_translates_job_in_batches(self, session_factory, jobs_model):
+        """Test a job completes batch by batch with partial results."""
+        job = await _create(session_factory)
+        runner = JobRunner(session_factory)
+
+        with patch.object(settings, "JOB_BATCH_SEGMENTS", 2):
+            assert await runner.run_once() == 2
+            partial_job, partial = await _load(session_factory, job.id)
+            assert await runner.run_once() == 1
+            assert await runner.run_once() == 0
+
+        done, translation = await _load(session_factory, job.id)
+        assert partial_job.segments_done == 2
+        assert partial == "es:First one. es:Second one."
+        assert done.status == JOB_COMPLETED
+        assert translation == "es:First one. es:Second one.\n\nes:Third one."
+        assert done.completed_at is not None
+        batches = jobs_model.translate_batch_async.await_args_list
+        assert batches[0].args[1] == GenerationParams(num_beams=2)
+
+    @pytest.mark.asyncio
+    async def test_waits_for_model(self, session_factory, jobs_model):
+        """Test nothing is claimed while the model is loading."""
+        await _create(session_factory)
+        jobs_model.is_loaded = False
+
+        assert await JobRunner(session_factory).run_once() == 0
+
+    @pytest.mark.asyncio
+    async def test_failing_job_is_retried_then_failed(
+        self, session_factory, jobs_model
+    ):
+        """Test a segment failing JOB_MAX_ATTEMPTS times fails the job."""
+        job = await _create(session_factory, text="Only one.")
+        jobs_model.translate_batch_async.side_effect = RuntimeError("boom")
+        runner = JobRunner(session_factory)
+
+        with patch.object(settings, "JOB_MAX_ATTEMPTS", 2):
+            await runner.run_once()
+            retried, _ = await _load(session_factory, job.id)
+            await runner.run_once()
+
+        failed, _ = await _load(session_factory, job.id)
+        assert retried.status == JOB_RUNNING
+        assert failed.status == JOB_FAILED
+        assert failed.error == "Translation error"
+        assert await runner.run_once() == 0
+
+    @pytest.mark.asyncio
+    async def test_resumes_after_restart(self, session_factory, jobs_model):
+        """Test a job interrupted mid-batch is finished by a new runner."""
+        job = await _create(session_factory)
+        async with session_factory() as db:
+            # A previous process claimed everything and died.
+            await JobService.claim(db, limit=10)
+            await db.execute(
+                update(JobSegment).values(
+                    lease_until=datetime.utcnow() - timedelta(seconds=1)
+                )
+            )
+            await db.commit()
+
+        await JobRunner(session_factory).run_once()
+
+        done, _ = await _load(session_factory, job.id)
+        assert done.status == JOB_COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_callback_on_completion(self, session_factory, jobs_model, callbacks):
+        """Test the finished job is POSTed to its callback URL."""
+        job = await _create(
+            session_factory, text="Only one.", callback_url="http://hook.test/done"
+        )
+
+        await JobRunner(session_factory).run_once()
+
+        done, _ = await _load(session_factory, job.id)
+        assert done.callback_status == "delivered"
+        url, body = callbacks[0]
+        assert url == "http://hook.test/done"
+        assert body["id"] == job.id
+        assert body["status"] == JOB_COMPLETED
+        assert body["translation"] == "es:Only one."
+
+    @pytest.mark.asyncio
+    async def test_undelivered_callbacks_resume(
+        self, session_factory, jobs_model, callbacks
+    ):
+        """Test callbacks owed before a restart are sent on start."""
+        job = await _create(
+            session_factory, text="Only one.", callback_url="http://hook.test/done"
+        )
+        async with session_factory() as db:
+            await db.execute(
+                update(Job).values(status=JOB_COMPLETED, translation="Hola")
+            )
+            await db.commit()
+
+        await JobRunner(session_factory)._resume_callbacks()
+
+        done, _ = await _load(session_factory, job.id)
+        assert done.callback_status == "delivered"
+        assert callbacks[0][1]["translation"] == "Hola"
+
+    @pytest.mark.asyncio
+    async def test_failed_callback_is_recorded(self, session_factory, jobs_model):
+        """Test an unreachable callback URL does not fail the job."""
+        job = await _create(
+            session_factory, text="Only one.", callback_url="http://hook.test/done"
+        )
+        transport = httpx.MockTransport(lambda request: httpx.Response(500))
+        real_client = httpx.AsyncClient
+
+        with (
+            patch(
+                "app.services.jobs.httpx.AsyncClient",
+                side_effect=lambda **kw: real_client(transport=transport, **kw),
+            ),
+            patch.object(settings, "JOB_CALLBACK_RETRIES", 1),
+        ):
+            await JobRunner(session_factory).run_once()
+
+        done, _ = await _load(session_factory, job.id)
+        assert done.status == JOB_COMPLETED
+        assert done.callback_status == "failed"
+
+    @pytest.mark.asyncio
+    async def test_refused_callback_is_not_sent(
+        self, session_factory, jobs_model, callbacks
+    ):
+        """Test a callback host that became internal is not called."""
+        job = await _create(
+            session_factory, text="Only one.", callback_url="http://hook.test/done"
+        )
+
+        with patch.dict(HOSTS, {"hook.test": ["10.1.2.3"]}):
+            await JobRunner(session_factory).run_once()
+
+        done, _ = await _load(session_factory, job.id)
+        assert done.status == JOB_COMPLETED
+        assert done.callback_status == "failed"
+        assert callbacks == []
+
+
+class TestJobEndpoints:
+    """Tests for the job API."""
+
+    @pytest.fixture
+    async def jobs_client(self, client, session_factory, jobs_model):
+        """Serve the job routes from the in-memory database."""
+        from app.main import app
+
+        async def override_get_db():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        with patch("app.api.jobs.job_runner") as mock_runner:
+            client._mock_runner = mock_runner
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_submit_and_poll(self, jobs_client, session_factory):
+        """Test a submitted job is queued and reported with its progress."""
+        jobs_client._mock_service.plan.return_value = GenerationParams(num_beams=1)
+
+        response = await jobs_client.post(
+            "/jobs",
+            json={
+                "text": DOCUMENT,
+                "num_beams": 1,
+                "callback_url": "http://hook.test/done",
+            },
+        )
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["status"] == JOB_QUEUED
+        assert data["segments_total"] == 3
+        assert data["progress"] == 0.0
+        assert data["strategy"] == "greedy"
+        jobs_client._mock_runner.notify.assert_called_once()
+
+        with patch.object(settings, "JOB_BATCH_SEGMENTS", 1):
+            await JobRunner(session_factory).run_once()
+        response = await jobs_client.get(f"/jobs/{data['id']}")
+
+        progress = response.json()
+        assert progress["status"] == JOB_RUNNING
+        assert progress["segments_done"] == 1
+        assert progress["progress"] == pytest.approx(1 / 3, abs=1e-4)
+        assert progress["translation"] == "es:First one."
+
+    @pytest.mark.asyncio
+    async def test_unknown_job(self, jobs_client):
+        """Test polling an unknown id is a 404."""
+        response = await jobs_client.get("/jobs/missing")
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_submissions(self, jobs_client):
+        """Test empty text, bad callback URLs and a loading model."""
+        response = await jobs_client.post("/jobs", json={"text": "   "})
+        assert response.status_code == 400
+
+        response = await jobs_client.post(
+            "/jobs", json={"text": "Hello", "callback_url": "not a url"}
+        )
+        assert response.status_code == 422
+
+        jobs_client._mock_manager.is_loaded = False
+        response = await jobs_client.post("/jobs", json={"text": "Hello"})
+        assert response.status_code == 503
+
+    @pytest.mark.asyncio
+    async def test_rejects_internal_callback_urls(self, jobs_client):
+        """Test callback URLs reaching internal services are refused."""
+        for url in ("http://127.0.0.1:8000/admin/reload", "http://intranet.test/"):
+            response = await jobs_client.post(
+                "/jobs", json={"text": "Hello", "callback_url": url}
+            )
+            assert response.status_code == 400
+            assert "Callback" in response.json()["detail"]
+
+        jobs_client._mock_runner.notify.assert_not_called()
@@ -0,0 +1,189 @@
+"""
+Production-replay Load Generator Tests
+"""
+
+import json
+import sqlite3
+
+import httpx
+import pytest
+
+from benchmarks.loadtest import (
+    RequestResult,
+    format_summary,
+    load_db_texts,
+    load_jsonl_texts,
+    repeat_rate,
+    run_closed_loop,
+    run_open_loop,
+    sample_texts,
+    summarize,
+)
+
+
+def mock_client(handler):
+    """Async client answering requests with a handler."""
+    return httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://test"
+    )
+
+
+class TestSources:
+    """Tests for reading and sampling the replayed texts."""
+
+    def test_load_db_texts_newest_first(self, tmp_path):
+        """Test the most recent rows of the translations table are read."""
+        path = tmp_path / "translations.db"
+        with sqlite3.connect(path) as connection:
+            connection.execute(
+                "CREATE TABLE translations (id INTEGER PRIMARY KEY, source_text TEXT)"
+            )
+            connection.executemany(
+                "INSERT INTO translations (source_text) VALUES (?)",
+                [("first",), ("second",), ("third",)],
+            )
+
+        assert load_db_texts(path, limit=2) == ["third", "second"]
+
+    def test_load_jsonl_texts(self, tmp_path):
+        """Test table exports and evaluation samples are both read."""
+        path = tmp_path / "texts.jsonl"
+        path.write_text(
+            "\n".join(
+                [
+                    json.dumps({"source_text": "exported", "translated_text": "x"}),
+                    "",
+                    json.dumps({"en": "sample", "ro": "exemplu"}),
+                    json.dumps({"other": "ignored"}),
+                ]
+            ),
+            encoding="utf-8",
+        )
+
+        assert load_jsonl_texts(path) == ["exported", "sample"]
+
+    def test_sample_texts(self):
+        """Test draws are reproducible and skip texts the API would reject."""
+        pool = ["short", "a bit longer text", " ", "x" * 5001]
+
+        texts = sample_texts(pool, 20, seed=1)
+
+        assert len(texts) == 20
+        assert set(texts) <= {"short", "a bit longer text"}
+        assert texts == sample_texts(pool, 20, seed=1)
+
+    def test_sample_texts_keeps_history_repeats(self):
+        """Test texts repeated in the history are drawn as often."""
+        pool = ["common"] * 9 + ["rare"]
+
+        texts = sample_texts(pool, 1000, seed=1)
+
+        assert 850 < texts.count("common") < 950
+
+    def test_sample_texts_zipf(self):
+        """Test a Zipf draw concentrates the load on a few distinct texts."""
+        pool = [f"text {i}" for i in range(100)]
+
+        texts = sample_texts(pool, 1000, seed=1, zipf=1.2)
+
+        counts = sorted((texts.count(text) for text in set(texts)), reverse=True)
+        # A uniform draw would give each text about 10 requests.
+        assert counts[0] > 150
+        assert repeat_rate(texts) > 0.9
+        assert texts == sample_texts(pool, 1000, seed=1, zipf=1.2)
+
+    def test_repeat_rate(self):
+        """Test the share of requests repeating an earlier text."""
+        assert repeat_rate(["a", "b", "a", "a"]) == 0.5
+        assert repeat_rate([]) == 0.0
+
+    def test_sample_texts_empty_pool(self):
+        """Test a pool without usable texts is an error."""
+        with pytest.raises(ValueError):
+            sample_texts([""], 5)
+
+
+class TestReplay:
+    """Tests for sending the load."""
+
+    @pytest.mark.asyncio
+    async def test_closed_loop_sends_every_text(self):
+        """Test every text is sent once, results in the order of the texts."""
+        sent = []
+
+        def handler(request):
+            sent.append(json.loads(request.content))
+            return httpx.Response(200, json={"translated_text": "t"})
+
+        async with mock_client(handler) as client:
+            results = await run_closed_loop(client, ["a", "bb", "ccc", "dddd"], 3)
+
+        assert sorted(body["text"] for body in sent) == ["a", "bb", "ccc", "dddd"]
+        # Bypassing the memory is up to the server, not the request.
+        assert all(body.keys() == {"text"} for body in sent)
+        assert [result.chars for result in results] == [1, 2, 3, 4]
+        assert all(result.ok for result in results)
+
+    @pytest.mark.asyncio
+    async def test_open_loop_records_statuses_and_errors(self):
+        """Test 429s, server errors and transport errors are all recorded."""
+
+        def handler(request):
+            text = json.loads(request.content)["text"]
+            if text == "busy":
+                return httpx.Response(429)
+            if text == "broken":
+                return httpx.Response(500)
+            if text == "down":
+                raise httpx.ConnectError("refused")
+            return httpx.Response(200)
+
+        async with mock_client(handler) as client:
+            results = await run_open_loop(
+                client, ["ok", "busy", "broken", "down"], qps=1000
+            )
+
+        assert [result.status for result in results] == [200, 429, 500, None]
+        assert results[3].error == "ConnectError"
+        assert all(result.latency_s >= 0 for result in results)
+
+
+class TestSummary:
+    """Tests for summarizing a run."""
+
+    def test_rates_and_latency_by_length(self):
+        """Test rates count 429s apart from errors and latency is binned by length."""
+        results = [
+            RequestResult(10, 0.1, status=200),
+            RequestResult(20, 0.3, status=200),
+            RequestResult(30, 9.0, status=429),
+            RequestResult(100, 0.5, status=200),
+            RequestResult(100, 1.0, status=503),
+            RequestResult(100, 2.0, error="ReadTimeout"),
+        ]
+
+        summary = summarize(results, duration=2.0, bins=(32, 128))
+
+        assert summary["requests"] == 6
+        assert summary["succeeded"] == 3
+        assert summary["throughput_rps"] == 1.5
+        assert summary["offered_rps"] == 3.0
+        assert summary["error_rate"] == 0.3333
+        assert summary["rejection_rate"] == 0.1667
+        assert summary["statuses"] == {"200": 3, "429": 1, "503": 1, "ReadTimeout": 1}
+        # Only successful requests count towards the latency.
+        assert summary["latency_ms"]["max"] == 500.0
+        short, long = summary["by_input_chars"]
+        assert short["chars"] == "1-32"
+        assert (short["requests"], short["rejection_rate"]) == (3, 0.3333)
+        assert short["latency_ms"]["p50"] == 300.0
+        assert (long["chars"], long["error_rate"]) == ("33-128", 0.6667)
+        assert "33-128" in format_summary(summary)
+
+    def test_no_success(self):
+        """Test a run without successful requests has no latency."""
+        summary = summarize([RequestResult(5, 1.0, error="ConnectError")], 1.0)
+
+        assert summary["latency_ms"]["p50"] is None
+        assert summary["throughput_rps"] == 0.0
+        assert "None" in format_summary(summary)
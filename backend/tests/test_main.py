@@ -2,7 +2,7 @@
 Tests for Main Application and Lifespan
 """
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi import FastAPI
@@ -12,8 +12,14 @@ from app.main import lifespan
 
 @pytest.mark.asyncio
 async def test_lifespan():
-    # Mock the model manager
-    with patch("app.main.model_manager") as mock_manager:
+    # Mock the model manager and batch scheduler
+    with (
+        patch("app.main.model_manager") as mock_manager,
+        patch("app.main.batch_scheduler") as mock_scheduler,
+        patch("app.main.inference_executor") as mock_executor,
+        patch("app.main.job_runner") as mock_jobs,
+    ):
+        mock_jobs.stop = AsyncMock()
         # Create a mock app
         mock_app = MagicMock(spec=FastAPI)
 
@@ -21,6 +27,12 @@ async def test_lifespan():
         async with lifespan(mock_app):
             # Verify startup
             mock_manager.load.assert_called_once()
+            mock_scheduler.start.assert_called_once()
+            mock_executor.start.assert_called_once()
+            mock_jobs.start.assert_called_once()
 
         # Verify shutdown
         mock_manager.cleanup.assert_called_once()
+        mock_scheduler.stop.assert_called_once()
+        mock_executor.shutdown.assert_called_once()
+        mock_jobs.stop.assert_awaited_once()
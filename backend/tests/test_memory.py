@@ -0,0 +1,223 @@
+"""
+Translation Memory and Database Migration Tests
+"""
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.database import Base, _add_missing_columns
+from app.models.translation import Translation
+from app.services.memory import (
+    SentenceMemory,
+    SentenceMemoryStats,
+    TranslationMemory,
+)
+
+
+class TestTranslationMemory:
+    """Tests for exact-match lookups on the translations table."""
+
+    @pytest.mark.asyncio
+    async def test_store_then_lookup(self, db):
+        """Test a stored translation is found by hash and model version."""
+        saved = await TranslationMemory.store(db, "Hello", "Hola", "h1", "v1")
+
+        assert saved.id is not None
+        assert await TranslationMemory.lookup(db, "h1", "v1") == "Hola"
+
+    @pytest.mark.asyncio
+    async def test_lookup_miss(self, db):
+        """Test an unknown hash is a miss."""
+        assert await TranslationMemory.lookup(db, "missing", "v1") is None
+
+    @pytest.mark.asyncio
+    async def test_stale_model_version_is_skipped(self, db):
+        """Test entries from an older model are not served."""
+        await TranslationMemory.store(db, "Hello", "Hola", "h1", "old")
+        assert await TranslationMemory.lookup(db, "h1", "new") is None
+
+    @pytest.mark.asyncio
+    async def test_repeated_requests_are_all_recorded(self, db):
+        """Test the history keeps every request; lookups return the newest."""
+        await TranslationMemory.store(db, "Hello", "Hola", "h1", "v1")
+        repeat = await TranslationMemory.store(db, "Hello", "Buenas", "h1", "v1")
+
+        assert repeat.id is not None
+        result = await db.execute(text("SELECT COUNT(*) FROM translations"))
+        assert result.scalar() == 2
+        assert await TranslationMemory.lookup(db, "h1", "v1") == "Buenas"
+
+    @pytest.mark.asyncio
+    async def test_history_without_hash_allows_repeats(self, db):
+        """Test rows without a hash (memory disabled) can repeat."""
+        await TranslationMemory.store(db, "Hello", "Hola", None, None)
+        await TranslationMemory.store(db, "Hello", "Hola", None, None)
+
+        result = await db.execute(text("SELECT COUNT(*) FROM translations"))
+        assert result.scalar() == 2
+
+    @pytest.mark.asyncio
+    async def test_store_then_lookup_many(self, db):
+        """Test a batch is saved in one go and found by hash."""
+        await TranslationMemory.store(db, "Hello", "Hola", "h1", "v1")
+        await TranslationMemory.store_many(
+            db,
+            [("Hello", "Hola", "h1"), ("Bye", "Adiós", "h2"), ("Bye", "Adiós", "h2")],
+            "v1",
+        )
+
+        found = await TranslationMemory.lookup_many(db, ["h1", "h2", "h3"], "v1")
+
+        assert found == {"h1": "Hola", "h2": "Adiós"}
+        result = await db.execute(text("SELECT COUNT(*) FROM translations"))
+        assert result.scalar() == 4
+
+    @pytest.mark.asyncio
+    async def test_store_many_without_hash(self, db):
+        """Test a batch without hashes (memory disabled) is saved whole."""
+        await TranslationMemory.store_many(
+            db, [("Hello", "Hola", None), ("Hello", "Hola", None)], None
+        )
+
+        result = await db.execute(text("SELECT COUNT(*) FROM translations"))
+        assert result.scalar() == 2
+
+
+class TestAddMissingColumns:
+    """Tests for upgrading databases created by earlier versions."""
+
+    @pytest.mark.asyncio
+    async def test_adds_columns_and_index_to_old_table(self):
+        """Test an old translations table gains the memory columns."""
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "CREATE TABLE translations (id INTEGER PRIMARY KEY, "
+                    "source_text TEXT NOT NULL, translated_text TEXT NOT NULL, "
+                    "timestamp DATETIME NOT NULL)"
+                )
+            )
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_add_missing_columns)
+
+            def describe(sync_conn):
+                inspector = inspect(sync_conn)
+                columns = {c["name"] for c in inspector.get_columns("translations")}
+                indexes = {i["name"] for i in inspector.get_indexes("translations")}
+                return columns, indexes
+
+            columns, indexes = await conn.run_sync(describe)
+        await engine.dispose()
+
+        assert {"content_hash", "model_version"} <= columns
+        assert "ix_translations_content_hash" in indexes
+
+    @pytest.mark.asyncio
+    async def test_unique_hash_index_becomes_non_unique(self):
+        """Test databases with the old unique index accept repeated requests."""
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(text("DROP INDEX ix_translations_content_hash"))
+            await conn.execute(
+                text(
+                    "CREATE UNIQUE INDEX ix_translations_content_hash "
+                    "ON translations (content_hash)"
+                )
+            )
+            await conn.run_sync(_add_missing_columns)
+
+            def unique(sync_conn):
+                return {
+                    i["name"]: bool(i["unique"])
+                    for i in inspect(sync_conn).get_indexes("translations")
+                }
+
+            indexes = await conn.run_sync(unique)
+        session_factory = async_sessionmaker(engine)
+        async with session_factory() as session:
+            await TranslationMemory.store(session, "Hi", "Hola", "h1", "v1")
+            await TranslationMemory.store(session, "Hi", "Hola", "h1", "v1")
+        await engine.dispose()
+
+        assert indexes["ix_translations_content_hash"] is False
+
+    @pytest.mark.asyncio
+    async def test_idempotent(self, memory_engine):
+        """Test running the upgrade on a current schema changes nothing."""
+        async with memory_engine.begin() as conn:
+            await conn.run_sync(_add_missing_columns)
+            await conn.run_sync(_add_missing_columns)
+
+        session_factory = async_sessionmaker(memory_engine)
+        async with session_factory() as session:
+            session.add(Translation(source_text="a", translated_text="b"))
+            await session.commit()
+
+
+class TestSentenceMemory:
+    """Tests for the sentence-level translation memory."""
+
+    @pytest.mark.asyncio
+    async def test_store_then_lookup_many(self, db):
+        """Test stored sentences are found by hash and model version."""
+        await SentenceMemory.store_many(
+            db, [("h1", "Hello.", "Hola."), ("h2", "Bye.", "Adiós.")], "v1"
+        )
+
+        found = await SentenceMemory.lookup_many(db, ["h1", "h2", "h3", "h1"], "v1")
+
+        assert found == {"h1": "Hola.", "h2": "Adiós."}
+
+    @pytest.mark.asyncio
+    async def test_stale_model_version_is_skipped(self, db):
+        """Test sentences from an older model are not served."""
+        await SentenceMemory.store_many(db, [("h1", "Hello.", "Hola.")], "old")
+        assert await SentenceMemory.lookup_many(db, ["h1"], "new") == {}
+
+    @pytest.mark.asyncio
+    async def test_duplicates_are_skipped(self, db):
+        """Test storing a known sentence keeps the first entry."""
+        await SentenceMemory.store_many(db, [("h1", "Hello.", "Hola.")], "v1")
+        await SentenceMemory.store_many(db, [("h1", "Hello.", "Buenas.")], "v1")
+
+        assert await SentenceMemory.lookup_many(db, ["h1"], "v1") == {"h1": "Hola."}
+
+    @pytest.mark.asyncio
+    async def test_lookup_is_chunked(self, db):
+        """Test lookups over many hashes stay under the parameter limit."""
+        entries = [(f"h{i}", f"s{i}", f"t{i}") for i in range(1200)]
+        await SentenceMemory.store_many(db, entries, "v1")
+
+        found = await SentenceMemory.lookup_many(db, [e[0] for e in entries], "v1")
+
+        assert len(found) == 1200
+
+    @pytest.mark.asyncio
+    async def test_store_nothing(self, db):
+        """Test storing an empty list does not touch the database."""
+        await SentenceMemory.store_many(db, [], "v1")
+        assert await SentenceMemory.lookup_many(db, [], "v1") == {}
+
+
+class TestSentenceMemoryStats:
+    """Tests for the sentence memory counters."""
+
+    def test_snapshot(self):
+        """Test the hit rate is computed over all segments."""
+        stats = SentenceMemoryStats()
+        stats.record(segments=4, hits=1)
+        stats.record(segments=4, hits=3)
+
+        assert stats.snapshot() == {
+            "requests": 2,
+            "segments": 8,
+            "hits": 4,
+            "hit_rate": 0.5,
+        }
+
+    def test_empty_snapshot(self):
+        """Test the hit rate is zero before any request."""
+        assert SentenceMemoryStats().snapshot()["hit_rate"] == 0.0
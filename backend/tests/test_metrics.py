@@ -0,0 +1,164 @@
+"""
+Prometheus Metrics Tests
+"""
+
+from unittest.mock import patch
+
+import pytest
+import torch
+from prometheus_client import REGISTRY
+
+from app.core.admission import AdmissionController, Overloaded
+from app.core.bucketing import PaddingStats
+from app.core.config import settings
+from app.core.metrics import (
+    mark_worker_dead,
+    observe_phase,
+    phase_timer,
+    record_model_load,
+    render_metrics,
+)
+from app.core.tokenization import PhaseStats
+from app.services.cache import TranslationCache
+
+
+def sample(name, **labels):
+    """Current value of a sample, 0 if never recorded."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestPhaseHistogram:
+    """Tests for the per-phase latency histogram."""
+
+    def test_observe_phase(self):
+        """Test durations land in the phase's buckets."""
+        count = sample("translatica_phase_seconds_count", phase="db_persist")
+        fast = sample("translatica_phase_seconds_bucket", phase="db_persist", le="0.01")
+
+        observe_phase("db_persist", 0.005)
+        observe_phase("db_persist", 2.0)
+
+        assert (
+            sample("translatica_phase_seconds_count", phase="db_persist") == count + 2
+        )
+        assert (
+            sample("translatica_phase_seconds_bucket", phase="db_persist", le="0.01")
+            == fast + 1
+        )
+
+    def test_phase_timer(self):
+        """Test a timed block is observed even when it raises."""
+        count = sample("translatica_phase_seconds_count", phase="db_persist")
+
+        with pytest.raises(ValueError):
+            with phase_timer("db_persist"):
+                raise ValueError()
+
+        assert (
+            sample("translatica_phase_seconds_count", phase="db_persist") == count + 1
+        )
+
+    def test_phase_stats_feed_the_histogram(self):
+        """Test model phases timed for /stats are exported too."""
+        count = sample("translatica_phase_seconds_count", phase="generate")
+
+        PhaseStats().record("generate", 0.5)
+
+        assert sample("translatica_phase_seconds_count", phase="generate") == count + 1
+
+
+def test_padding_stats_count_tokens():
+    """Test real input and output tokens are counted, padding excluded."""
+    inputs = sample("translatica_tokens_total", direction="input")
+    outputs = sample("translatica_tokens_total", direction="output")
+
+    PaddingStats().record(
+        torch.tensor([[5, 6, 1], [7, 1, 0]]),
+        torch.tensor([[1, 1, 1], [1, 1, 0]]),
+        # Decoder start token, then generated ids padded with 0.
+        torch.tensor([[0, 8, 1], [0, 1, 0]]),
+        pad_token_id=0,
+    )
+
+    assert sample("translatica_tokens_total", direction="input") == inputs + 5
+    assert sample("translatica_tokens_total", direction="output") == outputs + 3
+
+
+def test_cache_lookups_are_counted():
+    """Test translation cache hits and misses are exported."""
+    hits = sample("translatica_cache_lookups_total", layer="cache", result="hit")
+    misses = sample("translatica_cache_lookups_total", layer="cache", result="miss")
+    cache = TranslationCache(max_entries=10, max_bytes=10_000, ttl_seconds=60)
+
+    cache.get("key")
+    cache.put("key", "Hola")
+    cache.get("key")
+
+    assert (
+        sample("translatica_cache_lookups_total", layer="cache", result="hit")
+        == hits + 1
+    )
+    assert (
+        sample("translatica_cache_lookups_total", layer="cache", result="miss")
+        == misses + 1
+    )
+
+
+class TestAdmissionMetrics:
+    """Tests for the inference queue metrics."""
+
+    @pytest.fixture
+    def controller(self):
+        """Admission controller with a one-place queue."""
+        with patch.object(settings, "ADMISSION_MAX_DEPTH", 1):
+            yield AdmissionController()
+
+    def test_depth_and_rejections(self, controller):
+        """Test the queue depth gauge follows the queue and rejections count."""
+        rejected = sample("translatica_queue_rejected_total")
+
+        ticket = controller.acquire()
+        assert sample("translatica_queue_depth") == 1
+        with pytest.raises(Overloaded):
+            controller.acquire()
+        controller.release(ticket)
+
+        assert sample("translatica_queue_depth") == 0
+        assert sample("translatica_queue_rejected_total") == rejected + 1
+
+    def test_queue_wait_is_observed(self, controller):
+        """Test the wait before reaching the model is observed once."""
+        count = sample("translatica_phase_seconds_count", phase="queue_wait")
+        ticket = controller.acquire()
+
+        controller.check(ticket)
+        controller.check(ticket)
+
+        assert (
+            sample("translatica_phase_seconds_count", phase="queue_wait") == count + 1
+        )
+
+
+def test_record_model_load():
+    """Test each load phase duration is exported."""
+    record_model_load({"tokenizer": 0.25, "total": 3.5})
+
+    assert sample("translatica_model_load_seconds", phase="total") == 3.5
+    assert sample("translatica_model_load_seconds", phase="tokenizer") == 0.25
+
+
+def test_render_metrics():
+    """Test the exposition text lists the metrics."""
+    text = render_metrics().decode()
+
+    assert "# TYPE translatica_request_seconds histogram" in text
+    assert "# TYPE translatica_errors_total counter" in text
+
+
+def test_mark_worker_dead_without_multiprocess_dir(monkeypatch):
+    """Test reaping a worker is a no-op outside multiprocess mode."""
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    with patch("app.core.metrics.multiprocess.mark_process_dead") as mark:
+        mark_worker_dead(1234)
+
+    mark.assert_not_called()
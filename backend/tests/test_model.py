@@ -2,12 +2,29 @@
 Unit Tests for ModelManager
 """
 
+import asyncio
+import json
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
+import torch
+from peft import LoraConfig, get_peft_model
+from transformers import T5Config, T5ForConditionalGeneration
 
 from app.core.config import settings
-from app.core.model import ModelManager
+from app.core.generation import DecodingLog, GenerationParams, LatencyModel
+from app.core.model import (
+    BUNDLE_FORMAT_VERSION,
+    EXPORT_INFO_FILE,
+    ModelManager,
+    compute_model_version,
+    load_merged_model,
+    load_onnx_model,
+    merge_lora_in_place,
+    read_export_version,
+)
+from app.core.quantization import QuantizationReport
 
 
 @pytest.fixture
@@ -17,10 +34,13 @@ def mock_transformers():
         patch("app.core.model.AutoModelForSeq2SeqLM") as mock_model,
         patch("app.core.model.PeftModel") as mock_peft,
         patch("app.core.model.torch") as mock_torch,
+        patch("app.core.model.latency_model") as mock_latency,
+        patch("app.core.model.padding_stats") as mock_padding,
+        patch("app.core.model.save_bundle") as mock_save_bundle,
     ):
 
         # Setup mocks
-        mock_tokenizer.from_pretrained.return_value = MagicMock()
+        mock_tokenizer.from_pretrained.return_value = MagicMock(pad_token_id=0)
         mock_model.from_pretrained.return_value = MagicMock()
 
         # PeftModel.from_pretrained(...).merge_and_unload() returns the final
@@ -39,6 +59,9 @@ def mock_transformers():
             "peft": mock_peft,
             "merged": merged_model,
             "torch": mock_torch,
+            "latency": mock_latency,
+            "padding": mock_padding,
+            "save_bundle": mock_save_bundle,
         }
 
 
@@ -98,6 +121,7 @@ def test_load_success(mock_transformers):
     assert manager._model is mock_transformers["merged"]
     manager._model.to.assert_called_once()
     manager._model.eval.assert_called_once()
+    assert set(manager.load_memory) == {"peak_rss_mb", "rss_mb"}
 
 
 def test_translate_not_loaded():
@@ -106,17 +130,32 @@ def test_translate_not_loaded():
         manager.translate("hello")
 
 
+def _with_encoder(manager, encoded):
+    """Serve fixed input ids on the CPU instead of tokenizing."""
+    manager._device = torch.device("cpu")
+    manager._encoder = MagicMock()
+    manager._encoder.encode.return_value = encoded
+    return manager
+
+
+def test_load_builds_encoder_with_t5_prefix(mock_transformers):
+    manager = ModelManager()
+    manager.load()
+
+    # T5 needs the task prefix it was fine-tuned with on every input.
+    assert manager.encoder.prefix == settings.TRANSLATION_PREFIX
+    assert manager.encoder.max_length == settings.MAX_INPUT_LENGTH
+
+
 def test_translate_success(mock_transformers):
     manager = ModelManager()
     manager.load()
 
     # Mock tokenization output
-    mock_input = MagicMock()
-    mock_input.to.return_value = {"input_ids": "fake_ids"}
-    manager._tokenizer.return_value = mock_input
+    _with_encoder(manager, [[5, 6, 1]])
 
     # Mock generation
-    manager._model.generate.return_value = ["fake_output"]
+    manager._model.generate.return_value = torch.ones(1, 4, dtype=torch.long)
 
     # Mock decoding
     manager._tokenizer.decode.return_value = "Hola"
@@ -125,21 +164,20 @@ def test_translate_success(mock_transformers):
     assert result == "Hola"
 
 
-def test_translate_applies_t5_prefix(mock_transformers):
+def test_translate_times_phases_apart(mock_transformers):
     manager = ModelManager()
     manager.load()
-
-    mock_input = MagicMock()
-    mock_input.to.return_value = {"input_ids": "fake_ids"}
-    manager._tokenizer.return_value = mock_input
-    manager._model.generate.return_value = ["fake_output"]
+    _with_encoder(manager, [[5, 6, 1]])
+    manager._model.generate.return_value = torch.ones(1, 4, dtype=torch.long)
     manager._tokenizer.decode.return_value = "Hola"
 
-    manager.translate("Hello")
+    with patch("app.core.model.phase_stats") as mock_phases:
+        manager.translate("Hello")
 
-    # The text passed to the tokenizer must start with the T5 task prefix.
-    called_text = manager._tokenizer.call_args[0][0]
-    assert called_text == settings.TRANSLATION_PREFIX + "Hello"
+    manager._encoder.encode.assert_called_once_with(["Hello"])
+    timed = [c[0][0] for c in mock_phases.timed.call_args_list]
+    assert timed == ["tokenize", "decode"]
+    assert mock_phases.record.call_args[0][0] == "generate"
 
 
 def test_cleanup(mock_transformers):
@@ -176,3 +214,652 @@ def test_get_model_error():
     manager = ModelManager()
     with pytest.raises(RuntimeError):
         _ = manager.model
+
+
+def test_translate_batch_not_loaded():
+    manager = ModelManager()
+    with pytest.raises(RuntimeError, match="Model not loaded"):
+        manager.translate_batch(["hello"])
+
+
+def test_translate_batch_empty(mock_transformers):
+    manager = ModelManager()
+    manager.load()
+
+    assert manager.translate_batch([]) == []
+    manager._model.generate.assert_not_called()
+
+
+def test_translate_batch_success(mock_transformers):
+    manager = ModelManager()
+    manager.load()
+
+    _with_encoder(manager, [[5] * 6, [5] * 2, [5] * 3])
+    # Each output row carries the padded input width of its batch.
+    manager._model.generate.side_effect = lambda input_ids, **kwargs: torch.full(
+        (input_ids.shape[0], 2), input_ids.shape[1]
+    )
+    manager._tokenizer.batch_decode.side_effect = lambda ids, **kwargs: [
+        f"width {int(row[0])}" for row in ids
+    ]
+
+    with patch.object(settings, "MAX_BATCH_TOKENS", 6):
+        result = manager.translate_batch(["Long", "Short", "Mid"])
+
+    # 2 and 3 tokens fit in 2x3 padded tokens; the 6-token text runs alone.
+    assert result == ["width 6", "width 3", "width 3"]
+    # Every text is tokenized in one batched call.
+    manager._encoder.encode.assert_called_once_with(["Long", "Short", "Mid"])
+    # Batched inputs are padded, so the attention mask must be passed along.
+    first_batch = manager._model.generate.call_args_list[0][1]
+    assert first_batch["attention_mask"].tolist() == [[1, 1, 0], [1, 1, 1]]
+    assert mock_transformers["padding"].record.call_count == 2
+
+
+def test_count_tokens(mock_transformers):
+    manager = ModelManager()
+    manager.load()
+    manager._encoder = MagicMock()
+    manager._encoder.count.return_value = 4
+
+    assert manager.count_tokens("Hello") == 4
+    manager._encoder.count.assert_called_once_with("Hello")
+
+
+@pytest.mark.asyncio
+async def test_translate_async_runs_on_executor(mock_transformers):
+    manager = ModelManager()
+    manager.load()
+
+    with patch("app.core.model.inference_executor") as mock_executor:
+
+        async def fake_run(fn, *args):
+            return "Hola"
+
+        mock_executor.run.side_effect = fake_run
+
+        assert await manager.translate_async("Hello") == "Hola"
+        mock_executor.run.assert_called_once_with(manager.translate, "Hello", None)
+
+
+@pytest.mark.asyncio
+async def test_translate_batch_async_runs_on_executor(mock_transformers):
+    manager = ModelManager()
+    manager.load()
+
+    with patch("app.core.model.inference_executor") as mock_executor:
+
+        async def fake_run(fn, *args):
+            return ["Hola"]
+
+        mock_executor.run.side_effect = fake_run
+
+        assert await manager.translate_batch_async(["Hello"]) == ["Hola"]
+        mock_executor.run.assert_called_once_with(
+            manager.translate_batch, ["Hello"], None
+        )
+
+
+def test_model_version_not_loaded():
+    manager = ModelManager()
+    with pytest.raises(RuntimeError, match="Model not loaded"):
+        _ = manager.model_version
+
+
+def test_load_sets_model_version_and_notifies(mock_transformers):
+    manager = ModelManager()
+    listener = MagicMock()
+    manager.add_load_listener(listener)
+
+    manager.load()
+
+    assert manager.model_version == compute_model_version(
+        settings.BASE_MODEL_CHECKPOINT, settings.MODEL_PATH
+    )
+    listener.assert_called_once_with()
+
+    manager.cleanup()
+    with pytest.raises(RuntimeError):
+        _ = manager.model_version
+
+
+def test_compute_model_version_tracks_adapter(tmp_path):
+    (tmp_path / "adapter_model.safetensors").write_bytes(b"weights-1")
+    first = compute_model_version("t5-small", tmp_path)
+
+    (tmp_path / "adapter_model.safetensors").write_bytes(b"weights-2")
+    second = compute_model_version("t5-small", tmp_path)
+
+    assert first != second
+    assert compute_model_version("t5-base", tmp_path) != second
+    assert len(first) == 16
+
+
+def _report(passed):
+    return QuantizationReport(
+        samples=2,
+        fp32={"bleu": 0.3, "chrf": 50.0},
+        int8={"bleu": 0.2, "chrf": 40.0},
+        bleu_drop=0.1,
+        chrf_drop=10.0,
+        passed=passed,
+    )
+
+
+@pytest.fixture
+def quantization(mock_transformers):
+    mock_transformers["torch"].device.return_value.type = "cpu"
+    with (
+        patch.object(settings, "QUANTIZE_INT8", True),
+        patch.object(settings, "DEVICE", "cpu"),
+        patch("app.core.model.quantize_dynamic_int8") as mock_quantize,
+        patch("app.core.model.check_quantization") as mock_check,
+    ):
+        yield mock_quantize, mock_check
+
+
+def test_load_serves_int8_when_check_passes(mock_transformers, quantization):
+    mock_quantize, mock_check = quantization
+    mock_check.return_value = _report(passed=True)
+    manager = ModelManager()
+
+    manager.load()
+
+    assert manager.model is mock_quantize.return_value
+    assert manager.is_quantized
+    assert manager.model_version.endswith("-int8")
+    assert manager.quantization_report["passed"] is True
+
+
+def test_load_refuses_int8_when_check_fails(mock_transformers, quantization):
+    _, mock_check = quantization
+    mock_check.return_value = _report(passed=False)
+    manager = ModelManager()
+
+    manager.load()
+
+    assert manager.model is mock_transformers["merged"]
+    assert not manager.is_quantized
+    assert not manager.model_version.endswith("-int8")
+
+
+def test_load_warns_and_serves_int8_when_configured(mock_transformers, quantization):
+    mock_quantize, mock_check = quantization
+    mock_check.side_effect = FileNotFoundError("no sample")
+    manager = ModelManager()
+
+    with patch.object(settings, "QUANTIZATION_ON_FAIL", "warn"):
+        manager.load()
+
+    assert manager.model is mock_quantize.return_value
+    assert manager.quantization_report is None
+
+
+def test_load_skips_check_when_disabled(mock_transformers, quantization):
+    mock_quantize, mock_check = quantization
+    manager = ModelManager()
+
+    with patch.object(settings, "QUANTIZATION_CHECK_ENABLED", False):
+        manager.load()
+
+    mock_check.assert_not_called()
+    assert manager.model is mock_quantize.return_value
+
+
+def test_load_fails_without_eval_sample(mock_transformers, quantization, tmp_path):
+    mock_quantize, mock_check = quantization
+    manager = ModelManager()
+
+    with patch.object(settings, "QUANTIZATION_EVAL_PATH", tmp_path / "missing.jsonl"):
+        with pytest.raises(FileNotFoundError, match="QUANTIZATION_CHECK_ENABLED"):
+            manager.load()
+
+    mock_quantize.assert_not_called()
+    assert not manager.is_loaded
+
+
+def test_quantization_skipped_on_gpu(mock_transformers, quantization):
+    mock_quantize, _ = quantization
+    mock_transformers["torch"].device.return_value.type = "cuda"
+    manager = ModelManager()
+
+    manager.load()
+
+    mock_quantize.assert_not_called()
+    assert not manager.is_quantized
+
+
+@pytest.fixture
+def onnx_backend(mock_transformers):
+    with (
+        patch.object(settings, "INFERENCE_BACKEND", "onnxruntime"),
+        patch("app.core.model.load_onnx_model") as mock_load_onnx,
+        patch("app.core.model.read_export_version") as mock_export_version,
+    ):
+        yield mock_load_onnx, mock_export_version
+
+
+def test_load_onnx_backend(mock_transformers, onnx_backend):
+    mock_load_onnx, mock_export_version = onnx_backend
+    current = compute_model_version(settings.BASE_MODEL_CHECKPOINT, settings.MODEL_PATH)
+    mock_export_version.return_value = current
+    manager = ModelManager()
+
+    with patch.object(settings, "QUANTIZE_INT8", True):
+        manager.load()
+
+    mock_load_onnx.assert_called_once_with(settings.ONNX_MODEL_PATH)
+    mock_transformers["peft"].from_pretrained.assert_not_called()
+    assert manager.model is mock_load_onnx.return_value
+    assert manager.model_version == f"{current}-onnx"
+    assert not manager.is_quantized
+
+
+def test_load_onnx_backend_stale_export(mock_transformers, onnx_backend):
+    _, mock_export_version = onnx_backend
+    mock_export_version.return_value = "0123456789abcdef"
+    manager = ModelManager()
+
+    manager.load()
+
+    # The version follows the exported graphs, not the current adapter.
+    assert manager.model_version == "0123456789abcdef-onnx"
+
+
+def test_read_export_version(tmp_path):
+    assert read_export_version(tmp_path) is None
+
+    (tmp_path / EXPORT_INFO_FILE).write_text('{"model_version": "abc"}')
+    assert read_export_version(tmp_path) == "abc"
+
+
+def test_load_onnx_model_without_optimum(tmp_path):
+    with patch.dict("sys.modules", {"optimum.onnxruntime": None}):
+        with pytest.raises(RuntimeError, match="optimum"):
+            load_onnx_model(tmp_path)
+
+
+def test_load_compiles_and_warms_up_buckets(mock_transformers):
+    manager = ModelManager()
+
+    with (
+        patch.object(settings, "COMPILE_ENABLED", True),
+        patch.object(settings, "COMPILE_LENGTH_BUCKETS", [16, 32, 1024]),
+        patch.object(settings, "MAX_REQUEST_BEAMS", 4),
+        patch("app.core.model.compile_model", side_effect=lambda m: m) as mock_compile,
+        patch("app.core.model.compile_stats") as mock_stats,
+    ):
+        manager.load()
+
+    mock_compile.assert_called_once_with(mock_transformers["merged"])
+    assert manager.is_compiled
+    # Buckets longer than MAX_INPUT_LENGTH are never warmed up.
+    warmed = [c[0][0] for c in mock_stats.record_compile.call_args_list]
+    assert warmed == [16, 32]
+    # Every servable beam width, greedy included, is compiled per bucket.
+    calls = mock_transformers["merged"].generate.call_args_list
+    assert [c.kwargs["num_beams"] for c in calls] == [1, 2, 3, 4] * 2
+
+
+def test_generate_pads_to_bucket_when_compiled(mock_transformers):
+    manager = ModelManager()
+    manager.load()
+    manager._is_compiled = True
+    manager._tokenizer.pad_token_id = 0
+    inputs = {
+        "input_ids": torch.tensor([[5, 6, 1]]),
+        "attention_mask": torch.ones(1, 3, dtype=torch.long),
+    }
+
+    with (
+        patch.object(settings, "COMPILE_LENGTH_BUCKETS", [8, 16]),
+        patch("app.core.model.compile_stats") as mock_stats,
+    ):
+        manager._generate(inputs)
+
+    input_ids = manager._model.generate.call_args[0][0]
+    assert input_ids.shape == (1, 8)
+    assert manager._model.generate.call_args[1]["attention_mask"].sum() == 3
+    assert mock_stats.record.call_args[0][0] == 8
+
+
+def test_generate_uses_request_params(mock_transformers):
+    manager = ModelManager()
+    manager.load()
+    inputs = {"input_ids": torch.ones(1, 5, dtype=torch.long)}
+    manager._model.generate.return_value = torch.ones(1, 7, dtype=torch.long)
+
+    manager._generate(inputs, GenerationParams(num_beams=1, max_new_tokens=12))
+
+    kwargs = manager._model.generate.call_args[1]
+    assert kwargs["num_beams"] == 1
+    assert kwargs["max_new_tokens"] == 12
+    assert "early_stopping" not in kwargs
+    record = mock_transformers["latency"].record.call_args[0]
+    assert record[:3] == (1, 5, 6)
+
+
+def test_generate_unbucketed_input(mock_transformers):
+    manager = ModelManager()
+    manager.load()
+    manager._is_compiled = True
+    inputs = {"input_ids": torch.ones(1, 40, dtype=torch.long)}
+
+    with (
+        patch.object(settings, "COMPILE_LENGTH_BUCKETS", [8, 16]),
+        patch("app.core.model.compile_stats") as mock_stats,
+    ):
+        manager._generate(inputs)
+
+    assert manager._model.generate.call_args[0][0].shape == (1, 40)
+    assert mock_stats.record.call_args[0][0] is None
+
+
+@pytest.fixture
+def bundle_dir(tmp_path):
+    bundle = tmp_path / "bundle"
+    bundle.mkdir()
+    adapter = tmp_path / "adapter"
+    adapter.mkdir()
+    (adapter / "adapter_model.safetensors").write_bytes(b"weights")
+    version = compute_model_version(settings.BASE_MODEL_CHECKPOINT, adapter)
+    info = {"format_version": BUNDLE_FORMAT_VERSION, "model_version": version}
+    (bundle / EXPORT_INFO_FILE).write_text(json.dumps(info))
+    with (
+        patch.object(settings, "MODEL_BUNDLE_PATH", bundle),
+        patch.object(settings, "MODEL_PATH", adapter),
+    ):
+        yield bundle, adapter, version
+
+
+def test_load_memory_maps_matching_bundle(mock_transformers, bundle_dir):
+    bundle, _, version = bundle_dir
+    mock_transformers["torch"].device.return_value.type = "cpu"
+    manager = ModelManager()
+
+    with (
+        patch.object(settings, "DEVICE", "cpu"),
+        patch("app.core.model.load_bundle_model") as mock_load_bundle,
+    ):
+        manager.load()
+
+    mock_load_bundle.assert_called_once_with(bundle)
+    mock_transformers["peft"].from_pretrained.assert_not_called()
+    mock_transformers["tokenizer"].from_pretrained.assert_called_once_with(bundle)
+    assert manager.model is mock_load_bundle.return_value
+    assert manager.model_version == version
+    assert manager.weights_memory_mapped
+    assert {"tokenizer", "bundle", "to_device", "total"} <= set(manager.load_timings)
+
+
+def test_stale_bundle_is_ignored(mock_transformers, bundle_dir):
+    _, adapter, _ = bundle_dir
+    (adapter / "adapter_model.safetensors").write_bytes(b"retrained")
+    manager = ModelManager()
+
+    with patch("app.core.model.load_bundle_model") as mock_load_bundle:
+        manager.load()
+
+    mock_load_bundle.assert_not_called()
+    assert not manager.weights_memory_mapped
+    assert {"base_model", "adapter", "merge"} <= set(manager.load_timings)
+
+
+def test_bundle_without_adapter_is_used(mock_transformers, bundle_dir):
+    bundle, adapter, version = bundle_dir
+    (adapter / "adapter_model.safetensors").unlink()
+    adapter.rmdir()
+    manager = ModelManager()
+
+    with patch("app.core.model.load_bundle_model"):
+        manager.load()
+
+    assert manager.model_version == version
+
+
+def test_bundle_with_unknown_format_is_ignored(mock_transformers, bundle_dir):
+    bundle, _, version = bundle_dir
+    info = {"format_version": 99, "model_version": version}
+    (bundle / EXPORT_INFO_FILE).write_text(json.dumps(info))
+    manager = ModelManager()
+
+    with patch("app.core.model.load_bundle_model") as mock_load_bundle:
+        manager.load()
+
+    mock_load_bundle.assert_not_called()
+
+
+def test_first_start_writes_bundle(mock_transformers, tmp_path):
+    manager = ModelManager()
+
+    with patch.object(settings, "MODEL_BUNDLE_PATH", tmp_path / "bundle"):
+        manager.load()
+
+    mock_transformers["save_bundle"].assert_called_once_with(
+        mock_transformers["merged"],
+        manager._tokenizer,
+        tmp_path / "bundle",
+        manager.model_version,
+    )
+    assert "bundle_write" in manager.load_timings
+
+
+def test_bundle_write_failure_does_not_fail_load(mock_transformers, tmp_path):
+    mock_transformers["save_bundle"].side_effect = OSError("read-only")
+    manager = ModelManager()
+
+    with patch.object(settings, "MODEL_BUNDLE_PATH", tmp_path / "bundle"):
+        manager.load()
+
+    assert manager.is_loaded
+
+
+def test_bundle_build_on_start_disabled(mock_transformers, tmp_path):
+    manager = ModelManager()
+
+    with (
+        patch.object(settings, "MODEL_BUNDLE_PATH", tmp_path / "bundle"),
+        patch.object(settings, "MODEL_BUNDLE_BUILD_ON_START", False),
+    ):
+        manager.load()
+
+    mock_transformers["save_bundle"].assert_not_called()
+
+
+def test_bundle_disabled(mock_transformers, bundle_dir):
+    manager = ModelManager()
+
+    with (
+        patch.object(settings, "MODEL_BUNDLE_ENABLED", False),
+        patch("app.core.model.load_bundle_model") as mock_load_bundle,
+    ):
+        manager.load()
+
+    mock_load_bundle.assert_not_called()
+    mock_transformers["save_bundle"].assert_not_called()
+
+
+def _tiny_config():
+    return T5Config(
+        vocab_size=32,
+        d_model=16,
+        d_kv=4,
+        d_ff=32,
+        num_layers=1,
+        num_heads=2,
+        decoder_start_token_id=0,
+        pad_token_id=0,
+        eos_token_id=1,
+    )
+
+
+def _tiny_peft_model():
+    torch.manual_seed(0)
+    config = _tiny_config()
+    lora = LoraConfig(target_modules=["q", "v"], r=4, init_lora_weights=False)
+    return get_peft_model(T5ForConditionalGeneration(config).eval(), lora)
+
+
+def test_merge_lora_in_place_matches_merge_and_unload():
+    expected = _tiny_peft_model().merge_and_unload().state_dict()
+
+    merged = merge_lora_in_place(_tiny_peft_model())
+
+    assert not any("lora" in name for name, _ in merged.named_modules())
+    assert merged.state_dict().keys() == expected.keys()
+    for name, tensor in merged.state_dict().items():
+        assert torch.allclose(tensor, expected[name]), name
+
+
+def test_load_merged_model_low_memory():
+    with (
+        patch("app.core.model.AutoModelForSeq2SeqLM") as mock_model,
+        patch("app.core.model.PeftModel") as mock_peft,
+        patch("app.core.model.merge_lora_in_place") as mock_merge,
+        patch("app.core.model.release_freed_memory") as mock_release,
+    ):
+        merged = load_merged_model("t5-small", "adapter", low_memory=True)
+
+    mock_model.from_pretrained.assert_called_once_with(
+        "t5-small", low_cpu_mem_usage=True
+    )
+    assert mock_peft.from_pretrained.call_args.kwargs == {"low_cpu_mem_usage": True}
+    mock_peft.from_pretrained.return_value.merge_and_unload.assert_not_called()
+    assert merged is mock_merge.return_value
+    mock_release.assert_called_once()
+
+
+def test_load_merged_model_follows_setting(mock_transformers):
+    with patch.object(settings, "LOW_MEMORY_LOAD", False):
+        merged = load_merged_model("t5-small", "adapter")
+
+    mock_transformers["model"].from_pretrained.assert_called_once_with(
+        "t5-small", low_cpu_mem_usage=False
+    )
+    # Not passed at all, so peft releases without the argument still work.
+    assert mock_transformers["peft"].from_pretrained.call_args.kwargs == {}
+    assert merged is mock_transformers["merged"]
+
+
+@pytest.fixture
+def tiny_manager():
+    torch.manual_seed(0)
+    manager = ModelManager()
+    manager._model = T5ForConditionalGeneration(_tiny_config()).eval()
+    manager._tokenizer = MagicMock(pad_token_id=0)
+    manager._device = torch.device("cpu")
+    inputs = {
+        "input_ids": torch.randint(2, 32, (4, 6)),
+        "attention_mask": torch.ones(4, 6, dtype=torch.long),
+    }
+    with (
+        patch.object(settings, "CASCADE_ENABLED", True),
+        patch("app.core.model.cascade_stats") as mock_stats,
+        patch("app.core.model.latency_model", LatencyModel()),
+        patch("app.core.model.decoding_log", DecodingLog()) as log,
+    ):
+        yield manager, inputs, mock_stats, log
+
+
+@pytest.mark.parametrize("threshold, escalated", [(float("-inf"), 0), (0.0, 4)])
+def test_cascade_escalates_low_confidence_rows(tiny_manager, threshold, escalated):
+    manager, inputs, mock_stats, log = tiny_manager
+    texts = ["a", "b", "c", "d"]
+    beam = GenerationParams(num_beams=4, max_new_tokens=6)
+    expected_params = beam if escalated else GenerationParams(1, max_new_tokens=6)
+    expected = manager.model.generate(**inputs, **expected_params.generate_kwargs())
+
+    with patch.object(settings, "CASCADE_CONFIDENCE_THRESHOLD", threshold):
+        generated = manager._generate(inputs, beam, texts=texts)
+
+    assert torch.equal(generated, expected)
+    confidence, rerun, _, baseline = mock_stats.record.call_args[0]
+    assert len(confidence) == 4
+    assert rerun == escalated
+    # Escalating every row measures the baseline; beam search never ran when
+    # no row escalated, so there is nothing to compare against.
+    assert (baseline is not None) == bool(escalated)
+    assert log.lookup(texts, beam) == expected_params
+
+
+def test_cascade_estimates_baseline_from_measured_beams(tiny_manager):
+    manager, inputs, mock_stats, _ = tiny_manager
+    greedy = GenerationParams(num_beams=1, max_new_tokens=6)
+    steps = manager.model.generate(**inputs, **greedy.generate_kwargs()).shape[1] - 1
+    latency = LatencyModel()
+    latency.record(4, 6, 10, 0.05)
+
+    with (
+        patch.object(settings, "CASCADE_CONFIDENCE_THRESHOLD", float("-inf")),
+        patch("app.core.model.latency_model", latency),
+    ):
+        manager._generate(inputs, GenerationParams(num_beams=4, max_new_tokens=6))
+
+    # Greedy steps at the measured 5ms per 4-beam step.
+    assert mock_stats.record.call_args[0][3] == pytest.approx(steps * 0.005)
+
+
+def test_cascade_skips_greedy_requests(tiny_manager):
+    manager, inputs, mock_stats, _ = tiny_manager
+
+    manager._generate(inputs, GenerationParams(num_beams=1, max_new_tokens=6))
+
+    mock_stats.record.assert_not_called()
+
+
+@pytest.fixture
+def streaming_manager(tiny_manager):
+    manager, _, _, _ = tiny_manager
+    manager._is_loaded = True
+    _with_encoder(manager, [[5, 6, 7, 1]])
+    manager._tokenizer.decode.side_effect = lambda ids, **kwargs: "".join(
+        f"w{int(i)} " for i in ids if int(i) > 1
+    )
+    return manager
+
+
+async def _stream(manager, params=None, cancel=None):
+    streamer = manager.create_streamer()
+    generation = asyncio.ensure_future(
+        asyncio.to_thread(
+            manager.translate_streaming, "Hello", streamer, params, cancel
+        )
+    )
+    chunks = [chunk async for chunk in streamer]
+    return chunks, generation
+
+
+async def test_translate_streaming_matches_greedy_output(streaming_manager):
+    params = GenerationParams(num_beams=1, max_new_tokens=6)
+    inputs = {
+        "input_ids": torch.tensor([[5, 6, 7, 1]]),
+        "attention_mask": torch.ones(1, 4, dtype=torch.long),
+    }
+    expected = streaming_manager.model.generate(**inputs, **params.generate_kwargs())
+
+    chunks, generation = await _stream(streaming_manager, params)
+    await generation
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == streaming_manager._tokenizer.decode(expected[0])
+
+
+async def test_translate_streaming_stops_when_cancelled(streaming_manager):
+    cancel = threading.Event()
+    cancel.set()
+
+    chunks, generation = await _stream(
+        streaming_manager, GenerationParams(num_beams=1, max_new_tokens=6), cancel
+    )
+    await generation
+
+    # Only the first step runs before the stopping criteria is checked.
+    assert len("".join(chunks).split()) <= 1
+
+
+async def test_translate_streaming_rejects_beam_search(streaming_manager):
+    chunks, generation = await _stream(streaming_manager, GenerationParams(4))
+
+    assert "".join(chunks) == ""
+    with pytest.raises(ValueError):
+        await generation
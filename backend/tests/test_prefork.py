@@ -0,0 +1,231 @@
+"""
+Pre-fork Server and Memory Reporting Tests
+"""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.prefork import (
+    PreforkServer,
+    create_socket,
+    parse_args,
+    prepare_master,
+    worker_torch_threads,
+)
+from app.utils.memory import (
+    get_memory_usage,
+    get_peak_rss_mb,
+    release_freed_memory,
+    reset_peak_rss,
+)
+
+
+class TestWorkerTorchThreads:
+    """Tests for per-worker thread partitioning."""
+
+    def test_equal_share_of_cores(self):
+        """Test cores are divided evenly between workers."""
+        assert worker_torch_threads(4, cpu_count=32) == 8
+        assert worker_torch_threads(3, cpu_count=32) == 10
+
+    def test_at_least_one_thread(self):
+        """Test more workers than cores still get one thread each."""
+        assert worker_torch_threads(8, cpu_count=4) == 1
+
+    def test_explicit_setting_wins(self):
+        """Test an explicit TORCH_INTRA_OP_THREADS is kept."""
+        with patch("app.prefork.settings.TORCH_INTRA_OP_THREADS", 3):
+            assert worker_torch_threads(4, cpu_count=32) == 3
+
+
+class TestPrepareMaster:
+    """Tests for loading the model in the master process."""
+
+    def test_loads_and_shares_weights(self):
+        """Test the model is loaded once and moved to shared memory."""
+        mock_manager = MagicMock()
+        mock_manager.device.type = "cpu"
+        mock_manager.weights_memory_mapped = False
+
+        with (
+            patch("app.prefork.model_manager", mock_manager),
+            patch("app.prefork.torch") as mock_torch,
+            patch("app.prefork.asyncio") as mock_asyncio,
+            patch("app.prefork._prepare_database", MagicMock()),
+            patch("app.prefork.gc") as mock_gc,
+        ):
+            prepare_master()
+
+        mock_torch.set_num_threads.assert_called_once_with(1)
+        mock_manager.load.assert_called_once()
+        mock_manager.model.share_memory.assert_called_once()
+        mock_asyncio.run.assert_called_once()
+        mock_gc.freeze.assert_called_once()
+
+    def test_memory_mapped_bundle_is_not_copied(self):
+        """Test bundle weights stay in the page cache instead of shared memory."""
+        mock_manager = MagicMock()
+        mock_manager.device.type = "cpu"
+        mock_manager.weights_memory_mapped = True
+
+        with (
+            patch("app.prefork.model_manager", mock_manager),
+            patch("app.prefork.torch"),
+            patch("app.prefork.asyncio"),
+            patch("app.prefork._prepare_database", MagicMock()),
+            patch("app.prefork.gc"),
+        ):
+            prepare_master()
+
+        mock_manager.model.share_memory.assert_not_called()
+
+    def test_shared_memory_disabled(self):
+        """Test SHARE_MODEL_MEMORY=False relies on plain copy-on-write."""
+        mock_manager = MagicMock()
+        mock_manager.device.type = "cpu"
+        mock_manager.weights_memory_mapped = False
+
+        with (
+            patch("app.prefork.settings.SHARE_MODEL_MEMORY", False),
+            patch("app.prefork.model_manager", mock_manager),
+            patch("app.prefork.torch"),
+            patch("app.prefork.asyncio"),
+            patch("app.prefork._prepare_database", MagicMock()),
+            patch("app.prefork.gc"),
+        ):
+            prepare_master()
+
+        mock_manager.model.share_memory.assert_not_called()
+
+    def test_rejects_onnxruntime_backend(self):
+        """Test pre-fork mode refuses ONNX Runtime sessions."""
+        mock_manager = MagicMock()
+
+        with (
+            patch("app.prefork.settings.INFERENCE_BACKEND", "onnxruntime"),
+            patch("app.prefork.model_manager", mock_manager),
+        ):
+            with pytest.raises(RuntimeError, match="pytorch backend"):
+                prepare_master()
+
+        mock_manager.load.assert_not_called()
+
+    def test_rejects_gpu(self):
+        """Test pre-fork mode refuses CUDA devices."""
+        mock_manager = MagicMock()
+        mock_manager.device.type = "cuda"
+
+        with (
+            patch("app.prefork.model_manager", mock_manager),
+            patch("app.prefork.torch"),
+        ):
+            with pytest.raises(RuntimeError, match="CPU"):
+                prepare_master()
+
+
+class TestPreforkServer:
+    """Tests for worker supervision."""
+
+    def test_create_socket(self):
+        """Test the shared socket is bound and inheritable."""
+        sock = create_socket("127.0.0.1", 0)
+        try:
+            assert sock.get_inheritable()
+            assert sock.getsockname()[1] > 0
+        finally:
+            sock.close()
+
+    def test_report_memory(self):
+        """Test the report covers the master and every worker."""
+        server = PreforkServer(2, "127.0.0.1", 0)
+        server._pids = {os.getpid(): 0}
+
+        report = server.report_memory()
+
+        assert "master" in report
+        assert report["worker-0"]["pid"] == os.getpid()
+        assert report["total_pss_mb"] >= 0
+
+    def test_reap_respawns_dead_worker(self):
+        """Test an exited worker is replaced."""
+        server = PreforkServer(1, "127.0.0.1", 0)
+        server._pids = {1234: 0}
+
+        with (
+            patch("app.prefork.os.waitpid", side_effect=[(1234, 256), (0, 0)]),
+            patch.object(server, "spawn") as mock_spawn,
+        ):
+            server.reap()
+
+        mock_spawn.assert_called_once_with(0)
+        assert 1234 not in server._pids
+
+    def test_shutdown_terminates_workers(self):
+        """Test shutdown signals every worker."""
+        server = PreforkServer(1, "127.0.0.1", 0)
+        server._pids = {1234: 0}
+
+        def fake_waitpid(pid, options):
+            return (1234, 0)
+
+        with (
+            patch("app.prefork.os.kill") as mock_kill,
+            patch("app.prefork.os.waitpid", side_effect=fake_waitpid),
+        ):
+            server.shutdown(timeout=1.0)
+
+        mock_kill.assert_called_once()
+        assert server._pids == {}
+
+    def test_parse_args_defaults(self):
+        """Test CLI defaults come from settings."""
+        with patch("sys.argv", ["prefork"]):
+            args = parse_args()
+        assert args.workers >= 1
+        assert args.port == 8000
+
+
+class TestMemoryUsage:
+    """Tests for process memory reporting."""
+
+    def test_current_process(self):
+        """Test the current process reports a positive RSS."""
+        usage = get_memory_usage()
+        assert usage["rss_mb"] > 0
+        assert set(usage) == {"rss_mb", "pss_mb", "shared_mb", "private_mb"}
+
+    def test_falls_back_without_proc(self, tmp_path):
+        """Test a missing /proc entry falls back to peak RSS."""
+        with patch("app.utils.memory.Path", return_value=tmp_path):
+            usage = get_memory_usage(pid=1)
+        assert usage["rss_mb"] > 0
+
+    def test_peak_rss_after_reset(self):
+        """Test the peak is at least the current RSS once reset."""
+        reset_peak_rss()
+        assert get_peak_rss_mb() >= get_memory_usage()["rss_mb"] - 1
+
+    def test_peak_rss_falls_back_without_proc(self, tmp_path):
+        """Test a missing /proc falls back to the lifetime peak."""
+        with (
+            patch("app.utils.memory.open", side_effect=OSError, create=True),
+            patch("app.utils.memory.Path", return_value=tmp_path),
+        ):
+            assert not reset_peak_rss()
+            assert get_peak_rss_mb() > 0
+
+    def test_release_freed_memory_without_libc(self):
+        """Test releasing memory works when libc cannot be found."""
+        with (
+            patch("app.utils.memory.gc.collect") as mock_collect,
+            patch("app.utils.memory.ctypes.util.find_library", return_value=None),
+        ):
+            release_freed_memory()
+        mock_collect.assert_called_once()
+
+    def test_release_freed_memory_without_malloc_trim(self):
+        """Test a libc without malloc_trim (e.g. musl) is tolerated."""
+        with patch("app.utils.memory.ctypes.CDLL", side_effect=OSError):
+            release_freed_memory()
@@ -0,0 +1,148 @@
+"""
+On-demand Profiling Tests
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+import torch
+
+from app.core.config import settings
+from app.core.profiling import InferenceProfiler, ProfilerBusy
+
+
+def model_call():
+    """A few ops standing in for a generate() call."""
+    return torch.nn.functional.linear(torch.randn(4, 8), torch.randn(8, 8)).sum()
+
+
+class TestInferenceProfiler:
+    """Tests for capturing profiles of the next model calls."""
+
+    def test_without_capture_calls_run_unprofiled(self):
+        """Test the block runs as is when no capture is running."""
+        profiler = InferenceProfiler()
+
+        with profiler.profiled():
+            model_call()
+
+        assert not profiler.is_active
+
+    def test_capture_ends_after_calls(self, tmp_path):
+        """Test each call gets a trace and the capture ends after the last one."""
+        profiler = InferenceProfiler()
+        future = profiler.start(tmp_path, calls=2, seconds=60)
+
+        for _ in range(3):
+            with profiler.profiled():
+                model_call()
+
+        assert not profiler.is_active
+        summary = future.result(timeout=0)
+        assert summary["calls"] == 2
+        directory = tmp_path / "profiles" / summary["id"]
+        assert summary["trace_dir"] == str(directory)
+        for trace in summary["traces"]:
+            assert trace.endswith(".pt.trace.json")
+            assert "traceEvents" in json.loads((directory / trace).read_text())
+        assert json.loads((directory / "summary.json").read_text()) == summary
+
+        names = [op["name"] for op in summary["top_ops"]]
+        assert any(name.startswith("aten::") for name in names)
+        first = summary["top_ops"][0]
+        assert first["self_cpu_ms"] >= summary["top_ops"][-1]["self_cpu_ms"]
+        assert 0 < first["self_cpu_share"] <= 1
+        assert summary["top_shapes"][0]["input_shapes"]
+
+    def test_capture_ends_after_deadline(self, tmp_path):
+        """Test a call past the deadline ends the capture unprofiled."""
+        profiler = InferenceProfiler()
+        future = profiler.start(tmp_path, calls=None, seconds=0.001)
+
+        with patch("app.core.profiling.time.perf_counter", return_value=1e12):
+            with profiler.profiled():
+                model_call()
+
+        assert future.result(timeout=0)["calls"] == 0
+        assert not profiler.is_active
+
+    def test_one_capture_at_a_time(self, tmp_path):
+        """Test a second capture is refused until the first one ends."""
+        profiler = InferenceProfiler()
+        profiler.start(tmp_path, calls=1, seconds=60)
+
+        with pytest.raises(ProfilerBusy):
+            profiler.start(tmp_path, calls=1, seconds=60)
+
+        assert profiler.stop()["calls"] == 0
+        assert profiler.stop() is None
+        profiler.start(tmp_path, calls=1, seconds=60)
+
+    def test_summary_limited_to_top_ops(self, tmp_path):
+        """Test only PROFILE_TOP_OPS ops are listed."""
+        profiler = InferenceProfiler()
+        future = profiler.start(tmp_path, calls=1, seconds=60)
+
+        with patch.object(settings, "PROFILE_TOP_OPS", 1):
+            with profiler.profiled():
+                model_call()
+                torch.randn(8).relu()
+
+        summary = future.result(timeout=0)
+        assert len(summary["top_ops"]) == 1
+        assert len(summary["top_shapes"]) == 1
+
+
+class TestProfileEndpoint:
+    """Tests for the admin profiling endpoint."""
+
+    @pytest.fixture
+    def admin(self, tmp_path):
+        """Enable the admin endpoints and write traces to a temporary directory."""
+        with (
+            patch.object(settings, "ADMIN_TOKEN", "secret"),
+            patch.object(settings, "LOGS_DIR", tmp_path),
+        ):
+            yield {"X-Admin-Token": "secret"}
+
+    @pytest.mark.asyncio
+    async def test_disabled_without_token_configured(self, client):
+        """Test admin endpoints are off unless ADMIN_TOKEN is set."""
+        with patch.object(settings, "ADMIN_TOKEN", None):
+            response = await client.post(
+                "/admin/profile", json={}, headers={"X-Admin-Token": ""}
+            )
+
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_rejects_wrong_token(self, client, admin):
+        """Test callers without the admin token are refused."""
+        response = await client.post(
+            "/admin/profile", json={}, headers={"X-Admin-Token": "guess"}
+        )
+
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_capture_ends_after_seconds(self, client, admin, tmp_path):
+        """Test an idle capture returns once its time is up."""
+        response = await client.post(
+            "/admin/profile", json={"calls": 5, "seconds": 0.05}, headers=admin
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["calls"] == 0
+        assert data["top_ops"] == []
+        assert data["trace_dir"].startswith(str(tmp_path))
+
+    @pytest.mark.asyncio
+    async def test_busy_profiler_returns_409(self, client, admin):
+        """Test a second capture is refused while one is running."""
+        with patch("app.api.admin.inference_profiler") as profiler:
+            profiler.start.side_effect = ProfilerBusy("busy")
+            response = await client.post("/admin/profile", json={}, headers=admin)
+
+        assert response.status_code == 409
@@ -0,0 +1,177 @@
+"""
+Dynamic int8 Quantization Tests
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+import torch
+from transformers import T5Config, T5ForConditionalGeneration
+
+from app.core.config import settings
+from app.core.quantization import (
+    QuantizationReport,
+    check_quantization,
+    evaluate_model,
+    load_eval_sample,
+    quantize_dynamic_int8,
+)
+
+
+@pytest.fixture
+def tiny_model():
+    """Create a small randomly initialized T5 (no download)."""
+    torch.manual_seed(0)
+    config = T5Config(
+        vocab_size=32,
+        d_model=16,
+        d_kv=4,
+        d_ff=32,
+        num_layers=1,
+        num_heads=2,
+        decoder_start_token_id=0,
+        pad_token_id=0,
+        eos_token_id=1,
+    )
+    return T5ForConditionalGeneration(config).eval()
+
+
+@pytest.fixture
+def fake_tokenizer():
+    """Tokenizer stand-in returning fixed ids for every text."""
+
+    def tokenize(texts=None, text_target=None, **kwargs):
+        if text_target is not None:
+            return {"input_ids": [[5, 6, 1] for _ in text_target]}
+        ids = torch.tensor([[3, 4, 1]] * len(texts))
+        return {"input_ids": ids, "attention_mask": torch.ones_like(ids)}
+
+    tokenizer = MagicMock(side_effect=tokenize)
+    tokenizer.pad_token_id = 0
+    return tokenizer
+
+
+class TestQuantizeDynamicInt8:
+    """Tests for quantizing the merged model."""
+
+    def test_linear_layers_are_quantized(self, tiny_model):
+        """Test Linear layers are replaced and the original is untouched."""
+        quantized = quantize_dynamic_int8(tiny_model)
+
+        assert isinstance(tiny_model.lm_head, torch.nn.Linear)
+        assert type(quantized.lm_head).__module__.startswith(
+            "torch.ao.nn.quantized.dynamic"
+        )
+
+    def test_quantized_model_generates(self, tiny_model):
+        """Test the quantized model still runs generation."""
+        quantized = quantize_dynamic_int8(tiny_model)
+        output = quantized.generate(torch.tensor([[3, 4, 1]]), max_length=5)
+        assert output.shape[0] == 1
+
+
+class TestLoadEvalSample:
+    """Tests for reading the held-out sample."""
+
+    def test_reads_pairs_up_to_limit(self, tmp_path):
+        """Test pairs are read in order and blank lines skipped."""
+        path = tmp_path / "eval.jsonl"
+        lines = [json.dumps({"en": f"e{i}", "es": f"s{i}"}) for i in range(3)]
+        path.write_text("\n\n".join(lines), encoding="utf-8")
+
+        assert load_eval_sample(path, limit=2) == (["e0", "e1"], ["s0", "s1"])
+
+    def test_empty_file(self, tmp_path):
+        """Test an empty sample is rejected."""
+        path = tmp_path / "eval.jsonl"
+        path.write_text("", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="No sentence pairs"):
+            load_eval_sample(path, limit=10)
+
+    def test_missing_file(self, tmp_path):
+        """Test a missing sample raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            load_eval_sample(tmp_path / "missing.jsonl", limit=10)
+
+    def test_shipped_sample(self):
+        """Test the default sample is in the tree and holds en/es pairs."""
+        sources, references = load_eval_sample(settings.QUANTIZATION_EVAL_PATH, 64)
+
+        assert len(sources) == len(references) >= 32
+        assert all(sources) and all(references)
+
+
+class TestEvaluateModel:
+    """Tests for scoring a model on the sample."""
+
+    def test_passes_padded_ids_to_metrics(self, tiny_model, fake_tokenizer):
+        """Test predictions and labels reach the metric as padded arrays."""
+        compute_metrics = MagicMock(return_value={"bleu": 0.5, "chrf": 40.0})
+
+        with (
+            patch.object(settings, "MAX_OUTPUT_LENGTH", 6),
+            patch.object(settings, "NUM_BEAMS", 1),
+        ):
+            result = evaluate_model(
+                tiny_model,
+                fake_tokenizer,
+                ["a"] * 20,
+                ["b"] * 20,
+                compute_metrics,
+                torch.device("cpu"),
+            )
+
+        assert result == {"bleu": 0.5, "chrf": 40.0}
+        preds, labels = compute_metrics.call_args[0][0]
+        assert isinstance(preds, np.ndarray) and preds.shape[0] == 20
+        assert labels.tolist() == [[5, 6, 1]] * 20
+
+
+class TestCheckQuantization:
+    """Tests for the int8 accuracy gate."""
+
+    def _run(self, tmp_path, fp32, int8):
+        path = tmp_path / "eval.jsonl"
+        path.write_text(json.dumps({"en": "Hi", "es": "Hola"}), encoding="utf-8")
+        with (
+            patch.object(settings, "QUANTIZATION_EVAL_PATH", path),
+            patch("training.trainer.get_compute_metrics"),
+            patch("app.core.quantization.evaluate_model", side_effect=[fp32, int8]),
+        ):
+            return check_quantization(
+                MagicMock(), MagicMock(), MagicMock(), torch.device("cpu")
+            )
+
+    def test_small_drop_passes(self, tmp_path):
+        """Test a drop within both limits passes."""
+        report = self._run(
+            tmp_path, {"bleu": 0.30, "chrf": 50.0}, {"bleu": 0.295, "chrf": 49.5}
+        )
+
+        assert report.passed
+        assert report.samples == 1
+        assert report.bleu_drop == 0.005
+
+    def test_large_chrf_drop_fails(self, tmp_path):
+        """Test a chrF drop over the limit fails the check."""
+        report = self._run(
+            tmp_path, {"bleu": 0.30, "chrf": 50.0}, {"bleu": 0.30, "chrf": 45.0}
+        )
+
+        assert not report.passed
+        assert report.chrf_drop == 5.0
+
+    def test_report_to_dict(self):
+        """Test the report serializes to a plain dict."""
+        report = QuantizationReport(
+            samples=1,
+            fp32={"bleu": 0.3},
+            int8={"bleu": 0.3},
+            bleu_drop=0.0,
+            chrf_drop=0.0,
+            passed=True,
+        )
+        assert report.to_dict()["passed"] is True
@@ -0,0 +1,83 @@
+"""
+Sentence Segmentation Tests
+"""
+
+from app.services.segmentation import Segment, join_segments, split_segments
+
+
+def count_words(text):
+    """Stand-in token counter: one token per word."""
+    return len(text.split())
+
+
+class TestSplitSegments:
+    """Tests for splitting text into segments."""
+
+    def test_single_sentence(self):
+        """Test a short sentence stays whole."""
+        assert split_segments("Hello world.", count_words, 10) == [
+            Segment(text="Hello world.")
+        ]
+
+    def test_empty_text(self):
+        """Test whitespace-only text has no segments."""
+        assert split_segments("  \n ", count_words, 10) == []
+
+    def test_splits_sentences_and_keeps_whitespace(self):
+        """Test sentence boundaries and the whitespace after them."""
+        segments = split_segments("One. Two!  Three?\n\nFour", count_words, 10)
+
+        assert [s.text for s in segments] == ["One.", "Two!", "Three?", "Four"]
+        assert [s.trailing for s in segments] == [" ", "  ", "\n\n", ""]
+
+    def test_line_breaks_end_segments(self):
+        """Test headings without punctuation are separate segments."""
+        segments = split_segments("Chapter One\nIt was late.", count_words, 10)
+        assert [s.text for s in segments] == ["Chapter One", "It was late."]
+
+    def test_closing_quotes(self):
+        """Test quotes after terminal punctuation stay with the sentence."""
+        segments = split_segments('He said "Go." She left.', count_words, 10)
+        assert [s.text for s in segments] == ['He said "Go."', "She left."]
+
+    def test_abbreviations_and_initials(self):
+        """Test abbreviations and initials do not end sentences."""
+        text = "Mr. Smith met J. Doe, e.g. at noon. Then left."
+        segments = split_segments(text, count_words, 20)
+        assert [s.text for s in segments] == [
+            "Mr. Smith met J. Doe, e.g. at noon.",
+            "Then left.",
+        ]
+
+    def test_long_sentence_split_at_clauses(self):
+        """Test an over-budget sentence is split at clause punctuation."""
+        text = "one two three, four five six, seven eight."
+        segments = split_segments(text, count_words, 4)
+        assert [s.text for s in segments] == [
+            "one two three,",
+            "four five six,",
+            "seven eight.",
+        ]
+
+    def test_long_clause_split_between_words(self):
+        """Test a clause over budget falls back to word boundaries."""
+        text = "a b c d e f g"
+        segments = split_segments(text, count_words, 3)
+
+        assert [s.text for s in segments] == ["a b c", "d e f", "g"]
+        assert all(count_words(s.text) <= 3 for s in segments)
+
+
+class TestJoinSegments:
+    """Tests for reassembling translated segments."""
+
+    def test_roundtrip_identity(self):
+        """Test joining untranslated segments restores the text."""
+        text = "First.\n\nSecond one.  Third?\nFourth"
+        segments = split_segments(text, count_words, 10)
+        assert join_segments(segments, [s.text for s in segments]) == text
+
+    def test_uses_translations(self):
+        """Test translations replace the segment text."""
+        segments = [Segment("Hi.", " "), Segment("Bye.", "")]
+        assert join_segments(segments, ["Hola.", "Adiós."]) == "Hola. Adiós."
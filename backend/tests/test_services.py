@@ -2,7 +2,8 @@
 Translation Service Tests
 """
 
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -61,7 +62,7 @@ class TestTranslationServiceTranslate:
             result = TranslationService.translate("Hello world")
 
             assert result == "Hola mundo"
-            mock_model_manager.translate.assert_called_once_with("Hello world")
+            mock_model_manager.translate.assert_called_once_with("Hello world", None)
 
     def test_translate_strips_input(self, mock_model_manager):
         """Test that translation strips input whitespace."""
@@ -71,12 +72,14 @@ class TestTranslationServiceTranslate:
             mock_model_manager.translate.return_value = "Hola mundo"
             TranslationService.translate("  Hello world  ")
 
-            mock_model_manager.translate.assert_called_once_with("Hello world")
+            mock_model_manager.translate.assert_called_once_with("Hello world", None)
 
     def test_translate_model_not_loaded(self):
         """Test translation when model is not loaded."""
         mock_manager = MagicMock()
         mock_manager.translate.side_effect = RuntimeError("Model not loaded")
+        mock_manager.count_tokens.side_effect = RuntimeError("Model not loaded")
+        mock_manager.model_version = "test-version"
 
         with patch("app.services.translation.model_manager", mock_manager):
             from app.services.translation import TranslationService
@@ -93,14 +96,725 @@ class TestTranslationServiceTranslate:
                 TranslationService.translate("")
 
     def test_translate_long_text(self, mock_model_manager):
-        """Test translation with long text."""
+        """Test long text is translated sentence by sentence in one batch."""
         with patch("app.services.translation.model_manager", mock_model_manager):
             from app.services.translation import TranslationService
 
             long_text = "Hello world. " * 100
-            mock_model_manager.translate.return_value = "Hola mundo. " * 100
 
             result = TranslationService.translate(long_text)
 
-            assert result == "Hola mundo. " * 100
-            mock_model_manager.translate.assert_called_once()
+            assert result == " ".join(["es:Hello world."] * 100)
+            mock_model_manager.translate_batch.assert_called_once()
+            mock_model_manager.translate.assert_not_called()
+
+
+class TestTranslationServiceSegmentation:
+    """Tests for segmented translation of long inputs."""
+
+    def test_preserves_paragraph_breaks(self, mock_model_manager):
+        """Test whitespace between sentences survives translation."""
+        with patch("app.services.translation.model_manager", mock_model_manager):
+            from app.services.translation import TranslationService
+
+            result = TranslationService.translate("First one.\n\nSecond one.  Third.")
+
+        assert result == "es:First one.\n\nes:Second one.  es:Third."
+
+    def test_batch_is_length_sorted(self, mock_model_manager):
+        """Test segments reach the model shortest first."""
+        with patch("app.services.translation.model_manager", mock_model_manager):
+            from app.services.translation import TranslationService
+
+            TranslationService.translate("A much longer sentence here. Short.")
+
+        texts = mock_model_manager.translate_batch.call_args[0][0]
+        assert texts == ["Short.", "A much longer sentence here."]
+
+    def test_segmentation_disabled(self, mock_model_manager):
+        """Test SEGMENTATION_ENABLED=False sends the whole text at once."""
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.settings.SEGMENTATION_ENABLED", False),
+        ):
+            from app.services.translation import TranslationService
+
+            TranslationService.translate("One. Two.")
+
+        mock_model_manager.translate.assert_called_once_with("One. Two.", None)
+
+    def test_segments_go_through_scheduler(self, mock_model_manager):
+        """Test a running scheduler receives every segment."""
+        from concurrent.futures import Future
+
+        def submit(text, params=None):
+            future = Future()
+            future.set_result(text.upper())
+            return future
+
+        mock_scheduler = MagicMock()
+        mock_scheduler.is_running = True
+        mock_scheduler.submit.side_effect = submit
+
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.batch_scheduler", mock_scheduler),
+        ):
+            from app.services.translation import TranslationService
+
+            result = TranslationService.translate("One. Two.")
+
+        assert result == "ONE. TWO."
+        assert mock_scheduler.submit.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_translate_async_segments(self, mock_model_manager):
+        """Test the async path translates segments in one batch."""
+        mock_model_manager.translate_batch_async = AsyncMock(
+            return_value=["Dos.", "Uno es."]
+        )
+        mock_scheduler = MagicMock()
+        mock_scheduler.is_running = False
+
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.batch_scheduler", mock_scheduler),
+        ):
+            from app.services.translation import TranslationService
+
+            result = await TranslationService.translate_async("One is. Two.")
+
+        assert result == "Uno es. Dos."
+        mock_model_manager.translate_batch_async.assert_awaited_once_with(
+            ["Two.", "One is."], None
+        )
+
+
+class TestTranslationServiceBatching:
+    """Tests for routing translations through the batch scheduler."""
+
+    def test_translate_uses_scheduler_when_running(self, mock_model_manager):
+        """Test that a running scheduler handles the translation."""
+        mock_scheduler = MagicMock()
+        mock_scheduler.is_running = True
+        mock_scheduler.translate.return_value = "Hola mundo"
+
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.batch_scheduler", mock_scheduler),
+        ):
+            from app.services.translation import TranslationService
+
+            result = TranslationService.translate("  Hello world ")
+
+        assert result == "Hola mundo"
+        mock_scheduler.translate.assert_called_once_with("Hello world", None)
+        mock_model_manager.translate.assert_not_called()
+
+
+class TestTranslationServiceAsync:
+    """Tests for the async translation path."""
+
+    @pytest.mark.asyncio
+    async def test_translate_async_uses_executor_path(self, mock_model_manager):
+        """Test the model manager's async path is used without a scheduler."""
+        mock_model_manager.translate_async = AsyncMock(return_value="Hola mundo")
+        mock_scheduler = MagicMock()
+        mock_scheduler.is_running = False
+
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.batch_scheduler", mock_scheduler),
+        ):
+            from app.services.translation import TranslationService
+
+            result = await TranslationService.translate_async(" Hello world ")
+
+        assert result == "Hola mundo"
+        mock_model_manager.translate_async.assert_awaited_once_with("Hello world", None)
+        mock_model_manager.translate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_translate_async_uses_scheduler(self, mock_model_manager):
+        """Test a running scheduler's future is awaited."""
+        from concurrent.futures import Future
+
+        future = Future()
+        future.set_result("Hola mundo")
+        mock_scheduler = MagicMock()
+        mock_scheduler.is_running = True
+        mock_scheduler.submit.return_value = future
+
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.batch_scheduler", mock_scheduler),
+        ):
+            from app.services.translation import TranslationService
+
+            result = await TranslationService.translate_async("Hello world")
+
+        assert result == "Hola mundo"
+        mock_scheduler.submit.assert_called_once_with("Hello world", None)
+
+    @pytest.mark.asyncio
+    async def test_translate_async_empty_input(self):
+        """Test the async path validates input."""
+        from app.services.translation import TranslationService
+
+        with pytest.raises(ValueError):
+            await TranslationService.translate_async("   ")
+
+
+class TestTranslationServicePlan:
+    """Tests for choosing decoding settings per request."""
+
+    def test_without_budget_skips_tokenizing(self, mock_model_manager):
+        """Test requests without a budget are planned without the tokenizer."""
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.plan_generation") as mock_plan,
+        ):
+            from app.services.translation import TranslationService
+
+            TranslationService.plan("Hello world", num_beams=2)
+
+        mock_model_manager.count_tokens.assert_not_called()
+        mock_plan.assert_called_once_with(
+            0, num_beams=2, max_new_tokens=None, latency_budget_ms=None
+        )
+
+    def test_budget_uses_longest_segment(self, mock_model_manager):
+        """Test long inputs are estimated at the segment token budget."""
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.plan_generation") as mock_plan,
+            patch("app.services.translation.settings.SEGMENT_MAX_TOKENS", 3),
+        ):
+            from app.services.translation import TranslationService
+
+            TranslationService.plan("one two three four five", latency_budget_ms=100)
+
+        assert mock_plan.call_args[0][0] == 3
+
+    def test_decoding_used_follows_the_cascade(self, mock_model_manager):
+        """Test a request is reported greedy only if no segment escalated."""
+        from app.core.generation import DecodingLog, GenerationParams
+
+        beam = GenerationParams(num_beams=4)
+        log = DecodingLog()
+        log.record(["One.", "Two."], beam, [1, 4])
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.decoding_log", log),
+            patch("app.services.translation.settings.CASCADE_ENABLED", True),
+        ):
+            from app.services.translation import TranslationService
+
+            assert TranslationService.decoding_used("One.", beam).num_beams == 1
+            assert TranslationService.decoding_used("One. Two.", beam) == beam
+
+            with patch("app.services.translation.settings.CASCADE_ENABLED", False):
+                assert TranslationService.decoding_used("One.", beam) == beam
+
+
+class TestTranslationServiceCache:
+    """Tests for the translation cache in the service."""
+
+    def test_repeat_is_served_from_cache(self, mock_model_manager):
+        """Test a repeated input skips the model."""
+        with patch("app.services.translation.model_manager", mock_model_manager):
+            from app.services.translation import TranslationService
+
+            first = TranslationService.translate("Hello world")
+            second = TranslationService.translate("  Hello   world ")
+
+        assert first == second == "Hola mundo"
+        mock_model_manager.translate.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_cache_bypassed(self, mock_model_manager):
+        """Test use_cache=False neither reads nor fills the cache."""
+        mock_model_manager.translate_async = AsyncMock(return_value="Hola mundo")
+        mock_scheduler = MagicMock()
+        mock_scheduler.is_running = False
+
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.batch_scheduler", mock_scheduler),
+        ):
+            from app.services.translation import TranslationService
+
+            await TranslationService.translate_async("Hello world", use_cache=False)
+            await TranslationService.translate_async("Hello world")
+            await TranslationService.translate_async("Hello world", use_cache=False)
+
+        assert mock_model_manager.translate_async.await_count == 3
+
+    def test_model_version_is_part_of_key(self, mock_model_manager):
+        """Test a different model version misses the cache."""
+        with patch("app.services.translation.model_manager", mock_model_manager):
+            from app.services.translation import TranslationService
+
+            TranslationService.translate("Hello world")
+            mock_model_manager.model_version = "retrained"
+            TranslationService.translate("Hello world")
+
+        assert mock_model_manager.translate.call_count == 2
+
+    def test_decoding_settings_are_part_of_key(self, mock_model_manager):
+        """Test a different beam width misses the cache."""
+        with patch("app.services.translation.model_manager", mock_model_manager):
+            from app.core.generation import GenerationParams
+            from app.services.translation import TranslationService
+
+            TranslationService.translate("Hello world")
+            greedy = GenerationParams(num_beams=1)
+            TranslationService.translate("Hello world", greedy)
+
+        assert mock_model_manager.translate.call_count == 2
+        mock_model_manager.translate.assert_called_with("Hello world", greedy)
+
+    def test_cache_disabled(self, mock_model_manager):
+        """Test CACHE_ENABLED=False always runs the model."""
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.settings.CACHE_ENABLED", False),
+        ):
+            from app.services.translation import TranslationService
+
+            TranslationService.translate("Hello world")
+            TranslationService.translate("Hello world")
+
+        assert mock_model_manager.translate.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_translate_async_uses_cache(self, mock_model_manager):
+        """Test the async path reads and fills the cache."""
+        mock_model_manager.translate_async = AsyncMock(return_value="Hola mundo")
+        mock_scheduler = MagicMock()
+        mock_scheduler.is_running = False
+
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.batch_scheduler", mock_scheduler),
+        ):
+            from app.services.translation import TranslationService
+
+            await TranslationService.translate_async("Hello world")
+            result = await TranslationService.translate_async("Hello world")
+
+        assert result == "Hola mundo"
+        mock_model_manager.translate_async.assert_awaited_once()
+
+
+class TestTranslationServiceSentenceMemory:
+    """Tests for sentence-level translation memory in the service."""
+
+    @pytest.fixture
+    def manager(self, mock_model_manager):
+        """Model manager whose async batch path echoes the inputs."""
+        mock_model_manager.translate_batch_async = AsyncMock(
+            side_effect=lambda texts, params=None: [f"es:{t}" for t in texts]
+        )
+        mock_scheduler = MagicMock()
+        mock_scheduler.is_running = False
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.batch_scheduler", mock_scheduler),
+        ):
+            yield mock_model_manager
+
+    @pytest.mark.asyncio
+    async def test_only_misses_reach_the_model(self, manager, db):
+        """Test sentences seen in another document are not translated again."""
+        from app.services.cache import translation_cache
+        from app.services.translation import TranslationService
+
+        first = await TranslationService.translate_with_memory(
+            "Chapter One. It was dark.", db
+        )
+        # Drop the in-process copies so the second request uses the database.
+        translation_cache.clear()
+        second = await TranslationService.translate_with_memory(
+            "Chapter One. It was late.", db
+        )
+
+        assert first.segments_from_memory == 0
+        assert second.translation == "es:Chapter One. es:It was late."
+        assert second.segments == 2
+        assert second.segments_from_memory == 1
+        assert second.memory_fraction == 0.5
+        manager.translate_batch_async.assert_awaited_with(["It was late."], None)
+
+    @pytest.mark.asyncio
+    async def test_repeated_sentence_translated_once(self, manager, db):
+        """Test a sentence repeated inside one request is translated once."""
+        from app.services.translation import TranslationService
+
+        result = await TranslationService.translate_with_memory("Yes. Yes. No.", db)
+
+        assert result.translation == "es:Yes. es:Yes. es:No."
+        assert result.segments == 3
+        assert result.segments_from_memory == 0
+        manager.translate_batch_async.assert_awaited_once_with(["No.", "Yes."], None)
+
+    @pytest.mark.asyncio
+    async def test_cache_is_checked_before_the_database(self, manager, db):
+        """Test sentences in the in-process cache skip the database lookup."""
+        from app.services.translation import TranslationService
+
+        await TranslationService.translate_with_memory("Hello there.", db)
+        with patch(
+            "app.services.translation.SentenceMemory.lookup_many"
+        ) as mock_lookup:
+            result = await TranslationService.translate_with_memory("Hello there.", db)
+
+        mock_lookup.assert_not_called()
+        assert result.memory_fraction == 1.0
+
+    @pytest.mark.asyncio
+    async def test_memory_failure_falls_back_to_model(self, manager):
+        """Test database errors do not fail the translation."""
+        from app.services.translation import TranslationService
+
+        broken_db = MagicMock()
+        broken_db.execute = AsyncMock(side_effect=RuntimeError("db down"))
+
+        result = await TranslationService.translate_with_memory("Hello.", broken_db)
+
+        assert result.translation == "es:Hello."
+        assert result.segments_from_memory == 0
+
+    def test_memory_fraction_of_empty_result(self):
+        """Test the fraction is zero when there were no segments."""
+        from app.services.translation import MemoryTranslation
+
+        assert MemoryTranslation("", 0, 0).memory_fraction == 0.0
+
+
+class FakeStreamer:
+    """Async iterator standing in for the model's text streamer."""
+
+    def __init__(self, chunks, on_chunk=None):
+        self._chunks = list(chunks)
+        self._on_chunk = on_chunk
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._chunks:
+            raise StopAsyncIteration
+        chunk = self._chunks.pop(0)
+        if self._on_chunk:
+            self._on_chunk()
+        return chunk
+
+
+class TestTranslationServiceSingleFlight:
+    """Tests for sharing translations between identical concurrent requests."""
+
+    @pytest.fixture
+    def flights(self, mock_model_manager):
+        """Fresh single-flight registry and a model held until released."""
+        from app.services.singleflight import SingleFlight
+
+        gate = asyncio.Event()
+
+        async def translate(texts, params=None):
+            await gate.wait()
+            return [f"es:{t}" for t in texts]
+
+        async def translate_one(text, params=None):
+            return (await translate([text], params))[0]
+
+        mock_model_manager.translate_async = AsyncMock(side_effect=translate_one)
+        mock_model_manager.translate_batch_async = AsyncMock(side_effect=translate)
+        mock_scheduler = MagicMock()
+        mock_scheduler.is_running = False
+        flights = SingleFlight()
+        flights.gate = gate
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.batch_scheduler", mock_scheduler),
+            patch("app.services.translation.translation_flights", flights),
+            patch("app.services.translation.settings.CACHE_ENABLED", False),
+        ):
+            yield flights
+
+    async def _together(self, gate, *calls):
+        """Start calls concurrently, then let the model finish."""
+        tasks = [asyncio.ensure_future(call) for call in calls]
+        await asyncio.sleep(0.01)
+        gate.set()
+        return await asyncio.gather(*tasks)
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_generation(
+        self, flights, mock_model_manager
+    ):
+        """Test concurrent identical requests trigger one model call."""
+        from app.core.generation import GenerationParams
+        from app.services.translation import TranslationService
+
+        greedy = GenerationParams(num_beams=1)
+        results = await self._together(
+            flights.gate,
+            TranslationService.translate_async("Hello", greedy),
+            TranslationService.translate_async(" Hello ", greedy),
+            TranslationService.translate_async("Hello", GenerationParams(num_beams=4)),
+        )
+
+        assert results == ["es:Hello"] * 3
+        # Different decoding settings are a different translation.
+        assert mock_model_manager.translate_async.await_count == 2
+        assert flights.snapshot()["coalesced"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sentence_memory_requests_share_sentences(
+        self, flights, mock_model_manager, memory_engine
+    ):
+        """Test sentences already being translated for another request are awaited."""
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        from app.services.translation import TranslationService
+
+        sessions = async_sessionmaker(memory_engine, expire_on_commit=False)
+
+        async def translate(text):
+            async with sessions() as db:
+                return await TranslationService.translate_with_memory(text, db)
+
+        first, second = await self._together(
+            flights.gate, translate("Welcome. Sign in."), translate("Welcome. Log out.")
+        )
+
+        assert first.translation == "es:Welcome. es:Sign in."
+        assert second.translation == "es:Welcome. es:Log out."
+        translated = [
+            text
+            for call in mock_model_manager.translate_batch_async.await_args_list
+            for text in call.args[0]
+        ]
+        assert sorted(translated) == ["Log out.", "Sign in.", "Welcome."]
+        assert flights.snapshot()["coalesced"] == 1
+
+
+class TestTranslationServiceStream:
+    """Tests for streamed translation."""
+
+    @pytest.fixture
+    def streaming(self, mock_model_manager):
+        """Patch the model manager, scheduler and streaming statistics."""
+        from app.services.translation import StreamStats
+
+        mock_model_manager.translate_async = AsyncMock(
+            side_effect=lambda text, params=None: f"es:{text}"
+        )
+        mock_model_manager.translate_streaming_async = AsyncMock()
+        mock_model_manager.create_streamer.side_effect = lambda: FakeStreamer(
+            ["Hola ", "mundo", ""]
+        )
+        mock_scheduler = MagicMock()
+        mock_scheduler.is_running = False
+        stats = StreamStats()
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.batch_scheduler", mock_scheduler),
+            patch("app.services.translation.stream_stats", stats),
+        ):
+            yield mock_model_manager, stats
+
+    @staticmethod
+    async def _collect(text, params=None, cancel=None):
+        from app.services.translation import TranslationService
+
+        return [
+            chunk
+            async for chunk in TranslationService.translate_stream(text, params, cancel)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_greedy_streams_words(self, streaming):
+        """Test greedy decoding streams each segment as it is generated."""
+        from app.core.generation import GenerationParams
+
+        manager, stats = streaming
+        greedy = GenerationParams(num_beams=1)
+
+        chunks = await self._collect("Hello world", greedy)
+
+        assert chunks == ["Hola ", "mundo"]
+        streamer = manager.translate_streaming_async.await_args[0][1]
+        assert isinstance(streamer, FakeStreamer)
+        snapshot = stats.snapshot()
+        assert snapshot["completed"] == 1
+        assert snapshot["ttft_ms"]["p50"] is not None
+
+    @pytest.mark.asyncio
+    async def test_repeat_is_served_from_cache(self, streaming):
+        """Test a streamed translation is cached whole."""
+        from app.core.generation import GenerationParams
+
+        manager, _ = streaming
+        greedy = GenerationParams(num_beams=1)
+
+        await self._collect("Hello world", greedy)
+        chunks = await self._collect("Hello world", greedy)
+
+        assert chunks == ["Hola mundo"]
+        manager.translate_streaming_async.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_beam_search_streams_sentences(self, streaming):
+        """Test beam search yields whole segments in order."""
+        from app.core.generation import GenerationParams
+
+        manager, _ = streaming
+
+        chunks = await self._collect("First one.\n\nSecond.", GenerationParams(2))
+
+        assert chunks == ["es:First one.\n\n", "es:Second."]
+        assert manager.translate_async.await_count == 2
+        manager.create_streamer.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_without_caching(self, streaming):
+        """Test a cancelled stream ends early and is not cached."""
+        import threading
+
+        from app.core.generation import GenerationParams
+        from app.services.cache import translation_cache
+
+        manager, stats = streaming
+        cancel = threading.Event()
+        manager.create_streamer.side_effect = lambda: FakeStreamer(
+            ["Hola "], on_chunk=cancel.set
+        )
+
+        chunks = await self._collect(
+            "Hello world. Again.", GenerationParams(num_beams=1), cancel
+        )
+
+        assert chunks == ["Hola "]
+        assert len(translation_cache) == 0
+        assert stats.snapshot()["cancelled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_generation_error_is_raised(self, streaming):
+        """Test a failed generation surfaces after the stream closes."""
+        from app.core.generation import GenerationParams
+
+        manager, stats = streaming
+        manager.translate_streaming_async.side_effect = RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await self._collect("Hello world", GenerationParams(num_beams=1))
+
+        assert stats.snapshot()["failed"] == 1
+
+
+class TestTranslationServiceTranslateMany:
+    """Tests for translating many texts in one call."""
+
+    @pytest.fixture
+    def batch_manager(self, mock_model_manager):
+        """Patch the model manager with an async batch path and no scheduler."""
+        mock_model_manager.translate_batch_async = AsyncMock(
+            side_effect=lambda texts, params=None: [f"es:{t}" for t in texts]
+        )
+        mock_scheduler = MagicMock()
+        mock_scheduler.is_running = False
+        with (
+            patch("app.services.translation.model_manager", mock_model_manager),
+            patch("app.services.translation.batch_scheduler", mock_scheduler),
+        ):
+            yield mock_model_manager, mock_scheduler
+
+    @staticmethod
+    async def _collect(texts, params=None):
+        from app.services.translation import TranslationService
+
+        return [r async for r in TranslationService.translate_many(texts, params)]
+
+    @pytest.mark.asyncio
+    async def test_results_carry_input_indices(self, batch_manager):
+        """Test every text gets one result tagged with its position."""
+        results = await self._collect(["Hello.", " ", "First one. Second one."])
+
+        by_index = {r.index: r for r in results}
+        assert len(results) == 3
+        assert by_index[0].translation == "es:Hello."
+        assert by_index[1].error == "Text cannot be empty"
+        assert by_index[2].translation == "es:First one. es:Second one."
+
+    @pytest.mark.asyncio
+    async def test_segments_share_length_sorted_batches(self, batch_manager):
+        """Test segments of all texts are batched by token budget, shortest first."""
+        manager, _ = batch_manager
+
+        # One token per word: 1 + 2 fit in 2x2 padded tokens, 4 does not.
+        with patch("app.services.translation.settings.MAX_BATCH_TOKENS", 4):
+            await self._collect(["A much longer sentence. Hi.", "Mid length."])
+
+        batches = [
+            call.args[0] for call in manager.translate_batch_async.await_args_list
+        ]
+        assert batches == [["Hi.", "Mid length."], ["A much longer sentence."]]
+
+    @pytest.mark.asyncio
+    async def test_repeats_and_cached_texts_skip_the_model(self, batch_manager):
+        """Test repeated texts are translated once and cached ones not at all."""
+        manager, _ = batch_manager
+        await self._collect(["Cached."])
+        manager.translate_batch_async.reset_mock()
+
+        results = await self._collect(["New.", "Cached.", " New. "])
+
+        assert results[0].index == 1
+        assert sorted(r.index for r in results) == [0, 1, 2]
+        manager.translate_batch_async.assert_awaited_once()
+        assert manager.translate_batch_async.await_args[0][0] == ["New."]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_only_fails_its_texts(self, batch_manager):
+        """Test a failed batch yields errors for its texts and nothing else."""
+        manager, _ = batch_manager
+
+        def translate_batch(texts, params=None):
+            if "Bad." in texts:
+                raise RuntimeError("boom")
+            return [f"es:{t}" for t in texts]
+
+        manager.translate_batch_async.side_effect = translate_batch
+
+        with patch("app.services.translation.settings.MAX_BATCH_TOKENS", 1):
+            results = await self._collect(["Good.", "Bad."])
+
+        by_index = {r.index: r for r in results}
+        assert by_index[0].translation == "es:Good."
+        assert by_index[1].error == "Translation error"
+
+    @pytest.mark.asyncio
+    async def test_uses_scheduler(self, batch_manager):
+        """Test every segment is submitted to a running scheduler."""
+        from concurrent.futures import Future
+
+        manager, scheduler = batch_manager
+        scheduler.is_running = True
+
+        def submit(text, params=None):
+            future = Future()
+            future.set_result(f"es:{text}")
+            return future
+
+        scheduler.submit.side_effect = submit
+
+        results = await self._collect(["One. Two.", "Three."])
+
+        assert {r.index: r.translation for r in results} == {
+            0: "es:One. es:Two.",
+            1: "es:Three.",
+        }
+        assert scheduler.submit.call_count == 3
+        manager.translate_batch_async.assert_not_called()
@@ -0,0 +1,110 @@
+"""
+Single-flight Deduplication Tests
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+def _gated(calls, gate):
+    """Computation recording the positions it was asked for, held by a gate."""
+
+    async def compute(positions):
+        calls.append(positions)
+        await gate.wait()
+        return [f"result {i}" for i in positions]
+
+    return compute
+
+
+class TestSingleFlight:
+    """Tests for sharing in-flight computations."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_computation(self):
+        """Test callers asking for the same key await the first computation."""
+        flights = SingleFlight()
+        calls, gate = [], asyncio.Event()
+        compute = _gated(calls, gate)
+
+        tasks = [
+            asyncio.ensure_future(flights.run_many(["k"], compute)) for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        gate.set()
+
+        assert await asyncio.gather(*tasks) == [["result 0"]] * 3
+        assert calls == [[0]]
+        snapshot = flights.snapshot()
+        assert snapshot["computed"] == 1
+        assert snapshot["coalesced"] == 2
+        assert snapshot["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_only_keys_not_in_flight_are_computed(self):
+        """Test a caller computes the keys nobody else is computing."""
+        flights = SingleFlight()
+        calls, gate = [], asyncio.Event()
+        compute = _gated(calls, gate)
+
+        first = asyncio.ensure_future(flights.run_many(["a", "b"], compute))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flights.run_many(["c", "b", "c"], compute))
+        await asyncio.sleep(0)
+        gate.set()
+
+        assert await first == ["result 0", "result 1"]
+        # "b" comes from the first computation, "c" once from the second.
+        assert await second == ["result 0", "result 1", "result 0"]
+        assert calls == [[0, 1], [0]]
+
+    @pytest.mark.asyncio
+    async def test_finished_keys_are_computed_again(self):
+        """Test results are not kept once the computation ends."""
+        flights = SingleFlight()
+        calls, gate = [], asyncio.Event()
+        gate.set()
+        compute = _gated(calls, gate)
+
+        await flights.run("k", lambda: compute([0]))
+        await flights.run("k", lambda: compute([0]))
+
+        assert len(calls) == 2
+        assert flights.snapshot()["coalesced"] == 0
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_every_caller(self):
+        """Test a failed computation fails everyone waiting on it."""
+        flights = SingleFlight()
+        gate = asyncio.Event()
+
+        async def fail():
+            await gate.wait()
+            raise RuntimeError("boom")
+
+        tasks = [asyncio.ensure_future(flights.run("k", fail)) for _ in range(2)]
+        await asyncio.sleep(0)
+        gate.set()
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_caller_leaving_does_not_cancel_others(self):
+        """Test the first caller going away leaves the computation running."""
+        flights = SingleFlight()
+        calls, gate = [], asyncio.Event()
+        compute = _gated(calls, gate)
+
+        first = asyncio.ensure_future(flights.run_many(["k"], compute))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flights.run_many(["k"], compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        gate.set()
+
+        assert await second == ["result 0"]
+        assert first.cancelled()
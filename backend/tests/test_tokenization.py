@@ -0,0 +1,158 @@
+"""
+Input Tokenization Tests
+"""
+
+import pytest
+import torch
+
+from app.core.tokenization import InputEncoder, PhaseStats, pad_batch
+
+PREFIX = "translate English to Spanish: "
+
+
+class WordTokenizer:
+    """Tokenizer stand-in with one id per word and an end-of-sequence id."""
+
+    eos_token_id = 1
+
+    def __init__(self):
+        self.vocab = {}
+        self.calls = []
+
+    def _ids(self, text):
+        return [
+            self.vocab.setdefault(word, len(self.vocab) + 2) for word in text.split()
+        ]
+
+    def __call__(
+        self, texts, add_special_tokens=True, truncation=False, max_length=None
+    ):
+        single = isinstance(texts, str)
+        batch = [texts] if single else texts
+        self.calls.append(list(batch))
+        encoded = []
+        for text in batch:
+            ids = self._ids(text)
+            if add_special_tokens:
+                if truncation:
+                    ids = ids[: max_length - 1]
+                ids = ids + [self.eos_token_id]
+            encoded.append(ids)
+        return {"input_ids": encoded[0] if single else encoded}
+
+
+class CharTokenizer(WordTokenizer):
+    """Tokenizer stand-in whose pieces cross the prefix/text boundary."""
+
+    def _ids(self, text):
+        return [len(text)]
+
+
+@pytest.fixture
+def tokenizer():
+    """Word-level tokenizer stand-in."""
+    return WordTokenizer()
+
+
+class TestInputEncoder:
+    """Tests for encoding texts behind the cached task prefix."""
+
+    def test_matches_tokenizing_prefixed_text(self, tokenizer):
+        """Test joined ids equal those of the prefixed strings."""
+        encoder = InputEncoder(tokenizer, PREFIX, max_length=512)
+        texts = ["Hello world", "A longer sentence here", ""]
+
+        encoded = encoder.encode(texts)
+        # The prefix is encoded once, then each batch in a single call.
+        assert tokenizer.calls[-1] == texts
+
+        expected = tokenizer(
+            [PREFIX + text for text in texts], truncation=True, max_length=512
+        )["input_ids"]
+        assert encoder.joins_prefix
+        assert encoded == expected
+
+    def test_truncates_like_the_tokenizer(self, tokenizer):
+        """Test long texts keep the prefix and end-of-sequence token."""
+        encoder = InputEncoder(tokenizer, PREFIX, max_length=8)
+        text = "one two three four five six seven"
+
+        encoded = encoder.encode([text])[0]
+
+        assert len(encoded) == 8
+        assert (
+            encoded
+            == tokenizer(PREFIX + text, truncation=True, max_length=8)["input_ids"]
+        )
+
+    def test_falls_back_when_prefix_does_not_split(self):
+        """Test prefixed strings are tokenized when joining would differ."""
+        tokenizer = CharTokenizer()
+        encoder = InputEncoder(tokenizer, PREFIX, max_length=512)
+
+        encoded = encoder.encode(["Hello"])
+
+        assert not encoder.joins_prefix
+        assert encoded == [[len(PREFIX + "Hello"), 1]]
+
+    def test_cache_skips_the_tokenizer(self, tokenizer):
+        """Test repeated short texts are served from the cache."""
+        encoder = InputEncoder(
+            tokenizer, PREFIX, max_length=512, cache_size=2, cache_max_chars=20
+        )
+        first = encoder.encode(["Hello", "Hello", "Bye"])
+        calls = len(tokenizer.calls)
+
+        second = encoder.encode(["Bye", "Hello"])
+
+        assert second == [first[2], first[0]]
+        assert len(tokenizer.calls) == calls
+        snapshot = encoder.snapshot()
+        assert snapshot["cache_hits"] == 2
+        assert snapshot["cache_misses"] == 2
+        assert snapshot["cache_entries"] == 2
+
+    def test_cache_evicts_and_skips_long_texts(self, tokenizer):
+        """Test the least recently used text is evicted, long texts never cached."""
+        encoder = InputEncoder(
+            tokenizer, PREFIX, max_length=512, cache_size=2, cache_max_chars=10
+        )
+        encoder.encode(["a", "b", "c", "far too long to cache"])
+
+        assert list(encoder._cache) == ["b", "c"]
+
+    def test_cached_ids_are_copies(self, tokenizer):
+        """Test callers cannot alter cached ids."""
+        encoder = InputEncoder(
+            tokenizer, PREFIX, max_length=512, cache_size=2, cache_max_chars=10
+        )
+        encoder.encode(["Hello"])[0].append(99)
+
+        assert encoder.encode(["Hello"])[0][-1] == 1
+
+    def test_count(self, tokenizer):
+        """Test counting includes the prefix and end-of-sequence token."""
+        encoder = InputEncoder(tokenizer, PREFIX, max_length=512)
+
+        assert encoder.count("Hello world") == len(PREFIX.split()) + 2 + 1
+
+
+def test_pad_batch():
+    """Test rows are right-padded with a matching attention mask."""
+    inputs = pad_batch([[5, 6, 1], [7, 1]], pad_token_id=0, device=torch.device("cpu"))
+
+    assert inputs["input_ids"].tolist() == [[5, 6, 1], [7, 1, 0]]
+    assert inputs["attention_mask"].tolist() == [[1, 1, 1], [1, 1, 0]]
+
+
+def test_phase_stats():
+    """Test each phase is timed apart."""
+    stats = PhaseStats()
+    stats.record("generate", 0.5)
+    with stats.timed("tokenize"):
+        pass
+
+    snapshot = stats.snapshot()
+    assert snapshot["generate"] == {"calls": 1, "total_ms": 500.0, "mean_ms": 500.0}
+    assert snapshot["tokenize"]["calls"] == 1
+    assert snapshot["decode"]["calls"] == 0
@@ -1,6 +1,6 @@
 import React, { useState } from 'react';
 import { FaArrowRight, FaMagic, FaCheckCircle, FaCopy, FaCheck, FaExclamationTriangle } from 'react-icons/fa';
-import { translateText } from '../../services/api';
+import { translateTextStream } from '../../services/api';
 import classNames from 'classnames';
 
 export const TranslatorCard: React.FC = () => {
@@ -25,7 +25,7 @@ export const TranslatorCard: React.FC = () => {
         setTranslation(null);
 
         try {
-            const result = await translateText(inputText);
+            const result = await translateTextStream(inputText, setTranslation);
             setTranslation(result);
         } catch (err: any) {
             setError(err.message || 'An unexpected error occurred.');
@@ -92,7 +92,7 @@ export const TranslatorCard: React.FC = () => {
                 {(translation || error || isLoading) && (
                     <div className="mt-6 p-6 bg-black/40 border border-glass-border rounded-2xl min-h-[80px] text-base leading-relaxed text-text animate-[fadeIn_0.4s_ease-out]">
 
-                        {isLoading && (
+                        {isLoading && !translation && (
                             <div className="flex items-center justify-center gap-4 py-5 text-secondary">
                                 <div className="w-6 h-6 border-4 border-secondary/20 border-t-secondary rounded-full animate-spin"></div>
                                 <span>Translating your text...</span>
@@ -106,6 +106,13 @@ export const TranslatorCard: React.FC = () => {
                             </div>
                         )}
 
+                        {translation && isLoading && (
+                            <div className="p-4 bg-black/20 rounded-xl text-lg leading-7">
+                                {translation}
+                                <span className="inline-block w-2 h-5 ml-1 align-middle bg-secondary animate-pulse" />
+                            </div>
+                        )}
+
                         {translation && !isLoading && (
                             <div className="animate-[fadeIn_0.4s_ease-out]">
                                 <div className="flex items-center gap-2.5 mb-4 text-success font-semibold">
@@ -27,3 +27,63 @@ export const translateText = async (text: string): Promise<string> => {
         throw new Error('Failed to connect to translation service.');
     }
 };
+
+interface StreamEvent {
+    event: string;
+    data: any;
+}
+
+const parseEvent = (block: string): StreamEvent => {
+    const event: StreamEvent = { event: 'message', data: null };
+    for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) event.event = line.slice(7);
+        if (line.startsWith('data: ')) event.data = JSON.parse(line.slice(6));
+    }
+    return event;
+};
+
+// Streams the translation as it is generated, calling onChunk with the text so far.
+export const translateTextStream = async (
+    text: string,
+    onChunk: (partial: string) => void,
+    signal?: AbortSignal,
+): Promise<string> => {
+    let response: Response;
+    try {
+        response = await fetch('/translate/stream', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ text }),
+            signal,
+        });
+    } catch {
+        throw new Error('Failed to connect to translation service.');
+    }
+    if (!response.ok || !response.body) {
+        const body = await response.json().catch(() => null);
+        throw new Error(body?.detail || 'Failed to connect to translation service.');
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    let partial = '';
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+        let end: number;
+        while ((end = buffer.indexOf('\n\n')) !== -1) {
+            const { event, data } = parseEvent(buffer.slice(0, end));
+            buffer = buffer.slice(end + 2);
+            if (event === 'chunk') {
+                partial += data.text;
+                onChunk(partial);
+            } else if (event === 'done') {
+                return data.translation;
+            } else if (event === 'error') {
+                throw new Error(data.error);
+            }
+        }
+    }
+    throw new Error('Translation stream ended unexpectedly.');
+};
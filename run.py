@@ -150,6 +150,8 @@ def run():
         if be.poll() is not None:
             print(f"\n>>> Backend stopped unexpectedly (exit code {be.returncode}).")
             print(">>> This is often 'out of memory' while loading torch.")
+            print(">>> Try LOW_MEMORY_LOAD=true, or export a model bundle with "
+                  "'python -m app.export_bundle'.")
             print(">>> Fix: increase the Windows paging file, or close other apps "
                   "to free RAM, then re-run.")
         if fe is not None and fe.poll() is not None: